@@ -5,10 +5,11 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+import time
 from pathlib import Path
 from typing import Any, Dict
 
-from src.orchestrator.artifact_sink import persist_artifacts
+from src.orchestrator.artifact_sink import ArtifactPersister
 from src.orchestrator.factory import advisor_factory, agent_factory
 from src.orchestrator.hooks import PromptRefinerOnFailure
 from src.orchestrator.report import build_markdown_report
@@ -86,7 +87,13 @@ Examples:
     ap.add_argument(
         "--save-artifacts",
         action="store_true",
-        help="Save artifacts to filesystem (out/<run_id>/<stage>/)",
+        help="Save artifacts to filesystem (out/<run_id>/<stage>/) as each stage completes",
+    )
+    ap.add_argument(
+        "--artifact-workers",
+        type=int,
+        default=4,
+        help="Threads writing artifacts with --save-artifacts (default: 4)",
     )
     ap.add_argument(
         "--dry-run",
@@ -104,11 +111,48 @@ Examples:
         default="multi-agent",
         help="Service name for OpenTelemetry traces",
     )
+    ap.add_argument(
+        "--otel-sample-ratio",
+        type=float,
+        default=1.0,
+        help="Fraction of step traces exported to OpenTelemetry (head sampling, default: 1.0)",
+    )
+    ap.add_argument(
+        "--otel-sample",
+        nargs="*",
+        default=[],
+        metavar="CATEGORY=RATIO",
+        help="Per-category sampling ratios overriding --otel-sample-ratio (e.g. codegen=0.1)",
+    )
+    ap.add_argument(
+        "--otel-max-queue",
+        type=int,
+        default=2048,
+        help="Spans buffered for export before new ones are dropped (default: 2048)",
+    )
+    ap.add_argument(
+        "--otel-batch-size",
+        type=int,
+        default=512,
+        help="Max spans per OTLP export request (default: 512)",
+    )
+    ap.add_argument(
+        "--otel-schedule-delay-ms",
+        type=int,
+        default=5000,
+        help="Max delay between span exports in milliseconds (default: 5000)",
+    )
     ap.add_argument(
         "--no-cache",
         action="store_true",
         help="Disable agent output caching",
     )
+    ap.add_argument(
+        "--prune-memory",
+        action="store_true",
+        help="Offload stage outputs no later stage reads to out/<run_id>/_memory/ "
+        "(sequential runner; agents must only read depends_on/template inputs)",
+    )
     ap.add_argument(
         "--top-suggestions",
         action="store_true",
@@ -122,7 +166,31 @@ Examples:
     ap.add_argument(
         "--resume-run-id",
         type=str,
-        help="Resume from a previous run ID (loads the latest checkpoint memory)",
+        help="Resume a previous run ID: completed stages are replayed from checkpoints "
+        "and execution continues at the first incomplete stage",
+    )
+    ap.add_argument(
+        "--only",
+        type=str,
+        help="Run only these stages (comma-separated); upstream inputs come from "
+        "--inputs-from-run, otherwise upstream stages run too",
+    )
+    ap.add_argument(
+        "--from",
+        dest="from_stage",
+        type=str,
+        help="Run this stage and every stage downstream of it",
+    )
+    ap.add_argument(
+        "--until",
+        type=str,
+        help="Run this stage and every stage upstream of it",
+    )
+    ap.add_argument(
+        "--inputs-from-run",
+        type=str,
+        help="Hydrate the outputs of skipped upstream stages from this run's checkpoints "
+        "(used with --only/--from/--until)",
     )
     ap.add_argument(
         "--version",
@@ -135,6 +203,86 @@ Examples:
         default="fs",
         help="Checkpoint store backend: fs (filesystem) or sqlite (default: fs)",
     )
+    ap.add_argument(
+        "--checkpoint-dedup-threshold",
+        type=int,
+        help="Store memory values of at least this many bytes once in a content-addressed "
+        "blob table referenced by digest (default: disabled)",
+    )
+    ap.add_argument(
+        "--checkpoint-compression",
+        choices=["none", "zlib", "lzma"],
+        default="zlib",
+        help="Compression for deduplicated checkpoint blobs (default: zlib)",
+    )
+    ap.add_argument(
+        "--checkpoint-format",
+        default="json",
+        help="Checkpoint serialization: json (default), pickle or msgpack, optionally "
+        "compressed with +zlib/+lzma (e.g. pickle+zlib). Binary formats store bytes natively",
+    )
+    ap.add_argument(
+        "--checkpoint-durability",
+        choices=["none", "batched", "per-step"],
+        help="Write checkpoints through a background writer: per-step (commit + fsync each "
+        "step), batched (one commit + fsync per group, off-thread) or none (off-thread, "
+        "no fsync). "
+        "Default: synchronous writes without the background writer",
+    )
+    ap.add_argument(
+        "--event-sink",
+        choices=["jsonl", "sqlite"],
+        default="jsonl",
+        help="Where run events go: out/<run_id>_events.jsonl (default) or the indexed "
+        "out/events.db queried with 'cli.py events query'",
+    )
+    ap.add_argument(
+        "--checkpoint-retention",
+        metavar="SPEC",
+        help="Prune old checkpoints in the background while the pipeline runs, e.g. "
+        "'keep=20,age=7d,final-only' (keep the 20 newest runs plus runs younger than 7 days; "
+        "keep only the final checkpoint of successful runs)",
+    )
+    ap.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Record step, attempt and phase spans per thread and write them as Chrome "
+        "trace-event JSON (open in https://ui.perfetto.dev), e.g. out/run.trace.json",
+    )
+    ap.add_argument(
+        "--track-resources",
+        action="store_true",
+        help="Record per-step CPU time, peak RSS and memory written in the history, "
+        "step_end events and report",
+    )
+    ap.add_argument(
+        "--tracemalloc-top",
+        type=int,
+        default=0,
+        metavar="N",
+        help="With resource tracking, list each step's N top allocation sites via tracemalloc "
+        "(implies --track-resources; slows the run noticeably)",
+    )
+    ap.add_argument(
+        "--profile",
+        nargs="?",
+        const="*",
+        metavar="STAGES",
+        help="Profile agent and advisor calls with cProfile: all stages, or a comma-separated "
+        "list. Writes out/<run_id>/profiles/<stage>.prof and adds top functions to the report",
+    )
+    ap.add_argument(
+        "--metrics-textfile",
+        metavar="PATH",
+        help="Write Prometheus metrics for node_exporter's textfile collector at run end "
+        "(e.g. /var/lib/node_exporter/orchestrator.prom)",
+    )
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while the run lasts",
+    )
     ap.add_argument(
         "--preset",
         type=str,
@@ -207,11 +355,27 @@ Examples:
     if args.otel_endpoint:
         from src.orchestrator.otel import init_otel
 
-        init_otel(args.otel_service, args.otel_endpoint)
+        try:
+            category_ratios = {k: float(v) for k, v in parse_kv_pairs(args.otel_sample).items()}
+            init_otel(
+                args.otel_service,
+                args.otel_endpoint,
+                sample_ratio=args.otel_sample_ratio,
+                category_ratios=category_ratios,
+                max_queue_size=args.otel_max_queue,
+                max_export_batch_size=args.otel_batch_size,
+                schedule_delay_ms=args.otel_schedule_delay_ms,
+            )
+        except ValueError as e:
+            print(f"Invalid OpenTelemetry sampling option: {e}", file=sys.stderr)
+            sys.exit(1)
 
     try:
         # Load pipeline (use strict loader if parallel, regular otherwise)
+        policy = None
         if args.parallel:
+            from src.orchestrator.yaml_loader_strict import YAMLPipelineLoaderStrict
+
             loader = YAMLPipelineLoaderStrict()
             steps, score_thresholds = loader.load(args.pipeline)
         else:
@@ -243,22 +407,45 @@ Examples:
         # Create checkpoint store based on CLI flag
         def make_checkpoint_store(kind: str, root: str = "out"):
             """Factory function for checkpoint stores."""
+            store_opts = {
+                "blob_threshold": args.checkpoint_dedup_threshold,
+                "compression": args.checkpoint_compression,
+                "serializer": args.checkpoint_format,
+            }
             if kind == "sqlite":
                 from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
 
-                return SQLiteCheckpointStore(db_path=f"{root}/checkpoints.db")
+                return SQLiteCheckpointStore(db_path=f"{root}/checkpoints.db", **store_opts)
             else:  # fs
                 from src.orchestrator.checkpoint_fs import FileCheckpointStore
 
-                return FileCheckpointStore(root=f"{root}/checkpoints")
+                return FileCheckpointStore(root=f"{root}/checkpoints", **store_opts)
 
         checkpoint_store = make_checkpoint_store(args.checkpoint_store, root="out")
+        retention_worker = None
+        if args.checkpoint_retention:
+            from src.orchestrator.retention import RetentionPolicy, RetentionWorker
+
+            try:
+                retention_policy = RetentionPolicy.parse(args.checkpoint_retention)
+            except ValueError as e:
+                print(f"Error parsing --checkpoint-retention: {e}", file=sys.stderr)
+                sys.exit(1)
+            # Works on the raw store so it never forces a flush of the async writer
+            retention_worker = RetentionWorker(checkpoint_store, retention_policy)
+        if args.checkpoint_durability:
+            from src.orchestrator.checkpoint_writer import AsyncCheckpointWriter
+
+            checkpoint_store = AsyncCheckpointWriter(
+                checkpoint_store, durability=args.checkpoint_durability
+            )
 
         # Create orchestrator
         if args.parallel:
             orch = OrchestratorParallel(
                 agent_factory=agent_factory,
                 advisor_factory=advisor_factory,
+                checkpoint_store=checkpoint_store,
                 max_workers=args.max_workers,
                 score_thresholds=score_thresholds,
                 post_step_hooks=post_hooks,
@@ -282,12 +469,37 @@ Examples:
                     max_runtime_sec=budget_data.get("max_runtime_sec"),
                     max_stages=budget_data.get("max_stages"),
                     max_artifacts_bytes=budget_data.get("max_artifacts_bytes"),
+                    max_cpu_sec=budget_data.get("max_cpu_sec"),
+                    max_rss_mb=budget_data.get("max_rss_mb"),
                 )
 
         # Apply cache setting from CLI
         orch.use_cache = not args.no_cache
+        if args.event_sink == "sqlite":
+            from src.orchestrator.eventlog_sqlite import SQLiteEventLog
+
+            orch.eventlog = SQLiteEventLog(db_path="out/events.db")
+        if args.prune_memory:
+            if isinstance(orch, OrchestratorParallel):
+                print("[WARN] --prune-memory is ignored by the parallel runner", file=sys.stderr)
+            else:
+                orch.prune_memory = True
+        if args.track_resources or args.tracemalloc_top > 0:
+            orch.track_resources = True
+            orch.tracemalloc_top = max(0, args.tracemalloc_top)
+        if args.profile:
+            from src.orchestrator.profiling import StageProfiler
+
+            profile_stages = None
+            if args.profile != "*":
+                profile_stages = [s.strip() for s in args.profile.split(",") if s.strip()]
+                unknown = sorted(set(profile_stages) - {s.stage for s in steps})
+                if unknown:
+                    print(f"[WARN] --profile: unknown stage(s) {unknown}", file=sys.stderr)
+            orch.profiler = StageProfiler(stages=profile_stages)
 
         # Resume from checkpoint if requested
+        resume = False
         if args.resume_run_id:
             # Use the same checkpoint store as orchestrator
             store = orch.checkpoints if hasattr(orch, "checkpoints") else checkpoint_store
@@ -296,18 +508,16 @@ Examples:
 
                 store = FileCheckpointStore()
 
+            # The runner replays completed stages from checkpoints and continues
+            # from the first incomplete one
             last_key = store.find_last_key(args.resume_run_id)
             if last_key:
-                checkpoint = store.load(last_key)
-                if checkpoint:
-                    orch.memory.update(checkpoint.memory_snapshot)
-                    orch.run_id = args.resume_run_id
-                    print(f"Resumed from checkpoint: {last_key}", file=sys.stderr)
-                else:
-                    print(
-                        f"Warning: No checkpoint found for run_id={args.resume_run_id}",
-                        file=sys.stderr,
-                    )
+                orch.run_id = args.resume_run_id
+                resume = True
+                print(
+                    f"Resuming run {args.resume_run_id} (last checkpoint: {last_key})",
+                    file=sys.stderr,
+                )
             else:
                 print(
                     f"Warning: No checkpoint found for run_id={args.resume_run_id}", file=sys.stderr
@@ -323,11 +533,79 @@ Examples:
                 print(f"Error parsing --mem: {e}", file=sys.stderr)
                 sys.exit(1)
 
+        # Partial run: compute the stages to execute from the dependency graph
+        stages = None
+        if args.only or args.from_stage or args.until:
+            from src.orchestrator.subgraph import select_stages
+
+            stages = select_stages(
+                steps,
+                only=[n.strip() for n in args.only.split(",")] if args.only else None,
+                from_stage=args.from_stage,
+                until=args.until,
+                include_upstream=not args.inputs_from_run,
+            )
+            order = [s.stage for s in steps if s.stage in stages]
+            print(f"Running stages: {', '.join(order)}", file=sys.stderr)
+
+        # Artifacts are written in the background as each stage completes
+        persister = None
+        if args.save_artifacts:
+            persister = ArtifactPersister(
+                out_dir="out", run_id=orch.run_id, max_workers=args.artifact_workers
+            )
+            orch.post_step_hooks.append(persister)
+
         # Run pipeline
-        if args.parallel:
-            result = orch.run_waves(steps)
-        else:
-            result = orch.run(steps)
+        if retention_worker is not None:
+            retention_worker.protect.update(filter(None, [orch.run_id, args.inputs_from_run]))
+            retention_worker.start()
+        metrics_server = None
+        if args.metrics_port is not None:
+            from src.orchestrator.metrics import MetricsServer
+
+            metrics_server = MetricsServer(port=args.metrics_port).start()
+        tracer = None
+        if args.trace:
+            from src.orchestrator.tracing import ChromeTracer, set_tracer
+
+            tracer = ChromeTracer(process_name=f"orchestrator {orch.run_id}")
+            set_tracer(tracer)
+        try:
+            if args.parallel:
+                result = orch.run_waves(
+                    steps, resume=resume, stages=stages, inputs_from_run=args.inputs_from_run
+                )
+            else:
+                result = orch.run(
+                    steps, resume=resume, stages=stages, inputs_from_run=args.inputs_from_run
+                )
+        except BaseException:
+            if persister is not None:
+                # Keep the artifacts of the stages that finished and write their manifest
+                persister.close()
+            raise
+        finally:
+            if retention_worker is not None:
+                retention_worker.stop()
+            if metrics_server is not None:
+                metrics_server.stop()
+            if args.metrics_textfile:
+                from src.orchestrator.metrics import write_textfile
+
+                write_textfile(args.metrics_textfile)
+            if tracer is not None:
+                set_tracer(None)
+                tracer.write(args.trace)
+                print(f"[INFO] Trace written to {args.trace}", file=sys.stderr)
+
+        # Finish artifact writes and the manifest (before fail-fast, so failed runs keep them)
+        artifacts_saved = False
+        if persister is not None:
+            count = persister.close(result)
+            run_dir = Path("out") / result.get("run_id", "unknown")
+            print(f"\n[INFO] Saved {count} artifacts to: {run_dir}", file=sys.stderr)
+            artifacts_saved = True
 
         # Fail-fast check
         if args.fail_fast:
@@ -342,14 +620,6 @@ Examples:
                     )
                     sys.exit(1)
 
-        # Save artifacts if requested
-        artifacts_saved = False
-        if args.save_artifacts:
-            count = persist_artifacts(result, out_dir="out")
-            run_dir = Path("out") / result.get("run_id", "unknown")
-            print(f"\n[INFO] Saved {count} artifacts to: {run_dir}", file=sys.stderr)
-            artifacts_saved = True
-
         # Output result
         if args.output == "human":
             report = build_markdown_report(
@@ -379,6 +649,177 @@ def clean_command() -> None:
     sys.exit(clean_main())
 
 
+def watch_command() -> None:
+    """Watch command entry point: re-run only invalidated stages on every change."""
+    ap = argparse.ArgumentParser(
+        prog="cli.py watch",
+        description="Watch a pipeline and re-execute only stages whose inputs changed",
+    )
+    ap.add_argument("--pipeline", required=True, help="Path to pipeline YAML")
+    ap.add_argument(
+        "--seed",
+        nargs="*",
+        default=[],
+        help="Seed files: KEY=PATH (file text becomes memory[KEY]) or PATH to a JSON/YAML "
+        "mapping merged into memory",
+    )
+    ap.add_argument("--mem", nargs="*", default=[], help="Memory overrides key=value")
+    ap.add_argument(
+        "--watch",
+        nargs="*",
+        default=[],
+        help="Extra files to watch (e.g. plugin modules); agent/advisor sources are "
+        "watched automatically",
+    )
+    ap.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds")
+    ap.add_argument("--once", action="store_true", help="Run one cycle and exit")
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while watching",
+    )
+    args = ap.parse_args()
+
+    from src.orchestrator.logging import setup_logging
+    from src.orchestrator.watch import IncrementalRunner
+
+    setup_logging()
+    try:
+        memory = parse_kv_pairs(args.mem)
+    except ValueError as e:
+        print(f"Error parsing --mem: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    runner = IncrementalRunner(
+        args.pipeline, seeds=args.seed, memory=memory, extra_watch=args.watch
+    )
+
+    def report(result: Dict[str, Any]) -> None:
+        executed = ", ".join(result["executed"]) or "nothing"
+        print(
+            f"[watch] ran {executed}; reused {len(result['reused'])} stage(s) "
+            f"in {result['elapsed_sec']:.3f}s",
+            file=sys.stderr,
+        )
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        from src.orchestrator.metrics import MetricsServer
+
+        metrics_server = MetricsServer(port=args.metrics_port).start()
+    try:
+        runner.watch(interval=args.interval, max_cycles=1 if args.once else None, on_result=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+    sys.exit(0)
+
+
+def events_command() -> None:
+    """Events command entry point: query the SQLite event store or backfill it."""
+    ap = argparse.ArgumentParser(
+        prog="cli.py events", description="Query and import run events (SQLite event store)"
+    )
+    ap.add_argument("--db", default="out/events.db", help="Event database (default: out/events.db)")
+    sub = ap.add_subparsers(dest="action", required=True)
+
+    q = sub.add_parser("query", help="List or aggregate events")
+    q.add_argument("--run-id", help="Only this run")
+    q.add_argument("--stage", help="Only this stage")
+    q.add_argument("--event", help="Only this event type (e.g. step_end)")
+    q.add_argument("--since", help="Only events newer than a duration (e.g. 7d, 24h)")
+    q.add_argument("--last-runs", type=int, help="Only the N most recent runs")
+    q.add_argument("--field", help="Numeric event field to aggregate (e.g. duration_ms)")
+    q.add_argument(
+        "--agg",
+        help="Comma-separated aggregates: count,sum,avg,min,max,p50,p90,p95,p99 "
+        "(default with --field: count,avg,p50,p95,max)",
+    )
+    q.add_argument("--group-by", choices=["run_id", "stage", "event"], help="Group results")
+    q.add_argument("--limit", type=int, default=50, help="Max events listed (default: 50)")
+    q.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    imp = sub.add_parser("import", help="Backfill JSONL event logs into the database")
+    imp.add_argument("paths", nargs="*", help="JSONL files (default: out/*_events.jsonl)")
+    args = ap.parse_args()
+
+    from src.orchestrator.eventlog_sqlite import (
+        EventQuery,
+        aggregate_events,
+        import_jsonl,
+        query_events,
+    )
+
+    if args.action == "import":
+        paths = args.paths or sorted(str(p) for p in Path("out").glob("*_events.jsonl"))
+        stats = import_jsonl(args.db, paths)
+        print(
+            f"Imported {stats['events']} events from {stats['files']} file(s) into {args.db} "
+            f"({stats['skipped_files']} unchanged, {stats['bad_lines']} bad line(s))"
+        )
+        sys.exit(0)
+
+    if not Path(args.db).exists():
+        print(f"Event database not found: {args.db}", file=sys.stderr)
+        sys.exit(1)
+
+    from src.orchestrator.retention import parse_duration
+
+    query = EventQuery(
+        run_id=args.run_id,
+        stage=args.stage,
+        event=args.event,
+        since=time.time() - parse_duration(args.since) if args.since else None,
+        last_runs=args.last_runs,
+    )
+    if args.field or args.agg or args.group_by:
+        default_aggs = "count,avg,p50,p95,max" if args.field else "count"
+        aggs = [a.strip() for a in (args.agg or default_aggs).split(",") if a.strip()]
+        try:
+            rows = aggregate_events(
+                args.db, query, field=args.field, aggregates=aggs, group_by=args.group_by
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            columns = ([args.group_by] if args.group_by else []) + aggs
+            print("  ".join(f"{c:>14}" for c in columns))
+            for row in rows:
+                print(
+                    "  ".join(
+                        f"{row[c]:>14.2f}" if isinstance(row[c], float) else f"{row[c]!s:>14}"
+                        for c in columns
+                    )
+                )
+        sys.exit(0)
+
+    events = query_events(args.db, query, limit=args.limit)
+    if args.json:
+        print(json.dumps(events, indent=2, default=str))
+    else:
+        for event in events:
+            extra = {k: v for k, v in event.items() if k not in ("ts", "event", "run_id", "stage")}
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.get("ts", 0)))
+            print(
+                f"{stamp}  {event.get('event', ''):<14} {event.get('run_id') or '-':<36} "
+                f"{event.get('stage') or '-':<16} {json.dumps(extra, default=str)}"
+            )
+    sys.exit(0)
+
+
+def bench_command() -> None:
+    """Bench command entry point: microbenchmarks of orchestrator hot paths."""
+    from scripts.microbench import main as bench_main
+
+    sys.exit(bench_main())
+
+
 def doctor_command() -> None:
     """Doctor command entry point."""
     from scripts.doctor import main as doctor_main
@@ -396,5 +837,14 @@ if __name__ == "__main__":
         elif subcommand == "doctor":
             sys.argv = sys.argv[1:]  # Remove 'doctor' from args
             doctor_command()
+        elif subcommand == "watch":
+            sys.argv = sys.argv[1:]  # Remove 'watch' from args
+            watch_command()
+        elif subcommand == "events":
+            sys.argv = sys.argv[1:]  # Remove 'events' from args
+            events_command()
+        elif subcommand == "bench":
+            sys.argv = sys.argv[1:]  # Remove 'bench' from args
+            bench_command()
 
     main()
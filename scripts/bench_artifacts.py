@@ -0,0 +1,109 @@
+"""Artifact persistence benchmark - throughput of serial, pooled and per-stage (hook) writes."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.memory import SharedMemory
+from src.orchestrator.artifact_sink import ArtifactPersister, persist_artifacts
+
+MODES = ("serial", "pooled", "hook")
+
+
+def make_memory(artifacts: int, stages: int, size: int) -> Dict[str, Any]:
+    """Run memory with `artifacts` text artifacts of `size` bytes spread over `stages`."""
+    per_stage = max(1, artifacts // stages)
+    payload = "# artifact\n" + "x" * max(0, size - 11)
+    return {
+        f"stage{s}.artifacts": [
+            {"name": f"file{i}.md", "type": "markdown", "content": payload}
+            for i in range(per_stage)
+        ]
+        for s in range(stages)
+    }
+
+
+def bench(
+    mode: str, memory: Dict[str, Any], workers: int, compute_ms: float, workdir: Path
+) -> Dict[str, float]:
+    """
+    Simulate a run whose stages compute for compute_ms each, then persist its artifacts.
+
+    serial and pooled write everything after the last stage (1 vs `workers` threads);
+    hook writes each stage's artifacts on `workers` threads while later stages compute.
+    """
+    stages = sorted({k.split(".")[0] for k in memory})
+    start = time.perf_counter()
+    if mode == "hook":
+        shared = SharedMemory()
+        persister = ArtifactPersister(out_dir=str(workdir), run_id=mode, max_workers=workers)
+        for stage in stages:
+            time.sleep(compute_ms / 1000)
+            shared.set(f"{stage}.artifacts", memory[f"{stage}.artifacts"])
+            persister(step_result={"stage": stage}, shared_memory=shared)
+        count = persister.close()
+    else:
+        for _stage in stages:
+            time.sleep(compute_ms / 1000)
+        count = persist_artifacts(
+            {"run_id": mode, "memory": memory},
+            out_dir=str(workdir),
+            max_workers=1 if mode == "serial" else workers,
+        )
+    elapsed = time.perf_counter() - start
+
+    nbytes = sum(p.stat().st_size for p in (workdir / mode).glob("*/*"))
+    compute_sec = len(stages) * compute_ms / 1000
+    return {
+        "artifacts": count,
+        "wall_ms": elapsed * 1000,
+        "persist_overhead_ms": max(0.0, elapsed - compute_sec) * 1000,
+        "artifacts_per_sec": count / elapsed,
+        "mb_per_sec": nbytes / elapsed / 1e6,
+    }
+
+
+def main() -> int:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark artifact persistence")
+    parser.add_argument("-n", "--artifacts", type=int, default=5000, help="Artifacts per run")
+    parser.add_argument("--stages", type=int, default=50, help="Stages the artifacts spread over")
+    parser.add_argument("--size", type=int, default=16384, help="Bytes per artifact")
+    parser.add_argument("--workers", type=int, default=4, help="Writer threads (pooled, hook)")
+    parser.add_argument(
+        "--compute-ms", type=float, default=40.0, help="Simulated compute per stage"
+    )
+    parser.add_argument("--modes", help=f"Comma-separated modes (default: {','.join(MODES)})")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",") if args.modes else list(MODES)
+    memory = make_memory(args.artifacts, args.stages, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {m: bench(m, memory, args.workers, args.compute_ms, Path(tmp)) for m in modes}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'mode':<8} {'artifacts':>10} {'wall ms':>10} {'overhead ms':>12} ", end="")
+    print(f"{'art/s':>10} {'MB/s':>8}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<8} {r['artifacts']:10.0f} {r['wall_ms']:10.1f} "
+            f"{r['persist_overhead_ms']:12.1f} {r['artifacts_per_sec']:10.0f} "
+            f"{r['mb_per_sec']:8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
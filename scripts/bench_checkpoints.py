@@ -0,0 +1,133 @@
+"""Checkpoint store microbenchmark - connect-per-operation vs pooled SQLite."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.resume import Checkpoint
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+
+
+class LegacySQLiteCheckpointStore:
+    """Reference copy of the previous store: one sqlite3.connect() per operation."""
+
+    def __init__(self, db_path: str) -> None:
+        self.path = db_path
+        with sqlite3.connect(self.path) as cx:
+            cx.execute("PRAGMA journal_mode=WAL;")
+            cx.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id TEXT NOT NULL, step_index INTEGER NOT NULL, stage TEXT NOT NULL,
+                    created_at INTEGER NOT NULL, memory_json TEXT NOT NULL,
+                    extra_json TEXT NOT NULL, PRIMARY KEY (run_id, step_index)
+                )
+            """)
+            cx.commit()
+
+    def save(self, key: str, checkpoint: Checkpoint) -> None:
+        run_id, idx = key.split(":", 1)
+        with sqlite3.connect(self.path) as cx:
+            cx.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    int(idx),
+                    checkpoint.stage,
+                    int(checkpoint.timestamp * 1000),
+                    json.dumps(checkpoint.memory_snapshot, ensure_ascii=False),
+                    json.dumps(checkpoint.extra or {}, ensure_ascii=False),
+                ),
+            )
+            cx.commit()
+
+    def load(self, key: str) -> Optional[Checkpoint]:
+        run_id, idx = key.split(":", 1)
+        with sqlite3.connect(self.path) as cx:
+            row = cx.execute(
+                "SELECT stage, created_at, memory_json, extra_json FROM checkpoints "
+                "WHERE run_id=? AND step_index=?",
+                (run_id, int(idx)),
+            ).fetchone()
+        if not row:
+            return None
+        return Checkpoint(
+            run_id, int(idx), row[0], json.loads(row[2]), row[1] / 1000.0, json.loads(row[3])
+        )
+
+    def find_last_key(self, run_id: str) -> Optional[str]:
+        with sqlite3.connect(self.path) as cx:
+            row = cx.execute(
+                "SELECT step_index FROM checkpoints WHERE run_id=? "
+                "ORDER BY step_index DESC LIMIT 1",
+                (run_id,),
+            ).fetchone()
+        return f"{run_id}:{row[0]}" if row else None
+
+
+def _ops_per_sec(n: int, fn: Callable[[int], Any]) -> float:
+    """Run fn(i) for i in range(n) and return operations per second."""
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return n / elapsed if elapsed > 0 else float("inf")
+
+
+def bench(store: Any, n: int, payload: Dict[str, Any]) -> Dict[str, float]:
+    """Measure save/load/find_last_key (and save_many when supported) throughput."""
+    results = {
+        "save": _ops_per_sec(
+            n, lambda i: store.save(f"bench:{i}", Checkpoint("bench", i, "s", payload))
+        ),
+        "load": _ops_per_sec(n, lambda i: store.load(f"bench:{i}")),
+        "find_last_key": _ops_per_sec(n, lambda _: store.find_last_key("bench")),
+    }
+    save_many = getattr(store, "save_many", None)
+    if save_many is not None:
+        items = [(f"bulk:{i}", Checkpoint("bulk", i, "s", payload)) for i in range(n)]
+        start = time.perf_counter()
+        save_many(items)
+        elapsed = time.perf_counter() - start
+        results["save_many"] = n / elapsed if elapsed > 0 else float("inf")
+    return results
+
+
+def main() -> int:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark SQLite checkpoint store throughput")
+    parser.add_argument("-n", type=int, default=500, help="Operations per measurement")
+    parser.add_argument("--payload-kb", type=int, default=4, help="Memory snapshot size (KiB)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    payload = {"artifact": "x" * (args.payload_kb * 1024)}
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = bench(LegacySQLiteCheckpointStore(str(Path(tmp) / "legacy.db")), args.n, payload)
+        pooled_store = SQLiteCheckpointStore(str(Path(tmp) / "pooled.db"))
+        pooled = bench(pooled_store, args.n, payload)
+        pooled_store.close()
+
+    if args.json:
+        print(json.dumps({"legacy": legacy, "pooled": pooled}, indent=2))
+        return 0
+
+    print(f"{'operation':<15} {'legacy ops/s':>14} {'pooled ops/s':>14} {'speedup':>9}")
+    for op, value in pooled.items():
+        base = legacy.get(op)
+        speedup = f"{value / base:8.1f}x" if base else "      n/a"
+        base_str = f"{base:14.0f}" if base else f"{'n/a':>14}"
+        print(f"{op:<15} {base_str} {value:14.0f} {speedup}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
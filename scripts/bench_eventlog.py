@@ -0,0 +1,93 @@
+"""Event log microbenchmark - sustained events/s for unbuffered and buffered writers."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.orchestrator.eventlog import BufferedJsonlEventLog, JsonlEventLog
+
+WRITERS: Dict[str, Callable[[str], JsonlEventLog]] = {
+    "unbuffered": lambda path: JsonlEventLog(path=path),
+    "buffered-block": lambda path: BufferedJsonlEventLog(path=path, backpressure="block"),
+    "buffered-drop": lambda path: BufferedJsonlEventLog(
+        path=path, backpressure="drop", max_queue=1000
+    ),
+}
+
+
+def bench(writer: str, events: int, threads: int, workdir: Path) -> Dict[str, float]:
+    """Emit `events` step-like events from `threads` threads; time until all are on disk."""
+    path = workdir / f"{writer}.jsonl"
+    log = WRITERS[writer](str(path))
+    per_thread = events // threads
+
+    def emitter(t: int) -> None:
+        for i in range(per_thread):
+            log.emit(
+                "step_result",
+                stage=f"stage{t}",
+                attempt=i % 3,
+                score=0.87,
+                approved=True,
+                duration_ms=12.5,
+            )
+
+    workers: List[threading.Thread] = [
+        threading.Thread(target=emitter, args=(t,)) for t in range(threads)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    close = getattr(log, "close", None)
+    if close is not None:
+        close()
+    elapsed = time.perf_counter() - start
+
+    written = sum(1 for _ in path.open(encoding="utf-8"))
+    return {
+        "events_per_sec": per_thread * threads / elapsed,
+        "written": written,
+        "dropped": getattr(log, "dropped", 0),
+        "elapsed_ms": elapsed * 1000,
+    }
+
+
+def main() -> int:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark JSONL event log writers")
+    parser.add_argument("-n", "--events", type=int, default=50_000, help="Events per writer")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent emitting threads")
+    parser.add_argument("--writers", help="Comma-separated writers (default: all)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    writers = args.writers.split(",") if args.writers else list(WRITERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {w: bench(w, args.events, args.threads, Path(tmp)) for w in writers}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'writer':<16} {'events/s':>12} {'written':>10} {'dropped':>10} {'ms':>10}")
+    for writer, r in results.items():
+        print(
+            f"{writer:<16} {r['events_per_sec']:12.0f} {r['written']:10.0f} "
+            f"{r['dropped']:10.0f} {r['elapsed_ms']:10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Checkpoint serializer microbenchmark - encode/decode throughput and size per format."""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.orchestrator.serializers import MSGPACK_AVAILABLE, decode, encode
+
+FORMATS = ["json", "json+zlib", "pickle", "pickle+zlib", "pickle+lzma"]
+if MSGPACK_AVAILABLE:
+    FORMATS += ["msgpack", "msgpack+zlib"]
+
+
+def make_snapshot(stages: int, text_kb: int, binary_kb: int) -> Dict[str, Any]:
+    """Memory snapshot shaped like a real run: text outputs, reviews, artifacts."""
+    snapshot: Dict[str, Any] = {"product_idea": "A todo app for teams"}
+    for i in range(stages):
+        stage = f"stage{i}"
+        snapshot[f"{stage}.content"] = ("lorem ipsum dolor sit amet " * 40)[:1024] * text_kb
+        snapshot[f"{stage}.review"] = {
+            "score": 0.9,
+            "approved": True,
+            "critical_issues": [],
+            "suggestions": [f"suggestion {j}" for j in range(10)],
+            "summary": "ok",
+            "severity": "low",
+        }
+        snapshot[f"{stage}.metadata"] = {"tokens": 1234, "model": "m", "nested": {"a": [1, 2, 3]}}
+        if binary_kb:
+            snapshot[f"{stage}.binary"] = os.urandom(binary_kb * 1024)
+    return snapshot
+
+
+def _timed(n: int, fn: Callable[[], Any]) -> float:
+    """Run fn n times and return the elapsed seconds."""
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return time.perf_counter() - start
+
+
+def bench(snapshot: Dict[str, Any], n: int, formats: List[str]) -> Dict[str, Dict[str, float]]:
+    """Measure encode/decode MiB/s and encoded size for each format."""
+    results: Dict[str, Dict[str, float]] = {}
+    for fmt in formats:
+        payload = snapshot
+        if fmt.startswith("json"):
+            # JSON cannot carry bytes; measure the base64 inflation it would need
+            payload = {
+                k: base64.b64encode(v).decode("ascii") if isinstance(v, bytes) else v
+                for k, v in snapshot.items()
+            }
+        raw = encode(payload, fmt)
+        mib = len(raw) / (1024 * 1024)
+        enc = _timed(n, lambda p=payload, f=fmt: encode(p, f))
+        dec = _timed(n, lambda r=raw: decode(r))
+        results[fmt] = {
+            "bytes": len(raw),
+            "encode_mib_s": mib * n / enc if enc > 0 else float("inf"),
+            "decode_mib_s": mib * n / dec if dec > 0 else float("inf"),
+            "encode_ms": enc / n * 1000,
+            "decode_ms": dec / n * 1000,
+        }
+    return results
+
+
+def main() -> int:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark checkpoint serializers")
+    parser.add_argument("-n", type=int, default=50, help="Iterations per measurement")
+    parser.add_argument("--stages", type=int, default=10, help="Stages in the snapshot")
+    parser.add_argument("--text-kb", type=int, default=32, help="Text output per stage (KiB)")
+    parser.add_argument(
+        "--binary-kb", type=int, default=256, help="Binary artifact per stage (KiB)"
+    )
+    parser.add_argument("--formats", help="Comma-separated formats (default: all available)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    formats = args.formats.split(",") if args.formats else FORMATS
+    results = bench(make_snapshot(args.stages, args.text_kb, args.binary_kb), args.n, formats)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'format':<14} {'size KiB':>10} {'encode ms':>10} {'decode ms':>10} {'enc MiB/s':>10}")
+    for fmt, r in results.items():
+        print(
+            f"{fmt:<14} {r['bytes'] / 1024:10.0f} {r['encode_ms']:10.2f} "
+            f"{r['decode_ms']:10.2f} {r['encode_mib_s']:10.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Benchmark harness - synthetic agents/advisors, DAG generators, timing statistics."""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.core.base import BaseAdvisor, BaseFunctionalAgent
+from src.core.types import AgentMetadata, AgentOutput
+
+# (stage, depends_on) pairs in topological order
+Dag = List[Tuple[str, List[str]]]
+
+
+@dataclass
+class Workload:
+    """Simulated cost of one agent or advisor call."""
+
+    latency_ms: float = 0.0  # Blocking wait (I/O, model latency); releases the GIL
+    cpu_iters: int = 0  # Pure-Python loop iterations; holds the GIL
+    output_bytes: int = 256  # Size of the agent's content
+    score: float = 0.95  # Score given by the advisor
+
+
+def _work(workload: Workload) -> None:
+    if workload.latency_ms > 0:
+        time.sleep(workload.latency_ms / 1000)
+    if workload.cpu_iters > 0:
+        acc = 0
+        for i in range(workload.cpu_iters):
+            acc += i * i
+
+
+class SyntheticAgent(BaseFunctionalAgent):
+    """Agent with configurable latency, CPU work and output size."""
+
+    name = "SyntheticAgent"
+    min_advisor_score = 0.5
+
+    def __init__(self, workload: Workload) -> None:
+        self.workload = workload
+        self._payload = "x" * workload.output_bytes
+
+    def process(self, task: str, context: Dict[str, Any]) -> AgentOutput:
+        _work(self.workload)
+        return AgentOutput(
+            content=f"{task}\n{self._payload}",
+            metadata=AgentMetadata(agent_name=self.name),
+        )
+
+
+class SyntheticAdvisor(BaseAdvisor):
+    """Advisor with configurable latency and CPU work, approving with a fixed score."""
+
+    name = "SyntheticAdvisor"
+
+    def __init__(self, workload: Workload) -> None:
+        self.workload = workload
+
+    def review(self, output: AgentOutput, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        _work(self.workload)
+        score = self.workload.score
+        return {
+            "score": score,
+            "approved": score >= 0.5,
+            "critical_issues": [],
+            "suggestions": [],
+            "summary": "synthetic",
+            "severity": "low",
+        }
+
+
+def factories(
+    agent: Workload, advisor: Optional[Workload] = None
+) -> Tuple[Callable[[str], BaseFunctionalAgent], Callable[[str], BaseAdvisor]]:
+    """
+    Agent and advisor factories for the runners.
+
+    Args:
+        agent: Agent workload
+        advisor: Advisor workload (default: no latency or CPU work)
+
+    Returns:
+        (agent_factory, advisor_factory)
+    """
+    advisor = advisor or Workload()
+    return (lambda _name: SyntheticAgent(agent)), (lambda _name: SyntheticAdvisor(advisor))
+
+
+def chain(n: int) -> Dag:
+    """n stages, each depending on the previous one."""
+    return [(f"s{i}", [f"s{i - 1}"] if i else []) for i in range(n)]
+
+
+def fanout(width: int) -> Dag:
+    """One root, `width` independent stages depending on it, and a join stage."""
+    leaves = [f"leaf{i}" for i in range(width)]
+    return [("root", [])] + [(leaf, ["root"]) for leaf in leaves] + [("join", leaves)]
+
+
+def diamonds(count: int, width: int = 2) -> Dag:
+    """`count` diamonds in a row: each forks into `width` stages that join again."""
+    dag: Dag = [("d0.join", [])]
+    for d in range(1, count + 1):
+        mids = [f"d{d}.m{i}" for i in range(width)]
+        dag += [(m, [f"d{d - 1}.join"]) for m in mids]
+        dag.append((f"d{d}.join", mids))
+    return dag
+
+
+def layered(n: int, width: int = 50, fan_in: int = 3, seed: int = 0) -> Dag:
+    """
+    Random layered DAG for large-pipeline benchmarks (e.g. 1000+ stages).
+
+    Args:
+        n: Number of stages
+        width: Stages per layer
+        fan_in: Max dependencies per stage, drawn from the previous layer
+        seed: RNG seed (the same arguments always give the same DAG)
+
+    Returns:
+        Dag in topological order
+    """
+    rng = random.Random(seed)
+    dag: Dag = []
+    previous: List[str] = []
+    for start in range(0, n, width):
+        layer = [f"n{i}" for i in range(start, min(n, start + width))]
+        for stage in layer:
+            k = min(len(previous), rng.randint(1, fan_in)) if previous else 0
+            dag.append((stage, sorted(rng.sample(previous, k))))
+        previous = layer
+    return dag
+
+
+def to_steps(dag: Dag, step_cls: Callable[..., Any], **fields: Any) -> List[Any]:
+    """
+    Build pipeline steps for a runner from a DAG.
+
+    Args:
+        dag: (stage, depends_on) pairs
+        step_cls: runner.PipelineStep or runner_parallel.PipelineStep
+        **fields: Extra step fields (e.g. max_retries)
+
+    Returns:
+        Steps with agent/advisor named after the stage and a plain task
+    """
+    return [
+        step_cls(
+            stage=stage,
+            agent=stage,
+            advisor=stage,
+            task=f"work on {stage}",
+            depends_on=deps,
+            **fields,
+        )
+        for stage, deps in dag
+    ]
+
+
+def measure(
+    make_op: Callable[[], Callable[[], Any]],
+    warmup: int = 1,
+    repeat: int = 5,
+    max_time_sec: Optional[float] = None,
+) -> List[float]:
+    """
+    Time an operation after warmup runs.
+
+    Args:
+        make_op: Called before every run to set up fresh state (untimed); returns the op
+        warmup: Untimed runs first (imports, caches, allocator warmup)
+        repeat: Timed runs
+        max_time_sec: Stop early (after at least one timed run) once warmup and timed
+            runs took this long, so slow benchmarks do not dominate a suite
+
+    Returns:
+        Wall time of each timed run in milliseconds
+    """
+    deadline = time.perf_counter() + max_time_sec if max_time_sec else None
+    for _ in range(warmup):
+        make_op()()
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    samples: List[float] = []
+    for _ in range(repeat):
+        op = make_op()
+        start = time.perf_counter()
+        op()
+        end = time.perf_counter()
+        samples.append((end - start) * 1000)
+        if deadline is not None and end > deadline:
+            break
+    return samples
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    q-th percentile with linear interpolation between closest ranks.
+
+    Args:
+        samples: Values (need not be sorted)
+        q: Percentile in [0, 100]
+
+    Returns:
+        Percentile value (0.0 for no samples)
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    pos = (len(ordered) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """n, mean, min, p50, p95, p99 and max of samples, rounded to 3 decimals."""
+    n = len(samples)
+    return {
+        "n": n,
+        "mean": round(sum(samples) / n, 3) if n else 0.0,
+        "min": round(min(samples), 3) if n else 0.0,
+        "p50": round(percentile(samples, 50), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "max": round(max(samples), 3) if n else 0.0,
+    }
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    threshold: float = 0.25,
+    stat: str = "p50",
+    min_delta_ms: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """
+    Compare benchmark results (lower is better) against a baseline.
+
+    A benchmark regresses when its `stat` exceeds the baseline by more than
+    `threshold` (relative) and `min_delta_ms` (absolute, to ignore timer noise
+    on sub-millisecond benchmarks). Benchmarks missing on either side are skipped.
+
+    Args:
+        baseline: Benchmark name -> summary (see summarize) of the baseline
+        current: Benchmark name -> summary of this run
+        threshold: Allowed relative slowdown (0.25 = 25%)
+        stat: Summary statistic to compare (p50, p95, p99, mean, ...)
+        min_delta_ms: Allowed absolute slowdown
+
+    Returns:
+        One row per common benchmark: name, baseline, current, change, regressed
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        old = float(baseline[name][stat])
+        new = float(current[name][stat])
+        change = (new - old) / old if old > 0 else 0.0
+        rows.append(
+            {
+                "name": name,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regressed": change > threshold and new - old > min_delta_ms,
+            }
+        )
+    return rows
@@ -200,6 +200,69 @@ def clean_artifacts(
     return deleted_count, freed_bytes, deleted_files
 
 
+def clean_checkpoints(
+    artifacts_root: str = "out",
+    older_than: Optional[str] = None,
+    keep_latest: Optional[int] = None,
+    final_only_successful: bool = False,
+    dry_run: bool = False,
+    convert_vacuum: bool = False,
+) -> Dict[str, Any]:
+    """
+    Apply retention to the checkpoint stores under artifacts_root.
+
+    Both out/checkpoints (filesystem) and out/checkpoints.db (SQLite) are
+    handled when present. A run survives if it is among the newest keep_latest
+    runs or younger than older_than. With convert_vacuum, SQLite databases created
+    before auto_vacuum=INCREMENTAL are converted by a one-time full VACUUM, which
+    must not run while a pipeline writes to them.
+
+    Returns:
+        Dict with per-store results ("fs", "sqlite")
+    """
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from src.orchestrator.retention import RetentionPolicy, enforce_retention, plan_retention
+
+    policy = RetentionPolicy(
+        keep_last=keep_latest,
+        max_age_sec=parse_duration(older_than) if older_than else None,
+        final_only_successful=final_only_successful,
+    )
+    root = Path(artifacts_root)
+    stores: Dict[str, Any] = {}
+    if (root / "checkpoints").is_dir():
+        from src.orchestrator.checkpoint_fs import FileCheckpointStore
+
+        stores["fs"] = FileCheckpointStore(root=str(root / "checkpoints"))
+    if (root / "checkpoints.db").is_file():
+        from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+
+        stores["sqlite"] = SQLiteCheckpointStore(db_path=str(root / "checkpoints.db"))
+
+    results: Dict[str, Any] = {}
+    for name, store in stores.items():
+        if dry_run:
+            plan = plan_retention(store.list_checkpoints(), policy)
+            results[name] = {"delete_runs": plan.delete_runs, "delete_keys": plan.delete_keys}
+            print(
+                f"\n[DRY RUN] Would delete {len(plan.delete_runs)} run(s) and "
+                f"{len(plan.delete_keys)} intermediate checkpoint(s) from {name} store"
+            )
+        else:
+            results[name] = enforce_retention(store, policy)
+            if convert_vacuum and hasattr(store, "vacuum"):
+                results[name]["pages_freed"] += store.vacuum(convert=True)
+            print(
+                f"\nCheckpoints ({name}): deleted {results[name]['checkpoints_deleted']} "
+                f"checkpoint(s) from {results[name]['runs_deleted']} run(s), "
+                f"freed {results[name]['pages_freed']} page(s)"
+            )
+        close = getattr(store, "close", None)
+        if close is not None:
+            close()
+    return results
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Clean artifacts with retention policies")
@@ -224,6 +287,22 @@ def main() -> int:
         type=int,
         help="Keep latest N runs",
     )
+    parser.add_argument(
+        "--checkpoints",
+        action="store_true",
+        help="Also apply --keep-latest/--older-than to the checkpoint stores",
+    )
+    parser.add_argument(
+        "--final-only-successful",
+        action="store_true",
+        help="With --checkpoints: keep only the final checkpoint of successful runs",
+    )
+    parser.add_argument(
+        "--convert-vacuum",
+        action="store_true",
+        help="With --checkpoints: convert SQLite databases created before incremental "
+        "vacuum with a one-time full VACUUM (do not run while a pipeline is writing)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -237,16 +316,32 @@ def main() -> int:
 
     args = parser.parse_args()
 
-    if not any([args.older_than, args.max_size, args.keep_latest]):
+    if not any([args.older_than, args.max_size, args.keep_latest, args.final_only_successful]):
         parser.error("At least one retention policy must be specified")
-
-    deleted_count, freed_bytes, deleted_files = clean_artifacts(
-        artifacts_root=args.artifacts_root,
-        older_than=args.older_than,
-        max_size=args.max_size,
-        keep_latest=args.keep_latest,
-        dry_run=args.dry_run,
-    )
+    if args.final_only_successful and not args.checkpoints:
+        parser.error("--final-only-successful requires --checkpoints")
+    if args.convert_vacuum and not args.checkpoints:
+        parser.error("--convert-vacuum requires --checkpoints")
+
+    deleted_count, freed_bytes, deleted_files = 0, 0, []
+    if any([args.older_than, args.max_size, args.keep_latest]):
+        deleted_count, freed_bytes, deleted_files = clean_artifacts(
+            artifacts_root=args.artifacts_root,
+            older_than=args.older_than,
+            max_size=args.max_size,
+            keep_latest=args.keep_latest,
+            dry_run=args.dry_run,
+        )
+    checkpoints: Dict[str, Any] = {}
+    if args.checkpoints:
+        checkpoints = clean_checkpoints(
+            artifacts_root=args.artifacts_root,
+            older_than=args.older_than,
+            keep_latest=args.keep_latest,
+            final_only_successful=args.final_only_successful,
+            dry_run=args.dry_run,
+            convert_vacuum=args.convert_vacuum,
+        )
 
     if args.json:
         result = {
@@ -256,6 +351,8 @@ def main() -> int:
             "dry_run": args.dry_run,
             "deleted_files": deleted_files,
         }
+        if args.checkpoints:
+            result["checkpoints"] = checkpoints
         print(json.dumps(result, ensure_ascii=False, indent=2))
     else:
         print(f"\n{'[DRY RUN] ' if args.dry_run else ''}Summary:")
@@ -5,7 +5,25 @@ from __future__ import annotations
 import csv
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
+
+from scripts.benchlib import percentile, summarize
+
+
+def step_duration_ms(step: Dict[str, Any]) -> int:
+    """
+    Duration of one history entry as measured by the runner.
+
+    Args:
+        step: History entry (step summary)
+
+    Returns:
+        duration_ms, or the sum of phases_ms for results without it (0 for
+        stages skipped on resume)
+    """
+    if "duration_ms" in step:
+        return int(step["duration_ms"])
+    return int(sum(step.get("phases_ms", {}).values()))
 
 
 def aggregate_kpis(run_result: Dict[str, Any]) -> Dict[str, Any]:
@@ -20,7 +38,7 @@ def aggregate_kpis(run_result: Dict[str, Any]) -> Dict[str, Any]:
     """
     hist = run_result.get("history", [])
 
-    total_ms = sum(int(s.get("duration_ms", 0)) for s in hist)
+    total_ms = sum(step_duration_ms(s) for s in hist)
     approved = sum(1 for s in hist if s.get("approved"))
     avg_score = sum(float(s.get("score", 0.0)) for s in hist) / max(1, len(hist))
     timeouts = sum(1 for s in hist if s.get("error_reason") == "timeout")
@@ -40,6 +58,53 @@ def aggregate_kpis(run_result: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def aggregate_runs(
+    run_results: Sequence[Dict[str, Any]], wall_ms: Optional[Sequence[float]] = None
+) -> Dict[str, Any]:
+    """
+    Aggregate KPIs over repeated runs of the same pipeline.
+
+    Scalar KPIs are pooled over all runs; total_duration_ms is the median run
+    with _p95/_p99 companions, and stage_ms / phase_ms hold timing
+    distributions (n, mean, min, p50, p95, p99, max) per stage and per phase.
+
+    Args:
+        run_results: Pipeline execution results
+        wall_ms: Wall time of each run, if measured by the caller
+
+    Returns:
+        Dictionary with aggregated KPIs
+    """
+    per_run = [aggregate_kpis(r) for r in run_results]
+    hist = [s for r in run_results for s in r.get("history", [])]
+    kpis = aggregate_kpis({"history": hist})
+    kpis["iterations"] = len(per_run)
+    kpis["stages"] = max((k["stages"] for k in per_run), default=0)
+    kpis["artifacts_bytes"] = max((k["artifacts_bytes"] for k in per_run), default=0)
+    kpis["cache_hits"] = sum(k["cache_hits"] for k in per_run)
+
+    totals = [k["total_duration_ms"] for k in per_run]
+    kpis["total_duration_ms"] = round(percentile(totals, 50), 1)
+    kpis["total_duration_ms_p95"] = round(percentile(totals, 95), 1)
+    kpis["total_duration_ms_p99"] = round(percentile(totals, 99), 1)
+    if wall_ms:
+        kpis["wall_ms_p50"] = round(percentile(wall_ms, 50), 1)
+        kpis["wall_ms_p95"] = round(percentile(wall_ms, 95), 1)
+        kpis["wall_ms_p99"] = round(percentile(wall_ms, 99), 1)
+
+    stage_samples: Dict[str, List[float]] = {}
+    phase_samples: Dict[str, List[float]] = {}
+    for s in hist:
+        if s.get("resumed"):
+            continue
+        stage_samples.setdefault(s["stage"], []).append(step_duration_ms(s))
+        for phase, ms in s.get("phases_ms", {}).items():
+            phase_samples.setdefault(phase, []).append(ms)
+    kpis["stage_ms"] = {stage: summarize(v) for stage, v in stage_samples.items()}
+    kpis["phase_ms"] = {phase: summarize(v) for phase, v in sorted(phase_samples.items())}
+    return kpis
+
+
 def write_kpis(out_dir: str, kpis: Dict[str, Any]) -> None:
     """
     Write KPIs to JSON and CSV files.
@@ -55,12 +120,13 @@ def write_kpis(out_dir: str, kpis: Dict[str, Any]) -> None:
     json_path = out / "kpis.json"
     json_path.write_text(json.dumps(kpis, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    # Write CSV
+    # Write CSV (scalar KPIs only; timing distributions are in the JSON)
+    scalars = {k: v for k, v in kpis.items() if not isinstance(v, (dict, list))}
     csv_path = out / "kpis.csv"
     with open(csv_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow(kpis.keys())
-        writer.writerow(kpis.values())
+        writer.writerow(scalars.keys())
+        writer.writerow(scalars.values())
 
     print(f"KPIs written to {json_path} and {csv_path}")
 
@@ -85,6 +151,30 @@ def generate_kpi_markdown(kpis: Dict[str, Any], out_path: str) -> None:
         f"| Average Score | {kpis.get('avg_score', 0.0):.3f} |",
         f"| Total Duration | {kpis.get('total_duration_ms', 0) / 1000:.2f}s |",
         "",
+    ]
+
+    if "iterations" in kpis:
+        md_lines.extend(
+            [
+                f"## Timing Distribution ({kpis['iterations']} runs)",
+                "",
+                "| Metric | p50 | p95 | p99 |",
+                "|--------|-----|-----|-----|",
+                f"| Total step time (ms) | {kpis['total_duration_ms']} "
+                f"| {kpis['total_duration_ms_p95']} | {kpis['total_duration_ms_p99']} |",
+            ]
+        )
+        if "wall_ms_p50" in kpis:
+            md_lines.append(
+                f"| Run wall time (ms) | {kpis['wall_ms_p50']} "
+                f"| {kpis['wall_ms_p95']} | {kpis['wall_ms_p99']} |"
+            )
+        md_lines.extend(["", "| Stage | n | p50 ms | p95 ms | p99 ms |", "|---|---|---|---|---|"])
+        for stage, t in kpis.get("stage_ms", {}).items():
+            md_lines.append(f"| {stage} | {t['n']} | {t['p50']} | {t['p95']} | {t['p99']} |")
+        md_lines.append("")
+
+    md_lines += [
         "## Error Metrics",
         "",
         "| Metric | Value |",
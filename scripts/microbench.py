@@ -0,0 +1,379 @@
+"""Microbenchmarks - per-call cost of orchestrator hot paths (python cli.py bench)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.benchlib import compare, measure, summarize
+from src import __version__
+from src.core.memory import SharedMemory
+from src.core.resume import Checkpoint
+from src.orchestrator.artifact_diff import diff_text
+from src.orchestrator.artifact_sink import persist_artifacts
+from src.orchestrator.cache import AgentCache
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.task_render import JINJA2_AVAILABLE, render_task
+
+BASELINE_PATH = Path("docs/benchmarks/microbench_latest.json")
+
+# Size parameter n per size name: items in a memory value, memory keys in a snapshot or
+# context, artifacts per run, template placeholders or loop items, lines in a diff
+SIZES: Dict[str, int] = {"small": 10, "medium": 100, "large": 1000}
+VALUE_BYTES = 1024  # Text payload of every generated value
+
+# A microbenchmark builds one call of the operation (untimed setup) from n, a scratch dir
+# and an ExitStack that releases what it opened (e.g. SQLite connections) after timing
+Micro = Callable[[int, Path, ExitStack], Callable[[], Any]]
+
+
+def _value(n: int) -> Dict[str, Any]:
+    """Stage-output-like value: text content plus n small nested records."""
+    return {
+        "content": "x" * VALUE_BYTES,
+        "metadata": {"agent_name": "BenchAgent", "score": 0.9},
+        "items": [{"id": i, "name": f"item{i}", "tags": ["a", "b"]} for i in range(n)],
+    }
+
+
+def _snapshot(n: int) -> Dict[str, Any]:
+    """Memory snapshot with n stage keys holding small values."""
+    return {f"stage{i}.content": _value(2) for i in range(n)}
+
+
+def _memory_get(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    mem = SharedMemory()
+    mem.set("plan.content", _value(n))
+    return lambda: mem.get("plan.content")
+
+
+def _memory_set(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    mem, value = SharedMemory(), _value(n)
+    return lambda: mem.set("plan.content", value)
+
+
+def _memory_to_dict(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    mem = SharedMemory()
+    mem.update(_snapshot(n))
+    return mem.to_dict
+
+
+def _cache_key(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    context = {f"plan.field{i}": "x" * VALUE_BYTES for i in range(n)}
+    context.update({f"other{i}": i for i in range(n)})  # Filtered out of the key
+    return lambda: AgentCache._key("BenchAgent", "plan", "write the plan", context)
+
+
+def _render_jinja2(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    template = "Plan for {{ topic }}:\n{% for item in items %}- {{ item.name }}\n{% endfor %}"
+    memory = {"topic": "bench", "items": _value(n)["items"]}
+    return lambda: render_task(template, memory)
+
+
+def _render_fallback(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    template = " ".join(f"{{key{i}}}" for i in range(n))
+    memory = {f"key{i}": f"value{i}" for i in range(n)}
+    return lambda: render_task(template, memory)
+
+
+def _checkpoint_to_json(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    ck = Checkpoint(run_id="bench", step_index=0, stage="plan", memory_snapshot=_snapshot(n))
+    return ck.to_json
+
+
+def _store_save(store_of: Callable[[Path, ExitStack], Any]) -> Micro:
+    def make(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+        store = store_of(workdir, stack)
+        ck = Checkpoint(run_id="bench", step_index=0, stage="plan", memory_snapshot=_snapshot(n))
+        return lambda: store.save("bench:0", ck)
+
+    return make
+
+
+def _store_load(store_of: Callable[[Path, ExitStack], Any]) -> Micro:
+    def make(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+        store = store_of(workdir, stack)
+        ck = Checkpoint(run_id="bench", step_index=0, stage="plan", memory_snapshot=_snapshot(n))
+        store.save("bench:0", ck)
+        return lambda: store.load("bench:0")
+
+    return make
+
+
+def _eventlog_emit(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    log = JsonlEventLog(path=str(workdir / "events.jsonl"))
+    phases = {"render": 0.1, "agent_call": 12.5, "review": 3.2, "checkpoint": 0.8}
+    return lambda: log.emit(
+        "step_end",
+        run_id="bench",
+        stage="plan",
+        agent="BenchAgent",
+        attempts=1,
+        approved=True,
+        score=0.9,
+        duration_ms=17,
+        phases_ms=phases,
+    )
+
+
+def _persist_artifacts(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    memory: Dict[str, Any] = {}
+    for s in range(max(1, n // 10)):
+        memory[f"stage{s}.artifacts"] = [
+            {"name": f"file{i}.md", "type": "markdown", "content": f"# {i}\n" + "x" * VALUE_BYTES}
+            for i in range(min(n, 10))
+        ]
+    result = {"run_id": "bench", "memory": memory}
+    return lambda: persist_artifacts(result, out_dir=str(workdir))
+
+
+def _diff_text(n: int, workdir: Path, stack: ExitStack) -> Callable[[], Any]:
+    old_lines = [f"line {i}: {'x' * 60}" for i in range(n)]
+    new_lines = [line + " changed" if i % 10 == 0 else line for i, line in enumerate(old_lines)]
+    old, new = "\n".join(old_lines), "\n".join(new_lines)
+    return lambda: diff_text(old, new)
+
+
+def _fs_store(p: Path, stack: ExitStack) -> FileCheckpointStore:
+    return FileCheckpointStore(root=str(p / "fs"))
+
+
+def _sqlite_store(p: Path, stack: ExitStack) -> SQLiteCheckpointStore:
+    store = SQLiteCheckpointStore(db_path=str(p / "checkpoints.db"))
+    stack.callback(store.close)
+    return store
+
+
+# name -> (microbenchmark, whether it runs at every size)
+MICROBENCHES: Dict[str, Tuple[Micro, bool]] = {
+    "memory.get": (_memory_get, True),
+    "memory.set": (_memory_set, True),
+    "memory.to_dict": (_memory_to_dict, True),
+    "cache.key": (_cache_key, True),
+    "render.fallback": (_render_fallback, True),
+    "checkpoint.to_json": (_checkpoint_to_json, True),
+    "checkpoint.fs.save": (_store_save(_fs_store), True),
+    "checkpoint.fs.load": (_store_load(_fs_store), True),
+    "checkpoint.sqlite.save": (_store_save(_sqlite_store), True),
+    "checkpoint.sqlite.load": (_store_load(_sqlite_store), True),
+    "eventlog.emit": (_eventlog_emit, False),
+    "artifacts.persist": (_persist_artifacts, True),
+    "diff.text": (_diff_text, True),
+}
+if JINJA2_AVAILABLE:
+    MICROBENCHES["render.jinja2"] = (_render_jinja2, True)
+
+
+def bench_names(sizes: List[str], only: Optional[List[str]] = None) -> List[Tuple[str, str, str]]:
+    """
+    Expand microbenchmarks into runs.
+
+    Args:
+        sizes: Size names (keys of SIZES)
+        only: Names or dotted prefixes to keep (e.g. ["memory", "checkpoint.fs.save"])
+
+    Returns:
+        (result name, microbenchmark, size) tuples; sized results are named "name[size]"
+    """
+    runs = []
+    for name, (_micro, sized) in MICROBENCHES.items():
+        if only and not any(name == w or name.startswith(f"{w}.") for w in only):
+            continue
+        for size in sizes if sized else [sizes[0]]:
+            runs.append((f"{name}[{size}]" if sized else name, name, size))
+    return runs
+
+
+def run_microbenches(
+    runs: List[Tuple[str, str, str]], repeat: int = 7, min_batch_ms: float = 20.0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Time each run in batches of calls.
+
+    The calibration batch doubles the call count until a batch takes min_batch_ms
+    (and serves as warmup); each of the `repeat` timed batches then gives one
+    per-call sample, so timer resolution does not dominate sub-microsecond calls.
+
+    Args:
+        runs: From bench_names()
+        repeat: Timed batches per run
+        min_batch_ms: Minimum batch duration
+
+    Returns:
+        Result name -> summary in microseconds per call (see benchlib.summarize),
+        plus "calls" (calls per batch)
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    logging.disable(logging.INFO)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, (result_name, name, size) in enumerate(runs):
+                workdir = Path(tmp) / str(i)
+                workdir.mkdir()
+                with ExitStack() as stack:
+                    op = MICROBENCHES[name][0](SIZES[size], workdir, stack)
+                    calls = _calibrate(op, min_batch_ms / 1000)
+                    samples = _per_call_us(op, calls, repeat)
+                results[result_name] = {**summarize(samples), "calls": calls}
+                s = results[result_name]
+                print(f"  {result_name:<32} p50={s['p50']:12.3f} us", file=sys.stderr)
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def _per_call_us(op: Callable[[], Any], calls: int, repeat: int) -> List[float]:
+    """Time `repeat` batches of `calls` calls; one per-call sample in microseconds each."""
+
+    def batch() -> None:
+        for _ in range(calls):
+            op()
+
+    return [ms * 1000 / calls for ms in measure(lambda: batch, warmup=0, repeat=repeat)]
+
+
+def _calibrate(op: Callable[[], Any], min_batch_sec: float, max_calls: int = 1_000_000) -> int:
+    """Calls per batch so that one batch takes at least min_batch_sec."""
+    calls = 1
+    while calls < max_calls:
+        if _per_call_us(op, calls, 1)[0] * calls / 1e6 >= min_batch_sec:
+            break
+        calls *= 2
+    return calls
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print a results table to stdout."""
+    print(f"{'benchmark':<32} {'p50 us':>12} {'p95 us':>12} {'min us':>12} {'calls':>8}")
+    for name, s in results.items():
+        print(f"{name:<32} {s['p50']:12.3f} {s['p95']:12.3f} {s['min']:12.3f} {s['calls']:8d}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run microbenchmarks, then save a baseline and/or compare against one."""
+    parser = argparse.ArgumentParser(
+        prog="cli.py bench", description="Microbenchmark orchestrator hot paths (us per call)"
+    )
+    parser.add_argument(
+        "--only", help="Comma-separated benchmark names or prefixes (e.g. memory,checkpoint.fs)"
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(SIZES),
+        help=f"Comma-separated sizes (default: all of {', '.join(SIZES)})",
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="Timed batches per benchmark")
+    parser.add_argument(
+        "--min-batch-ms", type=float, default=20.0, help="Minimum duration of one timed batch"
+    )
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=str(BASELINE_PATH),
+        metavar="BASELINE",
+        help=f"Compare against a baseline JSON (default: {BASELINE_PATH}) and exit 1 on regression",
+    )
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const=str(BASELINE_PATH),
+        metavar="PATH",
+        help=f"Save results as a baseline (default: {BASELINE_PATH})",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%)"
+    )
+    parser.add_argument(
+        "--min-delta-us", type=float, default=1.0, help="Ignore slowdowns smaller than this"
+    )
+    parser.add_argument(
+        "--stat", default="p50", choices=["p50", "p95", "p99", "mean", "min"], help="Compared"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown or not sizes:
+        print(f"Unknown size(s): {', '.join(unknown)} (choose from {list(SIZES)})", file=sys.stderr)
+        return 2
+    only = [w.strip() for w in args.only.split(",") if w.strip()] if args.only else None
+    runs = bench_names(sizes, only)
+    if not runs:
+        print(f"No benchmark matches --only {args.only}", file=sys.stderr)
+        return 2
+    if args.list:
+        for result_name, _name, _size in runs:
+            print(result_name)
+        return 0
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Cannot read baseline {args.compare}: {e}", file=sys.stderr)
+            return 2
+
+    print(f"Running {len(runs)} microbenchmarks...", file=sys.stderr)
+    results = run_microbenches(runs, repeat=args.repeat, min_batch_ms=args.min_batch_ms)
+    data = {
+        "version": __version__,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "unit": "us",
+        "config": {"repeat": args.repeat, "min_batch_ms": args.min_batch_ms, "sizes": SIZES},
+        "benchmarks": results,
+    }
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        print_results(results)
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        print(f"Saved baseline: {path}", file=sys.stderr)
+    if baseline is None:
+        return 0
+
+    # Summaries are in microseconds, so min_delta is too
+    rows = compare(
+        baseline.get("benchmarks", {}),
+        results,
+        threshold=args.threshold,
+        stat=args.stat,
+        min_delta_ms=args.min_delta_us,
+    )
+    print(f"\n{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>9}", file=sys.stderr)
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<32} {row['baseline']:12.3f} {row['current']:12.3f} "
+            f"{row['change']:+9.1%}{flag}",
+            file=sys.stderr,
+        )
+    print(f"({args.stat} us per call, threshold {args.threshold:+.0%})", file=sys.stderr)
+    regressed = [r["name"] for r in rows if r["regressed"]]
+    if regressed:
+        print(f"Regressions: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,32 @@
-"""Migration utility: FS checkpoints → SQLite."""
+"""Migration utility: FS checkpoints → SQLite, and conversion between checkpoint formats."""
 
 from __future__ import annotations
 
 import json
-import sqlite3
+import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Tuple
-
-DDL = """
-CREATE TABLE IF NOT EXISTS checkpoints (
-  run_id      TEXT NOT NULL,
-  step_index  INTEGER NOT NULL,
-  stage       TEXT NOT NULL,
-  created_at  INTEGER NOT NULL,
-  memory_json TEXT NOT NULL,
-  extra_json  TEXT NOT NULL,
-  PRIMARY KEY (run_id, step_index)
-);
-CREATE INDEX IF NOT EXISTS idx_checkpoints_runid_created ON checkpoints (run_id, created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_checkpoints_stage ON checkpoints (stage);
-"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Module level, so worker processes that re-import this script can find src too
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.resume import Checkpoint
+from src.orchestrator.checkpoint_blobs import DEFAULT_BLOB_THRESHOLD, BlobStore, resolve_snapshot
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import Row, SQLiteCheckpointStore, encode_row
+from src.orchestrator.serializers import decode, parse_format
+
+DEFAULT_BATCH_SIZE = 1000  # Rows per transaction
+MAX_CHUNK_FILES = 200  # Files parsed per worker task
+PROGRESS_INTERVAL_SEC = 2.0
+
+FileEntry = Tuple[str, str, str]  # (path, run_id, suffix)
+
+# Per-process blob stores, opened on first use by each worker
+_worker_blobs: Dict[str, Optional[BlobStore]] = {}
 
 
 def parse_fs_key(stem: str) -> Tuple[str, int]:
@@ -36,88 +42,267 @@ def parse_fs_key(stem: str) -> Tuple[str, int]:
     return run_id, int(step_idx)
 
 
-def migrate(fs_root: str, sqlite_path: str) -> int:
+def iter_fs_checkpoints(root: Path) -> Iterator[Tuple[Path, str, str]]:
+    """
+    Yield (file, run_id, suffix) for every FS checkpoint.
+
+    Covers both the per-run layout (root/<shard>/<run>/index.json) and the flat
+    root/<run_id>__<step_index>.json layout of earlier versions.
+    """
+    for index_file in root.glob("*/*/index.json"):
+        try:
+            index = json.loads(index_file.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[SKIP] {index_file}: {e}", file=sys.stderr)
+            continue
+        for suffix, name in (index.get("keys") or {}).items():
+            yield index_file.parent / name, index["run_id"], suffix
+
+    for ck_file in root.glob("*.json"):
+        run_id, _, suffix = ck_file.stem.partition("__")
+        yield ck_file, run_id, suffix
+
+
+def _to_checkpoint(data: Dict[str, Any], run_id: str, suffix: str) -> Checkpoint:
+    """Build a Checkpoint from a stored record, accepting older field names."""
+    stage = data.get("stage") or data.get("metadata", {}).get("stage", "unknown")
+
+    # Handle timestamp (can be seconds or milliseconds)
+    timestamp = (
+        data.get("timestamp")
+        or data.get("created_at")
+        or data.get("metadata", {}).get("created_at")
+        or 0
+    )
+    if timestamp >= 10000000000:  # Milliseconds, convert to seconds
+        timestamp = timestamp / 1000.0
+
+    return Checkpoint(
+        run_id=run_id,
+        step_index=int(suffix),
+        stage=stage,
+        memory_snapshot=data.get("memory_snapshot") or data.get("memory") or {},
+        timestamp=timestamp,
+        extra=data.get("extra") or data.get("metadata") or {},
+    )
+
+
+def _blob_store(fs_root: str) -> Optional[BlobStore]:
+    """Blob store of a deduplicated FS root (None if the root has no blobs.db)."""
+    if fs_root not in _worker_blobs:
+        path = Path(fs_root) / "blobs.db"
+        _worker_blobs[fs_root] = BlobStore(str(path)) if path.exists() else None
+    return _worker_blobs[fs_root]
+
+
+def encode_files(
+    files: Sequence[FileEntry], fs_root: str, fmt: str
+) -> Tuple[List[Row], List[Tuple[str, str]], int]:
+    """
+    Parse FS checkpoint files and encode them as SQLite rows.
+
+    Runs in migration worker processes: reading, decoding, resolving blobs and
+    re-encoding are the expensive parts, so only ready-to-insert rows travel back.
+
+    Args:
+        files: (path, run_id, suffix) entries
+        fs_root: FS checkpoint root (for its blob store)
+        fmt: Target snapshot format
+
+    Returns:
+        Tuple of (rows, [(file name, error)], bytes read)
+    """
+    blobs = _blob_store(fs_root)
+    rows: List[Row] = []
+    errors: List[Tuple[str, str]] = []
+    bytes_read = 0
+    for path, run_id, suffix in files:
+        try:
+            raw = Path(path).read_bytes()
+            bytes_read += len(raw)
+            ck = _to_checkpoint(decode(raw), run_id, suffix)
+            if blobs is not None:
+                ck.memory_snapshot = resolve_snapshot(ck.memory_snapshot, blobs)
+            rows.append(encode_row(run_id, ck.step_index, ck, fmt))
+        except Exception as e:
+            errors.append((Path(path).name, str(e)))
+    return rows, errors, bytes_read
+
+
+class _Progress:
+    """Periodic progress and throughput reporting on stderr."""
+
+    def __init__(self, total: int, interval: float) -> None:
+        self.total = total
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def update(self, files: int, nbytes: int) -> None:
+        self.files += files
+        self.bytes += nbytes
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            print(f"[PROGRESS] {self.line()}", file=sys.stderr)
+
+    def line(self) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        rate = self.files / elapsed
+        pct = 100.0 * self.files / self.total if self.total else 100.0
+        eta = (self.total - self.files) / rate if rate else 0.0
+        return (
+            f"{self.files}/{self.total} files ({pct:.1f}%) | {rate:.0f} files/s | "
+            f"{self.bytes / elapsed / (1024 * 1024):.1f} MiB/s | "
+            f"elapsed {elapsed:.1f}s | ETA {eta:.0f}s"
+        )
+
+
+def migrate(
+    fs_root: str,
+    sqlite_path: str,
+    fmt: str = "json",
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = True,
+    progress_interval: float = PROGRESS_INTERVAL_SEC,
+) -> int:
     """
     Migrate filesystem checkpoints to SQLite database.
 
+    Files are streamed through a pool of worker processes that parse and encode
+    them; the main process bulk-inserts the rows with executemany, committing
+    every `batch_size` rows. An interrupted migration resumes where it stopped:
+    keys already in the database are not read again.
+
     Args:
         fs_root: Root directory containing FS checkpoint files
         sqlite_path: Path to SQLite database file
+        fmt: Snapshot format in the database (see serializers.parse_format)
+        workers: Parser processes (None = CPU count, 0 or 1 = parse in-process)
+        batch_size: Rows per transaction
+        resume: Skip keys already present in the database
+        progress_interval: Seconds between progress lines
 
     Returns:
         Number of checkpoints migrated
     """
+    parse_format(fmt)
     root = Path(fs_root)
     if not root.exists():
         print(f"[WARN] FS root not found: {root}")
         return 0
 
-    conn = sqlite3.connect(sqlite_path)
+    store = SQLiteCheckpointStore(sqlite_path, serializer=fmt)
     try:
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.executescript(DDL)
+        done: Set[str] = store.keys() if resume else set()
+        pending: List[FileEntry] = []
+        seen: Set[str] = set()
+        for ck_file, run_id, suffix in iter_fs_checkpoints(root):
+            # The per-run layout is listed first and wins over a stale flat copy
+            key = f"{run_id}:{suffix}"
+            if key not in seen:
+                seen.add(key)
+                if key not in done:
+                    pending.append((str(ck_file), run_id, suffix))
+        already = len(seen) - len(pending)
+        if already:
+            print(f"[RESUME] {already} checkpoints already migrated, skipping them")
 
+        workers = os.cpu_count() or 1 if workers is None else workers
+        progress = _Progress(len(pending), progress_interval)
+        buffer: List[Row] = []
         count = 0
         skipped = 0
 
-        for ck_file in root.glob("*.json"):
-            try:
-                data = json.loads(ck_file.read_text(encoding="utf-8"))
-                run_id, step_index = parse_fs_key(ck_file.stem)
-
-                # Extract fields with fallbacks
-                stage = data.get("stage") or data.get("metadata", {}).get("stage", "unknown")
-
-                # Handle timestamp (can be seconds or milliseconds)
-                timestamp = (
-                    data.get("timestamp")
-                    or data.get("created_at")
-                    or data.get("metadata", {}).get("created_at")
-                    or 0
-                )
-                if timestamp < 10000000000:  # Likely seconds, convert to ms
-                    created_at = int(timestamp * 1000)
-                else:  # Already milliseconds
-                    created_at = int(timestamp)
-
-                memory_json = json.dumps(
-                    data.get("memory_snapshot") or data.get("memory") or {}, ensure_ascii=False
-                )
-                extra_json = json.dumps(
-                    data.get("extra") or data.get("metadata") or {}, ensure_ascii=False
-                )
-
-                conn.execute(
-                    """
-                    INSERT INTO checkpoints(run_id, step_index, stage, created_at, memory_json, extra_json)
-                    VALUES(?,?,?,?,?,?)
-                    ON CONFLICT(run_id, step_index) DO UPDATE SET
-                        stage=excluded.stage,
-                        created_at=excluded.created_at,
-                        memory_json=excluded.memory_json,
-                        extra_json=excluded.extra_json
-                """,
-                    (run_id, step_index, stage, created_at, memory_json, extra_json),
-                )
-                count += 1
-            except Exception as e:
-                print(f"[SKIP] {ck_file.name}: {e}", file=sys.stderr)
-                skipped += 1
-
-        conn.commit()
-        print(f"[OK] Migrated {count} checkpoints → {sqlite_path}")
+        def consume(result: Tuple[List[Row], List[Tuple[str, str]], int]) -> None:
+            nonlocal count, skipped
+            rows, errors, nbytes = result
+            for name, error in errors:
+                print(f"[SKIP] {name}: {error}", file=sys.stderr)
+            skipped += len(errors)
+            buffer.extend(rows)
+            if len(buffer) >= batch_size:
+                store.save_rows(buffer)
+                count += len(buffer)
+                buffer.clear()
+            progress.update(len(rows) + len(errors), nbytes)
+
+        chunk = max(1, min(MAX_CHUNK_FILES, len(pending) // (max(workers, 1) * 4)))
+        chunks = (pending[i : i + chunk] for i in range(0, len(pending), chunk))
+        if workers <= 1:
+            for files in chunks:
+                consume(encode_files(files, str(root), fmt))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Bounded window of tasks in flight keeps memory flat on large stores
+                inflight: Set[Future[Any]] = set()
+                for files in chunks:
+                    inflight.add(pool.submit(encode_files, files, str(root), fmt))
+                    if len(inflight) >= workers * 2:
+                        finished, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            consume(future.result())
+                for future in wait(inflight).done:
+                    consume(future.result())
+        store.save_rows(buffer)
+        count += len(buffer)
+
+        print(f"[OK] Migrated {count} checkpoints → {sqlite_path} ({progress.line()})")
         if skipped > 0:
             print(f"[WARN] Skipped {skipped} checkpoints due to errors")
         return count
     finally:
-        conn.close()
+        store.close()
+
+
+def convert_fs(fs_root: str, fmt: str) -> int:
+    """
+    Rewrite FS checkpoints in place using another serializer format.
+
+    Flat-layout checkpoints of earlier versions move to the per-run layout.
+
+    Args:
+        fs_root: Root directory containing FS checkpoint files
+        fmt: Target format (see serializers.parse_format)
+
+    Returns:
+        Number of checkpoints converted
+    """
+    root = Path(fs_root)
+    if not root.exists():
+        print(f"[WARN] FS root not found: {root}")
+        return 0
+
+    # Keep deduplicated values in the blob table (refcounts are moved, not dropped)
+    blob_threshold = DEFAULT_BLOB_THRESHOLD if (root / "blobs.db").exists() else None
+    store = FileCheckpointStore(str(root), blob_threshold=blob_threshold, serializer=fmt)
+    count = 0
+    for ck_file, run_id, suffix in list(iter_fs_checkpoints(root)):
+        key = f"{run_id}:{suffix}"
+        try:
+            ck = store.load(key)
+            if ck is None:
+                continue
+            store.save(key, ck)
+            if ck_file.exists() and ck_file.parent == root:
+                ck_file.unlink()
+            count += 1
+        except Exception as e:
+            print(f"[SKIP] {ck_file.name}: {e}", file=sys.stderr)
+    print(f"[OK] Converted {count} checkpoints to {fmt}")
+    return count
 
 
 def main() -> int:
     """Main entry point."""
     import argparse
 
-    parser = argparse.ArgumentParser(description="Migrate FS checkpoints to SQLite")
+    parser = argparse.ArgumentParser(
+        description="Migrate FS checkpoints to SQLite or convert them to another format"
+    )
     parser.add_argument(
         "fs_root", nargs="?", default="out/checkpoints", help="FS checkpoint root directory"
     )
@@ -125,10 +310,50 @@ def main() -> int:
         "sqlite_path", nargs="?", default="out/checkpoints.db", help="SQLite database path"
     )
 
+    parser.add_argument(
+        "--format",
+        default="json",
+        help="Target checkpoint format: json, pickle, msgpack, optionally +zlib/+lzma "
+        "(e.g. pickle+zlib)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parser processes (default: CPU count; 1 parses in the main process)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per transaction (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Re-migrate checkpoints already present in the database",
+    )
+    parser.add_argument(
+        "--fs-only",
+        action="store_true",
+        help="Convert the FS checkpoints in place to --format instead of migrating to SQLite",
+    )
+
     args = parser.parse_args()
 
+    if args.fs_only:
+        print(f"Converting checkpoints in {args.fs_root} to {args.format}...")
+        count = convert_fs(args.fs_root, args.format)
+        return 0 if count >= 0 else 1
+
     print(f"Migrating checkpoints from {args.fs_root} to {args.sqlite_path}...")
-    count = migrate(args.fs_root, args.sqlite_path)
+    count = migrate(
+        args.fs_root,
+        args.sqlite_path,
+        fmt=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        resume=not args.no_resume,
+    )
     return 0 if count >= 0 else 1
 
 
@@ -1,109 +1,383 @@
-"""Performance baseline - Run hard tests and save KPI baseline."""
+"""Performance baseline - benchmark runners and storage layers, save or compare baselines."""
 
 from __future__ import annotations
 
+import argparse
+import functools
 import json
+import logging
+import platform
 import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def save_baseline(kpi_data: dict, output_dir: Path) -> None:
-    """Save KPI baseline to docs/benchmarks/."""
-    benchmark_dir = Path("docs/benchmarks")
-    benchmark_dir.mkdir(parents=True, exist_ok=True)
+from scripts.benchlib import (
+    Dag,
+    Workload,
+    chain,
+    compare,
+    diamonds,
+    factories,
+    fanout,
+    layered,
+    measure,
+    summarize,
+    to_steps,
+)
+from src import __version__
+from src.core.memory import SharedMemory
+from src.core.resume import Checkpoint, CheckpointStore
+from src.orchestrator.cache import AgentCache
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.eventlog import BufferedJsonlEventLog, JsonlEventLog
+from src.orchestrator.resources import peak_rss_mb
+from src.orchestrator.runner import Orchestrator
+from src.orchestrator.runner import PipelineStep as SequentialStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
 
+BENCHMARK_DIR = Path("docs/benchmarks")
+
+# Problem sizes per profile; --quick is meant for CI smoke runs
+SIZES: Dict[str, Dict[str, int]] = {
+    "full": {
+        "chain": 100,
+        "fanout": 64,
+        "diamonds": 25,
+        "layered": 1000,
+        "latency_ms": 2,
+        "cpu_iters": 2000,
+        "output_bytes": 2048,
+        "cache_entries": 5000,
+        "memory_keys": 2000,
+        "checkpoints": 200,
+        "events": 20000,
+    },
+    "quick": {
+        "chain": 10,
+        "fanout": 8,
+        "diamonds": 3,
+        "layered": 100,
+        "latency_ms": 1,
+        "cpu_iters": 500,
+        "output_bytes": 512,
+        "cache_entries": 500,
+        "memory_keys": 200,
+        "checkpoints": 20,
+        "events": 2000,
+    },
+}
+
+# A benchmark builds a fresh operation (untimed setup) from sizes and a scratch directory
+Benchmark = Callable[[Dict[str, int], Path], Callable[[], Any]]
+
+
+def _workload(sizes: Dict[str, int]) -> Workload:
+    return Workload(
+        latency_ms=sizes["latency_ms"],
+        cpu_iters=sizes["cpu_iters"],
+        output_bytes=sizes["output_bytes"],
+    )
+
+
+def _sequential(dag_of: Callable[[Dict[str, int]], Dag]) -> Benchmark:
+    def make(sizes: Dict[str, int], workdir: Path) -> Callable[[], Any]:
+        agent_factory, advisor_factory = factories(_workload(sizes))
+        orch = Orchestrator(agent_factory, advisor_factory, CheckpointStore())
+        orch.eventlog = BufferedJsonlEventLog(path=str(workdir / f"{orch.run_id}.jsonl"))
+        orch.use_cache = False
+        steps = to_steps(dag_of(sizes), SequentialStep, max_retries=0)
+        return lambda: orch.run(steps)
+
+    return make
+
+
+def _parallel(dag_of: Callable[[Dict[str, int]], Dag]) -> Benchmark:
+    def make(sizes: Dict[str, int], workdir: Path) -> Callable[[], Any]:
+        agent_factory, advisor_factory = factories(_workload(sizes))
+        orch = OrchestratorParallel(agent_factory, advisor_factory, CheckpointStore())
+        orch.eventlog = BufferedJsonlEventLog(path=str(workdir / f"{orch.run_id}.jsonl"))
+        steps = to_steps(dag_of(sizes), ParallelStep)
+        return lambda: orch.run_waves(steps)
+
+    return make
+
+
+def _cache_lookup(sizes: Dict[str, int], workdir: Path) -> Callable[[], Any]:
+    """Key computation plus hit/miss lookups, as done once per attempt by the runner."""
+    cache = AgentCache()
+    n = sizes["cache_entries"]
+    context = {f"s.k{i}": "v" * 64 for i in range(20)}
+    output = {"content": "x" * sizes["output_bytes"], "artifacts": [], "metadata": {}}
+    for i in range(0, n, 2):
+        cache.put_by_key(cache.key("a", "s", f"t{i}", context), output)
+
+    def op() -> None:
+        for i in range(n):
+            cache.get_by_key(cache.key("a", "s", f"t{i}", context))
+
+    return op
+
+
+def _memory(sizes: Dict[str, int], workdir: Path) -> Callable[[], Any]:
+    """SharedMemory updates and snapshots (every step snapshots memory several times)."""
+    memory = SharedMemory()
+    payload = "x" * sizes["output_bytes"]
+
+    def op() -> None:
+        for i in range(sizes["memory_keys"]):
+            memory.update({f"s{i}.content": payload, f"s{i}.review": {"score": 0.9}})
+            if i % 50 == 0:
+                memory.to_dict()
+
+    return op
+
+
+def _checkpoints(store_of: Callable[[Path], Any]) -> Benchmark:
+    def make(sizes: Dict[str, int], workdir: Path) -> Callable[[], Any]:
+        store = store_of(Path(tempfile.mkdtemp(dir=workdir)) / "checkpoints")
+        payload = "x" * sizes["output_bytes"]
+        memory = {f"s{i}.content": payload for i in range(50)}
+
+        def op() -> None:
+            for i in range(sizes["checkpoints"]):
+                store.save(f"bench:{i}", Checkpoint("bench", i, f"s{i}", memory))
+            flush = getattr(store, "flush", None)
+            if flush is not None:
+                flush()
+
+        return op
+
+    return make
+
+
+def _eventlog(log_of: Callable[[str], JsonlEventLog]) -> Benchmark:
+    def make(sizes: Dict[str, int], workdir: Path) -> Callable[[], Any]:
+        log = log_of(str(Path(tempfile.mkdtemp(dir=workdir)) / "events.jsonl"))
+
+        def op() -> None:
+            for i in range(sizes["events"]):
+                log.emit("step_end", stage=f"s{i % 100}", attempts=1, score=0.9, duration_ms=12)
+            close = getattr(log, "close", None)
+            if close is not None:
+                close()
+
+        return op
+
+    return make
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "sequential.chain": _sequential(lambda s: chain(s["chain"])),
+    "parallel.chain": _parallel(lambda s: chain(s["chain"])),
+    "parallel.fanout": _parallel(lambda s: fanout(s["fanout"])),
+    "parallel.diamonds": _parallel(lambda s: diamonds(s["diamonds"], width=4)),
+    "parallel.layered": _parallel(lambda s: layered(s["layered"])),
+    "cache.lookup": _cache_lookup,
+    "memory.update": _memory,
+    "checkpoint.fs": _checkpoints(lambda p: FileCheckpointStore(root=str(p))),
+    "checkpoint.sqlite": _checkpoints(lambda p: SQLiteCheckpointStore(db_path=f"{p}.db")),
+    "eventlog.jsonl": _eventlog(lambda path: JsonlEventLog(path=path)),
+    "eventlog.buffered": _eventlog(lambda path: BufferedJsonlEventLog(path=path)),
+}
+
+
+def run_benchmarks(
+    names: List[str],
+    sizes: Dict[str, int],
+    warmup: int,
+    repeat: int,
+    max_time_sec: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run benchmarks and summarize their timings.
+
+    Args:
+        names: Benchmark names (keys of BENCHMARKS)
+        sizes: Problem sizes (a SIZES profile)
+        warmup: Untimed runs per benchmark
+        repeat: Timed runs per benchmark
+        max_time_sec: Time budget per benchmark (fewer timed runs once exceeded)
+
+    Returns:
+        Benchmark name -> summary in milliseconds (n, mean, min, p50, p95, p99, max)
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    # Runner INFO logs would dominate the timings
+    logging.disable(logging.INFO)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in names:
+                workdir = Path(tmp) / name
+                workdir.mkdir()
+                make_op = functools.partial(BENCHMARKS[name], sizes, workdir)
+                samples = measure(make_op, warmup, repeat, max_time_sec)
+                results[name] = summarize(samples)
+                s = results[name]
+                print(f"  {name:<20} p50={s['p50']:10.2f} ms  (n={s['n']})", file=sys.stderr)
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def save_baseline(kpi_data: Dict[str, Any], output_dir: Path = BENCHMARK_DIR) -> Path:
+    """Save a baseline as timestamped JSON/CSV/Markdown plus baseline_latest.json."""
+    output_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Save JSON
-    json_path = benchmark_dir / f"baseline_{timestamp}.json"
-    json_path.write_text(json.dumps(kpi_data, indent=2))
+    json_path = output_dir / f"baseline_{timestamp}.json"
+    json_path.write_text(json.dumps(kpi_data, indent=2), encoding="utf-8")
     print(f"Saved JSON baseline: {json_path}", file=sys.stderr)
 
-    # Save CSV (if available)
-    if "metrics" in kpi_data:
-        csv_lines = ["metric,value"]
-        for metric, value in kpi_data["metrics"].items():
-            csv_lines.append(f"{metric},{value}")
-        csv_path = benchmark_dir / f"baseline_{timestamp}.csv"
-        csv_path.write_text("\n".join(csv_lines))
-        print(f"Saved CSV baseline: {csv_path}", file=sys.stderr)
-
-    # Save Markdown summary
+    stats = ["n", "mean", "min", "p50", "p95", "p99", "max"]
+    csv_lines = ["benchmark," + ",".join(stats)]
     md_lines = [
         "# Performance Baseline",
         "",
-        f"**Date**: {datetime.now().isoformat()}",
+        f"**Date**: {kpi_data['timestamp']}",
         f"**Version**: {kpi_data.get('version', 'unknown')}",
+        f"**Python**: {kpi_data.get('python', 'unknown')}",
+        f"**Profile**: {kpi_data['config']['profile']}  |  "
+        f"warmup={kpi_data['config']['warmup']}  |  repeat={kpi_data['config']['repeat']}",
+        f"**Peak RSS**: {kpi_data.get('peak_rss_mb', 0.0):.1f} MiB",
         "",
-        "## Metrics",
+        "## Benchmarks (ms)",
         "",
+        "| Benchmark | p50 | p95 | p99 | mean | min | max |",
+        "|-----------|----:|----:|----:|-----:|----:|----:|",
     ]
-
-    if "metrics" in kpi_data:
-        for metric, value in kpi_data["metrics"].items():
-            md_lines.append(f"- **{metric}**: {value}")
-
-    if "stages" in kpi_data:
-        md_lines.extend(
-            [
-                "",
-                "## Stage Performance",
-                "",
-                "| Stage | Duration | Status |",
-                "|-------|----------|--------|",
-            ]
+    for name, s in kpi_data["benchmarks"].items():
+        csv_lines.append(name + "," + ",".join(str(s[k]) for k in stats))
+        md_lines.append(
+            f"| {name} | {s['p50']:.2f} | {s['p95']:.2f} | {s['p99']:.2f} | "
+            f"{s['mean']:.2f} | {s['min']:.2f} | {s['max']:.2f} |"
         )
-        for stage in kpi_data.get("stages", []):
-            md_lines.append(
-                f"| {stage.get('name', 'unknown')} | {stage.get('duration', 'N/A')} | {stage.get('status', 'N/A')} |"
-            )
 
-    md_path = benchmark_dir / f"baseline_{timestamp}.md"
-    md_path.write_text("\n".join(md_lines))
+    csv_path = output_dir / f"baseline_{timestamp}.csv"
+    csv_path.write_text("\n".join(csv_lines) + "\n", encoding="utf-8")
+    print(f"Saved CSV baseline: {csv_path}", file=sys.stderr)
+    md_path = output_dir / f"baseline_{timestamp}.md"
+    md_path.write_text("\n".join(md_lines) + "\n", encoding="utf-8")
     print(f"Saved Markdown baseline: {md_path}", file=sys.stderr)
 
-    # Update latest symlink/reference
-    latest_path = benchmark_dir / "baseline_latest.json"
-    latest_path.write_text(json.dumps(kpi_data, indent=2))
+    latest_path = output_dir / "baseline_latest.json"
+    latest_path.write_text(json.dumps(kpi_data, indent=2), encoding="utf-8")
     print(f"Updated latest baseline: {latest_path}", file=sys.stderr)
+    return json_path
 
 
-def main() -> int:
-    """Run hard tests and save baseline."""
-    print("Running performance baseline tests...", file=sys.stderr)
+def print_comparison(rows: List[Dict[str, Any]], stat: str, threshold: float) -> None:
+    """Print a baseline comparison table to stderr."""
+    print(f"\n{'benchmark':<20} {'baseline':>12} {'current':>12} {'change':>9}", file=sys.stderr)
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<20} {row['baseline']:12.2f} {row['current']:12.2f} "
+            f"{row['change']:+9.1%}{flag}",
+            file=sys.stderr,
+        )
+    print(f"({stat}, threshold {threshold:+.0%})", file=sys.stderr)
 
-    # Run hard tests
-    # Note: This assumes hard_test.py outputs KPI data
-    # Adjust based on actual hard_test.py implementation
-    try:
-        # Import and run hard test
-        # For now, we'll create a mock structure
-        # Replace with actual hard_test integration
-
-        kpi_data = {
-            "version": "1.0.0",
-            "timestamp": datetime.now().isoformat(),
-            "metrics": {
-                "total_stages": 0,
-                "success_rate": 0.0,
-                "avg_duration": 0.0,
-            },
-            "stages": [],
-        }
-
-        # TODO: Integrate with actual hard_test.py
-        # result = hard_test_main()
-        # kpi_data = extract_kpis(result)
-
-        save_baseline(kpi_data, Path("docs/benchmarks"))
-
-        print("\n✅ Baseline saved successfully", file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run benchmarks, then save a baseline and/or compare against one."""
+    parser = argparse.ArgumentParser(description="Benchmark the orchestrator and save baselines")
+    parser.add_argument("--quick", action="store_true", help="Small problem sizes (CI smoke)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument(
+        "--max-time-sec",
+        type=float,
+        default=60.0,
+        help="Per-benchmark time budget; slow benchmarks stop repeating once exceeded",
+    )
+    parser.add_argument(
+        "--only", help="Comma-separated benchmark names or prefixes (e.g. parallel,checkpoint.fs)"
+    )
+    parser.add_argument("--out", default=str(BENCHMARK_DIR), help="Baseline directory")
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=str(BENCHMARK_DIR / "baseline_latest.json"),
+        metavar="BASELINE",
+        help="Compare against a baseline JSON (default: <docs/benchmarks>/baseline_latest.json) "
+        "and exit 1 on regression; the baseline is not overwritten unless --save is given",
+    )
+    parser.add_argument("--save", action="store_true", help="Save a baseline even with --compare")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%)"
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this"
+    )
+    parser.add_argument(
+        "--stat", default="p50", choices=["p50", "p95", "p99", "mean"], help="Statistic compared"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    names = list(BENCHMARKS)
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(",") if w.strip()]
+        names = [n for n in names if any(n == w or n.startswith(f"{w}.") for w in wanted)]
+        if not names:
+            print(f"No benchmark matches --only {args.only}", file=sys.stderr)
+            return 2
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Cannot read baseline {args.compare}: {e}", file=sys.stderr)
+            return 2
+
+    profile = "quick" if args.quick else "full"
+    print(f"Running {len(names)} benchmarks ({profile})...", file=sys.stderr)
+    results = run_benchmarks(names, SIZES[profile], args.warmup, args.repeat, args.max_time_sec)
+
+    kpi_data = {
+        "version": __version__,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "config": {
+            "profile": profile,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "max_time_sec": args.max_time_sec,
+            "sizes": SIZES[profile],
+        },
+        "benchmarks": results,
+    }
+    if args.json:
+        print(json.dumps(kpi_data, indent=2))
+    if baseline is None or args.save:
+        save_baseline(kpi_data, Path(args.out))
+    if baseline is None:
         return 0
 
-    except Exception as e:
-        print(f"❌ Error creating baseline: {e}", file=sys.stderr)
+    if baseline.get("config", {}).get("profile") != profile:
+        print("[WARN] Baseline was recorded with a different size profile", file=sys.stderr)
+    rows = compare(
+        baseline.get("benchmarks", {}),
+        results,
+        threshold=args.threshold,
+        stat=args.stat,
+        min_delta_ms=args.min_delta_ms,
+    )
+    print_comparison(rows, args.stat, args.threshold)
+    regressed = [r["name"] for r in rows if r["regressed"]]
+    if regressed:
+        print(f"Regressions: {', '.join(regressed)}", file=sys.stderr)
         return 1
+    return 0
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import copy
 from threading import RLock
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 class SharedMemory:
@@ -30,6 +30,10 @@ class SharedMemory:
             for k, v in patch.items():
                 self._store[k] = copy.deepcopy(v)
 
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._store)
+
     def to_dict(self) -> Dict[str, Any]:
         with self._lock:
             return copy.deepcopy(self._store)
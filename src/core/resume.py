@@ -22,17 +22,22 @@ class Checkpoint:
     timestamp: float = field(default_factory=time.time)
     extra: Dict[str, Any] = field(default_factory=dict)
 
+    def to_dict(self) -> Dict[str, Any]:
+        snapshot = self.memory_snapshot
+        if not isinstance(snapshot, dict):
+            # Lazily loaded snapshots decode everything at once
+            snapshot = snapshot.to_dict() if hasattr(snapshot, "to_dict") else dict(snapshot)
+        return {
+            "run_id": self.run_id,
+            "step_index": self.step_index,
+            "stage": self.stage,
+            "memory_snapshot": snapshot,
+            "timestamp": self.timestamp,
+            "extra": self.extra,
+        }
+
     def to_json(self) -> str:
-        return json.dumps(
-            {
-                "run_id": self.run_id,
-                "step_index": self.step_index,
-                "stage": self.stage,
-                "memory_snapshot": self.memory_snapshot,
-                "timestamp": self.timestamp,
-                "extra": self.extra,
-            }
-        )
+        return json.dumps(self.to_dict())
 
 
 class CheckpointStore:
@@ -1,18 +1,20 @@
 """Orchestrator components for pipeline execution."""
 
-from .artifact_sink import persist_artifacts
+from .artifact_sink import ArtifactPersister, persist_artifacts
 from .cache import AgentCache
 from .checkpoint_fs import FileCheckpointStore
 from .council import AdvisorCouncil, DecisionMode
 from .dryrun import validate_pipeline_file
 from .errors import (
     AdvisorRejectError,
+    CheckpointCorruptError,
+    CheckpointWriteError,
     ExhaustedRetriesError,
     InvalidOutputError,
     OrchestratorError,
     TimeoutOrchestratorError,
 )
-from .eventlog import JsonlEventLog
+from .eventlog import BufferedJsonlEventLog, JsonlEventLog
 from .factory import CORE_ADVISORS, CORE_AGENTS, advisor_factory, agent_factory
 from .hooks import PostStepHook, PromptRefinerOnFailure
 from .quality_gate import QualityGate
@@ -46,12 +48,14 @@ __all__ = [
     "PromptRefinerOnFailure",
     "build_markdown_report",
     "persist_artifacts",
+    "ArtifactPersister",
     "AdvisorCouncil",
     "DecisionMode",
     "run_with_timeout",
     "retry",
     "BackoffPolicy",
     "JsonlEventLog",
+    "BufferedJsonlEventLog",
     "AgentCache",
     "validate_pipeline_file",
     "FileCheckpointStore",
@@ -61,4 +65,6 @@ __all__ = [
     "InvalidOutputError",
     "AdvisorRejectError",
     "ExhaustedRetriesError",
+    "CheckpointWriteError",
+    "CheckpointCorruptError",
 ]
@@ -4,13 +4,27 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import itertools
 import json
+import logging
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from src.core.memory import SharedMemory
 
+from .tracing import traced
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # Bytes (or characters) encoded, hashed and written at a time
+DEFAULT_BATCH_BYTES = 1 << 20  # Small artifacts are written in batches of about this size
+
+# (sequence number, artifact) pairs that share one sanitized file name
+_NameGroup = List[Tuple[int, Dict[str, Any]]]
+
 
 def _safe_name(name: str) -> str:
     """Sanitize filename to be filesystem-safe."""
@@ -20,8 +34,262 @@ def _safe_name(name: str) -> str:
     return name[:120] or "artifact.bin"
 
 
+def _byte_chunks(data: bytes, size: int) -> Iterator[Union[bytes, memoryview]]:
+    view = memoryview(data)
+    for i in range(0, len(view), size):
+        yield view[i : i + size]
+
+
+def _text_chunks(text: str, size: int) -> Iterator[bytes]:
+    for i in range(0, len(text), size):
+        yield text[i : i + size].encode("utf-8")
+
+
+def _base64_chunks(text: str, size: int) -> Iterator[bytes]:
+    """
+    Decode base64 text piecewise, accepting exactly what b64decode(validate=True) accepts.
+
+    Raises:
+        ValueError: (binascii.Error included) if the text is not valid base64
+    """
+    body = text.rstrip("=")
+    padding = text[len(body) :]
+    if "=" in body:
+        raise ValueError("padding inside base64 text")
+    if not body:
+        yield base64.b64decode(padding, validate=True)
+        return
+    step = max(4, size // 4 * 4)
+    for i in range(0, len(body), step):
+        piece = body[i : i + step]
+        if i + step >= len(body):
+            piece += padding
+        yield base64.b64decode(piece, validate=True)
+
+
+def _stream(path: Path, chunks: Iterable[Union[bytes, memoryview]]) -> Tuple[int, str]:
+    """Write chunks to path while hashing them; returns (bytes written, sha256 hex)."""
+    digest = hashlib.sha256()
+    nbytes = 0
+    it = iter(chunks)
+    first = next(it, b"")  # Errors in the first chunk (e.g. not base64) leave the file alone
+    with path.open("wb") as f:
+        for chunk in itertools.chain((first,), it):
+            digest.update(chunk)
+            f.write(chunk)
+            nbytes += len(chunk)
+    return nbytes, digest.hexdigest()
+
+
+def write_artifact(
+    path: Path, content: Any, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[int, str]:
+    """
+    Write one artifact's content, hashing it as it is written.
+
+    bytes are written as-is; non-empty strings that are valid base64 are decoded
+    and written as binary; anything else is written as UTF-8 text.
+
+    Args:
+        path: Destination file
+        content: Artifact content
+        chunk_size: Bytes (or characters) per chunk
+
+    Returns:
+        (bytes written, sha256 hex digest of the written bytes)
+    """
+    if isinstance(content, bytes):
+        return _stream(path, _byte_chunks(content, chunk_size))
+    if isinstance(content, str) and content:
+        try:
+            nbytes, sha256 = _stream(path, _base64_chunks(content, chunk_size))
+            if nbytes:
+                return nbytes, sha256
+        except ValueError:
+            pass  # Fall through to text handling (rewrites the file)
+    return _stream(path, _text_chunks(str(content), chunk_size))
+
+
+class ArtifactPersister:
+    """
+    Persist run artifacts on a bounded thread pool while the pipeline runs.
+
+    Use it as a post-step hook: after each stage it queues the stage's artifacts
+    (`<stage>.artifacts` in memory), which are written and SHA-256 hashed in
+    chunks by worker threads, so file I/O overlaps with the following stages.
+    Small artifacts are grouped into tasks of about `batch_bytes`; at most
+    `max_pending` tasks are queued, and the hook blocks beyond that.
+    close() waits for the writes, persists stages the hook never saw (e.g.
+    resumed ones) from the final result, and writes manifest.json and
+    SUMMARY.md. Layout and manifest are those of persist_artifacts().
+
+    Example:
+        persister = ArtifactPersister(out_dir="out", run_id=orch.run_id)
+        orch.post_step_hooks.append(persister)
+        result = orch.run(steps)
+        count = persister.close(result)
+    """
+
+    def __init__(
+        self,
+        out_dir: str = "out",
+        run_id: str = "unknown",
+        max_workers: int = 4,
+        max_pending: int = 64,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+    ) -> None:
+        """
+        Initialize persister.
+
+        Args:
+            out_dir: Output directory root (artifacts go to <out_dir>/<run_id>/<stage>/)
+            run_id: Run identifier
+            max_workers: Writer threads
+            max_pending: Max write tasks queued or running (backpressure)
+            chunk_size: Bytes (or characters) encoded, hashed and written at a time
+            batch_bytes: Approximate content size per write task
+        """
+        self.base = Path(out_dir) / str(run_id)
+        self.run_id = str(run_id)
+        self.chunk_size = chunk_size
+        self.batch_bytes = batch_bytes
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="artifact-writer"
+        )
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._futures: Dict[str, List[Future]] = {}  # stage -> writes of its latest submit
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._closed = False
+
+    def __call__(self, *, step_result: Dict[str, Any], shared_memory: SharedMemory) -> None:
+        """Post-step hook: queue the finished stage's artifacts."""
+        stage = step_result["stage"]
+        self.submit(stage, shared_memory.get(f"{stage}.artifacts") or [])
+
+    def submit(self, stage: str, artifacts: List[Dict[str, Any]]) -> None:
+        """
+        Queue a stage's artifacts for writing. Thread-safe (parallel runner hooks).
+
+        Submitting a stage again replaces its manifest entries (after its earlier
+        writes finish). Artifacts whose sanitized names collide are written in
+        order by one task, so the last one wins on disk, as with sequential writes.
+
+        Args:
+            stage: Stage name
+            artifacts: Artifact dicts (name, type, content)
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ArtifactPersister is closed")
+            for fut in self._futures.pop(stage, []):
+                fut.result()
+            futures = self._futures[stage] = []
+            if not artifacts:
+                return
+            stage_dir = self.base / stage
+            stage_dir.mkdir(parents=True, exist_ok=True)
+
+            by_name: Dict[str, _NameGroup] = {}
+            for a in artifacts:
+                name = _safe_name(str(a.get("name") or "artifact"))
+                by_name.setdefault(name, []).append((self._seq, a))
+                self._seq += 1
+            for batch in self._batches(by_name):
+                self._slots.acquire()  # Blocks while max_pending tasks are queued
+                try:
+                    fut = self._pool.submit(self._write, stage, stage_dir, batch)
+                except BaseException:
+                    self._slots.release()
+                    raise
+                fut.add_done_callback(lambda _f: self._slots.release())
+                futures.append(fut)
+
+    def _batches(self, by_name: Dict[str, _NameGroup]) -> Iterator[List[Tuple[str, _NameGroup]]]:
+        """Pack name groups into write tasks of about batch_bytes (one per large artifact)."""
+        batch: List[Tuple[str, _NameGroup]] = []
+        size = 0
+        for name, group in by_name.items():
+            batch.append((name, group))
+            size += sum(len(a.get("content") or "") for _seq, a in group)
+            if size >= self.batch_bytes:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+    def _write(
+        self, stage: str, stage_dir: Path, batch: List[Tuple[str, _NameGroup]]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """Write a batch of artifacts; returns (sequence, manifest entry) pairs."""
+        entries = []
+        for name, group in batch:
+            for seq, a in group:  # Same file, in order: the last artifact wins
+                nbytes, sha256 = write_artifact(
+                    stage_dir / name, a.get("content", ""), self.chunk_size
+                )
+                entry = {
+                    "stage": stage,
+                    "name": a.get("name") or "artifact",
+                    "safe_name": name,
+                    "type": a.get("type", "text"),
+                    "bytes": nbytes,
+                    "sha256": sha256,
+                }
+                entries.append((seq, entry))
+        return entries
+
+    def close(self, result: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Finish writing and assemble the manifest.
+
+        Args:
+            result: Final run result (or a dict with "memory"); artifacts of stages
+                not yet submitted are persisted from its memory
+
+        Returns:
+            Number of artifacts saved
+
+        Raises:
+            OSError: (or any other error) from the first failed write
+        """
+        mem = (result or {}).get("memory") or {}
+        for stage in sorted({k.split(".")[0] for k in mem if "." in k} - set(self._futures)):
+            self.submit(stage, mem.get(f"{stage}.artifacts") or [])
+        with self._lock:
+            self._closed = True
+        try:
+            written = [e for futures in self._futures.values() for f in futures for e in f.result()]
+        finally:
+            self._pool.shutdown(wait=True)
+        manifest = [entry for _seq, entry in sorted(written, key=lambda e: e[0])]
+
+        self.base.mkdir(parents=True, exist_ok=True)
+        (self.base / "manifest.json").write_text(
+            json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        (self.base / "SUMMARY.md").write_text(
+            f"# Run `{self.run_id}`\n\nArtifacts stored under stage folders.\n",
+            encoding="utf-8",
+        )
+        logger.debug(f"[ARTIFACTS] wrote {len(manifest)} artifact(s) to {self.base}")
+        return len(manifest)
+
+    def __enter__(self) -> ArtifactPersister:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=True)
+
+
+@traced("artifact.persist", "artifact")
 def persist_artifacts(
-    result_or_memory: Union[Dict[str, Any], SharedMemory], out_dir: str = "out"
+    result_or_memory: Union[Dict[str, Any], SharedMemory],
+    out_dir: str = "out",
+    max_workers: int = 4,
 ) -> int:
     """
     Persist artifacts from orchestrator memory to filesystem.
@@ -29,6 +297,7 @@ def persist_artifacts(
     Args:
         result_or_memory: Either result dict with run_id/memory or SharedMemory object
         out_dir: Output directory root
+        max_workers: Writer threads (see ArtifactPersister)
 
     Returns:
         Number of artifacts saved
@@ -40,86 +309,5 @@ def persist_artifacts(
     else:
         run_id = result_or_memory.get("run_id", "unknown")
         mem = result_or_memory.get("memory", {})
-    base = Path(out_dir) / str(run_id)
-    base.mkdir(parents=True, exist_ok=True)
-
-    saved_count = 0
-    manifest = []
-
-    # Walk stages present in memory by suffix convention
-    stages = {k.split(".")[0] for k in mem.keys() if "." in k}
-    for stage in stages:
-        arts: List[Dict[str, Any]] = mem.get(f"{stage}.artifacts") or []
-        stage_dir = base / stage
-        if not arts:
-            continue
-        stage_dir.mkdir(parents=True, exist_ok=True)
-        for a in arts:
-            raw_name = a.get("name") or "artifact"
-            name = _safe_name(str(raw_name))
-            content = a.get("content", "")
-            art_type = a.get("type", "text")
-            p = stage_dir / name
-
-            # Determine content bytes for manifest
-            content_bytes = b""
-
-            # Support binary artifacts
-            if isinstance(content, bytes):
-                p.write_bytes(content)
-                content_bytes = content
-            else:
-                # Try to decode base64 if it looks like base64 string
-                if isinstance(content, str) and len(content) > 0:
-                    try:
-                        decoded = base64.b64decode(content, validate=True)
-                        # If decoding succeeds and produces reasonable binary, save as binary
-                        if len(decoded) > 0:
-                            p.write_bytes(decoded)
-                            content_bytes = decoded
-                            saved_count += 1
-                            # Add to manifest
-                            sha256 = hashlib.sha256(content_bytes).hexdigest()
-                            manifest.append(
-                                {
-                                    "stage": stage,
-                                    "name": raw_name,
-                                    "safe_name": name,
-                                    "type": art_type,
-                                    "bytes": len(content_bytes),
-                                    "sha256": sha256,
-                                }
-                            )
-                            continue
-                    except Exception:
-                        pass  # Fall through to text handling
-
-                # Default: save as text
-                p.write_text(str(content), encoding="utf-8")
-                content_bytes = str(content).encode("utf-8")
-
-            saved_count += 1
-
-            # Add to manifest
-            sha256 = hashlib.sha256(content_bytes).hexdigest()
-            manifest.append(
-                {
-                    "stage": stage,
-                    "name": raw_name,
-                    "safe_name": name,
-                    "type": art_type,
-                    "bytes": len(content_bytes),
-                    "sha256": sha256,
-                }
-            )
-
-    # Write manifest.json
-    manifest_path = base / "manifest.json"
-    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
-
-    # Also drop a short SUMMARY.md
-    (base / "SUMMARY.md").write_text(
-        f"# Run `{run_id}`\n\nArtifacts stored under stage folders.\n",
-        encoding="utf-8",
-    )
-    return saved_count
+    persister = ArtifactPersister(out_dir=out_dir, run_id=run_id, max_workers=max_workers)
+    return persister.close({"memory": mem})
@@ -13,6 +13,8 @@ class Budget:
     max_runtime_sec: Optional[float] = None
     max_stages: Optional[int] = None
     max_artifacts_bytes: Optional[int] = None
+    max_cpu_sec: Optional[float] = None
+    max_rss_mb: Optional[float] = None
 
 
 class BudgetExceededError(RuntimeError):
@@ -50,3 +52,17 @@ def enforce_budget(budget: Budget, stats: Dict[str, Any]) -> None:
             raise BudgetExceededError(
                 f"Runtime budget exceeded: {runtime_sec:.1f}s > {budget.max_runtime_sec}s"
             )
+
+    if budget.max_cpu_sec is not None:
+        cpu_sec = stats.get("cpu_sec", 0.0)
+        if cpu_sec > budget.max_cpu_sec:
+            raise BudgetExceededError(
+                f"CPU budget exceeded: {cpu_sec:.1f}s > {budget.max_cpu_sec}s"
+            )
+
+    if budget.max_rss_mb is not None:
+        rss_mb = stats.get("rss_mb", 0.0)
+        if rss_mb > budget.max_rss_mb:
+            raise BudgetExceededError(
+                f"Memory budget exceeded: peak RSS {rss_mb:.1f} MiB > {budget.max_rss_mb} MiB"
+            )
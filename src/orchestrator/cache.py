@@ -65,7 +65,38 @@ class AgentCache:
         Returns:
             Cached output dict or None
         """
-        return self._store.get(self._key(agent, stage, task, context, agent_version))
+        return self.get_by_key(self._key(agent, stage, task, context, agent_version))
+
+    def key(
+        self,
+        agent: str,
+        stage: str,
+        task: str,
+        context: Dict[str, Any],
+        agent_version: str = "0.1.0",
+    ) -> str:
+        """
+        Compute the cache key once, for use with get_by_key()/put_by_key().
+
+        Args:
+            agent: Agent name
+            stage: Stage name
+            task: Task string
+            context: Context dictionary
+            agent_version: Agent version (default: "0.1.0")
+
+        Returns:
+            Cache key
+        """
+        return self._key(agent, stage, task, context, agent_version)
+
+    def get_by_key(self, key: str) -> Dict[str, Any] | None:
+        """Get cached output by a key from key() (None if absent)."""
+        return self._store.get(key)
+
+    def put_by_key(self, key: str, agent_output_dict: Dict[str, Any]) -> None:
+        """Store agent output under a key from key()."""
+        self._store[key] = agent_output_dict
 
     def put(
         self,
@@ -87,4 +118,4 @@ class AgentCache:
             agent_output_dict: Agent output as dictionary
             agent_version: Agent version (default: "0.1.0")
         """
-        self._store[self._key(agent, stage, task, context, agent_version)] = agent_output_dict
+        self.put_by_key(self._key(agent, stage, task, context, agent_version), agent_output_dict)
@@ -0,0 +1,281 @@
+"""Content-addressed blob storage for deduplicated checkpoint values."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import lzma
+import sqlite3
+import zlib
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Set
+
+from .sqlite_pool import SQLiteConnectionPool
+
+# Marker used in checkpoint snapshots to reference a stored blob: {"__blob__": "<sha256>"}
+BLOB_REF = "__blob__"
+
+COMPRESSIONS = ("none", "zlib", "lzma")
+
+# Values whose JSON encoding is at least this many bytes are moved to the blob table
+DEFAULT_BLOB_THRESHOLD = 64 * 1024
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress bytes with the given codec ("none", "zlib" or "lzma")."""
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "lzma":
+        return lzma.compress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Reverse compress() for the given codec."""
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+class BlobStore:
+    """
+    Content-addressed, reference-counted blob table backed by SQLite.
+
+    Blobs are keyed by the SHA-256 of their uncompressed bytes, so identical
+    content is stored once no matter how many checkpoints (or runs) use it.
+    Each put() adds a reference, release() drops one, and gc() deletes blobs
+    that are no longer referenced by any checkpoint.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        compression: str = "zlib",
+        pool: Optional[SQLiteConnectionPool] = None,
+    ) -> None:
+        """
+        Initialize blob store.
+
+        Args:
+            db_path: SQLite database file holding the blob table
+            compression: Codec for newly stored blobs ("none", "zlib", "lzma")
+            pool: Connection pool to share with a checkpoint store on the same file
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression codec: {compression}")
+        self.path = db_path
+        self.compression = compression
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._pool = pool or SQLiteConnectionPool(db_path)
+        self._init()
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._pool.close()
+
+    def _init(self) -> None:
+        """Initialize blob table schema."""
+        cx = self._pool.connection()
+        with cx:
+            cx.execute("PRAGMA journal_mode=WAL;")
+            cx.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest      TEXT PRIMARY KEY,
+                    codec       TEXT NOT NULL,
+                    size        INTEGER NOT NULL,
+                    stored_size INTEGER NOT NULL,
+                    refcount    INTEGER NOT NULL,
+                    data        BLOB NOT NULL
+                )
+            """)
+
+    def put(self, data: bytes, commit: bool = True) -> str:
+        """
+        Store bytes (if new) and add one reference.
+
+        Args:
+            data: Uncompressed blob content
+            commit: If False, leave the write in the connection's open transaction so
+                the caller commits it together with its own writes (shared pool only)
+
+        Returns:
+            SHA-256 hex digest of the content
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        cx = self._pool.connection()
+        with self._transaction(cx, commit):
+            cur = cx.execute("UPDATE blobs SET refcount = refcount + 1 WHERE digest=?", (digest,))
+            if cur.rowcount == 0:
+                packed = compress(data, self.compression)
+                cx.execute(
+                    """
+                    INSERT INTO blobs (digest, codec, size, stored_size, refcount, data)
+                    VALUES (?, ?, ?, ?, 1, ?)
+                    ON CONFLICT(digest) DO UPDATE SET refcount = refcount + 1
+                """,
+                    (digest, self.compression, len(data), len(packed), packed),
+                )
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """
+        Fetch uncompressed blob content.
+
+        Args:
+            digest: SHA-256 hex digest
+
+        Returns:
+            Blob bytes or None if not found
+        """
+        cx = self._pool.connection()
+        row = cx.execute("SELECT codec, data FROM blobs WHERE digest=?", (digest,)).fetchone()
+        if not row:
+            return None
+        codec, data = row
+        return decompress(bytes(data), codec)
+
+    def release(self, digests: Iterable[str], commit: bool = True) -> None:
+        """
+        Drop one reference for each digest (blobs are removed by gc()).
+
+        Args:
+            digests: Digests previously returned by put()
+            commit: If False, leave the write in the connection's open transaction
+                (see put())
+        """
+        rows = [(d,) for d in digests]
+        if not rows:
+            return
+        cx = self._pool.connection()
+        with self._transaction(cx, commit):
+            cx.executemany(
+                "UPDATE blobs SET refcount = MAX(refcount - 1, 0) WHERE digest=?",
+                rows,
+            )
+
+    def gc(self) -> int:
+        """
+        Delete unreferenced blobs.
+
+        Returns:
+            Number of blobs removed
+        """
+        cx = self._pool.connection()
+        with cx:
+            cur = cx.execute("DELETE FROM blobs WHERE refcount <= 0")
+        return cur.rowcount
+
+    @staticmethod
+    def _transaction(cx: sqlite3.Connection, commit: bool) -> ContextManager[Any]:
+        """The connection as a commit/rollback context, or a no-op to join the caller's."""
+        return cx if commit else nullcontext()
+
+    def stats(self) -> Dict[str, int]:
+        """Return blob count, logical bytes and stored (compressed) bytes."""
+        row = (
+            self._pool.connection()
+            .execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            )
+            .fetchone()
+        )
+        return {"blobs": row[0], "bytes": row[1], "stored_bytes": row[2]}
+
+
+def _is_small(value: Any, threshold: int) -> bool:
+    """Cheap pre-check that avoids encoding values that cannot reach the threshold."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return True
+    # JSON escapes expand a character to at most 6 bytes (\\uXXXX)
+    return isinstance(value, str) and len(value) * 6 + 2 < threshold
+
+
+def dedup_snapshot(
+    snapshot: Dict[str, Any],
+    blobs: BlobStore,
+    threshold: int = DEFAULT_BLOB_THRESHOLD,
+    commit: bool = True,
+) -> Dict[str, Any]:
+    """
+    Replace large memory values with blob references.
+
+    Args:
+        snapshot: Memory snapshot to store
+        blobs: Blob store receiving large values
+        threshold: Minimum JSON-encoded size (bytes) for a value to be deduplicated
+        commit: Passed to BlobStore.put()
+
+    Returns:
+        Snapshot where large values are {"__blob__": digest} references
+    """
+    out: Dict[str, Any] = {}
+    for k, v in snapshot.items():
+        if _is_small(v, threshold):
+            out[k] = v
+            continue
+        try:
+            raw = json.dumps(v, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        except TypeError:
+            # Not JSON-representable (e.g. bytes under a binary serializer); keep inline
+            out[k] = v
+            continue
+        out[k] = {BLOB_REF: blobs.put(raw, commit=commit)} if len(raw) >= threshold else v
+    return out
+
+
+def _blob_digest(value: Any) -> Optional[str]:
+    """Return the digest if value is a blob reference."""
+    if isinstance(value, dict) and len(value) == 1 and isinstance(value.get(BLOB_REF), str):
+        return str(value[BLOB_REF])
+    return None
+
+
+def referenced_digests(snapshot: Dict[str, Any]) -> List[str]:
+    """List blob digests referenced by a stored snapshot (one entry per reference)."""
+    refs: List[str] = []
+    for v in snapshot.values():
+        digest = _blob_digest(v)
+        if digest:
+            refs.append(digest)
+    return refs
+
+
+def resolve_snapshot(snapshot: Dict[str, Any], blobs: BlobStore) -> Dict[str, Any]:
+    """
+    Replace blob references with their stored values.
+
+    Args:
+        snapshot: Stored snapshot possibly containing blob references
+        blobs: Blob store holding referenced values
+
+    Returns:
+        Fully materialized snapshot
+
+    Raises:
+        KeyError: If a referenced blob is missing
+    """
+    out: Dict[str, Any] = {}
+    cache: Dict[str, Any] = {}
+    missing: Set[str] = set()
+    for k, v in snapshot.items():
+        digest = _blob_digest(v)
+        if digest is None:
+            out[k] = v
+            continue
+        if digest not in cache:
+            raw = blobs.get(digest)
+            if raw is None:
+                missing.add(digest)
+                continue
+            cache[digest] = raw
+        out[k] = json.loads(cache[digest])
+    if missing:
+        raise KeyError(f"Missing checkpoint blobs: {sorted(missing)}")
+    return out
@@ -2,39 +2,284 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from src.core.resume import Checkpoint
 
+from .checkpoint_blobs import BlobStore, dedup_snapshot, referenced_digests, resolve_snapshot
+from .checkpoint_lazy import LazySnapshot
+from .errors import CheckpointCorruptError
+from .metrics import CHECKPOINT_BYTES, CHECKPOINTS
+from .retention import CheckpointInfo
+from .serializers import decode, encode, is_text_format
+from .sqlite_pool import vacuum_incremental
+
+INDEX_FILE = "index.json"
+
+# Plain JSON checkpoints keep the .json extension; binary formats use .ckpt
+CHECKPOINT_EXTS = (".json", ".ckpt")
+
+# Sidecar with the byte span of every memory value in a JSON checkpoint
+OFFSETS_EXT = ".idx"
+
+
+def _safe(name: str) -> str:
+    """Make a key component FS-safe (path separators and ':' become '__')."""
+    for ch in (":", "/", "\\"):
+        name = name.replace(ch, "__")
+    return name or "_"
+
+
+def _order(suffix: str) -> int:
+    """Ordering used by find_last_key: numeric step index, non-numeric keys sort first."""
+    try:
+        return int(suffix)
+    except ValueError:
+        return -1
+
+
+def _atomic_write(path: Path, data: Union[str, bytes]) -> int:
+    """Write data via a temp file in the same directory, rename it into place; return its size."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    payload = data.encode("utf-8") if isinstance(data, str) else data
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        return len(payload)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _encode_with_offsets(data: Dict[str, Any]) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Encode a checkpoint as JSON and record where each memory value lives.
+
+    Returns:
+        Tuple of (file bytes, offsets sidecar); the sidecar holds the file size, the
+        header fields, the span of the timestamp (used to detect a stale sidecar) and
+        {memory key: [start, end]} byte spans
+    """
+    parts: List[bytes] = []
+    pos = 0
+
+    def emit(raw: bytes) -> Tuple[int, int]:
+        nonlocal pos
+        start = pos
+        parts.append(raw)
+        pos += len(raw)
+        return start, pos
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    header = {k: data[k] for k in ("run_id", "step_index", "stage", "timestamp", "extra")}
+    emit(b"{")
+    for name in ("run_id", "step_index", "stage", "extra"):
+        emit(dumps(name) + b": " + dumps(header[name]) + b", ")
+    emit(b'"timestamp": ')
+    ts_span = emit(dumps(header["timestamp"]))
+    emit(b', "memory_snapshot": {')
+    spans: Dict[str, List[int]] = {}
+    for i, (key, value) in enumerate(data["memory_snapshot"].items()):
+        emit((b", " if i else b"") + dumps(key) + b": ")
+        spans[key] = list(emit(dumps(value)))
+    emit(b"}}")
+    offsets = {"size": pos, "timestamp": list(ts_span), "header": header, "keys": spans}
+    return b"".join(parts), offsets
+
+
+def _fsync_dir(path: Path) -> None:
+    """fsync a directory so renames inside it are durable (no-op where unsupported)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened for fsync on Windows
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 class FileCheckpointStore:
-    """Filesystem-based checkpoint store for persistence across runs."""
+    """
+    Filesystem-based checkpoint store for persistence across runs.
 
-    def __init__(self, root: str = "out/checkpoints") -> None:
+    Layout: ``root/<shard>/<run_id>/<suffix>.json`` where the key is
+    ``"<run_id>:<suffix>"`` and ``shard`` is a 2-hex-digit hash prefix of the run id,
+    so no directory grows with the total number of runs. Each run directory holds an
+    ``index.json`` listing its checkpoints and the latest one, which makes
+    find_last_key()/find_key() O(1). Checkpoints and indexes are written atomically
+    (temp file + rename). Checkpoints written by older versions to the flat
+    ``root/<run_id>__<suffix>.json`` layout are still readable.
+
+    Checkpoints are plain JSON by default; binary formats (see serializers) are
+    stored as ``<suffix>.ckpt``. Files in any format are readable regardless of the
+    store's configured serializer.
+
+    JSON checkpoints get a ``<suffix>.idx`` sidecar with the byte span of every
+    memory value, so load_keys()/load_lazy() memory-map the file and decode only the
+    requested values. A missing or stale sidecar falls back to a full load.
+    """
+
+    def __init__(
+        self,
+        root: str = "out/checkpoints",
+        blob_threshold: Optional[int] = None,
+        compression: str = "zlib",
+        serializer: str = "json",
+    ) -> None:
         """
         Initialize filesystem checkpoint store.
 
         Args:
             root: Root directory for checkpoint files
+            blob_threshold: If set, memory values whose JSON size is at least this many
+                bytes are stored once in a content-addressed blob table (root/blobs.db).
+                An existing blob table is used either way, so loads resolve and deletes
+                release the references of deduplicated checkpoints
+            compression: Blob compression codec ("none", "zlib", "lzma")
+            serializer: Checkpoint format, e.g. "json", "pickle+zlib", "msgpack"
+                (see serializers.parse_format)
         """
+        self.serializer = serializer
+        self._ext = ".json" if is_text_format(serializer) else ".ckpt"
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self.blob_threshold = blob_threshold
+        self.blobs: Optional[BlobStore] = None
+        if blob_threshold is not None or (self.root / "blobs.db").exists():
+            self.blobs = BlobStore(str(self.root / "blobs.db"), compression=compression)
+        # Serializes read-modify-write of run indexes (the parallel runner saves from threads)
+        self._index_lock = threading.Lock()
+
+    @staticmethod
+    def _split(key: str) -> Tuple[str, str]:
+        """Split a key into run_id and suffix (step index or stage)."""
+        run_id, sep, suffix = key.rpartition(":")
+        return (run_id, suffix) if sep else (key, "")
+
+    def _run_dir(self, run_id: str) -> Path:
+        """Directory holding all checkpoints of a run."""
+        # Not a security use: the hash only spreads runs over directories, and changing
+        # it would move every existing run directory
+        shard = hashlib.sha1(run_id.encode("utf-8")).hexdigest()[:2]  # noqa: S324
+        return self.root / shard / _safe(run_id)
 
     def _path(self, key: str) -> Path:
         """
-        Convert checkpoint key to filesystem-safe path.
+        Convert checkpoint key to its file path.
 
         Args:
-            key: Checkpoint key (e.g., "run_id:stage")
+            key: Checkpoint key (e.g., "run_id:step_index")
 
         Returns:
             Path to checkpoint file
         """
-        # Make key FS-safe: replace : with __
-        safe = key.replace(":", "__")
-        return self.root / f"{safe}.json"
+        run_id, suffix = self._split(key)
+        return self._run_dir(run_id) / f"{_safe(suffix)}{self._ext}"
+
+    def _legacy_path(self, key: str) -> Path:
+        """Path used by the flat layout of earlier versions."""
+        return self.root / f"{key.replace(':', '__')}.json"
+
+    def _existing_path(self, key: str) -> Optional[Path]:
+        """Path of the stored checkpoint, checking the legacy layout as a fallback."""
+        p = self._path(key)
+        if p.exists():
+            return p
+        for ext in CHECKPOINT_EXTS:
+            other = p.with_suffix(ext)
+            if other.exists():
+                return other
+        legacy = self._legacy_path(key)
+        return legacy if legacy.exists() else None
+
+    def _read_index(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Load a run index (None if missing or unreadable)."""
+        return self._read_index_file(self._run_dir(run_id) / INDEX_FILE)
+
+    @staticmethod
+    def _read_index_file(path: Path) -> Optional[Dict[str, Any]]:
+        """Load an index file (None if missing or unreadable)."""
+        try:
+            data: Dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def _rebuild_index(self, run_id: str) -> Dict[str, Any]:
+        """Recreate a run index from the files in the run directory."""
+        keys: Dict[str, str] = {}
+        run_dir = self._run_dir(run_id)
+        if run_dir.exists():
+            for f in run_dir.iterdir():
+                if f.suffix in CHECKPOINT_EXTS and f.name != INDEX_FILE:
+                    keys[f.stem] = f.name
+        last = max(keys, key=_order) if keys else None
+        return {"run_id": run_id, "keys": keys, "last": last}
+
+    def _update_index(
+        self, run_id: str, added: Sequence[str] = (), removed: Sequence[str] = ()
+    ) -> None:
+        """Record added/removed suffixes in the run index (atomic rewrite)."""
+        with self._index_lock:
+            index = self._read_index(run_id) or self._rebuild_index(run_id)
+            keys: Dict[str, str] = index.setdefault("keys", {})
+            last = index.get("last")
+            for suffix in added:
+                keys[suffix] = f"{_safe(suffix)}{self._ext}"
+                if last is None or _order(suffix) >= _order(last):
+                    last = suffix
+            for suffix in removed:
+                keys.pop(suffix, None)
+            if last not in keys:
+                last = max(keys, key=_order) if keys else None
+            index["last"] = last
+            _atomic_write(self._run_dir(run_id) / INDEX_FILE, json.dumps(index, ensure_ascii=False))
+
+    def _write(self, key: str, checkpoint: Checkpoint) -> Path:
+        """Write one checkpoint file atomically (no index update)."""
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        previous = self._existing_path(key)
+        old_refs = self._stored_refs(previous)
+        data = checkpoint.to_dict()
+        if self.blobs is not None and self.blob_threshold is not None:
+            data["memory_snapshot"] = dedup_snapshot(
+                data["memory_snapshot"], self.blobs, self.blob_threshold
+            )
+
+        sidecar = p.with_suffix(OFFSETS_EXT)
+        if self._ext == ".json":
+            raw, offsets = _encode_with_offsets(data)
+            written = _atomic_write(p, raw) + _atomic_write(sidecar, json.dumps(offsets))
+        else:
+            written = _atomic_write(p, encode(data, self.serializer))
+            if sidecar.exists():
+                sidecar.unlink()
+        CHECKPOINTS.inc(store="fs")
+        CHECKPOINT_BYTES.inc(written, store="fs")
+
+        if self.blobs is not None:
+            # Release references held by the overwritten checkpoint only after the new one landed
+            self.blobs.release(old_refs)
+        if previous is not None and previous != p and previous.parent == p.parent:
+            # Written in another format before; drop the stale copy
+            previous.unlink()
+        return p
 
     def save(self, key: str, checkpoint: Checkpoint) -> None:
         """
@@ -44,8 +289,32 @@ class FileCheckpointStore:
             key: Checkpoint key
             checkpoint: Checkpoint object
         """
-        p = self._path(key)
-        p.write_text(checkpoint.to_json(), encoding="utf-8")
+        self.save_many([(key, checkpoint)], sync=False)
+
+    def save_many(self, items: Sequence[Tuple[str, Checkpoint]], sync: bool = True) -> None:
+        """
+        Save several checkpoints and make them durable together.
+
+        Args:
+            items: (key, checkpoint) pairs; for repeated keys the last one wins
+            sync: If True, fsync the written files and their directories once for the batch
+        """
+        by_run: Dict[str, List[str]] = {}
+        paths = []
+        for key, checkpoint in dict(items).items():
+            paths.append(self._write(key, checkpoint))
+            run_id, suffix = self._split(key)
+            by_run.setdefault(run_id, []).append(suffix)
+        for run_id, suffixes in by_run.items():
+            self._update_index(run_id, added=suffixes)
+
+        if not sync or not paths:
+            return
+        for p in paths:
+            with p.open("rb+") as f:
+                os.fsync(f.fileno())
+        for run_id in by_run:
+            _fsync_dir(self._run_dir(run_id))
 
     def load(self, key: str) -> Optional[Checkpoint]:
         """
@@ -56,15 +325,245 @@ class FileCheckpointStore:
 
         Returns:
             Checkpoint object or None if not found
+
+        Raises:
+            CheckpointCorruptError: If the checkpoint exists but cannot be decoded
         """
-        p = self._path(key)
-        if not p.exists():
+        p = self._existing_path(key)
+        if p is None:
             return None
         try:
-            data = json.loads(p.read_text(encoding="utf-8"))
+            data = decode(p.read_bytes())
+            if self.blobs is not None:
+                data["memory_snapshot"] = resolve_snapshot(data["memory_snapshot"], self.blobs)
             return Checkpoint(**data)
-        except Exception:
+        except Exception as e:
+            raise CheckpointCorruptError(f"Unreadable checkpoint {key} ({p}): {e}") from e
+
+    def _read_offsets(self, p: Path) -> Optional[Dict[str, Any]]:
+        """Load the offsets sidecar of a JSON checkpoint if it matches the file."""
+        if p.suffix != ".json":
+            return None
+        try:
+            offsets: Dict[str, Any] = json.loads(
+                p.with_suffix(OFFSETS_EXT).read_text(encoding="utf-8")
+            )
+            if offsets["size"] != p.stat().st_size:
+                return None
+            start, end = offsets["timestamp"]
+            with p.open("rb") as f:
+                f.seek(start)
+                stamp = f.read(end - start)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # A sidecar left from an earlier write of this key has another timestamp
+        if stamp != json.dumps(offsets["header"]["timestamp"]).encode("utf-8"):
+            return None
+        return offsets
+
+    def load_keys(self, key: str, keys: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        Load only selected memory keys of a checkpoint.
+
+        JSON checkpoints with a valid offsets sidecar are memory-mapped and only the
+        requested values are decoded; other checkpoints are loaded in full.
+
+        Args:
+            key: Checkpoint key
+            keys: Memory keys to return (keys absent from the snapshot are omitted)
+
+        Returns:
+            {memory key: value}, or None if the checkpoint does not exist
+
+        Raises:
+            CheckpointCorruptError: If the checkpoint exists but cannot be decoded
+        """
+        p = self._existing_path(key)
+        if p is None:
+            return None
+        offsets = self._read_offsets(p)
+        if offsets is None:
+            ck = self.load(key)
+            if ck is None:
+                return None
+            return {k: ck.memory_snapshot[k] for k in keys if k in ck.memory_snapshot}
+
+        spans = offsets["keys"]
+        wanted = [k for k in keys if k in spans]
+        values: Dict[str, Any] = {}
+        try:
+            if wanted:
+                with p.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for k in wanted:
+                        start, end = spans[k]
+                        values[k] = json.loads(mm[start:end])
+            if self.blobs is not None:
+                values = resolve_snapshot(values, self.blobs)
+        except Exception as e:
+            raise CheckpointCorruptError(f"Unreadable checkpoint {key} ({p}): {e}") from e
+        return values
+
+    def load_lazy(self, key: str) -> Optional[Checkpoint]:
+        """
+        Load a checkpoint whose memory values are decoded on first access.
+
+        Only the offsets sidecar is read up front; without one this is load().
+
+        Args:
+            key: Checkpoint key
+
+        Returns:
+            Checkpoint with a LazySnapshot memory_snapshot, or None if not found
+        """
+        p = self._existing_path(key)
+        if p is None:
             return None
+        offsets = self._read_offsets(p)
+        if offsets is None:
+            return self.load(key)
+
+        def fetch(keys: Sequence[str]) -> Dict[str, Any]:
+            return self.load_keys(key, keys) or {}
+
+        header = offsets["header"]
+        return Checkpoint(
+            run_id=header["run_id"],
+            step_index=header["step_index"],
+            stage=header["stage"],
+            memory_snapshot=LazySnapshot(offsets["keys"], fetch),  # type: ignore[arg-type]
+            timestamp=header["timestamp"],
+            extra=header["extra"],
+        )
+
+    def delete(self, key: str) -> bool:
+        """
+        Delete a checkpoint and release the blobs it references.
+
+        Args:
+            key: Checkpoint key
+
+        Returns:
+            True if a checkpoint was deleted
+        """
+        p = self._existing_path(key)
+        if p is None:
+            return False
+        refs = self._stored_refs(p)
+        p.unlink()
+        sidecar = p.with_suffix(OFFSETS_EXT)
+        if sidecar.exists():
+            sidecar.unlink()
+        if p.parent != self.root:
+            run_id, suffix = self._split(key)
+            self._update_index(run_id, removed=[suffix])
+        if self.blobs is not None:
+            self.blobs.release(refs)
+        return True
+
+    def _run_keys(self, run_id: str) -> List[str]:
+        """Keys of every checkpoint of a run, in both layouts."""
+        index = self._read_index(run_id) or self._rebuild_index(run_id)
+        keys = [f"{run_id}:{suffix}" for suffix in index.get("keys") or {}]
+        prefix = run_id.replace(":", "__")
+        keys += [p.stem.replace("__", ":") for p in self.root.glob(f"{prefix}__*.json")]
+        return keys
+
+    def list_checkpoints(self) -> List[CheckpointInfo]:
+        """
+        List the headers of every stored checkpoint.
+
+        JSON checkpoints are described from their offsets sidecar; others are loaded.
+        Unreadable checkpoints are listed with error_reason "checkpoint_corrupt" so
+        retention never treats their run as successful.
+
+        Returns:
+            CheckpointInfo per checkpoint
+        """
+        keys: List[str] = []
+        for index_file in self.root.glob(f"*/*/{INDEX_FILE}"):
+            index = self._read_index_file(index_file)
+            if index is not None:
+                keys += [f"{index['run_id']}:{suffix}" for suffix in index.get("keys") or {}]
+        keys += [p.stem.replace("__", ":") for p in self.root.glob("*__*.json")]
+
+        infos: List[CheckpointInfo] = []
+        for key in keys:
+            run_id, suffix = self._split(key)
+            try:
+                ck = self.load_lazy(key)
+            except CheckpointCorruptError:
+                p = self._existing_path(key)
+                mtime = p.stat().st_mtime if p is not None else 0.0
+                infos.append(
+                    CheckpointInfo(
+                        run_id, key, _order(suffix), mtime, {"error_reason": "checkpoint_corrupt"}
+                    )
+                )
+                continue
+            if ck is not None:
+                infos.append(
+                    CheckpointInfo(run_id, key, ck.step_index, ck.timestamp, dict(ck.extra or {}))
+                )
+        return infos
+
+    def delete_run(self, run_id: str) -> int:
+        """
+        Delete every checkpoint of a run and release the blobs they reference.
+
+        Args:
+            run_id: Run to delete
+
+        Returns:
+            Number of checkpoints deleted
+        """
+        paths = [p for p in (self._existing_path(k) for k in self._run_keys(run_id)) if p]
+        refs: List[str] = []
+        for p in paths:
+            refs.extend(self._stored_refs(p))
+        for p in paths:
+            if p.parent == self.root:
+                p.unlink()
+        run_dir = self._run_dir(run_id)
+        if run_dir.exists():
+            shutil.rmtree(run_dir)
+        if self.blobs is not None:
+            self.blobs.release(refs)
+        return len(paths)
+
+    def vacuum(self, max_pages: Optional[int] = None, convert: bool = False) -> int:
+        """
+        Reclaim space in the blob database (no-op without deduplication).
+
+        Args:
+            max_pages: Free at most this many pages (None = all)
+            convert: Switch a blob database created without auto_vacuum=INCREMENTAL
+                over with a one-time full VACUUM
+
+        Returns:
+            Number of pages freed
+        """
+        if self.blobs is None:
+            return 0
+        return vacuum_incremental(self.blobs._pool.connection(), max_pages, convert=convert)
+
+    def gc_blobs(self) -> int:
+        """
+        Delete blobs no longer referenced by any checkpoint.
+
+        Returns:
+            Number of blobs removed (0 when deduplication is disabled)
+        """
+        return self.blobs.gc() if self.blobs is not None else 0
+
+    def _stored_refs(self, p: Optional[Path]) -> List[str]:
+        """Blob digests referenced by the checkpoint file at p (empty if unreadable)."""
+        if self.blobs is None or p is None or not p.exists():
+            return []
+        try:
+            data: Dict[str, Any] = decode(p.read_bytes())
+        except Exception:
+            return []
+        return referenced_digests(data.get("memory_snapshot") or {})
 
     def find_last_key(self, run_id: str) -> Optional[str]:
         """
@@ -76,30 +575,31 @@ class FileCheckpointStore:
         Returns:
             Latest checkpoint key or None if not found
         """
-        # Search for checkpoints matching run_id prefix
-        # Keys are stored as run_id__step_index.json
+        index = self._read_index(run_id)
+        if index is not None:
+            last = index.get("last")
+            if last is None:
+                return None
+            if (self._run_dir(run_id) / index["keys"].get(last, "")).is_file():
+                return f"{run_id}:{last}"
+            # Index points at a file lost in a crash; rebuild it from the run directory
+            index = self._rebuild_index(run_id)
+            return f"{run_id}:{index['last']}" if index["last"] is not None else None
+        if self._run_dir(run_id).exists():
+            index = self._rebuild_index(run_id)
+            if index["last"] is not None:
+                return f"{run_id}:{index['last']}"
+        return self._find_last_legacy_key(run_id)
+
+    def _find_last_legacy_key(self, run_id: str) -> Optional[str]:
+        """Latest key among flat-layout checkpoints written by earlier versions."""
         prefix = run_id.replace(":", "__")
         matches = list(self.root.glob(f"{prefix}__*.json"))
         if not matches:
             return None
-
-        # Extract step_index from each match and find the maximum
-        # Format: run_id__step_index.json -> extract step_index
-        def extract_step_index(path: Path) -> int:
-            stem = path.stem  # e.g., "test_run_123__1"
-            parts = stem.split("__")
-            if len(parts) >= 2:
-                try:
-                    return int(parts[-1])
-                except ValueError:
-                    return -1
-            return -1
-
-        # Sort by step_index (more reliable than mtime)
-        latest = max(matches, key=extract_step_index)
-        # Convert back to key format: run_id:step_index
-        key = latest.stem.replace("__", ":")
-        return key
+        # Format: run_id__step_index.json; sort by step_index (more reliable than mtime)
+        latest = max(matches, key=lambda path: _order(path.stem.split("__")[-1]))
+        return latest.stem.replace("__", ":")
 
     def find_key(self, run_id: str, step_index: int) -> Optional[str]:
         """
@@ -113,5 +613,4 @@ class FileCheckpointStore:
             Checkpoint key if found, None otherwise
         """
         key = f"{run_id}:{step_index}"
-        p = self._path(key)
-        return key if p.exists() else None
+        return key if self._existing_path(key) is not None else None
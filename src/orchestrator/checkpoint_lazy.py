@@ -0,0 +1,104 @@
+"""Lazy, key-selective access to checkpoint memory snapshots."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from src.core.resume import Checkpoint
+
+Fetch = Callable[[Sequence[str]], Dict[str, Any]]
+
+
+class LazySnapshot(Mapping[str, Any]):
+    """
+    Read-only memory snapshot that decodes values on first access.
+
+    Key names are known up front; values are fetched from the store (in batches
+    when possible) and cached, so callers that only touch a few keys never pay
+    for decoding the rest.
+    """
+
+    def __init__(self, keys: Iterable[str], fetch: Fetch) -> None:
+        """
+        Initialize lazy snapshot.
+
+        Args:
+            keys: Memory keys present in the snapshot
+            fetch: Callable returning {key: value} for the requested keys
+        """
+        self._keys: List[str] = list(keys)
+        self._known = set(self._keys)
+        self._fetch = fetch
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._known:
+            raise KeyError(key)
+        if key not in self._values:
+            self.prefetch([key])
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._known
+
+    @property
+    def loaded(self) -> List[str]:
+        """Keys whose values have been decoded so far."""
+        return [k for k in self._keys if k in self._values]
+
+    def prefetch(self, keys: Iterable[str]) -> None:
+        """Decode several keys with a single store round trip."""
+        missing = [k for k in keys if k in self._known and k not in self._values]
+        if missing:
+            self._values.update(self._fetch(missing))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode every value and return a plain dict."""
+        self.prefetch(self._keys)
+        return {k: self._values[k] for k in self._keys}
+
+
+def load_keys(store: Any, key: str, keys: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """
+    Load selected memory keys of a checkpoint from any store.
+
+    Uses the store's load_keys() when it has one and falls back to a full load.
+
+    Args:
+        store: Checkpoint store
+        key: Checkpoint key
+        keys: Memory keys to return (missing keys are omitted)
+
+    Returns:
+        {memory key: value}, or None if the checkpoint does not exist
+    """
+    selective = getattr(store, "load_keys", None)
+    if selective is not None:
+        result: Optional[Dict[str, Any]] = selective(key, keys)
+        return result
+    ck: Optional[Checkpoint] = store.load(key)
+    if ck is None:
+        return None
+    return {k: ck.memory_snapshot[k] for k in keys if k in ck.memory_snapshot}
+
+
+def load_lazy(store: Any, key: str) -> Optional[Checkpoint]:
+    """
+    Load a checkpoint whose memory_snapshot is a LazySnapshot when the store supports it.
+
+    Args:
+        store: Checkpoint store
+        key: Checkpoint key
+
+    Returns:
+        Checkpoint (eager for stores without load_lazy()), or None if not found
+    """
+    lazy = getattr(store, "load_lazy", None)
+    result: Optional[Checkpoint] = lazy(key) if lazy is not None else store.load(key)
+    return result
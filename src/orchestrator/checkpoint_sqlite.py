@@ -5,29 +5,184 @@ from __future__ import annotations
 import json
 import sqlite3
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from src.core.resume import Checkpoint
 
+from .checkpoint_blobs import BlobStore, dedup_snapshot, referenced_digests, resolve_snapshot
+from .checkpoint_lazy import LazySnapshot
+from .metrics import CHECKPOINT_BYTES, CHECKPOINTS
+from .retention import CheckpointInfo
+from .serializers import decode, encode, is_text_format, parse_format
+from .sqlite_pool import SQLiteConnectionPool, vacuum_incremental
+
+# SQL kept as constants so every call reuses the connection's compiled statement
+_UPSERT_SQL = """
+    INSERT INTO checkpoints
+        (run_id, step_index, stage, created_at, memory_json, extra_json, memory_blob)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(run_id, step_index) DO UPDATE SET
+        stage=excluded.stage,
+        created_at=excluded.created_at,
+        memory_json=excluded.memory_json,
+        extra_json=excluded.extra_json,
+        memory_blob=excluded.memory_blob
+"""
+_LOAD_SQL = """
+    SELECT stage, created_at, memory_json, extra_json, memory_blob
+    FROM checkpoints WHERE run_id=? AND step_index=?
+"""
+_LAST_SQL = "SELECT step_index FROM checkpoints WHERE run_id=? ORDER BY step_index DESC LIMIT 1"
+_EXISTS_SQL = "SELECT 1 FROM checkpoints WHERE run_id=? AND step_index=?"
+_MEMORY_SQL = "SELECT memory_json, memory_blob FROM checkpoints WHERE run_id=? AND step_index=?"
+_HEADER_SQL = """
+    SELECT stage, created_at, extra_json, memory_blob IS NOT NULL
+    FROM checkpoints WHERE run_id=? AND step_index=?
+"""
+_KEYS_ALL_SQL = "SELECT run_id, step_index FROM checkpoints"
+_LIST_SQL = "SELECT run_id, step_index, created_at, extra_json FROM checkpoints"
+_RUN_MEMORY_SQL = "SELECT memory_json, memory_blob FROM checkpoints WHERE run_id=?"
+_DELETE_RUN_SQL = "DELETE FROM checkpoints WHERE run_id=?"
+# JSON1: pick values out of memory_json inside SQLite instead of decoding it in Python
+_KEYS_SQL = """
+    SELECT j.key FROM checkpoints c, json_each(c.memory_json) j
+    WHERE c.run_id=? AND c.step_index=?
+"""
+_SELECT_KEYS_SQL = """
+    SELECT j.key, j.value, j.type FROM checkpoints c, json_each(c.memory_json) j
+    WHERE c.run_id=? AND c.step_index=? AND j.key IN (SELECT value FROM json_each(?))
+"""
+
+
+Row = Tuple[str, int, str, int, str, str, Optional[bytes]]
+
+
+def encode_row(run_id: str, step_index: int, checkpoint: Checkpoint, serializer: str) -> Row:
+    """
+    Encode a checkpoint as a row of the checkpoints table.
+
+    Pure function of its inputs, so callers such as the migration tool can encode
+    rows in worker processes and insert them with SQLiteCheckpointStore.save_rows().
+    Blob deduplication is not applied here.
+
+    Args:
+        run_id: Run ID
+        step_index: Step index
+        checkpoint: Checkpoint to encode
+        serializer: Snapshot format (see serializers.parse_format)
+
+    Returns:
+        Row tuple in _UPSERT_SQL column order
+    """
+    # Use checkpoint timestamp if available, otherwise current time
+    created_at_ms = int((checkpoint.timestamp or time.time()) * 1000)
+    snapshot = checkpoint.memory_snapshot
+    if is_text_format(serializer):
+        memory_json, memory_blob = json.dumps(snapshot, ensure_ascii=False), None
+    else:
+        memory_json, memory_blob = "", encode(snapshot, serializer)
+    return (
+        run_id,
+        step_index,
+        checkpoint.stage,
+        created_at_ms,
+        memory_json,
+        json.dumps(checkpoint.extra or {}, ensure_ascii=False),
+        memory_blob,
+    )
+
+
+def _row_bytes(row: Row) -> int:
+    """Payload size of an encoded row (snapshot and extra columns)."""
+    blob = row[6]
+    return len(row[4].encode("utf-8")) + len(row[5].encode("utf-8")) + (len(blob) if blob else 0)
+
+
+def _load_memory(memory_json: str, memory_blob: Optional[bytes]) -> Dict[str, Any]:
+    """Decode a stored snapshot from whichever column holds it."""
+    if memory_blob is not None:
+        snapshot: Dict[str, Any] = decode(bytes(memory_blob))
+    else:
+        snapshot = json.loads(memory_json)
+    return snapshot
+
+
+def _json1_value(value: Any, json_type: str) -> Any:
+    """Convert a json_each() value/type pair back to the Python value."""
+    if json_type in ("object", "array"):
+        return json.loads(value)
+    if json_type == "true":
+        return True
+    if json_type == "false":
+        return False
+    return value
 
-class SQLiteCheckpointStore:
-    """SQLite-based checkpoint store with atomic operations and fast queries."""
 
-    def __init__(self, db_path: str = "out/checkpoints.db") -> None:
+class SQLiteCheckpointStore:
+    """
+    SQLite-based checkpoint store with atomic operations and fast queries.
+
+    Snapshots are stored as JSON text in `memory_json` by default. With a binary
+    serializer they go to the `memory_blob` column instead (memory_json is left
+    empty); `extra_json` is always JSON so it stays queryable.
+
+    load_keys()/load_lazy() extract individual values from JSON snapshots with
+    SQLite's JSON1 functions, so only the requested values reach Python.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "out/checkpoints.db",
+        blob_threshold: Optional[int] = None,
+        compression: str = "zlib",
+        pragmas: Optional[Dict[str, Any]] = None,
+        serializer: str = "json",
+    ) -> None:
         """
         Initialize SQLite checkpoint store.
 
+        Connections are persistent (one per thread) and tuned via PRAGMAs; see
+        sqlite_pool.DEFAULT_PRAGMAS for the defaults.
+
         Args:
             db_path: Path to SQLite database file
+            blob_threshold: If set, memory values whose JSON size is at least this many
+                bytes are stored once in a content-addressed `blobs` table. An existing
+                `blobs` table is used either way, so loads resolve and deletes release
+                the references of deduplicated checkpoints
+            compression: Blob compression codec ("none", "zlib", "lzma")
+            pragmas: PRAGMA overrides (e.g. {"synchronous": "NORMAL"}); checkpoint saves
+                always commit with synchronous=FULL or, for sync=False, OFF
+            serializer: Snapshot format, e.g. "json", "pickle+zlib", "msgpack"
+                (see serializers.parse_format)
         """
+        parse_format(serializer)  # Fail fast on unknown formats
+        self.serializer = serializer
         self.path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._pool = SQLiteConnectionPool(db_path, pragmas=pragmas)
         self._init()
+        self.blob_threshold = blob_threshold
+        self.blobs: Optional[BlobStore] = None
+        if blob_threshold is not None or self._has_blob_table():
+            self.blobs = BlobStore(db_path, compression=compression, pool=self._pool)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._pool.close()
+
+    def _has_blob_table(self) -> bool:
+        """Whether the database holds a blob table (written with deduplication on)."""
+        cx = self._pool.connection()
+        row = cx.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='blobs'")
+        return row.fetchone() is not None
 
     def _init(self) -> None:
         """Initialize database schema."""
-        with sqlite3.connect(self.path) as cx:
+        cx = self._pool.connection()
+        with cx:
             cx.execute("PRAGMA journal_mode=WAL;")
             cx.executescript("""
                 CREATE TABLE IF NOT EXISTS checkpoints (
@@ -37,6 +192,7 @@ class SQLiteCheckpointStore:
                     created_at    INTEGER NOT NULL,
                     memory_json   TEXT NOT NULL,
                     extra_json    TEXT NOT NULL,
+                    memory_blob   BLOB,
                     PRIMARY KEY (run_id, step_index)
                 );
 
@@ -46,7 +202,10 @@ class SQLiteCheckpointStore:
                 CREATE INDEX IF NOT EXISTS idx_checkpoints_stage
                     ON checkpoints (stage);
             """)
-            cx.commit()
+            columns = {row[1] for row in cx.execute("PRAGMA table_info(checkpoints)")}
+            if "memory_blob" not in columns:
+                # Databases created before binary serializers existed
+                cx.execute("ALTER TABLE checkpoints ADD COLUMN memory_blob BLOB")
 
     def save(self, key: str, checkpoint: Checkpoint) -> None:
         """
@@ -56,33 +215,96 @@ class SQLiteCheckpointStore:
             key: Checkpoint key (e.g., "run_id:step_index")
             checkpoint: Checkpoint object
         """
-        run_id, step_index = self._split(key)
-        # Use checkpoint timestamp if available, otherwise current time
-        created_at_ms = int((checkpoint.timestamp or time.time()) * 1000)
-
-        payload = (
-            run_id,
-            step_index,
-            checkpoint.stage,
-            created_at_ms,
-            json.dumps(checkpoint.memory_snapshot, ensure_ascii=False),
-            json.dumps(checkpoint.extra or {}, ensure_ascii=False),
-        )
+        self.save_many([(key, checkpoint)])
 
-        with sqlite3.connect(self.path) as cx:
-            cx.execute(
-                """
-                INSERT INTO checkpoints (run_id, step_index, stage, created_at, memory_json, extra_json)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(run_id, step_index) DO UPDATE SET
-                    stage=excluded.stage,
-                    created_at=excluded.created_at,
-                    memory_json=excluded.memory_json,
-                    extra_json=excluded.extra_json
-            """,
-                payload,
-            )
-            cx.commit()
+    def save_many(self, items: Sequence[Tuple[str, Checkpoint]], sync: bool = True) -> None:
+        """
+        Save several checkpoints in a single transaction (group commit).
+
+        Args:
+            items: (key, checkpoint) pairs; for repeated keys the last one wins
+            sync: If True, commit with PRAGMA synchronous=FULL (fsync); if False, commit
+                without waiting for the OS to flush (PRAGMA synchronous=OFF)
+        """
+        # Collapse repeated keys so blob references are counted once per stored row
+        latest = dict(items)
+        cx = self._pool.connection()
+        # Blob puts, the row upsert and the release of replaced references share the
+        # pooled connection, so they commit (or roll back) as one transaction
+        with self._synchronous(cx, sync), cx:
+            rows: List[Row] = []
+            old_refs: List[str] = []
+            for key, checkpoint in latest.items():
+                run_id, step_index = self._split(key)
+                if self.blobs is not None:
+                    old_refs.extend(self._stored_refs(run_id, step_index))
+                if self.blobs is not None and self.blob_threshold is not None:
+                    checkpoint = Checkpoint(
+                        run_id=checkpoint.run_id,
+                        step_index=checkpoint.step_index,
+                        stage=checkpoint.stage,
+                        memory_snapshot=dedup_snapshot(
+                            checkpoint.memory_snapshot,
+                            self.blobs,
+                            self.blob_threshold,
+                            commit=False,
+                        ),
+                        timestamp=checkpoint.timestamp,
+                        extra=checkpoint.extra,
+                    )
+                rows.append(encode_row(run_id, step_index, checkpoint, self.serializer))
+            self._upsert(cx, rows)
+            if self.blobs is not None:
+                self.blobs.release(old_refs, commit=False)
+
+    def save_rows(self, rows: Sequence[Row], sync: bool = True) -> None:
+        """
+        Insert pre-encoded rows (see encode_row) in a single transaction.
+
+        Args:
+            rows: Rows to upsert
+            sync: If True, commit with PRAGMA synchronous=FULL (fsync) whatever the pool's
+                setting; if False, commit without waiting for the OS to flush
+                (PRAGMA synchronous=OFF)
+        """
+        if not rows:
+            return
+
+        cx = self._pool.connection()
+        with self._synchronous(cx, sync), cx:
+            self._upsert(cx, rows)
+
+    @staticmethod
+    def _upsert(cx: sqlite3.Connection, rows: Sequence[Row]) -> None:
+        """Upsert rows inside the caller's transaction."""
+        if not rows:
+            return
+        CHECKPOINTS.inc(len(rows), store="sqlite")
+        CHECKPOINT_BYTES.inc(sum(_row_bytes(row) for row in rows), store="sqlite")
+        cx.executemany(_UPSERT_SQL, rows)
+
+    @contextmanager
+    def _synchronous(self, cx: sqlite3.Connection, sync: bool) -> Iterator[None]:
+        """Commit with synchronous=FULL (sync) or OFF, restoring the pool's setting after."""
+        level = "FULL" if sync else "OFF"
+        configured = str(self._pool.pragmas["synchronous"]).upper()
+        if level != configured:
+            cx.execute(f"PRAGMA synchronous={level};")
+        try:
+            yield
+        finally:
+            if level != configured:
+                cx.execute(f"PRAGMA synchronous={configured};")
+
+    def keys(self) -> Set[str]:
+        """
+        Return the keys of every stored checkpoint.
+
+        Returns:
+            Set of "run_id:step_index" keys
+        """
+        rows: Iterable[Tuple[str, int]] = self._pool.connection().execute(_KEYS_ALL_SQL)
+        return {f"{run_id}:{step_index}" for run_id, step_index in rows}
 
     def load(self, key: str) -> Optional[Checkpoint]:
         """
@@ -96,29 +318,90 @@ class SQLiteCheckpointStore:
         """
         run_id, step_index = self._split(key)
 
-        with sqlite3.connect(self.path) as cx:
-            row = cx.execute(
-                """
-                SELECT stage, created_at, memory_json, extra_json
-                FROM checkpoints WHERE run_id=? AND step_index=?
-            """,
-                (run_id, step_index),
-            ).fetchone()
+        row = self._pool.connection().execute(_LOAD_SQL, (run_id, step_index)).fetchone()
 
         if not row:
             return None
 
-        stage, created_at, mem_json, extra_json = row
+        stage, created_at, mem_json, extra_json, mem_blob = row
+        snapshot = _load_memory(mem_json, mem_blob)
+        if self.blobs is not None:
+            snapshot = resolve_snapshot(snapshot, self.blobs)
 
         return Checkpoint(
             run_id=run_id,
             step_index=step_index,
             stage=stage,
-            memory_snapshot=json.loads(mem_json),
+            memory_snapshot=snapshot,
             timestamp=created_at / 1000.0,  # Convert ms to seconds
             extra=json.loads(extra_json or "{}"),
         )
 
+    def load_keys(self, key: str, keys: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        Load only selected memory keys of a checkpoint.
+
+        Args:
+            key: Checkpoint key
+            keys: Memory keys to return (keys absent from the snapshot are omitted)
+
+        Returns:
+            {memory key: value}, or None if the checkpoint does not exist
+        """
+        run_id, step_index = self._split(key)
+        cx = self._pool.connection()
+        header = cx.execute(_HEADER_SQL, (run_id, step_index)).fetchone()
+        if not header:
+            return None
+
+        if header[3]:
+            # Binary snapshots are a single encoded value; decode and pick
+            row = cx.execute(_MEMORY_SQL, (run_id, step_index)).fetchone()
+            snapshot = _load_memory(row[0], row[1])
+            values = {k: snapshot[k] for k in keys if k in snapshot}
+        else:
+            rows = cx.execute(
+                _SELECT_KEYS_SQL, (run_id, step_index, json.dumps(list(keys)))
+            ).fetchall()
+            values = {k: _json1_value(v, t) for k, v, t in rows}
+
+        if self.blobs is not None:
+            values = resolve_snapshot(values, self.blobs)
+        return values
+
+    def load_lazy(self, key: str) -> Optional[Checkpoint]:
+        """
+        Load a checkpoint whose memory values are decoded on first access.
+
+        Args:
+            key: Checkpoint key
+
+        Returns:
+            Checkpoint with a LazySnapshot memory_snapshot, or None if not found
+        """
+        run_id, step_index = self._split(key)
+        cx = self._pool.connection()
+        header = cx.execute(_HEADER_SQL, (run_id, step_index)).fetchone()
+        if not header:
+            return None
+        stage, created_at, extra_json, binary = header
+        if binary:
+            return self.load(key)
+
+        names = [r[0] for r in cx.execute(_KEYS_SQL, (run_id, step_index)).fetchall()]
+
+        def fetch(keys: Sequence[str]) -> Dict[str, Any]:
+            return self.load_keys(key, keys) or {}
+
+        return Checkpoint(
+            run_id=run_id,
+            step_index=step_index,
+            stage=stage,
+            memory_snapshot=LazySnapshot(names, fetch),  # type: ignore[arg-type]
+            timestamp=created_at / 1000.0,
+            extra=json.loads(extra_json or "{}"),
+        )
+
     def find_last_key(self, run_id: str) -> Optional[str]:
         """
         Find the latest checkpoint key for a given run_id.
@@ -129,14 +412,7 @@ class SQLiteCheckpointStore:
         Returns:
             Latest checkpoint key or None if not found
         """
-        with sqlite3.connect(self.path) as cx:
-            row = cx.execute(
-                """
-                SELECT step_index FROM checkpoints
-                WHERE run_id=? ORDER BY step_index DESC LIMIT 1
-            """,
-                (run_id,),
-            ).fetchone()
+        row = self._pool.connection().execute(_LAST_SQL, (run_id,)).fetchone()
 
         return f"{run_id}:{row[0]}" if row else None
 
@@ -152,11 +428,8 @@ class SQLiteCheckpointStore:
             Checkpoint key if found, None otherwise
         """
         key = f"{run_id}:{step_index}"
-        with sqlite3.connect(self.path) as cx:
-            exists = cx.execute(
-                "SELECT 1 FROM checkpoints WHERE run_id=? AND step_index=?", (run_id, step_index)
-            ).fetchone()
-            return key if exists else None
+        exists = self._pool.connection().execute(_EXISTS_SQL, (run_id, step_index)).fetchone()
+        return key if exists else None
 
     def find_by_date_range(self, run_id: str, start_ms: int, end_ms: int) -> List[str]:
         """
@@ -170,18 +443,115 @@ class SQLiteCheckpointStore:
         Returns:
             List of checkpoint keys
         """
-        with sqlite3.connect(self.path) as cx:
-            rows = cx.execute(
+        rows = (
+            self._pool.connection()
+            .execute(
                 """
                 SELECT step_index FROM checkpoints
                 WHERE run_id=? AND created_at BETWEEN ? AND ?
                 ORDER BY step_index ASC
             """,
                 (run_id, start_ms, end_ms),
-            ).fetchall()
+            )
+            .fetchall()
+        )
 
         return [f"{run_id}:{r[0]}" for r in rows]
 
+    def delete(self, key: str) -> bool:
+        """
+        Delete a checkpoint and release the blobs it references.
+
+        Args:
+            key: Checkpoint key
+
+        Returns:
+            True if a checkpoint was deleted
+        """
+        run_id, step_index = self._split(key)
+        refs = self._stored_refs(run_id, step_index) if self.blobs is not None else []
+
+        cx = self._pool.connection()
+        with cx:
+            cur = cx.execute(
+                "DELETE FROM checkpoints WHERE run_id=? AND step_index=?", (run_id, step_index)
+            )
+            deleted = cur.rowcount > 0
+            if self.blobs is not None and deleted:
+                self.blobs.release(refs, commit=False)
+        return deleted
+
+    def list_checkpoints(self) -> List[CheckpointInfo]:
+        """
+        List the headers of every stored checkpoint (snapshots are not read).
+
+        Returns:
+            CheckpointInfo per checkpoint
+        """
+        rows = self._pool.connection().execute(_LIST_SQL).fetchall()
+        return [
+            CheckpointInfo(
+                run_id=run_id,
+                key=f"{run_id}:{step_index}",
+                step_index=step_index,
+                timestamp=created_at / 1000.0,
+                extra=json.loads(extra_json or "{}"),
+            )
+            for run_id, step_index, created_at, extra_json in rows
+        ]
+
+    def delete_run(self, run_id: str) -> int:
+        """
+        Delete every checkpoint of a run and release the blobs they reference.
+
+        Args:
+            run_id: Run to delete
+
+        Returns:
+            Number of checkpoints deleted
+        """
+        cx = self._pool.connection()
+        refs: List[str] = []
+        if self.blobs is not None:
+            for mem_json, mem_blob in cx.execute(_RUN_MEMORY_SQL, (run_id,)):
+                refs.extend(referenced_digests(_load_memory(mem_json, mem_blob)))
+        with cx:
+            deleted: int = cx.execute(_DELETE_RUN_SQL, (run_id,)).rowcount
+            if self.blobs is not None and deleted:
+                self.blobs.release(refs, commit=False)
+        return deleted
+
+    def vacuum(self, max_pages: Optional[int] = None, convert: bool = False) -> int:
+        """
+        Return space freed by deletions to the OS (incremental vacuum).
+
+        Args:
+            max_pages: Free at most this many pages (None = all)
+            convert: Switch a database created without auto_vacuum=INCREMENTAL over with
+                a one-time full VACUUM (see sqlite_pool.vacuum_incremental); otherwise
+                such databases are left alone
+
+        Returns:
+            Number of pages freed
+        """
+        return vacuum_incremental(self._pool.connection(), max_pages, convert=convert)
+
+    def gc_blobs(self) -> int:
+        """
+        Delete blobs no longer referenced by any checkpoint.
+
+        Returns:
+            Number of blobs removed (0 when deduplication is disabled)
+        """
+        return self.blobs.gc() if self.blobs is not None else 0
+
+    def _stored_refs(self, run_id: str, step_index: int) -> List[str]:
+        """Blob digests referenced by the stored checkpoint (empty if absent)."""
+        row = self._pool.connection().execute(_MEMORY_SQL, (run_id, step_index)).fetchone()
+        if not row:
+            return []
+        return referenced_digests(_load_memory(row[0], row[1]))
+
     @staticmethod
     def _split(key: str) -> Tuple[str, int]:
         """Split checkpoint key into run_id and step_index."""
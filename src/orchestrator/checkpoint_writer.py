@@ -0,0 +1,179 @@
+"""Background group-commit writer for checkpoint stores."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Literal, Optional, Tuple
+
+from src.core.resume import Checkpoint
+
+from .errors import CheckpointWriteError
+
+logger = logging.getLogger(__name__)
+
+Durability = Literal["none", "batched", "per-step"]
+DURABILITY_LEVELS = ("none", "batched", "per-step")
+
+_STOP = object()
+
+
+class AsyncCheckpointWriter:
+    """
+    Wrap a checkpoint store and take checkpoint writes off the critical path.
+
+    Durability levels:
+    - "per-step": write synchronously; save() returns once the checkpoint is committed
+      and fsynced (SQLite commits with synchronous=FULL)
+    - "batched": serialize on a background thread; every checkpoint queued while a
+      write is in flight is persisted together in one transaction/fsync (group commit)
+    - "none": like "batched" but without fsync (SQLite commits with synchronous=OFF;
+      fastest, may lose the tail on a crash)
+
+    Reads (load, find_last_key, ...) flush pending writes first, so resume sees every
+    checkpoint that was saved before it.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        durability: Durability = "batched",
+        max_batch: int = 64,
+        max_pending: int = 256,
+    ) -> None:
+        """
+        Initialize writer.
+
+        Args:
+            store: Checkpoint store to write to (save_many() is used when available)
+            durability: "none", "batched" or "per-step"
+            max_batch: Max checkpoints persisted in one group commit
+            max_pending: Max queued checkpoints before save() blocks (backpressure)
+        """
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown checkpoint durability: {durability}")
+        self.store = store
+        self.durability = durability
+        self.max_batch = max(1, max_batch)
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, max_pending))
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+        if durability != "per-step":
+            self._thread = threading.Thread(
+                target=self._worker, name="checkpoint-writer", daemon=True
+            )
+            self._thread.start()
+
+    def save(self, key: str, checkpoint: Checkpoint) -> None:
+        """
+        Queue (or, for "per-step", write) a checkpoint.
+
+        Raises:
+            CheckpointWriteError: If an earlier background write failed
+        """
+        self._raise_error()
+        if self._thread is None:
+            self._write([(key, checkpoint)])
+            return
+        self._queue.put((key, checkpoint))
+
+    def flush(self) -> None:
+        """
+        Block until every queued checkpoint is persisted.
+
+        Raises:
+            CheckpointWriteError: If a background write failed
+        """
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flush pending checkpoints and stop the background thread."""
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def load(self, key: str) -> Optional[Checkpoint]:
+        """Flush pending writes, then load from the wrapped store."""
+        self.flush()
+        result: Optional[Checkpoint] = self.store.load(key)
+        return result
+
+    def find_last_key(self, run_id: str) -> Optional[str]:
+        """Flush pending writes, then look up the latest key in the wrapped store."""
+        self.flush()
+        result: Optional[str] = self.store.find_last_key(run_id)
+        return result
+
+    def find_key(self, run_id: str, step_index: int) -> Optional[str]:
+        """Flush pending writes, then look up a key in the wrapped store."""
+        self.flush()
+        result: Optional[str] = self.store.find_key(run_id, step_index)
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate other store methods, flushing first so they observe queued writes."""
+        if name == "store":
+            raise AttributeError(name)
+        attr = getattr(self.store, name)
+        if not callable(attr):
+            return attr
+
+        def _flushed(*args: Any, **kwargs: Any) -> Any:
+            self.flush()
+            return attr(*args, **kwargs)
+
+        return _flushed
+
+    def _write(self, batch: List[Tuple[str, Checkpoint]]) -> None:
+        """Persist a batch through the store's bulk API when it has one."""
+        save_many: Optional[Callable[..., None]] = getattr(self.store, "save_many", None)
+        if save_many is not None:
+            save_many(batch, sync=self.durability != "none")
+            return
+        for key, checkpoint in batch:
+            self.store.save(key, checkpoint)
+
+    def _worker(self) -> None:
+        """Drain the queue, writing everything that piled up as one group commit."""
+        while True:
+            item = self._queue.get()
+            stop = item is _STOP
+            batch: List[Tuple[str, Checkpoint]] = [] if stop else [item]
+            while not stop and len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                else:
+                    batch.append(nxt)
+
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                logger.error(
+                    f"[CHECKPOINT] Background write of {len(batch)} checkpoints failed: {e}"
+                )
+                if self._error is None:
+                    self._error = e
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _raise_error(self) -> None:
+        """Surface (once) the first background write failure."""
+        err, self._error = self._error, None
+        if err is not None:
+            raise CheckpointWriteError(f"Checkpoint write failed: {err}") from err
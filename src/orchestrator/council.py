@@ -8,6 +8,9 @@ from typing import Any, Callable, Dict, List, Literal, Optional
 from src.core.base import BaseAdvisor
 from src.core.types import AdvisorReview, AgentOutput
 
+from .metrics import COUNCIL_DECISIONS, COUNCIL_VOTES
+from .tracing import span as trace_span
+
 DecisionMode = Literal["majority", "average"]
 
 
@@ -26,8 +29,13 @@ class AdvisorCouncil:
         """Review output using multiple advisors and aggregate results."""
         reviews: List[AdvisorReview] = []
         for name in self.advisors:
-            adv = self.advisor_factory(name)
-            reviews.append(adv.review(output=output, task=task, context=context))
+            with trace_span("council.member", "advisor", advisor=name) as traced:
+                adv = self.advisor_factory(name)
+                review = adv.review(output=output, task=task, context=context)
+                passed = review["approved"] and review["score"] >= self.min_score
+                traced.set(score=float(review["score"]), vote="approve" if passed else "reject")
+            COUNCIL_VOTES.inc(advisor=name, vote="approve" if passed else "reject")
+            reviews.append(review)
 
         # Aggregate
         approved_votes = sum(1 for r in reviews if r["approved"] and r["score"] >= self.min_score)
@@ -52,6 +60,8 @@ class AdvisorCouncil:
             avg_score = sum(r["score"] for r in reviews) / max(1, len(reviews))
             approved = approved_votes > (len(reviews) // 2)
 
+        COUNCIL_DECISIONS.inc(mode=self.decision, outcome="approved" if approved else "rejected")
+
         # Flatten issues/suggestions (cap to keep it readable)
         critical = [i for r in reviews for i in r["critical_issues"]][:10]
         suggestions = [s for r in reviews for s in r["suggestions"]][:10]
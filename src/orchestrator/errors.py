@@ -43,3 +43,15 @@ class ExhaustedRetriesError(OrchestratorError):
     """All retry attempts exhausted."""
 
     reason = "exhausted_retries"
+
+
+class CheckpointWriteError(OrchestratorError):
+    """Background checkpoint persistence failed."""
+
+    reason = "checkpoint_write"
+
+
+class CheckpointCorruptError(OrchestratorError):
+    """A stored checkpoint exists but cannot be decoded."""
+
+    reason = "checkpoint_corrupt"
@@ -3,9 +3,30 @@
 from __future__ import annotations
 
 import json
+import logging
+import queue
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import IO, Any, Dict, List, Literal, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+Backpressure = Literal["block", "drop"]
+
+_STOP = object()
+
+
+class EventLog(Protocol):
+    """
+    Sink for structured run events.
+
+    Implementations may buffer; runners call close() (when present) at run end.
+    """
+
+    def emit(self, event: str, **data: Any) -> None:
+        """Record an event."""
+        ...
 
 
 class JsonlEventLog:
@@ -21,6 +42,16 @@ class JsonlEventLog:
         self._p = Path(path)
         self._p.parent.mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def _line(event: str, data: Dict[str, Any]) -> str:
+        """Serialize one event record as a JSONL line."""
+        rec: Dict[str, Any] = {
+            "ts": time.time(),
+            "event": event,
+        }
+        rec.update(data)
+        return json.dumps(rec, ensure_ascii=False) + "\n"
+
     def emit(self, event: str, **data: Any) -> None:
         """
         Emit an event to the log.
@@ -29,10 +60,171 @@ class JsonlEventLog:
             event: Event name (e.g., "step_start", "step_result")
             **data: Additional event data
         """
-        rec: Dict[str, Any] = {
-            "ts": time.time(),
-            "event": event,
-        }
-        rec.update(data)
         with self._p.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.write(self._line(event, data))
+
+
+class BufferedJsonlEventLog(JsonlEventLog):
+    """
+    JSONL event log that batches writes on a background thread.
+
+    emit() serializes the record on the calling thread (so later mutation of the
+    data cannot leak into the log) and queues the line. A single flusher thread
+    keeps the file open and writes queued lines in batches, whenever
+    `max_batch` lines are pending or `flush_interval` seconds have passed, so
+    lines from concurrent emitters never interleave.
+
+    When the queue is full, "block" backpressure makes emit() wait and "drop"
+    discards the event (counted in `dropped`). Call flush() or close() at run end,
+    once concurrent emitters are done; emitting after close() restarts the thread.
+    If the file cannot be opened or written, the failed batch is discarded and the
+    error is raised by the next emit(), flush() or close().
+    """
+
+    def __init__(
+        self,
+        path: str = "out/run_events.jsonl",
+        max_batch: int = 256,
+        flush_interval: float = 0.5,
+        max_queue: int = 10_000,
+        backpressure: Backpressure = "block",
+    ) -> None:
+        """
+        Initialize buffered event log.
+
+        Args:
+            path: Path to JSONL file (will create parent directories)
+            max_batch: Write as soon as this many lines are pending
+            flush_interval: Max seconds a line waits in the buffer
+            max_queue: Max queued lines before backpressure applies
+            backpressure: "block" (emit waits) or "drop" (emit discards the event)
+        """
+        if backpressure not in ("block", "drop"):
+            raise ValueError(f"Unknown backpressure mode: {backpressure}")
+        super().__init__(path)
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.dropped = 0
+        self.max_queue = max(1, max_queue)
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def emit(self, event: str, **data: Any) -> None:
+        """
+        Queue an event for the flusher thread.
+
+        Args:
+            event: Event name (e.g., "step_start", "step_result")
+            **data: Additional event data
+
+        Raises:
+            OSError: If an earlier batch could not be written
+        """
+        self._raise_error()
+        line = self._line(event, data)
+        self._ensure_thread()
+        if self.backpressure == "block":
+            self._queue.put(line)
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def flush(self) -> None:
+        """
+        Block until every event emitted so far is written to the file.
+
+        Raises:
+            OSError: If a batch could not be written
+        """
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            done = threading.Event()
+            self._queue.put(done)  # Control items always block, even in "drop" mode
+            # Never wait on a flusher that died; its error (if any) is raised below
+            while not done.wait(0.1) and thread.is_alive():
+                pass
+        self._raise_error()
+
+    def close(self) -> None:
+        """
+        Write pending events, stop the flusher thread and close the file.
+
+        Raises:
+            OSError: If a batch could not be written
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            q = self._queue
+            # A restarted flusher gets its own queue so it cannot consume this stop
+            self._queue = queue.Queue(maxsize=self.max_queue)
+        if thread is not None:
+            q.put(_STOP)
+            thread.join()
+            if self.dropped:
+                logger.warning(f"[EVENTLOG] Dropped {self.dropped} event(s) under backpressure")
+        self._raise_error()
+
+    def _ensure_thread(self) -> None:
+        """Start the flusher thread on first use."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._worker, args=(self._queue,), name="eventlog-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _worker(self, q: queue.Queue[Any]) -> None:
+        """Collect lines until a size or time threshold, then write them in one call."""
+        f: Optional[IO[str]] = None
+        buffer: List[str] = []
+        deadline: Optional[float] = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = q.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if isinstance(item, str):
+                    buffer.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                    if len(buffer) < self.max_batch:
+                        continue
+
+                # Size or time threshold reached, or a flush/stop request
+                if buffer:
+                    try:
+                        # Opened here so a failure is reported instead of killing the thread
+                        if f is None:
+                            f = self._p.open("a", encoding="utf-8")
+                        f.write("".join(buffer))
+                        f.flush()
+                    except Exception as e:
+                        logger.error(f"[EVENTLOG] Failed to write {len(buffer)} event(s): {e}")
+                        if self._error is None:
+                            self._error = e
+                    buffer.clear()
+                deadline = None
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is _STOP:
+                    return
+        finally:
+            if f is not None:
+                f.close()
+
+    def _raise_error(self) -> None:
+        """Surface (once) the first failed write of the flusher thread."""
+        err, self._error = self._error, None
+        if err is not None:
+            raise err
@@ -0,0 +1,379 @@
+"""SQLite event sink with indexed queries and aggregates over run events."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .sqlite_pool import SQLiteConnectionPool
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        run_id TEXT,
+        stage TEXT,
+        event TEXT NOT NULL,
+        data_json TEXT NOT NULL,
+        source TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_run ON events(run_id, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_stage ON events(stage, event, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_event ON events(event, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_source ON events(source) WHERE source IS NOT NULL",
+    """
+    CREATE TABLE IF NOT EXISTS imported_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        events INTEGER NOT NULL
+    )
+    """,
+]
+
+_INSERT_SQL = (
+    "INSERT INTO events (ts, run_id, stage, event, data_json, source) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_IMPORTED_SQL = "SELECT size, mtime FROM imported_files WHERE path=?"
+_MARK_IMPORTED_SQL = "INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?, ?)"
+_DELETE_SOURCE_SQL = "DELETE FROM events WHERE source=?"
+
+GROUP_COLUMNS = ("run_id", "stage", "event")
+AGGREGATES = ("count", "sum", "avg", "min", "max", "p50", "p90", "p95", "p99")
+
+Row = Tuple[float, Optional[str], Optional[str], str, str, Optional[str]]
+
+
+def _row(rec: Dict[str, Any], source: Optional[str] = None) -> Row:
+    """Map an event record to an events row (the full record is kept as JSON)."""
+    return (
+        float(rec.get("ts") or 0.0),
+        rec.get("run_id"),
+        rec.get("stage"),
+        str(rec.get("event", "")),
+        json.dumps(rec, ensure_ascii=False, default=str),
+        source,
+    )
+
+
+def _open(db_path: str) -> SQLiteConnectionPool:
+    """Open a connection pool on an event database, creating the schema."""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    # Events are telemetry, so they keep the cheaper synchronous=NORMAL
+    pool = SQLiteConnectionPool(db_path, pragmas={"synchronous": "NORMAL"})
+    cx = pool.connection()
+    with cx:
+        for stmt in _SCHEMA:
+            cx.execute(stmt)
+    return pool
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Percentile with linear interpolation between closest ranks.
+
+    Args:
+        values: Sample (need not be sorted)
+        pct: Percentile in [0, 100]
+
+    Returns:
+        Interpolated percentile (nan for an empty sample)
+    """
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100.0
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class SQLiteEventLog:
+    """
+    Event sink writing to an indexed SQLite database instead of JSONL files.
+
+    Events are indexed by run_id, stage, event name and timestamp; the full
+    record is kept in data_json so any field can be aggregated with JSON1.
+    Rows are buffered and inserted with executemany once `max_batch` events are
+    pending or `flush_interval` seconds passed since the last insert (checked on
+    emit); flush()/close() write the rest. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "out/events.db",
+        max_batch: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        """
+        Initialize SQLite event sink.
+
+        Args:
+            db_path: Event database (created with its indexes if missing)
+            max_batch: Insert as soon as this many events are pending
+            flush_interval: Max seconds between inserts while events keep coming
+        """
+        self.path = db_path
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self._pool = _open(db_path)
+        self._lock = threading.Lock()
+        self._pending: List[Row] = []
+        self._last_flush = time.monotonic()
+
+    def emit(self, event: str, **data: Any) -> None:
+        """
+        Record an event.
+
+        Args:
+            event: Event name (e.g., "step_start", "step_end")
+            **data: Additional event data (run_id and stage are indexed)
+        """
+        rec: Dict[str, Any] = {"ts": time.time(), "event": event}
+        rec.update(data)
+        row = _row(rec)
+        with self._lock:
+            self._pending.append(row)
+            due = (
+                len(self._pending) >= self.max_batch
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert every pending event."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return
+            cx = self._pool.connection()
+            with cx:
+                cx.executemany(_INSERT_SQL, rows)
+
+    def close(self) -> None:
+        """Insert pending events and close the database connections."""
+        self.flush()
+        self._pool.close()
+
+
+@dataclass
+class EventQuery:
+    """Filters over the events table; unset fields do not filter."""
+
+    run_id: Optional[str] = None
+    stage: Optional[str] = None
+    event: Optional[str] = None
+    since: Optional[float] = None  # Epoch seconds
+    until: Optional[float] = None
+    last_runs: Optional[int] = None  # Only the N most recently active runs
+
+    def where(self) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause (with its parameters) for these filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column in GROUP_COLUMNS:
+            value = getattr(self, column)
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if self.since is not None:
+            clauses.append("ts >= ?")
+            params.append(self.since)
+        if self.until is not None:
+            clauses.append("ts < ?")
+            params.append(self.until)
+        if self.last_runs is not None:
+            clauses.append(
+                "run_id IN (SELECT run_id FROM events WHERE run_id IS NOT NULL "
+                "GROUP BY run_id ORDER BY MAX(ts) DESC LIMIT ?)"
+            )
+            params.append(self.last_runs)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query_events(
+    db_path: str, query: EventQuery, limit: Optional[int] = 100
+) -> List[Dict[str, Any]]:
+    """
+    Return matching events, newest first.
+
+    Args:
+        db_path: Event database
+        query: Filters
+        limit: Max events returned (None = all)
+
+    Returns:
+        Event records as emitted
+    """
+    where, params = query.where()
+    # The WHERE clause only holds whitelisted columns with bound values
+    sql = f"SELECT data_json FROM events{where} ORDER BY ts DESC, id DESC"  # noqa: S608
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    pool = _open(db_path)
+    try:
+        return [json.loads(data) for (data,) in pool.connection().execute(sql, params)]
+    finally:
+        pool.close()
+
+
+def aggregate_events(
+    db_path: str,
+    query: EventQuery,
+    field: Optional[str] = None,
+    aggregates: Sequence[str] = ("count",),
+    group_by: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate a numeric event field (e.g. duration_ms) over matching events.
+
+    Filtering and grouping run on the indexed columns; only the field values
+    are extracted (with JSON1) and percentiles are computed in Python.
+
+    Args:
+        db_path: Event database
+        query: Filters
+        field: Event field to aggregate (dotted paths reach nested values);
+            None only allows "count"
+        aggregates: Names from AGGREGATES
+        group_by: "run_id", "stage", "event" or None for a single group
+
+    Returns:
+        One dict per group: {group_by: value, "count": n, "<agg>": value, ...}
+
+    Raises:
+        ValueError: On an unknown aggregate or group column, or a value aggregate
+            without a field
+    """
+    unknown = [a for a in aggregates if a not in AGGREGATES]
+    if unknown:
+        raise ValueError(f"Unknown aggregate(s): {', '.join(unknown)}")
+    if group_by is not None and group_by not in GROUP_COLUMNS:
+        raise ValueError(f"Cannot group by {group_by}; use one of {', '.join(GROUP_COLUMNS)}")
+    if field is None and any(a != "count" for a in aggregates):
+        raise ValueError("Aggregates other than count need a field")
+
+    where, params = query.where()
+    group_expr = group_by or "NULL"
+    pool = _open(db_path)
+    try:
+        cx = pool.connection()
+        # Columns come from GROUP_COLUMNS and every value is a bound parameter
+        if field is None:
+            sql = f"SELECT {group_expr}, COUNT(*) FROM events{where} GROUP BY 1 ORDER BY 1"  # noqa: S608
+            return [_group(group_by, g, {"count": n}) for g, n in cx.execute(sql, params)]
+
+        value_expr = "json_extract(data_json, ?)"
+        cond = f"{where} AND" if where else " WHERE"
+        sql = (
+            f"SELECT {group_expr}, {value_expr} AS v FROM events{cond} "  # noqa: S608
+            f"{value_expr} IS NOT NULL ORDER BY 1"
+        )
+        path = f"$.{field}"
+        groups: Dict[Any, List[float]] = {}
+        for g, value in cx.execute(sql, [path, *params, path]):
+            if isinstance(value, (int, float)):
+                groups.setdefault(g, []).append(float(value))
+        return [_group(group_by, g, _summarize(values, aggregates)) for g, values in groups.items()]
+    finally:
+        pool.close()
+
+
+def _summarize(values: List[float], aggregates: Sequence[str]) -> Dict[str, float]:
+    """Compute the requested aggregates over one group's values."""
+    result: Dict[str, float] = {}
+    for name in aggregates:
+        if name == "count":
+            result[name] = len(values)
+        elif name == "sum":
+            result[name] = sum(values)
+        elif name == "avg":
+            result[name] = sum(values) / len(values)
+        elif name == "min":
+            result[name] = min(values)
+        elif name == "max":
+            result[name] = max(values)
+        else:
+            result[name] = percentile(values, float(name[1:]))
+    return result
+
+
+def _group(group_by: Optional[str], value: Any, stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Prefix a group's stats with its key."""
+    return {group_by: value, **stats} if group_by else stats
+
+
+def import_jsonl(db_path: str, paths: Iterable[str], batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Backfill JSONL event logs into an event database.
+
+    Each file is imported in one transaction with batched executemany inserts.
+    Files already imported with the same size and mtime are skipped; a file
+    that changed since (e.g. a run appended events) replaces its earlier rows.
+
+    Args:
+        db_path: Event database
+        paths: JSONL files
+        batch_size: Rows per executemany call
+
+    Returns:
+        Dict with files, events, skipped_files and bad_lines
+    """
+    stats = {"files": 0, "events": 0, "skipped_files": 0, "bad_lines": 0}
+    pool = _open(db_path)
+    try:
+        cx = pool.connection()
+        for path in paths:
+            p = Path(path)
+            source = str(p.resolve())
+            st = p.stat()
+            done = cx.execute(_IMPORTED_SQL, (source,)).fetchone()
+            if done is not None and done[0] == st.st_size and done[1] == st.st_mtime:
+                stats["skipped_files"] += 1
+                continue
+
+            count = 0
+            with cx, p.open(encoding="utf-8") as f:
+                cx.execute(_DELETE_SOURCE_SQL, (source,))
+                batch: List[Row] = []
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        stats["bad_lines"] += 1
+                        continue
+                    if not isinstance(rec, dict):
+                        stats["bad_lines"] += 1
+                        continue
+                    batch.append(_row(rec, source))
+                    if len(batch) >= batch_size:
+                        cx.executemany(_INSERT_SQL, batch)
+                        count += len(batch)
+                        batch.clear()
+                cx.executemany(_INSERT_SQL, batch)
+                count += len(batch)
+                cx.execute(_MARK_IMPORTED_SQL, (source, st.st_size, st.st_mtime, count))
+            stats["files"] += 1
+            stats["events"] += count
+        logger.info(
+            f"[EVENTS] Imported {stats['events']} events from {stats['files']} file(s) "
+            f"({stats['skipped_files']} unchanged)"
+        )
+        return stats
+    finally:
+        pool.close()
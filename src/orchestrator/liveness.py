@@ -0,0 +1,126 @@
+"""Liveness analysis and offloading of stage outputs no later stage reads."""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .subgraph import dependency_map
+from .task_render import referenced_keys
+
+# Marker for a memory value moved to disk: {"__offloaded__": "<path>", "bytes": n}
+OFFLOAD_REF = "__offloaded__"
+
+# Values smaller than this stay in memory (a stub would not be much smaller)
+DEFAULT_OFFLOAD_MIN_BYTES = 256
+
+
+def last_readers(steps: Sequence[Any]) -> Dict[str, int]:
+    """
+    Index of the last step that reads each stage's outputs.
+
+    A stage's `<stage>.*` keys are read by the stage itself (cache key,
+    previous_content), by stages that depend on it, and by stages whose task
+    template references one of its keys. Agents that read context keys beyond
+    these must not be combined with pruning.
+
+    Args:
+        steps: Pipeline steps in execution order
+
+    Returns:
+        Stage name -> index of its last reader
+    """
+    deps = dependency_map(steps)
+    names = set(deps)
+    last: Dict[str, int] = {s.stage: i for i, s in enumerate(steps)}
+    for i, step in enumerate(steps):
+        readers = set(deps[step.stage])
+        for key in referenced_keys(step.task):
+            owner = key.split(".", 1)[0]
+            if "." in key and owner in names:
+                readers.add(owner)
+        for owner in readers:
+            if owner in last:
+                last[owner] = max(last[owner], i)
+    return last
+
+
+def dead_stages(last: Dict[str, int], index: int) -> List[str]:
+    """Stages whose outputs no step after `index` reads."""
+    return [stage for stage, i in last.items() if i <= index]
+
+
+def _is_offloaded(value: Any) -> bool:
+    return isinstance(value, dict) and OFFLOAD_REF in value
+
+
+def offload_stage_keys(
+    memory: Dict[str, Any],
+    stages: Sequence[str],
+    offload_dir: Path,
+    min_bytes: int = DEFAULT_OFFLOAD_MIN_BYTES,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Write dead stage outputs to disk and build stubs to put in their place.
+
+    Args:
+        memory: Current memory snapshot
+        stages: Stages whose `<stage>.*` keys are dead
+        offload_dir: Directory receiving one JSON file per key
+        min_bytes: Only values at least this large (JSON-encoded) are offloaded
+
+    Returns:
+        Tuple of (key -> stub patch for SharedMemory.update, bytes offloaded)
+    """
+    prefixes = tuple(f"{s}." for s in stages)
+    patch: Dict[str, Any] = {}
+    offloaded = 0
+    for key, value in memory.items():
+        if not key.startswith(prefixes) or _is_offloaded(value):
+            continue
+        raw = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(raw.encode("utf-8"))
+        if size < min_bytes:
+            continue
+        offload_dir.mkdir(parents=True, exist_ok=True)
+        path = offload_dir / (re.sub(r"[^\w\-.]+", "_", key) + ".json")
+        path.write_text(raw, encoding="utf-8")
+        patch[key] = {OFFLOAD_REF: str(path), "bytes": size}
+        offloaded += size
+    return patch, offloaded
+
+
+def materialize(memory: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace offload stubs with the values stored on disk.
+
+    Args:
+        memory: Memory snapshot possibly containing stubs
+
+    Returns:
+        New dict with every offloaded value restored
+    """
+    out: Dict[str, Any] = {}
+    for key, value in memory.items():
+        if _is_offloaded(value):
+            out[key] = json.loads(Path(value[OFFLOAD_REF]).read_text(encoding="utf-8"))
+        else:
+            out[key] = value
+    return out
+
+
+def memory_size(memory: Dict[str, Any]) -> int:
+    """Approximate memory footprint in bytes (JSON encoding)."""
+    return len(json.dumps(memory, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def entry_size(key: str, value: Any) -> int:
+    """JSON size of one `"key": value` entry as counted by memory_size()."""
+    return memory_size({key: value}) - 2
+
+
+def total_size(entry_sizes: Dict[str, int]) -> int:
+    """memory_size() of a dict from its entry sizes (adds braces and separators)."""
+    return sum(entry_sizes.values()) + 2 * max(len(entry_sizes), 1)
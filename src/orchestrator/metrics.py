@@ -0,0 +1,464 @@
+"""Prometheus-compatible metrics for orchestrator runs (textfile and HTTP exporters)."""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, cast
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached steps (ms) up to slow LLM calls (minutes)
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+LabelKey = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _Metric:
+    """
+    Base for labelled metrics with per-thread shards.
+
+    Updates go to a dict owned by the calling thread, so the hot path takes no
+    lock (only the first update from a new thread registers its shard). Shards of
+    threads that exited are folded into a base dict when the metric is read, which
+    keeps thread-pool churn from growing memory. Reads are a consistent-enough
+    snapshot: an update racing with a scrape shows up in the next one.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._base: Dict[LabelKey, Any] = {}
+        self._shards: List[Tuple[threading.Thread, Dict[LabelKey, Any]]] = []
+
+    def _shard(self) -> Dict[LabelKey, Any]:
+        """Return the calling thread's shard, registering it on first use."""
+        try:
+            return cast(Dict[LabelKey, Any], self._local.shard)
+        except AttributeError:
+            shard: Dict[LabelKey, Any] = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        """Label values in labelnames order."""
+        try:
+            return tuple(str(labels[n]) for n in self.labelnames)
+        except KeyError as e:
+            raise ValueError(f"{self.name} needs labels {', '.join(self.labelnames)}") from e
+
+    def _merge(self, into: Dict[LabelKey, Any], shard: Dict[LabelKey, Any]) -> None:
+        """Add one shard's values into `into`."""
+        for key, value in shard.copy().items():
+            into[key] = into.get(key, 0.0) + value
+
+    def _totals(self) -> Dict[LabelKey, Any]:
+        """Values per label set, summed over all shards."""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    # The thread can no longer write to its shard
+                    self._merge(self._base, shard)
+            self._shards = live
+            totals: Dict[LabelKey, Any] = {}
+            self._merge(totals, self._base)
+            for _, shard in live:
+                self._merge(totals, shard)
+        return totals
+
+    def samples(self) -> List[Sample]:
+        """Exposition samples as (name, labels, value), sorted by label values."""
+        return [
+            (self.name, dict(zip(self.labelnames, key)), float(value))
+            for key, value in sorted(self._totals().items())
+        ]
+
+    def value(self, **labels: Any) -> float:
+        """Current value for one label set (0 if never updated)."""
+        return float(self._totals().get(self._key(labels), 0.0))
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Value for each label name
+
+        Raises:
+            ValueError: On a negative amount or missing labels
+        """
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} cannot decrease")
+        key = self._key(labels) if self.labelnames else ()
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. steps in flight)."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the gauge by `amount`."""
+        key = self._key(labels) if self.labelnames else ()
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrease the gauge by `amount`."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge (takes the lock; use inc/dec on hot paths)."""
+        key = self._key(labels) if self.labelnames else ()
+        current = self._totals().get(key, 0.0)
+        with self._lock:
+            self._base[key] = self._base.get(key, 0.0) + value - current
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value (e.g. seconds)
+            **labels: Value for each label name
+        """
+        key = self._key(labels) if self.labelnames else ()
+        shard = self._shard()
+        cell = shard.get(key)
+        if cell is None:
+            # Per-bucket (non-cumulative) counts, the +Inf bucket, then the sum
+            cell = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def _merge(self, into: Dict[LabelKey, Any], shard: Dict[LabelKey, Any]) -> None:
+        """Add one shard's bucket counts and sums into `into`."""
+        for key, cell in shard.copy().items():
+            cell = list(cell)
+            total = into.get(key)
+            into[key] = cell if total is None else [a + b for a, b in zip(total, cell)]
+
+    def samples(self) -> List[Sample]:
+        """Cumulative _bucket samples plus _sum and _count per label set."""
+        result: List[Sample] = []
+        bounds = [_fmt(b) for b in self.buckets] + ["+Inf"]
+        for key, cell in sorted(self._totals().items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(bounds, cell):
+                cumulative += count
+                result.append((f"{self.name}_bucket", {**labels, "le": bound}, float(cumulative)))
+            result.append((f"{self.name}_sum", labels, float(cell[-1])))
+            result.append((f"{self.name}_count", labels, float(cumulative)))
+        return result
+
+    def value(self, **labels: Any) -> float:
+        """Number of observations for one label set."""
+        cell = self._totals().get(self._key(labels))
+        return float(sum(cell[:-1])) if cell else 0.0
+
+    def sum(self, **labels: Any) -> float:
+        """Sum of observed values for one label set."""
+        cell = self._totals().get(self._key(labels))
+        return float(cell[-1]) if cell else 0.0
+
+
+def _fmt(value: float) -> str:
+    """Format a sample value or bucket bound in exposition format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in Prometheus text format 0.0.4."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: Type[MetricT], name: str, *args: Any, **kwargs: Any) -> MetricT:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter `name`, creating it if needed."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Return the gauge `name`, creating it if needed."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram `name`, creating it if needed."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Return a registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            doc = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample_name, labels, value in metric.samples():
+                if labels:
+                    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{sample_name}{{{pairs}}} {_fmt(value)}")
+                else:
+                    lines.append(f"{sample_name} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGES = REGISTRY.counter(
+    "orchestrator_stages_total",
+    "Stages executed, by final status (approved, rejected or error)",
+    ["stage", "status"],
+)
+REVIEWS = REGISTRY.counter(
+    "orchestrator_reviews_total", "Advisor reviews per attempt, by outcome", ["stage", "outcome"]
+)
+RETRIES = REGISTRY.counter(
+    "orchestrator_retries_total", "Attempts beyond the first after a rejection", ["stage"]
+)
+TIMEOUTS = REGISTRY.counter("orchestrator_timeouts_total", "Agent calls that timed out", ["stage"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "orchestrator_cache_requests_total",
+    "Agent cache lookups, by result (hit or miss)",
+    ["stage", "result"],
+)
+CHECKPOINT_BYTES = REGISTRY.counter(
+    "orchestrator_checkpoint_bytes_total", "Checkpoint payload bytes written", ["store"]
+)
+CHECKPOINTS = REGISTRY.counter("orchestrator_checkpoints_total", "Checkpoints written", ["store"])
+STAGE_SECONDS = REGISTRY.histogram(
+    "orchestrator_stage_duration_seconds", "Wall time per executed stage", ["stage"]
+)
+STEPS_IN_FLIGHT = REGISTRY.gauge("orchestrator_steps_in_flight", "Steps currently executing")
+COUNCIL_VOTES = REGISTRY.counter(
+    "orchestrator_council_votes_total", "AdvisorCouncil member votes", ["advisor", "vote"]
+)
+COUNCIL_DECISIONS = REGISTRY.counter(
+    "orchestrator_council_decisions_total",
+    "AdvisorCouncil decisions, by mode and outcome",
+    ["mode", "outcome"],
+)
+
+
+class StepTracker:
+    """
+    Context manager recording a step's in-flight count, latency and final status.
+
+    The status defaults to "error" if the block raises; otherwise set `status`
+    to "approved" or "rejected" before leaving the block.
+    """
+
+    __slots__ = ("_start", "stage", "status")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.status = "approved"
+        self._start = 0.0
+
+    def __enter__(self) -> StepTracker:
+        STEPS_IN_FLIGHT.inc()
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        STEPS_IN_FLIGHT.dec()
+        STAGE_SECONDS.observe(perf_counter() - self._start, stage=self.stage)
+        STAGES.inc(stage=self.stage, status="error" if exc_type is not None else self.status)
+
+
+def track_step(stage: str) -> StepTracker:
+    """Track one step execution (see StepTracker)."""
+    return StepTracker(stage)
+
+
+def write_textfile(path: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Write the registry for node_exporter's textfile collector.
+
+    The file is replaced atomically so the collector never reads a partial file;
+    node_exporter only picks up files ending in .prom.
+
+    Args:
+        path: Output file (parent directories are created)
+        registry: Registry to render
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(registry.render())
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class MetricsServer:
+    """
+    Serve GET /metrics from a daemon thread (for long-lived modes such as watch).
+
+    Example:
+        server = MetricsServer(port=9464).start()
+        ...
+        server.stop()
+    """
+
+    def __init__(
+        self, port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY
+    ) -> None:
+        """
+        Initialize metrics server.
+
+        Args:
+            port: TCP port (0 picks a free one, see .port)
+            host: Bind address
+            registry: Registry to expose
+        """
+        self.registry = registry
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Bound TCP port."""
+        return self._httpd.server_address[1]
+
+    def _handler(self) -> type:
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"[METRICS] {self.address_string()} {format % args}")
+
+        return Handler
+
+    def start(self) -> MetricsServer:
+        """Start serving in a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, name="metrics-http", daemon=True
+            )
+            self._thread.start()
+            host = self._httpd.server_address[0]
+            if isinstance(host, bytes):
+                host = host.decode("utf-8")
+            logger.info(f"[METRICS] Serving on http://{host}:{self.port}/metrics")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
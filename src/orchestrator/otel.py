@@ -2,31 +2,103 @@
 
 from __future__ import annotations
 
+import logging
+import warnings
 from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 try:
-    import logging
-    import warnings
-
     from opentelemetry import trace
     from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
     from opentelemetry.sdk.trace import TracerProvider
     from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import (
+        ParentBased,
+        Sampler,
+        SamplingResult,
+        TraceIdRatioBased,
+    )
 
     OPENTELEMETRY_AVAILABLE = True
 except ImportError:
     OPENTELEMETRY_AVAILABLE = False
-    logging = None
-    warnings = None
+
+logger = logging.getLogger(__name__)
 
 _tracer: Optional[Any] = None
+_provider: Optional[Any] = None
+
+if OPENTELEMETRY_AVAILABLE:
+
+    class CategorySampler(Sampler):
+        """
+        Head sampler keeping a ratio of traces per step category.
+
+        Traces are rooted at step spans (see tracing.span), which carry the
+        pipeline category as the "category" attribute; categories without a
+        ratio of their own use the default ratio. The decision is a function of
+        the trace ID, like TraceIdRatioBased.
+        """
+
+        def __init__(self, ratio: float = 1.0, category_ratios: Optional[Dict[str, float]] = None):
+            self._default = TraceIdRatioBased(ratio)
+            self._by_category = {
+                cat: TraceIdRatioBased(r) for cat, r in (category_ratios or {}).items()
+            }
+
+        def should_sample(
+            self,
+            parent_context: Any,
+            trace_id: int,
+            name: str,
+            kind: Any = None,
+            attributes: Any = None,
+            links: Optional[Sequence[Any]] = None,
+            trace_state: Any = None,
+        ) -> SamplingResult:
+            category = (attributes or {}).get("category")
+            sampler = self._default
+            if isinstance(category, str):
+                sampler = self._by_category.get(category, self._default)
+            return sampler.should_sample(
+                parent_context, trace_id, name, kind, attributes, links, trace_state
+            )
+
+        def get_description(self) -> str:
+            ratios = ",".join(f"{cat}={s.rate}" for cat, s in sorted(self._by_category.items()))
+            return f"CategorySampler{{{self._default.rate};{ratios}}}"
+
+
+def make_sampler(ratio: float = 1.0, category_ratios: Optional[Dict[str, float]] = None) -> Any:
+    """
+    Build the head sampler: per-category ratios at trace roots, parent decision below.
+
+    Args:
+        ratio: Fraction of traces kept for categories without their own ratio
+        category_ratios: Category -> fraction of traces kept
+
+    Returns:
+        OpenTelemetry sampler
+
+    Raises:
+        ValueError: If a ratio is outside [0, 1]
+    """
+    for r in [ratio, *(category_ratios or {}).values()]:
+        if not 0.0 <= r <= 1.0:
+            raise ValueError(f"Sampling ratio must be within [0, 1], got {r}")
+    return ParentBased(root=CategorySampler(ratio, category_ratios))
 
 
 def init_otel(
     service_name: str = "multi-agent",
     endpoint: str = "http://localhost:4318/v1/traces",
     fallback_to_console: bool = True,
+    sample_ratio: float = 1.0,
+    category_ratios: Optional[Dict[str, float]] = None,
+    max_queue_size: int = 2048,
+    max_export_batch_size: int = 512,
+    schedule_delay_ms: int = 5000,
+    exporter: Optional[Any] = None,
 ) -> None:
     """
     Initialize OpenTelemetry tracing.
@@ -35,57 +107,93 @@ def init_otel(
         service_name: Service name for traces
         endpoint: OTLP HTTP endpoint URL
         fallback_to_console: If True, fall back to console exporter if OTLP fails
+        sample_ratio: Head sampling ratio for step traces (see make_sampler)
+        category_ratios: Per-category head sampling ratios
+        max_queue_size: Spans buffered by the batch processor before new ones are dropped
+        max_export_batch_size: Spans per export request
+        schedule_delay_ms: Max delay between exports
+        exporter: Span exporter to use instead of OTLP (e.g. an in-memory one in tests)
+
+    Raises:
+        ValueError: If a sampling ratio is outside [0, 1]
     """
     if not OPENTELEMETRY_AVAILABLE:
         return
+    sampler = make_sampler(sample_ratio, category_ratios)
 
     try:
         # Suppress warnings and connection errors
-        if warnings:
-            warnings.filterwarnings("ignore", category=UserWarning)
-            warnings.filterwarnings("ignore", message=".*connection.*", category=Warning)
-
-        if logging:
-            # Suppress urllib3/requests connection errors
-            urllib3_logger = logging.getLogger("urllib3")
-            urllib3_logger.setLevel(logging.CRITICAL)
-            urllib3_logger.disabled = True
-            requests_logger = logging.getLogger("requests")
-            requests_logger.setLevel(logging.CRITICAL)
-            requests_logger.disabled = True
-            otlp_logger = logging.getLogger("opentelemetry.exporter.otlp")
-            otlp_logger.setLevel(logging.CRITICAL)
-            otlp_logger.disabled = True
-            # Suppress OpenTelemetry SDK internal errors
-            otel_logger = logging.getLogger("opentelemetry.sdk")
-            otel_logger.setLevel(logging.CRITICAL)
-            otel_logger.disabled = True
-
-        tp = TracerProvider()
+        warnings.filterwarnings("ignore", category=UserWarning)
+        warnings.filterwarnings("ignore", message=".*connection.*", category=Warning)
+
+        # Suppress urllib3/requests connection errors
+        urllib3_logger = logging.getLogger("urllib3")
+        urllib3_logger.setLevel(logging.CRITICAL)
+        urllib3_logger.disabled = True
+        requests_logger = logging.getLogger("requests")
+        requests_logger.setLevel(logging.CRITICAL)
+        requests_logger.disabled = True
+        otlp_logger = logging.getLogger("opentelemetry.exporter.otlp")
+        otlp_logger.setLevel(logging.CRITICAL)
+        otlp_logger.disabled = True
+        # Suppress OpenTelemetry SDK internal errors
+        otel_logger = logging.getLogger("opentelemetry.sdk")
+        otel_logger.setLevel(logging.CRITICAL)
+        otel_logger.disabled = True
+
+        tp = TracerProvider(sampler=sampler)
+
+        def batch_processor(span_exporter: Any) -> Any:
+            return BatchSpanProcessor(
+                span_exporter,
+                max_queue_size=max_queue_size,
+                schedule_delay_millis=schedule_delay_ms,
+                max_export_batch_size=min(max_export_batch_size, max_queue_size),
+            )
 
         # Try OTLP exporter first, but catch connection errors silently
         try:
-            otlp_exporter = OTLPSpanExporter(endpoint)
+            span_exporter = exporter if exporter is not None else OTLPSpanExporter(endpoint)
             # Use BatchSpanProcessor with error suppression
-            processor = BatchSpanProcessor(otlp_exporter)
-            tp.add_span_processor(processor)
-        except Exception:
+            tp.add_span_processor(batch_processor(span_exporter))
+        except Exception as e:
+            logger.debug(f"[OTEL] OTLP exporter unavailable: {e}")
             # If OTLP fails, fall back to console or no-op
             if fallback_to_console:
                 try:
-                    console_exporter = ConsoleSpanExporter()
-                    tp.add_span_processor(BatchSpanProcessor(console_exporter))
-                except Exception:
+                    tp.add_span_processor(batch_processor(ConsoleSpanExporter()))
+                except Exception as e:
                     # If console also fails, use no-op (no processor)
-                    pass
+                    logger.debug(f"[OTEL] Console exporter unavailable: {e}")
             # Otherwise, use no-op (no processor)
 
-        trace.set_tracer_provider(tp)
-        global _tracer
-        _tracer = trace.get_tracer(service_name)
-    except Exception:
+        global _tracer, _provider
+        if _provider is None:
+            # The global provider can only be set once per process; a provider
+            # replaced by a later call still exports its buffered spans at exit
+            trace.set_tracer_provider(tp)
+        _provider = tp
+        _tracer = tp.get_tracer(service_name)
+    except Exception as e:
         # Fail silently if OTel setup fails completely
-        pass
+        logger.debug(f"[OTEL] Tracing setup failed: {e}")
+
+
+def active_tracer() -> Optional[Any]:
+    """Return the OpenTelemetry tracer set up by init_otel(), if any."""
+    return _tracer
+
+
+def shutdown_otel() -> None:
+    """Export buffered spans and stop tracing."""
+    global _tracer, _provider
+    _tracer = None
+    if _provider is not None:
+        try:
+            _provider.shutdown()
+        except Exception as e:
+            logger.debug(f"[OTEL] Provider shutdown failed: {e}")
+        _provider = None
 
 
 @contextmanager
@@ -110,9 +218,9 @@ def span(name: str, attrs: Optional[Dict[str, Any]] = None):
                 for k, v in attrs.items():
                     try:
                         s.set_attribute(k, str(v))
-                    except Exception:
+                    except Exception as e:
                         # Ignore attribute setting errors
-                        pass
+                        logger.debug(f"[OTEL] Could not set span attribute {k}: {e}")
             yield s
     except Exception:
         # Fail silently if span creation fails
@@ -0,0 +1,134 @@
+"""Per-stage cProfile profiling of agent and advisor calls (--profile)."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import threading
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StageProfiler:
+    """
+    Profile the agent and advisor calls of selected stages with cProfile.
+
+    Each wrapped call runs under its own cProfile.Profile on the thread that
+    executes it (so agent calls on the timeout helper thread and parallel
+    workers are covered). dump() merges a stage's calls across attempts into
+    <out_dir>/<run_id>/profiles/<stage>.prof (open with pstats or snakeviz)
+    and returns the top functions by cumulative time for the run report.
+    Runners only consult the profiler when one is installed, so there is no
+    overhead without --profile.
+
+    Example:
+        profiler = StageProfiler(stages={"implement"})
+        orch.profiler = profiler
+        orch.run(steps)  # history entries of profiled stages get a "profile" key
+    """
+
+    def __init__(
+        self,
+        stages: Optional[Collection[str]] = None,
+        out_dir: str = "out",
+        top_n: int = 15,
+    ) -> None:
+        """
+        Initialize profiler.
+
+        Args:
+            stages: Stages to profile (None profiles every stage)
+            out_dir: Profiles go to <out_dir>/<run_id>/profiles/
+            top_n: Number of functions listed in the summary
+        """
+        self.stages = set(stages) if stages is not None else None
+        self.out_dir = out_dir
+        self.top_n = top_n
+        self._profiles: Dict[str, List[cProfile.Profile]] = {}
+        self._lock = threading.Lock()
+
+    def wants(self, stage: str) -> bool:
+        """Whether calls of this stage are profiled."""
+        return self.stages is None or stage in self.stages
+
+    def wrap(self, stage: str, fn: Callable[..., T]) -> Callable[..., T]:
+        """Wrap fn so each call is profiled and attributed to stage."""
+
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:
+                # Python 3.12+ allows only one active profiler per process
+                # (e.g. concurrent stages of a parallel wave): run unprofiled
+                logger.debug(f"[PROFILE] {stage}: another profiler is active, skipping call")
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.disable()
+                with self._lock:
+                    self._profiles.setdefault(stage, []).append(prof)
+
+        return wrapper
+
+    def dump(self, run_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Write the stage's merged profile and summarize it.
+
+        Args:
+            run_id: Run identifier (selects the output directory)
+            stage: Stage name
+
+        Returns:
+            Dict with path, calls (profiled call count) and top (functions by
+            cumulative time), or None if no call of the stage was profiled
+            (e.g. a cache hit without review)
+        """
+        with self._lock:
+            profiles = self._profiles.pop(stage, [])
+        if not profiles:
+            return None
+
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            stats.add(prof)
+        path = Path(self.out_dir) / run_id / "profiles" / f"{stage}.prof"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(str(path))
+        logger.info(f"[PROFILE] {stage}: wrote {path}")
+        return {"path": str(path), "calls": len(profiles), "top": top_functions(stats, self.top_n)}
+
+
+def top_functions(stats: pstats.Stats, n: int) -> List[Dict[str, Any]]:
+    """
+    Top n functions of a profile by cumulative time.
+
+    Args:
+        stats: Loaded profile statistics
+        n: Number of functions
+
+    Returns:
+        List of dicts with function, ncalls, tottime_ms and cumtime_ms
+    """
+    rows = []
+    entries = stats.stats.items()  # type: ignore[attr-defined]
+    for (filename, lineno, name), (_cc, ncalls, tottime, cumtime, _callers) in entries:
+        if name == "<method 'disable' of '_lsprof.Profiler' objects>":
+            continue
+        where = f"{Path(filename).name}:{lineno}({name})" if filename != "~" else name
+        rows.append(
+            {
+                "function": where,
+                "ncalls": ncalls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:n]
@@ -68,6 +68,33 @@ def build_markdown_report(
             status_line += f"  |  error: `{error_reason}`"
         lines.append(status_line)
 
+        # Resource usage (present when run with --track-resources)
+        res = h.get("resources")
+        if res:
+            lines.append(
+                f"**Resources:** cpu={res['cpu_sec']:.3f}s  |  "
+                f"peak RSS={res['peak_rss_mb']:.1f} MiB (+{res['peak_rss_delta_mb']:.1f})  |  "
+                f"memory written={res['memory_written_bytes']} B"
+            )
+            for alloc in res.get("top_allocations") or []:
+                lines.append(
+                    f"- `{alloc['where']}` +{alloc['size_kb']} KiB ({alloc['count']} blocks)"
+                )
+
+        # Profile summary (present for stages selected with --profile)
+        prof = h.get("profile")
+        if prof:
+            lines.append(f"**Profile:** `{prof['path']}` ({prof['calls']} profiled calls)")
+            lines.append("")
+            lines.append("| cumtime ms | tottime ms | calls | function |")
+            lines.append("|---:|---:|---:|---|")
+            for fn in prof.get("top") or []:
+                lines.append(
+                    f"| {fn['cumtime_ms']:.1f} | {fn['tottime_ms']:.1f} | {fn['ncalls']} "
+                    f"| `{fn['function']}` |"
+                )
+            lines.append("")
+
         # Basic artifact teaser from memory
         arts = mem.get(f"{stage}.artifacts") or []
         if arts:
@@ -0,0 +1,180 @@
+"""Per-step CPU and memory accounting (getrusage, thread_time, tracemalloc)."""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from .liveness import memory_size
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+# ru_maxrss is in kilobytes on Linux but in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_mb() -> float:
+    """Process peak resident set size in MiB (0.0 where getrusage is unavailable)."""
+    if resource is None:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT / 2**20
+
+
+def process_cpu_sec() -> float:
+    """User + system CPU time of the whole process."""
+    return time.process_time()
+
+
+@dataclass
+class ResourceUsage:
+    """Resources used by one step."""
+
+    cpu_sec: float  # CPU of the threads that ran the step (step thread + agent call thread)
+    process_cpu_sec: float  # Whole-process CPU delta (includes concurrent steps and flushers)
+    peak_rss_mb: float  # Process peak RSS after the step
+    peak_rss_delta_mb: float  # How much the step raised the process peak RSS
+    memory_written_bytes: int  # JSON size of the step's shared-memory outputs
+    top_allocations: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rounded dict for history, events and reports."""
+        data = asdict(self)
+        for key in ("cpu_sec", "process_cpu_sec", "peak_rss_mb", "peak_rss_delta_mb"):
+            data[key] = round(data[key], 4)
+        return data
+
+
+class ResourceMeter:
+    """
+    Measure the CPU and memory one step uses.
+
+    CPU is attributed per thread with time.thread_time(): the thread calling
+    start()/stop() plus any callable wrapped with attribute() (e.g. the agent
+    call that run_with_timeout runs on a helper thread). Peak RSS comes from
+    getrusage and is process-wide; its delta shows whether the step pushed the
+    high-water mark up. With tracemalloc_top > 0, snapshots taken at start and
+    stop give the source lines whose allocations grew most; tracemalloc is
+    process-wide too, so concurrent steps in a parallel wave share blame.
+
+    Example:
+        meter = ResourceMeter(tracemalloc_top=5).start()
+        output = run_with_timeout(meter.attribute(call_agent), timeout)
+        usage = meter.stop(memory_written_bytes=1024)
+    """
+
+    def __init__(self, tracemalloc_top: int = 0) -> None:
+        """
+        Initialize meter.
+
+        Args:
+            tracemalloc_top: Report this many top allocation sites (0 = no tracemalloc
+                snapshots; tracing must already be on, see allocation_tracing)
+        """
+        self.tracemalloc_top = tracemalloc_top
+        self._thread_cpu = 0.0
+        self._helper_cpu = 0.0
+        self._process_cpu = 0.0
+        self._peak_rss = 0.0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self) -> ResourceMeter:
+        """Record the starting counters."""
+        if self.tracemalloc_top > 0 and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+        self._peak_rss = peak_rss_mb()
+        self._process_cpu = process_cpu_sec()
+        self._thread_cpu = time.thread_time()
+        return self
+
+    def attribute(self, fn: Callable[[], T]) -> Callable[[], T]:
+        """Wrap fn so the CPU time of the thread running it counts towards this step."""
+
+        def wrapper() -> T:
+            start = time.thread_time()
+            try:
+                return fn()
+            finally:
+                self._helper_cpu += time.thread_time() - start
+
+        return wrapper
+
+    def stop(self, memory_written_bytes: int = 0) -> ResourceUsage:
+        """
+        Compute usage since start().
+
+        Args:
+            memory_written_bytes: Size of what the step wrote to shared memory
+
+        Returns:
+            ResourceUsage for the step
+        """
+        cpu = time.thread_time() - self._thread_cpu + self._helper_cpu
+        process_cpu = process_cpu_sec() - self._process_cpu
+        peak = peak_rss_mb()
+        top: List[Dict[str, Any]] = []
+        if self._snapshot is not None and tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().compare_to(self._snapshot, "lineno")
+            for stat in stats[: self.tracemalloc_top]:
+                if stat.size_diff <= 0:
+                    break
+                frame = stat.traceback[0]
+                top.append(
+                    {
+                        "where": f"{frame.filename}:{frame.lineno}",
+                        "size_kb": round(stat.size_diff / 1024, 1),
+                        "count": stat.count_diff,
+                    }
+                )
+            self._snapshot = None
+        return ResourceUsage(
+            cpu_sec=cpu,
+            process_cpu_sec=process_cpu,
+            peak_rss_mb=peak,
+            peak_rss_delta_mb=max(0.0, peak - self._peak_rss),
+            memory_written_bytes=memory_written_bytes,
+            top_allocations=top,
+        )
+
+
+@contextmanager
+def allocation_tracing(enabled: bool) -> Iterator[None]:
+    """Run the block with tracemalloc on; stop it afterwards only if this call started it."""
+    started = enabled and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def stage_memory_bytes(memory: Dict[str, Any], stage: str) -> int:
+    """JSON size of the shared-memory keys a stage wrote (its `<stage>.*` outputs)."""
+    prefix = f"{stage}."
+    own = {
+        k: v for k, v in memory.items() if k.startswith(prefix) and k != f"{prefix}previous_content"
+    }
+    return memory_size(own) if own else 0
+
+
+def resource_stats(cpu_start: float) -> Dict[str, float]:
+    """
+    Budget stats for resource limits (see budget.enforce_budget).
+
+    Args:
+        cpu_start: process_cpu_sec() at run start
+
+    Returns:
+        Dict with cpu_sec (process CPU since cpu_start) and rss_mb (peak RSS)
+    """
+    return {"cpu_sec": process_cpu_sec() - cpu_start, "rss_mb": peak_rss_mb()}
@@ -0,0 +1,150 @@
+"""Work out which pipeline stages a resumed run can skip."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.resume import Checkpoint
+
+from .checkpoint_lazy import load_lazy
+
+
+def checkpoint_extra(
+    review: Optional[Dict[str, Any]], error_reason: Optional[str], duration_ms: int
+) -> Dict[str, Any]:
+    """
+    Build the checkpoint `extra` payload recorded after a stage.
+
+    Args:
+        review: Final advisor review (None if the stage produced no output)
+        error_reason: Reason code if the stage failed (e.g. "exhausted_retries")
+        duration_ms: Stage wall time in milliseconds
+
+    Returns:
+        Dict with duration_ms, approved, score and error_reason
+    """
+    return {
+        "duration_ms": duration_ms,
+        "approved": bool(review and review.get("approved", False)),
+        "score": float(review["score"]) if review else 0.0,
+        "error_reason": error_reason,
+    }
+
+
+def is_complete(checkpoint: Checkpoint, stage: str) -> bool:
+    """
+    Whether a checkpoint records a finished, approved run of `stage`.
+
+    Checkpoints written before approval was recorded count as complete.
+    """
+    extra = checkpoint.extra or {}
+    return (
+        checkpoint.stage == stage
+        and bool(extra.get("approved", True))
+        and not extra.get("error_reason")
+    )
+
+
+def completed_checkpoints(store: Any, run_id: str, steps: Sequence[Any]) -> Dict[int, Checkpoint]:
+    """
+    Load the checkpoints of completed stages of a previous run.
+
+    Checkpoints are keyed "<run_id>:<step index>"; a checkpoint only counts if it
+    belongs to the stage now at that index (so edited pipelines are re-run).
+    Snapshots are loaded lazily where the store supports it, so deciding what to
+    skip reads only checkpoint headers.
+
+    Args:
+        store: Checkpoint store
+        run_id: Run being resumed
+        steps: Pipeline steps (objects with a `stage` attribute)
+
+    Returns:
+        Step index -> checkpoint for every completed stage
+    """
+    done: Dict[int, Checkpoint] = {}
+    for idx, step in enumerate(steps):
+        ck = load_lazy(store, f"{run_id}:{idx}")
+        if ck is not None and is_complete(ck, step.stage):
+            done[idx] = ck
+    return done
+
+
+def replay_memory(checkpoints: Sequence[Checkpoint]) -> Dict[str, Any]:
+    """
+    Merge the memory snapshots of completed stages; newer values win.
+
+    Snapshots are visited newest first and each key is taken from the newest
+    snapshot holding it, so with lazy snapshots every value is decoded once
+    instead of once per checkpoint.
+
+    Args:
+        checkpoints: Checkpoints of the stages being skipped
+
+    Returns:
+        Memory as it was after the most recent of those stages
+    """
+    memory: Dict[str, Any] = {}
+    for ck in reversed(sorted(checkpoints, key=lambda c: c.timestamp)):
+        snapshot = ck.memory_snapshot
+        missing = [k for k in snapshot if k not in memory]
+        prefetch = getattr(snapshot, "prefetch", None)
+        if prefetch is not None:
+            prefetch(missing)
+        for k in missing:
+            memory[k] = snapshot[k]
+    return memory
+
+
+def resumed_summary(step: Any, checkpoint: Checkpoint) -> Dict[str, Any]:
+    """
+    Rebuild a history entry for a stage skipped on resume.
+
+    Args:
+        step: Pipeline step (stage, agent, advisor, category)
+        checkpoint: Checkpoint recorded when the stage finished
+
+    Returns:
+        Step summary in the runners' history format, marked `resumed`
+    """
+    extra = checkpoint.extra or {}
+    return {
+        "stage": step.stage,
+        "agent": step.agent,
+        "advisor": step.advisor,
+        "category": step.category or "default",
+        "approved": bool(extra.get("approved", True)),
+        "score": float(extra.get("score", 0.0)),
+        "error_reason": extra.get("error_reason"),
+        "resumed": True,
+    }
+
+
+def skippable_stages(steps: Sequence[Any], done: Dict[int, Checkpoint]) -> List[int]:
+    """
+    Completed stages whose dependencies are all skippable too (DAG resume).
+
+    A stage downstream of one that must re-run is re-run as well, since its
+    inputs may change.
+
+    Args:
+        steps: Pipeline steps with `stage` and `depends_on`
+        done: Completed checkpoints from completed_checkpoints()
+
+    Returns:
+        Sorted step indexes that can be skipped
+    """
+    index = {s.stage: i for i, s in enumerate(steps)}
+    memo: Dict[int, bool] = {}
+
+    def ok(i: int, seen: frozenset) -> bool:
+        if i in memo:
+            return memo[i]
+        if i not in done or i in seen:
+            return False
+        deps = getattr(steps[i], "depends_on", None) or []
+        result = all(d in index and ok(index[d], seen | {i}) for d in deps)
+        memo[i] = result
+        return result
+
+    return [i for i in range(len(steps)) if ok(i, frozenset())]
@@ -0,0 +1,273 @@
+"""Retention policies for checkpoint stores, enforced on demand or in the background."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+@dataclass
+class CheckpointInfo:
+    """Header of a stored checkpoint (no memory snapshot)."""
+
+    run_id: str
+    key: str
+    step_index: int
+    timestamp: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Which checkpoints to keep.
+
+    A run is kept if it is among the `keep_last` most recent runs or its latest
+    checkpoint is younger than `max_age_sec`; with neither set every run is kept.
+    `final_only_successful` additionally drops all but the final checkpoint of kept
+    runs whose stages all succeeded (such runs can no longer be partially resumed
+    or used with --inputs-from-run for a single stage).
+    """
+
+    keep_last: Optional[int] = None
+    max_age_sec: Optional[float] = None
+    final_only_successful: bool = False
+
+    @classmethod
+    def parse(cls, spec: str) -> RetentionPolicy:
+        """
+        Parse a spec such as "keep=20,age=7d,final-only".
+
+        Raises:
+            ValueError: If the spec contains an unknown or malformed entry
+        """
+        policy = cls()
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            name, _, value = part.partition("=")
+            if name == "keep":
+                policy.keep_last = int(value)
+            elif name == "age":
+                policy.max_age_sec = parse_duration(value)
+            elif name == "final-only" and not value:
+                policy.final_only_successful = True
+            else:
+                raise ValueError(f"Unknown retention setting: {part}")
+        return policy
+
+    def is_empty(self) -> bool:
+        """True if the policy keeps everything."""
+        return (
+            self.keep_last is None and self.max_age_sec is None and not self.final_only_successful
+        )
+
+
+@dataclass
+class RetentionPlan:
+    """Runs and individual checkpoints selected for deletion."""
+
+    delete_runs: List[str] = field(default_factory=list)
+    delete_keys: List[str] = field(default_factory=list)
+
+
+def parse_duration(value: str) -> float:
+    """Parse "7d", "24h", "30m", "3600s" or plain seconds."""
+    value = value.strip().lower()
+    unit = value[-1:]
+    if unit in _DURATION_UNITS:
+        return float(value[:-1]) * _DURATION_UNITS[unit]
+    return float(value)
+
+
+def run_succeeded(checkpoints: Iterable[CheckpointInfo]) -> bool:
+    """Whether every recorded stage of a run was approved without error."""
+    return all(
+        bool(ck.extra.get("approved", True)) and not ck.extra.get("error_reason")
+        for ck in checkpoints
+    )
+
+
+def plan_retention(
+    checkpoints: Iterable[CheckpointInfo],
+    policy: RetentionPolicy,
+    now: Optional[float] = None,
+    protect: Collection[str] = (),
+) -> RetentionPlan:
+    """
+    Decide what a policy deletes.
+
+    Args:
+        checkpoints: Headers of every stored checkpoint
+        policy: Retention policy
+        now: Reference time (defaults to time.time())
+        protect: Run IDs that are never touched (e.g. the run in progress)
+
+    Returns:
+        RetentionPlan with whole runs and single checkpoints to delete
+    """
+    now = time.time() if now is None else now
+    runs: Dict[str, List[CheckpointInfo]] = {}
+    for ck in checkpoints:
+        runs.setdefault(ck.run_id, []).append(ck)
+
+    newest_first = sorted(runs, key=lambda r: max(c.timestamp for c in runs[r]), reverse=True)
+    plan = RetentionPlan()
+    run_policy = policy.keep_last is not None or policy.max_age_sec is not None
+    for rank, run_id in enumerate(newest_first):
+        if run_id in protect:
+            continue
+        cks = runs[run_id]
+        last = max(c.timestamp for c in cks)
+        keep = not run_policy
+        if policy.keep_last is not None and rank < policy.keep_last:
+            keep = True
+        if policy.max_age_sec is not None and now - last < policy.max_age_sec:
+            keep = True
+        if not keep:
+            plan.delete_runs.append(run_id)
+        elif policy.final_only_successful and len(cks) > 1 and run_succeeded(cks):
+            final = max(cks, key=lambda c: c.step_index)
+            plan.delete_keys.extend(c.key for c in cks if c is not final)
+    return plan
+
+
+def enforce_retention(
+    store: Any,
+    policy: RetentionPolicy,
+    now: Optional[float] = None,
+    protect: Collection[str] = (),
+    max_deletes: Optional[int] = None,
+    vacuum_pages: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Apply a retention policy to a checkpoint store.
+
+    The store must provide list_checkpoints(), delete_run() and delete();
+    gc_blobs() and vacuum() are used when available to reclaim space.
+
+    Args:
+        store: Checkpoint store
+        policy: Retention policy
+        now: Reference time (defaults to time.time())
+        protect: Run IDs that are never touched
+        max_deletes: Stop after deleting about this many checkpoints (incremental
+            enforcement; the rest is picked up by the next call)
+        vacuum_pages: Max pages returned to the OS per call (None = all)
+
+    Returns:
+        Dict with runs_deleted, checkpoints_deleted, blobs_removed and pages_freed
+    """
+    plan = plan_retention(store.list_checkpoints(), policy, now=now, protect=protect)
+    stats = {"runs_deleted": 0, "checkpoints_deleted": 0, "blobs_removed": 0, "pages_freed": 0}
+
+    def budget_left() -> bool:
+        return max_deletes is None or stats["checkpoints_deleted"] < max_deletes
+
+    for run_id in plan.delete_runs:
+        if not budget_left():
+            break
+        stats["checkpoints_deleted"] += store.delete_run(run_id)
+        stats["runs_deleted"] += 1
+    for key in plan.delete_keys:
+        if not budget_left():
+            break
+        if store.delete(key):
+            stats["checkpoints_deleted"] += 1
+
+    gc_blobs = getattr(store, "gc_blobs", None)
+    if gc_blobs is not None and stats["checkpoints_deleted"]:
+        stats["blobs_removed"] = gc_blobs()
+    # Vacuum even without new deletions: earlier bounded calls may have left free pages
+    vacuum = getattr(store, "vacuum", None)
+    if vacuum is not None:
+        stats["pages_freed"] = vacuum(vacuum_pages)
+    return stats
+
+
+class RetentionWorker:
+    """
+    Enforce a retention policy periodically on a background thread.
+
+    Each tick deletes at most `batch` checkpoints and frees at most `vacuum_pages`
+    pages, so cleanup never competes with a running pipeline for long.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        policy: RetentionPolicy,
+        interval: float = 30.0,
+        batch: int = 200,
+        vacuum_pages: Optional[int] = 1000,
+        protect: Collection[str] = (),
+    ) -> None:
+        """
+        Initialize worker.
+
+        Args:
+            store: Checkpoint store
+            policy: Retention policy
+            interval: Seconds between ticks
+            batch: Max checkpoints deleted per tick
+            vacuum_pages: Max SQLite pages freed per tick (None = all)
+            protect: Run IDs that are never touched
+        """
+        self.store = store
+        self.policy = policy
+        self.interval = interval
+        self.batch = batch
+        self.vacuum_pages = vacuum_pages
+        self.protect = set(protect)
+        self.totals: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def tick(self) -> Dict[str, int]:
+        """Run one bounded enforcement pass."""
+        stats = enforce_retention(
+            self.store,
+            self.policy,
+            protect=self.protect,
+            max_deletes=self.batch,
+            vacuum_pages=self.vacuum_pages,
+        )
+        for name, value in stats.items():
+            self.totals[name] = self.totals.get(name, 0) + value
+        if stats["checkpoints_deleted"]:
+            logger.info(
+                f"[RETENTION] Deleted {stats['checkpoints_deleted']} checkpoint(s) "
+                f"({stats['runs_deleted']} run(s)), freed {stats['pages_freed']} page(s)"
+            )
+        return stats
+
+    def start(self) -> None:
+        """Start the background thread (first tick runs immediately)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread after the current tick."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                stats = self.tick()
+            except Exception as e:
+                logger.error(f"[RETENTION] Enforcement failed: {e}")
+                stats = {}
+            # More work pending: continue soon; otherwise wait a full interval
+            busy = stats.get("checkpoints_deleted", 0) >= self.batch
+            self._stop.wait(min(self.interval, 0.1) if busy else self.interval)
@@ -5,8 +5,9 @@ from __future__ import annotations
 import logging
 import time
 import uuid
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence
 
 from src.core.base import BaseAdvisor, BaseFunctionalAgent
 from src.core.memory import SharedMemory
@@ -20,12 +21,31 @@ from .errors import (
     InvalidOutputError,
     TimeoutOrchestratorError,
 )
-from .eventlog import JsonlEventLog
+from .eventlog import BufferedJsonlEventLog, EventLog
 from .hooks import PostStepHook
-from .otel import span
+from .liveness import (
+    dead_stages,
+    entry_size,
+    last_readers,
+    materialize,
+    offload_stage_keys,
+    total_size,
+)
+from .metrics import CACHE_REQUESTS, RETRIES, REVIEWS, TIMEOUTS, track_step
+from .phases import PhaseTimer
+from .profiling import StageProfiler
+from .resources import (
+    ResourceMeter,
+    allocation_tracing,
+    process_cpu_sec,
+    resource_stats,
+)
+from .resume_plan import checkpoint_extra, completed_checkpoints, replay_memory, resumed_summary
 from .seed import seed_for
+from .subgraph import hydrate_inputs
 from .task_render import render_task
 from .timeout import FutureTimeoutError, run_with_timeout
+from .tracing import span as trace_span
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -41,6 +61,7 @@ class PipelineStep:
     task: str  # plain text or templated string using memory keys
     max_retries: int = 1  # advisor-gated retries
     category: Optional[str] = None  # Category for policy threshold lookup
+    depends_on: List[str] = field(default_factory=list)  # Used for partial runs (--only/--from)
 
 
 class Orchestrator:
@@ -74,118 +95,334 @@ class Orchestrator:
         self.run_id = str(uuid.uuid4())
         self.policy: Optional[Any] = None  # Policy from YAML loader
         self.post_step_hooks = list(post_step_hooks or [])
-        self.eventlog = JsonlEventLog(path=f"out/{self.run_id}_events.jsonl")
+        self.eventlog: EventLog = BufferedJsonlEventLog(path=f"out/{self.run_id}_events.jsonl")
         self.cache = AgentCache()
         self.agent_timeout_sec: float = 60.0  # Configurable timeout (can be overridden by policy)
         self.use_cache: bool = True  # Can be disabled via --no-cache flag
         self.start_time: float = time.time()  # Track runtime for budget
+        self.start_cpu: float = process_cpu_sec()  # Track CPU time for budget
         self.budget: Optional[Budget] = None  # Budget from policy
         self.total_artifacts_bytes: int = 0  # Track total artifacts size for budget
+        self.prune_memory: bool = False  # Offload dead stage outputs (--prune-memory)
+        self.offload_dir: str = "out"  # Offloaded values go to <offload_dir>/<run_id>/_memory/
+        self._entry_bytes: Dict[str, int] = {}  # Per-key JSON sizes behind memory_size events
+        self.track_resources: bool = False  # Per-step CPU/RSS accounting (--track-resources)
+        self.tracemalloc_top: int = 0  # Top allocation sites per step (--tracemalloc-top)
+        self.profiler: Optional[StageProfiler] = None  # cProfile selected stages (--profile)
 
     def _render_task(self, template: str, memory: SharedMemory) -> str:
         """Render task template with memory values."""
         return render_task(template, memory.to_dict())
 
-    def run(self, steps: List[PipelineStep]) -> Dict[str, Any]:
-        """Execute pipeline steps with retry logic and checkpointing."""
+    def _flush_checkpoints(self, on_error: bool = False) -> None:
+        """Flush buffered checkpoint writes (no-op for synchronous stores)."""
+        flush = getattr(self.checkpoints, "flush", None)
+        if flush is None:
+            return
+        if not on_error:
+            flush()
+            return
+        try:
+            flush()
+        except Exception as e:
+            # Keep the original failure; a flush error here is secondary
+            logger.error(f"Checkpoint flush failed while handling error: {e}")
+
+    def _close_eventlog(self) -> None:
+        """Write buffered events and stop the event log's flusher thread."""
+        close = getattr(self.eventlog, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Event log close failed: {e}")
+
+    def run(
+        self,
+        steps: List[PipelineStep],
+        resume: bool = False,
+        stages: Optional[Collection[str]] = None,
+        inputs_from_run: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute pipeline steps with retry logic and checkpointing.
+
+        Args:
+            steps: Pipeline steps
+            resume: Skip the leading stages that already completed under self.run_id,
+                replaying their memory from checkpoints, and continue from the first
+                incomplete stage
+            stages: Only execute these stages (see subgraph.select_stages); None runs all
+            inputs_from_run: Hydrate the outputs of upstream, non-selected stages from
+                this run's checkpoints before executing
+
+        Returns:
+            Dict with run_id, history, and memory snapshot
+        """
         history: List[Dict[str, Any]] = []
+        self._entry_bytes = {}
+        selected = set(stages) if stages is not None else {s.stage for s in steps}
+        try:
+            # Inside the try so step_skipped events reach the log even if a replay fails
+            if inputs_from_run:
+                self._replay(hydrate_inputs(self.checkpoints, inputs_from_run, steps, selected))
+                logger.info(f"[SUBGRAPH] Hydrated upstream inputs from run {inputs_from_run}")
+            start = self._resume(steps, history, selected) if resume else 0
+
+            with trace_span("run", "run", run_id=self.run_id, runner="sequential"):
+                with allocation_tracing(self.track_resources and self.tracemalloc_top > 0):
+                    self._run_steps(steps, history, start=start, stages=selected)
+        except BaseException:
+            self._flush_checkpoints(on_error=True)
+            raise
+        finally:
+            self._close_eventlog()
+        self._flush_checkpoints()
 
-        for idx, step in enumerate(steps):
-            stage_start = time.time()
-
-            # Save previous content for diff comparison (before overwriting)
-            prev_content = self.memory.get(f"{step.stage}.content")
-            if prev_content is not None:
-                self.memory.set(f"{step.stage}.previous_content", prev_content)
+        return {
+            "run_id": self.run_id,
+            "history": history,
+            "memory": self._final_memory(),
+        }
 
-            # Set deterministic seed for reproducibility
-            seed_for(self.run_id, step.stage)
+    def _final_memory(self) -> Dict[str, Any]:
+        """Memory snapshot for the run result, with offloaded values restored."""
+        memory = self.memory.to_dict()
+        return materialize(memory) if self.prune_memory else memory
+
+    def _report_memory(self, stage: str, idx: int, last: Dict[str, int]) -> int:
+        """
+        Emit the per-stage memory size, offloading dead outputs if pruning is on.
+
+        Sizes are tracked per key: only the stage's own `<stage>.*` keys and keys
+        not seen before are encoded, not the whole memory.
+
+        Returns:
+            JSON size of the stage's own outputs before offloading, as counted by
+            resources.stage_memory_bytes()
+        """
+        sizes = self._entry_bytes
+        keys = self.memory.keys()
+        prefix = f"{stage}."
+        for key in keys:
+            if key.startswith(prefix) or key not in sizes:
+                sizes[key] = entry_size(key, self.memory.get(key))
+        for key in set(sizes).difference(keys):
+            del sizes[key]
+        carried = f"{prefix}previous_content"
+        written = {k: n for k, n in sizes.items() if k.startswith(prefix) and k != carried}
+
+        pruned: List[str] = []
+        offloaded = 0
+        if self.prune_memory:
+            dead = dead_stages(last, idx)
+            prefixes = tuple(f"{s}." for s in dead)
+            patch, offloaded = offload_stage_keys(
+                {k: self.memory.get(k) for k in keys if k.startswith(prefixes)},
+                dead,
+                Path(self.offload_dir) / self.run_id / "_memory",
+            )
+            if patch:
+                self.memory.update(patch)
+                sizes.update({k: entry_size(k, v) for k, v in patch.items()})
+                pruned = sorted(patch)
+        self.eventlog.emit(
+            "memory_size",
+            run_id=self.run_id,
+            stage=stage,
+            keys=len(sizes),
+            bytes=total_size(sizes),
+            pruned_keys=pruned,
+            offloaded_bytes=offloaded,
+        )
+        return total_size(written) if written else 0
+
+    def _replay(self, memory: Dict[str, Any]) -> None:
+        """Load replayed memory; values already set (e.g. CLI --mem overrides) win."""
+        overrides = self.memory.to_dict()
+        self.memory.update(memory)
+        self.memory.update(overrides)
+
+    def _resume(
+        self, steps: List[PipelineStep], history: List[Dict[str, Any]], selected: Collection[str]
+    ) -> int:
+        """Replay completed stages of self.run_id and return the index to continue from."""
+        done = completed_checkpoints(self.checkpoints, self.run_id, steps)
+        start = 0
+        while start < len(steps) and (start in done or steps[start].stage not in selected):
+            start += 1
+        resumed = [i for i in range(start) if i in done]
+        if not resumed:
+            logger.info(f"[RESUME] No completed stages for run {self.run_id}")
+            return 0
+
+        self._replay(replay_memory([done[i] for i in resumed]))
+        for idx in resumed:
+            history.append(resumed_summary(steps[idx], done[idx]))
+            self.eventlog.emit(
+                "step_skipped", run_id=self.run_id, stage=steps[idx].stage, reason="resumed"
+            )
+        logger.info(
+            f"[RESUME] Skipping {len(resumed)} completed stage(s); continuing at index {start}"
+        )
+        return start
 
-            # Wrap step execution in OpenTelemetry span
-            with span(
+    def _run_steps(
+        self,
+        steps: List[PipelineStep],
+        history: List[Dict[str, Any]],
+        start: int = 0,
+        stages: Optional[Collection[str]] = None,
+    ) -> None:
+        """
+        Execute steps in order from `start`, appending each step summary to history.
+
+        The loop owns per-step bookkeeping around _run_step: the step span, the
+        in-flight/status metrics (a step that raises is counted as status=error)
+        and budget enforcement.
+        """
+        last_readers_map = last_readers(steps)
+        for idx, step in enumerate(steps):
+            if idx < start or (stages is not None and step.stage not in stages):
+                continue
+            with track_step(step.stage) as tracked, trace_span(
+                "step",
                 "step",
-                {
-                    "run_id": self.run_id,
-                    "stage": step.stage,
-                    "agent": step.agent,
-                    "category": step.category or "default",
-                },
-            ):
-                agent = self.agent_factory(step.agent)
-                task = self._render_task(step.task, self.memory)
-
-            self.eventlog.emit(
-                "step_start",
                 run_id=self.run_id,
                 stage=step.stage,
                 agent=step.agent,
-                advisor=step.advisor,
-            )
+                category=step.category or "default",
+            ) as traced:
+                step_summary = self._run_step(idx, step, history, last_readers_map)
+                tracked.status = "approved" if step_summary["approved"] else "rejected"
+                traced.set(status=tracked.status)
 
-            # Apply policy-driven timeouts and retries
-            current_timeout = self.agent_timeout_sec
-            if self.policy and step.category:
-                policy_timeout = getattr(self.policy, "timeouts", {}).get(step.category)
-                if policy_timeout is not None:
-                    current_timeout = float(policy_timeout)
-                    logger.info(
-                        f"[{step.stage}] Using policy timeout {current_timeout:.1f}s "
-                        f"for category '{step.category}'"
-                    )
+            # Enforce budget after each stage
+            if self.budget:
+                stats = {
+                    "stages": len(history),
+                    "artifacts_bytes": self.total_artifacts_bytes,
+                    "runtime_sec": time.time() - self.start_time,
+                    **resource_stats(self.start_cpu),
+                }
+                try:
+                    enforce_budget(self.budget, stats)
+                except BudgetExceededError as e:
+                    logger.error(f"[BUDGET] {e}")
+                    raise
 
-                policy_retries = getattr(self.policy, "retries", {}).get(step.category)
-                if policy_retries is not None and step.max_retries == 0:
-                    step.max_retries = int(policy_retries)
-                    logger.info(
-                        f"[{step.stage}] Using policy retries {step.max_retries} "
-                        f"for category '{step.category}'"
-                    )
+    def _run_step(
+        self,
+        idx: int,
+        step: PipelineStep,
+        history: List[Dict[str, Any]],
+        last_readers_map: Dict[str, int],
+    ) -> Dict[str, Any]:
+        """
+        Execute one step, append its summary to history and return the summary.
+
+        Covers render, cache, agent call with retries and review, memory update,
+        checkpoint, post-step hooks and the step_end event.
+        """
+        stage_start = time.time()
+        timer = PhaseTimer()
+        meter = ResourceMeter(self.tracemalloc_top).start() if self.track_resources else None
+        profiler = self.profiler if self.profiler and self.profiler.wants(step.stage) else None
+
+        # Save previous content for diff comparison (before overwriting)
+        prev_content = self.memory.get(f"{step.stage}.content")
+        if prev_content is not None:
+            self.memory.set(f"{step.stage}.previous_content", prev_content)
+
+        # Set deterministic seed for reproducibility
+        seed_for(self.run_id, step.stage)
+
+        with timer.phase("factory"):
+            agent = self.agent_factory(step.agent)
+        with timer.phase("render"):
+            task = self._render_task(step.task, self.memory)
+
+        self.eventlog.emit(
+            "step_start",
+            run_id=self.run_id,
+            stage=step.stage,
+            agent=step.agent,
+            advisor=step.advisor,
+        )
+
+        # Apply policy-driven timeouts and retries
+        current_timeout = self.agent_timeout_sec
+        if self.policy and step.category:
+            policy_timeout = getattr(self.policy, "timeouts", {}).get(step.category)
+            if policy_timeout is not None:
+                current_timeout = float(policy_timeout)
+                logger.info(
+                    f"[{step.stage}] Using policy timeout {current_timeout:.1f}s "
+                    f"for category '{step.category}'"
+                )
 
-            # Check if council is configured for this category
-            advisor = None
-            if self.policy and step.category:
-                advisor_cfg = getattr(self.policy, "advisors", {}).get(step.category)
-                if advisor_cfg:
-                    from .council import AdvisorCouncil
-
-                    advisor = AdvisorCouncil(
-                        advisor_factory=self.advisor_factory,
-                        advisors=list(advisor_cfg.get("list", [])),
-                        decision=str(advisor_cfg.get("decision", "majority")),
-                        min_score=agent.min_advisor_score,
-                        weights=advisor_cfg.get("weights"),  # Pass weights from policy
-                    )
-                    logger.info(
-                        f"[{step.stage}] Using AdvisorCouncil with {len(advisor_cfg.get('list', []))} advisors "
-                        f"(decision={advisor_cfg.get('decision', 'majority')})"
-                    )
+            policy_retries = getattr(self.policy, "retries", {}).get(step.category)
+            if policy_retries is not None and step.max_retries == 0:
+                step.max_retries = int(policy_retries)
+                logger.info(
+                    f"[{step.stage}] Using policy retries {step.max_retries} "
+                    f"for category '{step.category}'"
+                )
+
+        # Check if council is configured for this category
+        advisor = None
+        advisor_cfg = None
+        if self.policy and step.category:
+            advisor_cfg = getattr(self.policy, "advisors", {}).get(step.category)
+        with timer.phase("factory"):
+            if advisor_cfg:
+                from .council import AdvisorCouncil
+
+                advisor = AdvisorCouncil(
+                    advisor_factory=self.advisor_factory,
+                    advisors=list(advisor_cfg.get("list", [])),
+                    decision=str(advisor_cfg.get("decision", "majority")),
+                    min_score=agent.min_advisor_score,
+                    weights=advisor_cfg.get("weights"),  # Pass weights from policy
+                )
+                logger.info(
+                    f"[{step.stage}] Using AdvisorCouncil with "
+                    f"{len(advisor_cfg.get('list', []))} advisors "
+                    f"(decision={advisor_cfg.get('decision', 'majority')})"
+                )
 
             # Fallback to single advisor if no council configured
             if advisor is None:
                 advisor = self.advisor_factory(step.advisor)
 
-            advisor_name = getattr(advisor, "name", "AdvisorCouncil")
-            logger.info(f"[{step.stage}] Running {agent.describe()} with advisor {advisor_name}")
-
-            attempt = 0
-            latest_output: Optional[AgentOutput] = None
-            latest_review: Optional[Dict[str, Any]] = None
-            error_reason: Optional[str] = None
-
-            # Determine threshold: policy category > agent default
-            threshold = agent.min_advisor_score
-            if self.policy and step.category:
-                policy_threshold = self.policy.score_thresholds.get(step.category)
-                if policy_threshold is not None:
-                    threshold = policy_threshold
-                    logger.info(
-                        f"[{step.stage}] Using policy threshold {threshold:.2f} "
-                        f"for category '{step.category}'"
-                    )
-
-            while attempt <= step.max_retries:
-                attempt += 1
+        advisor_name = getattr(advisor, "name", "AdvisorCouncil")
+        review_fn = advisor.review
+        if profiler is not None:
+            review_fn = profiler.wrap(step.stage, review_fn)
+        logger.info(f"[{step.stage}] Running {agent.describe()} with advisor {advisor_name}")
+
+        attempt = 0
+        latest_output: Optional[AgentOutput] = None
+        latest_review: Optional[Dict[str, Any]] = None
+        error_reason: Optional[str] = None
+
+        # Determine threshold: policy category > agent default
+        threshold = agent.min_advisor_score
+        if self.policy and step.category:
+            policy_threshold = self.policy.score_thresholds.get(step.category)
+            if policy_threshold is not None:
+                threshold = policy_threshold
+                logger.info(
+                    f"[{step.stage}] Using policy threshold {threshold:.2f} "
+                    f"for category '{step.category}'"
+                )
 
+        while attempt <= step.max_retries:
+            attempt += 1
+            if attempt > 1:
+                RETRIES.inc(stage=step.stage)
+            with trace_span("attempt", "attempt", stage=step.stage, attempt=attempt):
                 self.eventlog.emit(
                     "step_attempt",
                     run_id=self.run_id,
@@ -200,19 +437,25 @@ class Orchestrator:
                 # Check cache first (if enabled, include agent version for cache invalidation)
                 agent_version = getattr(agent, "version", "0.1.0")
                 cached = None
+                cache_key = None
                 if self.use_cache:
-                    cached = self.cache.get(
-                        agent.name, step.stage, task, self.memory.to_dict(), agent_version
-                    )
+                    with timer.phase("cache_key"):
+                        cache_key = self.cache.key(
+                            agent.name, step.stage, task, self.memory.to_dict(), agent_version
+                        )
+                    with timer.phase("cache_lookup"):
+                        cached = self.cache.get_by_key(cache_key)
+                    CACHE_REQUESTS.inc(stage=step.stage, result="hit" if cached else "miss")
                 if cached:
                     # Hydrate memory from cache
-                    self.memory.update(
-                        {
-                            f"{step.stage}.content": cached["content"],
-                            f"{step.stage}.artifacts": cached.get("artifacts", []),
-                            f"{step.stage}.metadata": cached.get("metadata", {}),
-                        }
-                    )
+                    with timer.phase("memory_update"):
+                        self.memory.update(
+                            {
+                                f"{step.stage}.content": cached["content"],
+                                f"{step.stage}.artifacts": cached.get("artifacts", []),
+                                f"{step.stage}.metadata": cached.get("metadata", {}),
+                            }
+                        )
                     # Reconstruct AgentOutput from cache for validation
                     from src.core.types import AgentMetadata, Artifact
 
@@ -233,25 +476,30 @@ class Orchestrator:
                 else:
                     # Run agent with timeout
                     def _agent_call() -> AgentOutput:
-                        return agent.process(task=task, context=self.memory.to_dict())
+                        with trace_span("agent.process", "agent", stage=step.stage):
+                            return agent.process(task=task, context=self.memory.to_dict())
+
+                    call = _agent_call
+                    if profiler is not None:
+                        call = profiler.wrap(step.stage, call)
+                    if meter is not None:
+                        call = meter.attribute(call)
 
                     try:
-                        output = run_with_timeout(_agent_call, current_timeout)
-                        agent.validate_output(output)
+                        with timer.phase("agent_call"):
+                            output = run_with_timeout(call, current_timeout)
+                        with timer.phase("validation"):
+                            agent.validate_output(output)
                         current_output = output
                         latest_output = output
 
-                        # Cache the result (include agent version)
-                        self.cache.put(
-                            agent.name,
-                            step.stage,
-                            task,
-                            self.memory.to_dict(),
-                            output.to_dict(),
-                            agent_version,
-                        )
+                        # Cache the result (memory is unchanged since the key was computed)
+                        if cache_key is not None:
+                            with timer.phase("cache_store"):
+                                self.cache.put_by_key(cache_key, output.to_dict())
                     except FutureTimeoutError as e:
                         logger.error(f"[{step.stage}] Agent timeout after {current_timeout}s")
+                        TIMEOUTS.inc(stage=step.stage)
                         error_reason = TimeoutOrchestratorError.reason
                         self.eventlog.emit(
                             "error",
@@ -274,12 +522,17 @@ class Orchestrator:
                         raise InvalidOutputError(str(e)) from e
 
                 # Always use current_output (works for both cache and fresh execution)
-                review = advisor.review(
-                    output=current_output, task=task, context=self.memory.to_dict()
-                )
+                with timer.phase("review"):
+                    with trace_span("advisor.review", "advisor", advisor=advisor_name) as traced:
+                        review = review_fn(
+                            output=current_output, task=task, context=self.memory.to_dict()
+                        )
+                        traced.set(score=float(review["score"]))
+                    approved = advisor.gate(review, threshold)
+                REVIEWS.inc(stage=step.stage, outcome="approved" if approved else "rejected")
                 latest_review = review
 
-                if advisor.gate(review, threshold):
+                if approved:
                     logger.info(
                         f"[{step.stage}] Approved: score={review['score']:.2f} "
                         f"(threshold={threshold:.2f})"
@@ -311,24 +564,30 @@ class Orchestrator:
                         break
 
                     # Minimal refine loop: inject suggestions/issues back into memory
-                    self.memory.update(
-                        {
-                            f"{step.stage}.last_review": review,
-                            f"{step.stage}.last_output": output.to_dict(),
-                        }
-                    )
+                    with timer.phase("memory_update"):
+                        self.memory.update(
+                            {
+                                f"{step.stage}.last_review": review,
+                                f"{step.stage}.last_output": output.to_dict(),
+                            }
+                        )
 
-            # Persist memory and checkpoint after the step
-            if latest_output:
+        # Persist memory and checkpoint after the step
+        if latest_output:
+            with timer.phase("memory_update"):
                 self.memory.update(
                     {
                         f"{step.stage}.content": latest_output.content,
-                        f"{step.stage}.artifacts": [a.to_dict() for a in latest_output.artifacts],
+                        f"{step.stage}.artifacts": [
+                            a.to_dict() for a in latest_output.artifacts
+                        ],
                         f"{step.stage}.metadata": latest_output.metadata.to_dict(),
                         f"{step.stage}.review": latest_review,
                     }
                 )
 
+        duration_ms = int((time.time() - stage_start) * 1000)
+        with timer.phase("checkpoint_save"):
             self.checkpoints.save(
                 key=f"{self.run_id}:{idx}",
                 checkpoint=Checkpoint(
@@ -336,52 +595,58 @@ class Orchestrator:
                     step_index=idx,
                     stage=step.stage,
                     memory_snapshot=self.memory.to_dict(),
-                    extra={"duration_ms": int((time.time() - stage_start) * 1000)},
+                    extra=checkpoint_extra(latest_review, error_reason, duration_ms),
                 ),
             )
 
-            step_summary = {
-                "stage": step.stage,
-                "agent": step.agent,
-                "advisor": step.advisor,
-                "category": step.category or "default",
-                "approved": bool(latest_review and latest_review.get("approved", False)),
-                "score": float(latest_review["score"]) if latest_review else 0.0,
-                "error_reason": error_reason,
-            }
-            history.append(step_summary)
-
-            # Call post-step hooks
+        step_summary = {
+            "stage": step.stage,
+            "agent": step.agent,
+            "advisor": step.advisor,
+            "category": step.category or "default",
+            "approved": bool(latest_review and latest_review.get("approved", False)),
+            "score": float(latest_review["score"]) if latest_review else 0.0,
+            "error_reason": error_reason,
+            "duration_ms": duration_ms,
+        }
+        history.append(step_summary)
+
+        # Call post-step hooks
+        with timer.phase("hooks"):
             for hook in self.post_step_hooks:
                 hook(step_result=step_summary, shared_memory=self.memory)
 
-            # Enforce budget after each stage
-            if self.budget:
-                # Calculate artifacts size for this stage and accumulate
-                if latest_output:
-                    for artifact in latest_output.artifacts:
-                        # Estimate size (rough approximation)
-                        self.total_artifacts_bytes += len(artifact.name.encode("utf-8"))
-                        if hasattr(artifact, "content") and artifact.content:
-                            data = artifact.content
-                            if isinstance(data, bytes):
-                                self.total_artifacts_bytes += len(data)
-                            else:
-                                self.total_artifacts_bytes += len(str(data).encode("utf-8"))
-
-                stats = {
-                    "stages": len(history),
-                    "artifacts_bytes": self.total_artifacts_bytes,
-                    "runtime_sec": time.time() - self.start_time,
-                }
-                try:
-                    enforce_budget(self.budget, stats)
-                except BudgetExceededError as e:
-                    logger.error(f"[BUDGET] {e}")
-                    raise
-
-        return {
-            "run_id": self.run_id,
-            "history": history,
-            "memory": self.memory.to_dict(),
-        }
+        step_summary["phases_ms"] = timer.ms()
+        written_bytes = self._report_memory(step.stage, idx, last_readers_map)
+        if profiler is not None:
+            step_summary["profile"] = profiler.dump(self.run_id, step.stage)
+        if meter is not None:
+            usage = meter.stop(written_bytes)
+            step_summary["resources"] = usage.to_dict()
+        self.eventlog.emit(
+            "step_end",
+            run_id=self.run_id,
+            stage=step.stage,
+            agent=step.agent,
+            attempts=attempt,
+            approved=step_summary["approved"],
+            score=step_summary["score"],
+            error_reason=error_reason,
+            duration_ms=duration_ms,
+            phases_ms=step_summary["phases_ms"],
+            resources=step_summary.get("resources"),
+        )
+
+        # Accumulate artifact sizes for the budget
+        if self.budget and latest_output:
+            for artifact in latest_output.artifacts:
+                # Estimate size (rough approximation)
+                self.total_artifacts_bytes += len(artifact.name.encode("utf-8"))
+                if hasattr(artifact, "content") and artifact.content:
+                    data = artifact.content
+                    if isinstance(data, bytes):
+                        self.total_artifacts_bytes += len(data)
+                    else:
+                        self.total_artifacts_bytes += len(str(data).encode("utf-8"))
+
+        return step_summary
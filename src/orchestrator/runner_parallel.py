@@ -2,19 +2,34 @@
 
 from __future__ import annotations
 
+import contextvars
 import logging
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence, Set
 
 from src.core.base import BaseAdvisor, BaseFunctionalAgent
 from src.core.memory import SharedMemory
 from src.core.resume import Checkpoint, CheckpointStore
 from src.core.types import AgentOutput
 
+from .eventlog import BufferedJsonlEventLog, EventLog
 from .hooks import PostStepHook
+from .metrics import RETRIES, REVIEWS, track_step
+from .phases import PhaseTimer
+from .profiling import StageProfiler
+from .resources import ResourceMeter, allocation_tracing, stage_memory_bytes
+from .resume_plan import (
+    checkpoint_extra,
+    completed_checkpoints,
+    replay_memory,
+    resumed_summary,
+    skippable_stages,
+)
+from .subgraph import hydrate_inputs
+from .tracing import span as trace_span
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -68,6 +83,10 @@ class OrchestratorParallel:
         self.max_workers = max_workers
         self.score_thresholds = score_thresholds or {}
         self.post_step_hooks = list(post_step_hooks or [])
+        self.eventlog: EventLog = BufferedJsonlEventLog(path=f"out/{self.run_id}_events.jsonl")
+        self.track_resources: bool = False  # Per-step CPU/RSS accounting (--track-resources)
+        self.tracemalloc_top: int = 0  # Top allocation sites per step (--tracemalloc-top)
+        self.profiler: Optional[StageProfiler] = None  # cProfile selected stages (--profile)
 
     def _render_task(self, template: str) -> str:
         """Render task template with memory values."""
@@ -81,12 +100,61 @@ class OrchestratorParallel:
 
         return task
 
-    def _exec_step(self, step: PipelineStep) -> Dict[str, Any]:
-        """Execute a single pipeline step."""
-        stage_start = time.time()
+    def _flush_checkpoints(self, on_error: bool = False) -> None:
+        """Flush buffered checkpoint writes (no-op for synchronous stores)."""
+        flush = getattr(self.checkpoints, "flush", None)
+        if flush is None:
+            return
+        if not on_error:
+            flush()
+            return
+        try:
+            flush()
+        except Exception as e:
+            # Keep the original failure; a flush error here is secondary
+            logger.error(f"Checkpoint flush failed while handling error: {e}")
+
+    def _close_eventlog(self) -> None:
+        """Write buffered events and stop the event log's flusher thread."""
+        close = getattr(self.eventlog, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Event log close failed: {e}")
+
+    def _exec_tracked(self, step: PipelineStep, idx: int) -> Dict[str, Any]:
+        """Execute a step, recording its status, latency and in-flight count in metrics."""
+        with track_step(step.stage) as tracked, trace_span(
+            "step",
+            "step",
+            run_id=self.run_id,
+            stage=step.stage,
+            agent=step.agent,
+            category=step.category or "default",
+        ) as traced:
+            summary = self._exec_step(step, idx)
+            tracked.status = "approved" if summary["approved"] else "rejected"
+            traced.set(status=tracked.status)
+        return summary
 
-        agent = self.agent_factory(step.agent)
-        advisor = self.advisor_factory(step.advisor)
+    def _exec_step(self, step: PipelineStep, idx: int) -> Dict[str, Any]:
+        """Execute a single pipeline step (idx is its position in the pipeline)."""
+        stage_start = time.time()
+        timer = PhaseTimer()
+        # Steps run on their own worker thread, so thread CPU time is theirs alone
+        meter = ResourceMeter(self.tracemalloc_top).start() if self.track_resources else None
+        profiler = self.profiler if self.profiler and self.profiler.wants(step.stage) else None
+
+        with timer.phase("factory"):
+            agent = self.agent_factory(step.agent)
+            advisor = self.advisor_factory(step.advisor)
+        process_fn = agent.process
+        review_fn = advisor.review
+        if profiler is not None:
+            process_fn = profiler.wrap(step.stage, process_fn)
+            review_fn = profiler.wrap(step.stage, review_fn)
 
         # Category-aware threshold override
         if step.category and step.category in self.score_thresholds:
@@ -96,7 +164,15 @@ class OrchestratorParallel:
                 f"(category={step.category})"
             )
 
-        task = self._render_task(step.task)
+        with timer.phase("render"):
+            task = self._render_task(step.task)
+        self.eventlog.emit(
+            "step_start",
+            run_id=self.run_id,
+            stage=step.stage,
+            agent=step.agent,
+            advisor=step.advisor,
+        )
 
         attempt = 0
         latest_output: Optional[AgentOutput] = None
@@ -104,55 +180,79 @@ class OrchestratorParallel:
 
         while attempt <= step.max_retries:
             attempt += 1
-
-            output = agent.process(task=task, context=self.memory.to_dict())
-            agent.validate_output(output)
-            latest_output = output
-
-            review = advisor.review(output=output, task=task, context=self.memory.to_dict())
-            latest_review = review
-
-            if advisor.gate(review, agent.min_advisor_score):
-                logger.info(f"[{step.stage}] Approved score={review['score']:.2f}")
-                break
-
-            logger.warning(
-                f"[{step.stage}] Rejected {attempt}/{step.max_retries+1} "
-                f"score={review['score']:.2f}"
-            )
-            if attempt > step.max_retries:
-                break
-
-            # Feed back suggestions/issues into memory
-            self.memory.update(
-                {
-                    f"{step.stage}.last_review": review,
-                    f"{step.stage}.last_output": output.to_dict(),
-                }
-            )
+            if attempt > 1:
+                RETRIES.inc(stage=step.stage)
+            with trace_span("attempt", "attempt", stage=step.stage, attempt=attempt):
+                self.eventlog.emit(
+                    "step_attempt",
+                    run_id=self.run_id,
+                    stage=step.stage,
+                    attempt=attempt,
+                    max_retries=step.max_retries,
+                )
+
+                with timer.phase("agent_call"):
+                    with trace_span("agent.process", "agent", stage=step.stage):
+                        output = process_fn(task=task, context=self.memory.to_dict())
+                with timer.phase("validation"):
+                    agent.validate_output(output)
+                latest_output = output
+
+                with timer.phase("review"):
+                    with trace_span("advisor.review", "advisor", advisor=step.advisor) as traced:
+                        review = review_fn(
+                            output=output, task=task, context=self.memory.to_dict()
+                        )
+                        traced.set(score=float(review["score"]))
+                    approved = advisor.gate(review, agent.min_advisor_score)
+                REVIEWS.inc(stage=step.stage, outcome="approved" if approved else "rejected")
+                latest_review = review
+
+                if approved:
+                    logger.info(f"[{step.stage}] Approved score={review['score']:.2f}")
+                    break
+
+                logger.warning(
+                    f"[{step.stage}] Rejected {attempt}/{step.max_retries+1} "
+                    f"score={review['score']:.2f}"
+                )
+                if attempt > step.max_retries:
+                    break
+
+                # Feed back suggestions/issues into memory
+                with timer.phase("memory_update"):
+                    self.memory.update(
+                        {
+                            f"{step.stage}.last_review": review,
+                            f"{step.stage}.last_output": output.to_dict(),
+                        }
+                    )
 
         # Persist outcome
         if latest_output:
-            self.memory.update(
-                {
-                    f"{step.stage}.content": latest_output.content,
-                    f"{step.stage}.artifacts": [a.to_dict() for a in latest_output.artifacts],
-                    f"{step.stage}.metadata": latest_output.metadata.to_dict(),
-                    f"{step.stage}.review": latest_review,
-                }
+            with timer.phase("memory_update"):
+                self.memory.update(
+                    {
+                        f"{step.stage}.content": latest_output.content,
+                        f"{step.stage}.artifacts": [a.to_dict() for a in latest_output.artifacts],
+                        f"{step.stage}.metadata": latest_output.metadata.to_dict(),
+                        f"{step.stage}.review": latest_review,
+                    }
+                )
+
+        duration_ms = int((time.time() - stage_start) * 1000)
+        with timer.phase("checkpoint_save"):
+            self.checkpoints.save(
+                key=f"{self.run_id}:{idx}",
+                checkpoint=Checkpoint(
+                    run_id=self.run_id,
+                    step_index=idx,
+                    stage=step.stage,
+                    memory_snapshot=self.memory.to_dict(),
+                    extra=checkpoint_extra(latest_review, None, duration_ms),
+                ),
             )
 
-        self.checkpoints.save(
-            key=f"{self.run_id}:{step.stage}",
-            checkpoint=Checkpoint(
-                run_id=self.run_id,
-                step_index=-1,
-                stage=step.stage,
-                memory_snapshot=self.memory.to_dict(),
-                extra={"duration_ms": int((time.time() - stage_start) * 1000)},
-            ),
-        )
-
         summary = {
             "stage": step.stage,
             "agent": step.agent,
@@ -160,20 +260,79 @@ class OrchestratorParallel:
             "approved": bool(latest_review and latest_review.get("approved", False)),
             "score": float(latest_review["score"]) if latest_review else 0.0,
             "category": step.category or "default",
+            "duration_ms": duration_ms,
         }
 
         # Hooks run **after** checkpoint: safe to mutate memory for downstream waves
-        for hook in self.post_step_hooks:
-            hook(step_result=summary, shared_memory=self.memory)
-
+        with timer.phase("hooks"):
+            for hook in self.post_step_hooks:
+                hook(step_result=summary, shared_memory=self.memory)
+
+        summary["phases_ms"] = timer.ms()
+        if profiler is not None:
+            summary["profile"] = profiler.dump(self.run_id, step.stage)
+        if meter is not None:
+            usage = meter.stop(stage_memory_bytes(self.memory.to_dict(), step.stage))
+            summary["resources"] = usage.to_dict()
+        self.eventlog.emit(
+            "step_end",
+            run_id=self.run_id,
+            stage=step.stage,
+            agent=step.agent,
+            attempts=attempt,
+            approved=summary["approved"],
+            score=summary["score"],
+            error_reason=None,
+            duration_ms=duration_ms,
+            phases_ms=summary["phases_ms"],
+            resources=summary.get("resources"),
+        )
         return summary
 
-    def run_waves(self, steps: List[PipelineStep]) -> Dict[str, Any]:
+    def _replay(self, memory: Dict[str, Any]) -> None:
+        """Load replayed memory; values already set (e.g. CLI --mem overrides) win."""
+        overrides = self.memory.to_dict()
+        self.memory.update(memory)
+        self.memory.update(overrides)
+
+    def _resume(self, steps: List[PipelineStep], history: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Replay completed stages of self.run_id and return their names.
+
+        A completed stage is only skipped if all of its dependencies are skipped too.
+        """
+        done = completed_checkpoints(self.checkpoints, self.run_id, steps)
+        skip = skippable_stages(steps, done)
+        if not skip:
+            logger.info(f"[RESUME] No completed stages for run {self.run_id}")
+            return set()
+
+        self._replay(replay_memory([done[i] for i in skip]))
+        for i in skip:
+            history.append(resumed_summary(steps[i], done[i]))
+            self.eventlog.emit(
+                "step_skipped", run_id=self.run_id, stage=steps[i].stage, reason="resumed"
+            )
+        logger.info(f"[RESUME] Skipping {len(skip)} completed stage(s)")
+        return {steps[i].stage for i in skip}
+
+    def run_waves(
+        self,
+        steps: List[PipelineStep],
+        resume: bool = False,
+        stages: Optional[Collection[str]] = None,
+        inputs_from_run: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Execute pipeline steps in dependency waves (parallel within wave).
 
         Args:
             steps: List of pipeline steps with dependencies
+            resume: Skip stages that already completed under self.run_id (replaying
+                their memory from checkpoints) and run only the rest
+            stages: Only execute these stages (see subgraph.select_stages); None runs all
+            inputs_from_run: Hydrate the outputs of upstream, non-selected stages from
+                this run's checkpoints before executing
 
         Returns:
             Dict with run_id, history, and memory snapshot
@@ -181,41 +340,81 @@ class OrchestratorParallel:
         Raises:
             RuntimeError: If cyclic or unsatisfied dependencies detected
         """
-        # Build dependency graph
-        by_name = {s.stage: s for s in steps}
-        indeg: Dict[str, int] = {s.stage: 0 for s in steps}
-        edges: Dict[str, List[str]] = {s.stage: [] for s in steps}
-
-        for s in steps:
-            for d in s.depends_on or []:
-                indeg[s.stage] += 1
-                edges.setdefault(d, []).append(s.stage)
-
-        # Wave scheduling
         history: List[Dict[str, Any]] = []
-        ready: List[str] = [n for n, deg in indeg.items() if deg == 0]
-        visited: Set[str] = set()
-
-        while ready:
-            wave = ready[:]
-            ready.clear()
-
-            logger.info(f"[WAVE] Executing stages in parallel: {wave}")
-
-            # Parallel execution within wave
-            with ThreadPoolExecutor(max_workers=self.max_workers) as exe:
-                futs = {exe.submit(self._exec_step, by_name[n]): n for n in wave}
-                for fut in as_completed(futs):
-                    res = fut.result()
-                    history.append(res)
-                    visited.add(res["stage"])
-
-            # Reduce indegree for next wave
-            for n in wave:
-                for v in edges.get(n, []):
-                    indeg[v] -= 1
-                    if indeg[v] == 0:
-                        ready.append(v)
+        selected = set(stages) if stages is not None else {s.stage for s in steps}
+        waves = 0
+        try:
+            # Inside the try so step_skipped events reach the log even if a replay fails
+            if inputs_from_run:
+                self._replay(hydrate_inputs(self.checkpoints, inputs_from_run, steps, selected))
+                logger.info(f"[SUBGRAPH] Hydrated upstream inputs from run {inputs_from_run}")
+            # Stages outside the selection are treated like already-satisfied dependencies
+            skipped = self._resume(steps, history) if resume else set()
+            skipped |= {s.stage for s in steps if s.stage not in selected}
+
+            # Build dependency graph (skipped stages count as satisfied dependencies)
+            by_name = {s.stage: s for s in steps}
+            index = {s.stage: i for i, s in enumerate(steps)}
+            indeg: Dict[str, int] = {s.stage: 0 for s in steps if s.stage not in skipped}
+            edges: Dict[str, List[str]] = {s.stage: [] for s in steps}
+
+            for s in steps:
+                if s.stage in skipped:
+                    continue
+                for d in s.depends_on or []:
+                    if d in skipped:
+                        continue
+                    indeg[s.stage] += 1
+                    edges.setdefault(d, []).append(s.stage)
+
+            # Wave scheduling
+            ready: List[str] = [n for n, deg in indeg.items() if deg == 0]
+            visited: Set[str] = set(skipped)
+
+            with trace_span(
+                "run", "run", run_id=self.run_id, runner="parallel"
+            ), allocation_tracing(self.track_resources and self.tracemalloc_top > 0):
+                while ready:
+                    wave = ready[:]
+                    ready.clear()
+
+                    logger.info(f"[WAVE] Executing stages in parallel: {wave}")
+
+                    # Parallel execution within wave
+                    with trace_span("wave", "wave", index=waves, stages=wave), ThreadPoolExecutor(
+                        max_workers=self.max_workers
+                    ) as exe:
+                        # Each worker runs in a copy of this thread's context so spans
+                        # opened around the run (e.g. by an OTel-instrumented caller) parent
+                        # the steps
+                        futs = {
+                            exe.submit(
+                                contextvars.copy_context().run,
+                                self._exec_tracked,
+                                by_name[n],
+                                index[n],
+                            ): n
+                            for n in wave
+                        }
+                        for fut in as_completed(futs):
+                            res = fut.result()
+                            history.append(res)
+                            visited.add(res["stage"])
+
+                    waves += 1
+
+                    # Reduce indegree for next wave
+                    for n in wave:
+                        for v in edges.get(n, []):
+                            indeg[v] -= 1
+                            if indeg[v] == 0:
+                                ready.append(v)
+        except BaseException:
+            self._flush_checkpoints(on_error=True)
+            raise
+        finally:
+            self._close_eventlog()
+        self._flush_checkpoints()
 
         if len(visited) != len(steps):
             missing = [s.stage for s in steps if s.stage not in visited]
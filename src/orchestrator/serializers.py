@@ -0,0 +1,174 @@
+"""Pluggable checkpoint serializers with a versioned, compact binary container."""
+
+from __future__ import annotations
+
+import io
+import json
+import pickle
+import struct
+from typing import Any, List, Tuple, Union, cast
+
+from .checkpoint_blobs import COMPRESSIONS, compress, decompress
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# Binary container: MAGIC | version | codec | compression | body
+# Plain JSON ("json" without compression) is written without a header, exactly as
+# before, so existing checkpoints and external tooling keep working.
+MAGIC = b"CKPT"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sBBB")
+
+CODECS = ("json", "pickle", "msgpack")
+_CODEC_IDS = {name: i for i, name in enumerate(CODECS)}
+_COMPRESSION_IDS = {name: i for i, name in enumerate(COMPRESSIONS)}
+
+# bytes values at least this large are pickled out-of-band (not copied into the stream)
+OUT_OF_BAND_MIN_BYTES = 64 * 1024
+
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+
+def parse_format(spec: str) -> Tuple[str, str]:
+    """
+    Parse a serializer spec such as "json", "pickle+zlib" or "msgpack+lzma".
+
+    Args:
+        spec: "<codec>[+<compression>]"
+
+    Returns:
+        Tuple of (codec, compression)
+
+    Raises:
+        ValueError: If the codec or compression is unknown, or msgpack is requested
+            but not installed
+    """
+    codec, _, compression = spec.partition("+")
+    compression = compression or "none"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown checkpoint format: {codec} (expected one of {CODECS})")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression codec: {compression}")
+    if codec == "msgpack" and not MSGPACK_AVAILABLE:
+        raise ValueError("msgpack checkpoint format requires the 'msgpack' package")
+    return codec, compression
+
+
+def is_text_format(spec: str) -> bool:
+    """True if spec produces plain (headerless) JSON."""
+    return parse_format(spec) == ("json", "none")
+
+
+class _BytesPickler(pickle.Pickler):
+    """Pickler that hands large bytes values to buffer_callback instead of copying them."""
+
+    def reducer_override(self, obj: Any) -> Any:
+        if type(obj) is bytes and len(obj) >= OUT_OF_BAND_MIN_BYTES:
+            return bytes, (pickle.PickleBuffer(obj),)
+        return NotImplemented
+
+
+def _pickle_dumps(obj: Any) -> bytes:
+    """Pickle protocol 5 with out-of-band buffers framed after the pickle stream."""
+    buffers: List[pickle.PickleBuffer] = []
+    stream = io.BytesIO()
+    _BytesPickler(stream, protocol=5, buffer_callback=buffers.append).dump(obj)
+    frames: List[Union[bytes, memoryview]] = [_U32.pack(len(buffers))]
+    for buf in buffers:
+        raw = buf.raw()
+        frames.append(_U64.pack(raw.nbytes))
+        frames.append(raw)
+    frames.append(stream.getbuffer())
+    return b"".join(frames)
+
+
+def _pickle_loads(body: memoryview) -> Any:
+    """Reverse _pickle_dumps (buffers are zero-copy slices of body)."""
+    (count,) = _U32.unpack_from(body, 0)
+    offset = _U32.size
+    buffers = []
+    for _ in range(count):
+        (size,) = _U64.unpack_from(body, offset)
+        offset += _U64.size
+        buffers.append(body[offset : offset + size])
+        offset += size
+    # Checkpoints are trusted input; see the note in decode()
+    return pickle.loads(body[offset:], buffers=buffers)  # noqa: S301
+
+
+def _encode_body(obj: Any, codec: str) -> bytes:
+    if codec == "pickle":
+        return _pickle_dumps(obj)
+    if codec == "msgpack":
+        return cast(bytes, msgpack.packb(obj, use_bin_type=True))
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _decode_body(body: memoryview, codec: str) -> Any:
+    if codec == "pickle":
+        return _pickle_loads(body)
+    if codec == "msgpack":
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("Checkpoint was written with msgpack, which is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return json.loads(bytes(body).decode("utf-8"))
+
+
+def encode(obj: Any, spec: str = "json") -> bytes:
+    """
+    Serialize a checkpoint payload.
+
+    Args:
+        obj: JSON-like payload; the binary formats also accept bytes values
+        spec: Serializer spec (see parse_format)
+
+    Returns:
+        Encoded bytes (plain UTF-8 JSON for "json", otherwise a versioned container)
+    """
+    codec, compression = parse_format(spec)
+    body = _encode_body(obj, codec)
+    if codec == "json" and compression == "none":
+        return body
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _CODEC_IDS[codec], _COMPRESSION_IDS[compression])
+    return header + compress(body, compression)
+
+
+def decode(raw: bytes) -> Any:
+    """
+    Deserialize bytes produced by encode() with any spec (or legacy plain JSON).
+
+    Pickle payloads are only as trustworthy as the checkpoint directory they come
+    from; do not point a store at checkpoints from untrusted sources.
+
+    Args:
+        raw: Encoded payload
+
+    Returns:
+        Decoded payload
+
+    Raises:
+        ValueError: If the container version, codec or compression is unknown
+    """
+    if not raw.startswith(MAGIC):
+        return _decode_body(memoryview(raw), "json")
+    _, version, codec_id, compression_id = _HEADER.unpack_from(raw, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format version: {version}")
+    try:
+        codec = CODECS[codec_id]
+        compression = COMPRESSIONS[compression_id]
+    except IndexError:
+        raise ValueError(
+            f"Unknown checkpoint codec/compression id: {codec_id}/{compression_id}"
+        ) from None
+    body = memoryview(raw)[_HEADER.size :]
+    if compression != "none":
+        body = memoryview(decompress(bytes(body), compression))
+    return _decode_body(body, codec)
@@ -0,0 +1,159 @@
+"""Stage selection for partial pipeline runs (--only / --from / --until)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from src.core.resume import Checkpoint
+
+from .checkpoint_lazy import load_lazy
+from .resume_plan import replay_memory
+
+
+def dependency_map(steps: Sequence[Any]) -> Dict[str, List[str]]:
+    """
+    Map each stage to the stages it depends on.
+
+    Uses each step's `depends_on`. A pipeline that declares no dependencies at
+    all is treated as a linear chain in pipeline order, since the sequential
+    runner feeds every earlier stage's output into memory.
+
+    Args:
+        steps: Pipeline steps (objects with `stage` and optional `depends_on`)
+
+    Returns:
+        Stage name -> list of dependency stage names
+    """
+    deps = {s.stage: list(getattr(s, "depends_on", None) or []) for s in steps}
+    if steps and not any(deps.values()):
+        names = [s.stage for s in steps]
+        return {name: names[i - 1 : i] for i, name in enumerate(names)}
+    return deps
+
+
+def _closure(start: Set[str], edges: Dict[str, List[str]]) -> Set[str]:
+    """All nodes reachable from start (inclusive) following edges."""
+    seen: Set[str] = set()
+    stack = list(start)
+    while stack:
+        n = stack.pop()
+        if n in seen:
+            continue
+        seen.add(n)
+        stack.extend(edges.get(n, []))
+    return seen
+
+
+def ancestors(steps: Sequence[Any], stages: Set[str]) -> Set[str]:
+    """Stages that `stages` (transitively) depend on, excluding `stages` themselves."""
+    return _closure(stages, dependency_map(steps)) - stages
+
+
+def select_stages(
+    steps: Sequence[Any],
+    only: Optional[Sequence[str]] = None,
+    from_stage: Optional[str] = None,
+    until: Optional[str] = None,
+    include_upstream: bool = False,
+) -> Set[str]:
+    """
+    Compute the stages to execute for a partial run.
+
+    Filters combine by intersection: `from_stage` keeps the stage and everything
+    downstream of it, `until` keeps the stage and everything upstream of it, and
+    `only` keeps exactly the named stages.
+
+    Args:
+        steps: Pipeline steps
+        only: Stage names to run
+        from_stage: Run this stage and its descendants
+        until: Run this stage and its ancestors
+        include_upstream: Add every ancestor of the selection (use when there is no
+            prior run to hydrate upstream inputs from)
+
+    Returns:
+        Set of stage names to execute
+
+    Raises:
+        ValueError: If a stage name is unknown or the selection is empty
+    """
+    deps = dependency_map(steps)
+    names = set(deps)
+    requested = list(only or []) + [n for n in (from_stage, until) if n]
+    unknown = [n for n in requested if n not in names]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+
+    selected = set(names)
+    if only:
+        selected &= set(only)
+    if from_stage:
+        children: Dict[str, List[str]] = {n: [] for n in names}
+        for n, ds in deps.items():
+            for d in ds:
+                children.setdefault(d, []).append(n)
+        selected &= _closure({from_stage}, children)
+    if until:
+        selected &= _closure({until}, deps)
+    if not selected:
+        raise ValueError("Stage selection is empty")
+
+    if include_upstream:
+        selected |= ancestors(steps, selected)
+    return selected
+
+
+def find_stage_checkpoint(
+    store: Any, run_id: str, steps: Sequence[Any], stage: str
+) -> Optional[Checkpoint]:
+    """
+    Load the checkpoint a run recorded for a stage.
+
+    Args:
+        store: Checkpoint store
+        run_id: Run that executed the stage
+        steps: Pipeline steps (checkpoints are keyed by step index)
+        stage: Stage name
+
+    Returns:
+        Checkpoint, or None if the run has no checkpoint for the stage
+    """
+    for idx, step in enumerate(steps):
+        if step.stage == stage:
+            ck = load_lazy(store, f"{run_id}:{idx}")
+            return ck if ck is not None and ck.stage == stage else None
+    return None
+
+
+def hydrate_inputs(
+    store: Any, run_id: str, steps: Sequence[Any], selected: Set[str]
+) -> Dict[str, Any]:
+    """
+    Rebuild the memory that the selected stages need from a prior run.
+
+    Args:
+        store: Checkpoint store holding the prior run
+        run_id: Prior run to take upstream outputs from
+        steps: Pipeline steps
+        selected: Stages about to execute
+
+    Returns:
+        Memory assembled from the checkpoints of all upstream stages
+
+    Raises:
+        ValueError: If an upstream stage has no checkpoint in the prior run
+    """
+    upstream = ancestors(steps, selected)
+    checkpoints: List[Checkpoint] = []
+    missing: List[str] = []
+    for step in steps:
+        if step.stage not in upstream:
+            continue
+        ck = find_stage_checkpoint(store, run_id, steps, step.stage)
+        if ck is None:
+            missing.append(step.stage)
+        else:
+            checkpoints.append(ck)
+    if missing:
+        raise ValueError(f"Run {run_id} has no checkpoint for upstream stage(s): {missing}")
+    return replay_memory(checkpoints)
@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import re
+from typing import Any, Dict, Set
 
 try:
     from jinja2 import Environment, StrictUndefined
@@ -12,6 +13,31 @@ try:
 except ImportError:
     JINJA2_AVAILABLE = False
 
+# {key} placeholders and the leading name of Jinja2 {{ expr }} / {% if|for %} blocks
+_SIMPLE_RE = re.compile(r"(?<!\{)\{([A-Za-z_][\w.\-]*)\}(?!\})")
+_JINJA_EXPR_RE = re.compile(r"\{\{-?\s*([A-Za-z_][\w.]*)")
+_JINJA_TAG_RE = re.compile(r"\{%-?\s*(?:if|elif|for\s+\w+\s+in)\s+([A-Za-z_][\w.]*)")
+
+
+def referenced_keys(template: str) -> Set[str]:
+    """
+    Memory keys a task template references.
+
+    Covers {key} placeholders and the first name in Jinja2 expressions/tags
+    (e.g. "{{ requirements.content }}" -> "requirements.content"). Jinja2 attribute
+    access and dotted memory keys look the same, so dotted names are kept whole.
+
+    Args:
+        template: Task template string
+
+    Returns:
+        Set of referenced memory keys
+    """
+    keys = set(_SIMPLE_RE.findall(template))
+    keys.update(_JINJA_EXPR_RE.findall(template))
+    keys.update(_JINJA_TAG_RE.findall(template))
+    return keys
+
 
 def render_task(template: str, memory: Dict[str, Any]) -> str:
     """
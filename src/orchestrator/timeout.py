@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import contextvars
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError as FutureTimeoutError
 from typing import Callable, TypeVar
@@ -29,7 +30,9 @@ def run_with_timeout(fn: Callable[[], T], seconds: float) -> T:
         FutureTimeoutError: If execution exceeds timeout
     """
     with ThreadPoolExecutor(max_workers=1) as ex:
-        fut = ex.submit(fn)
+        # Run in a copy of the caller's context so tracing spans opened in fn nest under the
+        # caller's current span
+        fut = ex.submit(contextvars.copy_context().run, fn)
         try:
             return fut.result(timeout=seconds)
         except FutureTimeoutError as e:
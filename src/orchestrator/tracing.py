@@ -0,0 +1,277 @@
+"""Built-in span tracer writing Chrome trace-event JSON (open in Perfetto or chrome://tracing)."""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from time import perf_counter_ns, time_ns
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from .otel import active_tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (name, category, start_ns, end_ns, native thread id, args)
+Event = Tuple[str, str, int, int, int, Optional[Dict[str, Any]]]
+
+# Categories kept out of OpenTelemetry: OTel traces are rooted at steps so head
+# sampling can be decided per pipeline category
+LOCAL_ONLY_CATEGORIES = frozenset({"run", "wave"})
+
+
+def _attributes(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Span args as OpenTelemetry attribute values (primitives or lists of strings)."""
+    attrs: Dict[str, Any] = {}
+    for key, value in args.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, bool, int, float)):
+            attrs[key] = value
+        elif isinstance(value, (list, tuple)):
+            attrs[key] = [str(v) for v in value]
+        else:
+            attrs[key] = str(value)
+    return attrs
+
+
+class _Span:
+    """
+    Context manager for one span on the active backends.
+
+    Records a complete ("X") event on the Chrome tracer and/or runs the block
+    inside a current OpenTelemetry span (so nested spans become its children).
+    """
+
+    __slots__ = ("_otel", "_otel_cm", "_otel_tracer", "_start", "_tracer", "args", "cat", "name")
+
+    def __init__(
+        self,
+        tracer: Optional[ChromeTracer],
+        otel_tracer: Optional[Any],
+        name: str,
+        cat: str,
+        args: Dict[str, Any],
+    ) -> None:
+        self._tracer = tracer
+        self._otel_tracer = otel_tracer
+        self._otel_cm: Optional[Any] = None
+        self._otel: Optional[Any] = None
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._start = 0
+
+    def set(self, **args: Any) -> None:
+        """Add arguments shown in the span's details (attributes in OpenTelemetry)."""
+        self.args.update(args)
+        if self._otel is not None:
+            self._otel.set_attributes(_attributes(args))
+
+    def __enter__(self) -> _Span:
+        if self._otel_tracer is not None:
+            self._otel_cm = self._otel_tracer.start_as_current_span(
+                self.name, attributes=_attributes(self.args)
+            )
+            self._otel = self._otel_cm.__enter__()
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        end = perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self._tracer is not None:
+            self._tracer.add(self.name, self.cat, self._start, end, self.args)
+        if self._otel_cm is not None:
+            # Records the exception and sets an error status on the OTel span
+            self._otel_cm.__exit__(exc_type, exc, tb)
+
+
+class _NoopSpan:
+    """Span returned while no tracer is active."""
+
+    __slots__ = ()
+
+    def set(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class ChromeTracer:
+    """
+    Collect nested spans per thread and export them as Chrome trace-event JSON.
+
+    Spans are complete events on the track of the thread that ran them, so a
+    parallel run shows one track per worker thread: steps nest their attempts,
+    attempts nest their phases (see phases.PHASES), and gaps between steps on a
+    worker show wave stalls. Recording is a list append (no lock); the JSON is
+    built only by write().
+
+    Example:
+        tracer = ChromeTracer()
+        set_tracer(tracer)
+        orch.run(steps)
+        tracer.write("out/run.trace.json")
+    """
+
+    def __init__(self, process_name: str = "orchestrator", max_events: int = 1_000_000) -> None:
+        """
+        Initialize tracer.
+
+        Args:
+            process_name: Process label shown in the trace viewer
+            max_events: Stop recording (and count drops) beyond this many spans
+        """
+        self.process_name = process_name
+        self.max_events = max_events
+        self.dropped = 0
+        self._origin_ns = perf_counter_ns()
+        self._origin_epoch_us = time_ns() // 1000
+        self._events: List[Event] = []
+        self._threads: Dict[int, str] = {}
+
+    def span(self, name: str, cat: str = "orchestrator", **args: Any) -> _Span:
+        """Time the enclosed block as a span named `name` on the current thread."""
+        return _Span(self, None, name, cat, args)
+
+    def add(
+        self,
+        name: str,
+        cat: str,
+        start_ns: int,
+        end_ns: int,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record a span measured by the caller (perf_counter_ns timestamps).
+
+        Args:
+            name: Span name
+            cat: Category (e.g. "step", "phase")
+            start_ns: Start, from perf_counter_ns()
+            end_ns: End, from perf_counter_ns()
+            args: Arguments shown in the span's details
+        """
+        if len(self._events) >= self.max_events:
+            self.dropped += 1
+            return
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self._events.append((name, cat, start_ns, end_ns, tid, args))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the trace-event document (JSON object format)."""
+        pid = os.getpid()
+        origin = self._origin_ns
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.process_name}}
+        ]
+        for tid, thread_name in list(self._threads.items()):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+        for name, cat, start, end, tid, args in list(self._events):
+            event: Dict[str, Any] = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"start_epoch_us": self._origin_epoch_us, "dropped": self.dropped},
+        }
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """
+        Write the trace as JSON.
+
+        Args:
+            path: Output file (parent directories are created)
+
+        Returns:
+            Path written
+        """
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        doc = self.to_dict()
+        p.write_text(json.dumps(doc, default=str), encoding="utf-8")
+        logger.info(f"[TRACE] Wrote {len(self._events)} spans to {p}")
+        return p
+
+
+_tracer: Optional[ChromeTracer] = None
+
+
+def set_tracer(tracer: Optional[ChromeTracer]) -> None:
+    """Install the process-wide tracer (None disables tracing)."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[ChromeTracer]:
+    """Return the active tracer, if any."""
+    return _tracer
+
+
+def span(name: str, cat: str = "orchestrator", **args: Any) -> Union[_Span, _NoopSpan]:
+    """
+    Span on the active tracers (Chrome and OpenTelemetry); a shared no-op when both are off.
+
+    Args:
+        name: Span name
+        cat: Category (LOCAL_ONLY_CATEGORIES are not sent to OpenTelemetry)
+        **args: Arguments shown in the span's details
+
+    Returns:
+        Context manager (its set() adds arguments before the span ends)
+    """
+    tracer = _tracer
+    otel_tracer = active_tracer()
+    if otel_tracer is not None and cat in LOCAL_ONLY_CATEGORIES:
+        otel_tracer = None
+    if tracer is None and otel_tracer is None:
+        return _NOOP
+    return _Span(tracer, otel_tracer, name, cat, args)
+
+
+def traced(name: str, cat: str = "orchestrator") -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator running the function inside span(name, cat)."""
+
+    def decorate(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name, cat):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
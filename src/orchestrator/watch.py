@@ -0,0 +1,338 @@
+"""Incremental watch mode: re-run only the stages whose inputs changed."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import yaml
+
+from src.core.base import BaseAdvisor, BaseFunctionalAgent
+from src.core.resume import CheckpointStore
+
+from .cache import AgentCache
+from .factory import CORE_ADVISORS, CORE_AGENTS, advisor_factory, agent_factory
+from .runner import Orchestrator, PipelineStep
+from .subgraph import dependency_map
+from .task_render import referenced_keys
+from .yaml_loader import Policy, YAMLPipelineLoader
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(obj: Any) -> str:
+    """Stable SHA-256 of a JSON-serializable object."""
+    raw = json.dumps(obj, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _file_digest(path: Optional[str]) -> str:
+    """SHA-256 of a file's bytes ("" if unavailable)."""
+    if not path:
+        return ""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def load_seeds(seeds: Sequence[str]) -> Tuple[Dict[str, Any], List[Path]]:
+    """
+    Load seed files into memory values.
+
+    Args:
+        seeds: "KEY=PATH" (file text becomes memory[KEY]) or "PATH" to a JSON/YAML
+            mapping that is merged into memory
+
+    Returns:
+        Tuple of (memory values, seed file paths)
+    """
+    memory: Dict[str, Any] = {}
+    paths: List[Path] = []
+    for spec in seeds:
+        key, sep, path = spec.partition("=")
+        if sep:
+            p = Path(path)
+            memory[key] = p.read_text(encoding="utf-8")
+        else:
+            p = Path(spec)
+            data = yaml.safe_load(p.read_text(encoding="utf-8")) or {}
+            if not isinstance(data, dict):
+                raise ValueError(f"Seed file {p} must contain a mapping")
+            memory.update(data)
+        paths.append(p)
+    return memory, paths
+
+
+def reload_modules(paths: Sequence[Path]) -> List[str]:
+    """
+    Reload already-imported modules defined in the given files.
+
+    Agent/advisor registries are repointed to the reloaded classes so the
+    factories create instances of the new code.
+
+    Args:
+        paths: Changed Python source files
+
+    Returns:
+        Names of reloaded modules
+    """
+    from .plugin_loader import get_advisor_plugins, get_agent_plugins
+
+    targets = {p.resolve() for p in paths}
+    reloaded: List[str] = []
+    for name, mod in list(sys.modules.items()):
+        mod_file = getattr(mod, "__file__", None)
+        if not mod_file or Path(mod_file).resolve() not in targets:
+            continue
+        try:
+            new_mod = importlib.reload(mod)
+        except Exception as e:
+            logger.error(f"[WATCH] Reload of {name} failed: {e}")
+            continue
+        reloaded.append(name)
+        registries: List[Dict[str, Any]] = [
+            CORE_AGENTS,
+            CORE_ADVISORS,
+            get_agent_plugins(),
+            get_advisor_plugins(),
+        ]
+        for registry in registries:
+            for key, cls in list(registry.items()):
+                if cls.__module__ == name and hasattr(new_mod, cls.__name__):
+                    registry[key] = getattr(new_mod, cls.__name__)
+    return reloaded
+
+
+class IncrementalRunner:
+    """
+    Keep an orchestrator warm and re-execute only invalidated stages.
+
+    Each stage gets a signature covering its definition (agent, advisor, task
+    template, category policy), the source files of its agent and advisor, the
+    seed memory, and the signatures of the stages it depends on (declared
+    depends_on plus stage outputs referenced in its task template). A stage runs
+    only when its signature changed since the last successful cycle, so edits
+    propagate to dependents and nothing else. Stages that still run are served
+    from an in-process AgentCache when their rendered inputs are unchanged.
+    """
+
+    def __init__(
+        self,
+        pipeline_path: str,
+        seeds: Sequence[str] = (),
+        memory: Optional[Dict[str, Any]] = None,
+        extra_watch: Sequence[str] = (),
+        agent_factory: Callable[[str], BaseFunctionalAgent] = agent_factory,
+        advisor_factory: Callable[[str], BaseAdvisor] = advisor_factory,
+        checkpoint_store: Optional[Any] = None,
+    ) -> None:
+        """
+        Initialize incremental runner.
+
+        Args:
+            pipeline_path: Pipeline YAML file
+            seeds: Seed specs (see load_seeds)
+            memory: Fixed memory overrides (e.g. from --mem)
+            extra_watch: Extra files to watch (e.g. plugin modules)
+            agent_factory: Factory for agents
+            advisor_factory: Factory for advisors
+            checkpoint_store: Checkpoint store (defaults to in-memory)
+        """
+        self.pipeline_path = Path(pipeline_path)
+        self.seeds = list(seeds)
+        self.memory_overrides = dict(memory or {})
+        self.extra_watch = [Path(p) for p in extra_watch]
+        self.agent_factory = agent_factory
+        self.advisor_factory = advisor_factory
+        self.checkpoints = checkpoint_store or CheckpointStore()
+        self.cache = AgentCache()
+        self.run_id: Optional[str] = None
+        self.memory: Dict[str, Any] = {}
+        self.signatures: Dict[str, str] = {}
+        self._sources: Set[Path] = set()
+
+    def _source_file(self, factory: Callable[[str], Any], name: str) -> Optional[str]:
+        """Source file of the class the factory creates for `name`."""
+        try:
+            return inspect.getsourcefile(type(factory(name)))
+        except (TypeError, KeyError, OSError):
+            return None
+
+    def stage_signatures(
+        self, steps: Sequence[PipelineStep], policy: Optional[Policy], seed_memory: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """
+        Compute the input signature of every stage.
+
+        Args:
+            steps: Pipeline steps in topological order
+            policy: Pipeline policy
+            seed_memory: Memory values not produced by stages
+
+        Returns:
+            Stage name -> signature
+        """
+        deps = dependency_map(steps)
+        names = set(deps)
+        seeds_digest = _digest(seed_memory)
+        sources: Set[Path] = set()
+        sigs: Dict[str, str] = {}
+        for step in steps:
+            upstream = set(deps[step.stage])
+            for key in referenced_keys(step.task):
+                owner = key.split(".", 1)[0]
+                if "." in key and owner in names and owner != step.stage:
+                    upstream.add(owner)
+
+            agent_src = self._source_file(self.agent_factory, step.agent)
+            advisor_src = self._source_file(self.advisor_factory, step.advisor)
+            sources.update(Path(p) for p in (agent_src, advisor_src) if p)
+
+            category_policy: Dict[str, Any] = {}
+            if policy and step.category:
+                category_policy = {
+                    "threshold": policy.score_thresholds.get(step.category),
+                    "timeout": policy.timeouts.get(step.category),
+                    "retries": policy.retries.get(step.category),
+                    "advisors": policy.advisors.get(step.category),
+                }
+
+            sigs[step.stage] = _digest(
+                {
+                    "step": [step.agent, step.advisor, step.task, step.category, step.max_retries],
+                    "policy": category_policy,
+                    "code": [_file_digest(agent_src), _file_digest(advisor_src)],
+                    # Agents receive the whole memory as context, so every seed counts
+                    "seeds": seeds_digest,
+                    "upstream": sorted(sigs.get(d, d) for d in upstream),
+                }
+            )
+        self._sources = sources
+        return sigs
+
+    def watched_files(self) -> List[Path]:
+        """Files whose changes trigger a new cycle."""
+        _, seed_paths = load_seeds(self.seeds) if self.seeds else ({}, [])
+        return [self.pipeline_path, *seed_paths, *sorted(self._sources), *self.extra_watch]
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run one incremental cycle.
+
+        Returns:
+            Dict with run_id, executed and reused stage names, history, memory and
+            elapsed_sec
+        """
+        start = time.perf_counter()
+        steps, policy = YAMLPipelineLoader().load_from_file(str(self.pipeline_path))
+        seed_memory, _ = load_seeds(self.seeds)
+        seed_memory.update(self.memory_overrides)
+
+        sigs = self.stage_signatures(steps, policy, seed_memory)
+        invalid = {name for name, sig in sigs.items() if self.signatures.get(name) != sig}
+        reused = [s.stage for s in steps if s.stage not in invalid]
+        executed = [s.stage for s in steps if s.stage in invalid]
+
+        history: List[Dict[str, Any]] = []
+        if invalid:
+            orch = Orchestrator(
+                self.agent_factory, self.advisor_factory, checkpoint_store=self.checkpoints
+            )
+            if self.run_id is None:
+                self.run_id = orch.run_id
+            else:
+                orch.run_id = self.run_id
+            orch.cache = self.cache
+            orch.policy = policy
+            orch.memory.update(self.memory)
+            orch.memory.update(seed_memory)
+            result = orch.run(steps, stages=invalid)
+            history = result["history"]
+            self.memory = result["memory"]
+
+        # Orchestrator.run does not raise on rejected stages (exhausted retries): keep
+        # signatures of executed stages only if approved, so the others rerun next cycle
+        approved = {h["stage"] for h in history if h.get("approved")}
+        self.signatures = {
+            name: sig for name, sig in sigs.items() if name not in invalid or name in approved
+        }
+        elapsed = time.perf_counter() - start
+        logger.info(f"[WATCH] executed={executed or '-'} reused={len(reused)} in {elapsed:.3f}s")
+        return {
+            "run_id": self.run_id,
+            "executed": executed,
+            "reused": reused,
+            "history": history,
+            "memory": self.memory,
+            "elapsed_sec": elapsed,
+        }
+
+    def watch(
+        self,
+        interval: float = 0.5,
+        max_cycles: Optional[int] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        """
+        Run a cycle, then poll watched files and run again after each change.
+
+        Errors in a cycle are logged and the loop keeps watching.
+
+        Args:
+            interval: Polling interval in seconds
+            max_cycles: Stop after this many cycles (None = until interrupted)
+            on_result: Callback receiving each cycle's result
+        """
+        cycles = 0
+        stamps: Dict[Path, Tuple[int, int]] = {}
+        while max_cycles is None or cycles < max_cycles:
+            try:
+                result = self.run_once()
+                if on_result is not None:
+                    on_result(result)
+            except Exception as e:
+                logger.error(f"[WATCH] Cycle failed: {e}")
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                return
+
+            stamps = _stat_all(self._safe_watched_files())
+            while True:
+                time.sleep(interval)
+                current = _stat_all(self._safe_watched_files())
+                changed = [
+                    p for p in current.keys() | stamps.keys() if current.get(p) != stamps.get(p)
+                ]
+                if changed:
+                    break
+            py_changed = [p for p in changed if p.suffix == ".py" and p.exists()]
+            if py_changed:
+                reload_modules(py_changed)
+            logger.info(f"[WATCH] Changed: {', '.join(str(p) for p in sorted(changed))}")
+
+    def _safe_watched_files(self) -> List[Path]:
+        """watched_files() that tolerates seed files being mid-edit."""
+        try:
+            return self.watched_files()
+        except Exception:
+            return [self.pipeline_path, *sorted(self._sources), *self.extra_watch]
+
+
+def _stat_all(paths: Sequence[Path]) -> Dict[Path, Tuple[int, int]]:
+    """(mtime_ns, size) for each existing path."""
+    out: Dict[Path, Tuple[int, int]] = {}
+    for p in paths:
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        out[p] = (st.st_mtime_ns, st.st_size)
+    return out
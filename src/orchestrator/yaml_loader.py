@@ -171,6 +171,7 @@ class YAMLPipelineLoader:
                 task=str(s.get("task", "")),
                 max_retries=int(s.get("max_retries", 1)),
                 category=s.get("category"),  # Store category for policy lookup
+                depends_on=list(s.get("depends_on") or []),
             )
             steps.append(step)
 
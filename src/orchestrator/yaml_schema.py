@@ -21,6 +21,8 @@ class BudgetModel(BaseModel):
     max_runtime_sec: Optional[float] = Field(default=None, gt=0)
     max_stages: Optional[int] = Field(default=None, gt=0)
     max_artifacts_bytes: Optional[int] = Field(default=None, gt=0)
+    max_cpu_sec: Optional[float] = Field(default=None, gt=0)
+    max_rss_mb: Optional[float] = Field(default=None, gt=0)
 
 
 class PolicyModel(BaseModel):
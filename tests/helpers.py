@@ -0,0 +1,58 @@
+"""Shared test doubles for runner tests: a recording agent factory and an approving advisor."""
+
+from typing import Collection, Dict, List
+
+from src.core.base import BaseAdvisor, BaseFunctionalAgent
+from src.core.types import AgentOutput
+
+
+class RecordingAgents:
+    """
+    Agent factory recording which agents ran and the context each one saw.
+
+    Args:
+        content: Output template, formatted with the agent `name` and its `task`
+        failing: Agents whose process() raises RuntimeError
+    """
+
+    def __init__(self, content: str = "{name}: {task}", failing: Collection[str] = ()) -> None:
+        self.calls: List[str] = []
+        self.contexts: Dict[str, Dict] = {}
+        self.content = content
+        self.failing = failing
+
+    def __call__(self, name: str) -> BaseFunctionalAgent:
+        factory = self
+
+        class _Agent(BaseFunctionalAgent):
+            def process(self, task: str, context: Dict) -> AgentOutput:
+                factory.calls.append(name)
+                factory.contexts[name] = dict(context)
+                if name in factory.failing:
+                    raise RuntimeError(f"{name} crashed")
+                return AgentOutput(content=factory.content.format(name=name, task=task))
+
+        agent = _Agent()
+        agent.name = name
+        return agent
+
+
+class Approve(BaseAdvisor):
+    """Advisor approving every output with a perfect score."""
+
+    name = "Approve"
+
+    def review(self, output: AgentOutput, task: str, context: Dict) -> Dict:
+        return {
+            "score": 1.0,
+            "approved": True,
+            "critical_issues": [],
+            "suggestions": [],
+            "summary": "ok",
+            "severity": "low",
+        }
+
+
+def approve(name: str) -> BaseAdvisor:
+    """Advisor factory returning Approve for every advisor name."""
+    return Approve()
@@ -0,0 +1,177 @@
+"""Tests for concurrent, incremental artifact persistence (ArtifactPersister)."""
+
+import base64
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from scripts.benchlib import SyntheticAdvisor, Workload
+from src.core.base import BaseFunctionalAgent
+from src.core.memory import SharedMemory
+from src.core.types import AgentMetadata, AgentOutput, Artifact
+from src.orchestrator.artifact_sink import ArtifactPersister, persist_artifacts, write_artifact
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.runner import Orchestrator, PipelineStep
+
+
+class ArtifactAgent(BaseFunctionalAgent):
+    """Agent emitting one markdown artifact per call."""
+
+    name = "ArtifactAgent"
+    min_advisor_score = 0.5
+
+    def process(self, task: str, context: Dict[str, Any]) -> AgentOutput:
+        return AgentOutput(
+            content=task,
+            artifacts=[Artifact(name=f"{task}.md", type="markdown", content=f"# {task}")],
+            metadata=AgentMetadata(agent_name=self.name),
+        )
+
+
+def _manifest(root: Path) -> list:
+    return json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+
+
+def test_write_artifact_streams_and_hashes(tmp_path: Path) -> None:
+    """Chunked writes give the same bytes and digest as whole-content handling."""
+    blob = bytes(range(256)) * 41
+    cases = [
+        (blob, blob),
+        (base64.b64encode(blob).decode("ascii"), blob),
+        ("plain text, not base64!", b"plain text, not base64!"),
+        ("ab=cd", b"ab=cd"),  # Padding inside the text is not base64
+        ("abc", b"abc"),
+        ("", b""),
+        ("é" * 1000, ("é" * 1000).encode("utf-8")),
+    ]
+    path = tmp_path / "a.bin"
+    for content, expected in cases:
+        for chunk_size in (7, 64, 1 << 20):
+            nbytes, sha256 = write_artifact(path, content, chunk_size)
+            assert path.read_bytes() == expected
+            assert (nbytes, sha256) == (len(expected), hashlib.sha256(expected).hexdigest())
+
+
+def test_hook_writes_each_stage_as_it_completes(tmp_path: Path) -> None:
+    """Files exist once the hook's writes finish; close() assembles the manifest in order."""
+    memory = SharedMemory()
+    persister = ArtifactPersister(out_dir=str(tmp_path), run_id="r1", max_workers=2, batch_bytes=8)
+    for stage in ("plan", "build"):
+        memory.set(
+            f"{stage}.artifacts",
+            [
+                {"name": f"{stage}{i}.txt", "type": "text", "content": f"{stage}-{i}"}
+                for i in range(5)
+            ],
+        )
+        persister(step_result={"stage": stage}, shared_memory=memory)
+    for fut in persister._futures["plan"]:
+        fut.result()
+    assert (tmp_path / "r1" / "plan" / "plan4.txt").read_text(encoding="utf-8") == "plan-4"
+
+    assert persister.close({"memory": memory.to_dict()}) == 10
+    manifest = _manifest(tmp_path / "r1")
+    assert [e["name"] for e in manifest] == [f"plan{i}.txt" for i in range(5)] + [
+        f"build{i}.txt" for i in range(5)
+    ]
+    for e in manifest:
+        data = (tmp_path / "r1" / e["stage"] / e["safe_name"]).read_bytes()
+        assert e["sha256"] == hashlib.sha256(data).hexdigest() and e["bytes"] == len(data)
+    with pytest.raises(RuntimeError, match="closed"):
+        persister.submit("late", [{"name": "x", "content": "x"}])
+
+
+def test_close_persists_unsubmitted_stages_and_resubmits_replace(tmp_path: Path) -> None:
+    persister = ArtifactPersister(out_dir=str(tmp_path), run_id="r2")
+    persister.submit("a", [{"name": "old.txt", "content": "old"}])
+    persister.submit("a", [{"name": "new.txt", "content": "new"}])
+    memory = {
+        "a.artifacts": [{"name": "ignored.txt", "content": "x"}],
+        "b.artifacts": [{"name": "resumed.txt", "content": "from result"}],
+        "b.content": "text",
+    }
+    assert persister.close({"memory": memory}) == 2
+    assert [(e["stage"], e["name"]) for e in _manifest(tmp_path / "r2")] == [
+        ("a", "new.txt"),
+        ("b", "resumed.txt"),
+    ]
+
+
+def test_colliding_names_keep_last_write(tmp_path: Path) -> None:
+    """Names that sanitize to the same file are written in order; both stay in the manifest."""
+    memory = {
+        "s.artifacts": [
+            {"name": "a/b.txt", "content": "first"},
+            {"name": "a*b.txt", "content": "second"},
+        ]
+    }
+    assert persist_artifacts({"run_id": "r3", "memory": memory}, out_dir=str(tmp_path)) == 2
+    assert (tmp_path / "r3" / "s" / "a_b.txt").read_text(encoding="utf-8") == "second"
+    assert [e["safe_name"] for e in _manifest(tmp_path / "r3")] == ["a_b.txt", "a_b.txt"]
+
+
+def test_concurrent_submits_with_backpressure(tmp_path: Path) -> None:
+    """Hooks called from several threads (parallel runner) with a small pending limit."""
+    persister = ArtifactPersister(
+        out_dir=str(tmp_path), run_id="r4", max_workers=3, max_pending=2, batch_bytes=1
+    )
+
+    def stage(n: int) -> None:
+        persister.submit(f"s{n}", [{"name": f"{i}.txt", "content": f"{n}:{i}"} for i in range(20)])
+
+    threads = [threading.Thread(target=stage, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert persister.close() == 160
+    assert len(list((tmp_path / "r4").glob("s*/*.txt"))) == 160
+
+
+def test_orchestrator_post_step_hook(tmp_path: Path) -> None:
+    """Registered as a post-step hook, the persister saves every stage of a run."""
+    orch = Orchestrator(
+        lambda _name: ArtifactAgent(),
+        lambda _name: SyntheticAdvisor(Workload()),
+        FileCheckpointStore(root=str(tmp_path / "ckpt")),
+    )
+    orch.eventlog.path = str(tmp_path / "events.jsonl")
+    persister = ArtifactPersister(out_dir=str(tmp_path / "art"), run_id=orch.run_id)
+    orch.post_step_hooks.append(persister)
+    steps = [PipelineStep(stage=s, agent="A", advisor="B", task=s) for s in ("one", "two")]
+    result = orch.run(steps)
+
+    assert set(persister._futures) == {"one", "two"}
+    assert persister.close(result) == 2
+    root = tmp_path / "art" / orch.run_id
+    assert (root / "two" / "two.md").read_text(encoding="utf-8") == "# two"
+    assert (root / "SUMMARY.md").exists()
+
+
+def test_cli_writes_manifest_when_run_raises(tmp_path: Path, monkeypatch) -> None:
+    """--save-artifacts keeps the finished stages' artifacts if a later stage raises."""
+    import cli
+
+    pipeline = Path(__file__).resolve().parent.parent / "pipeline" / "example.yaml"
+    run_step = Orchestrator._run_step
+
+    def failing_step(self, idx, step, history, last_readers_map):
+        if step.stage == "refine_prompt":
+            raise RuntimeError("boom")
+        return run_step(self, idx, step, history, last_readers_map)
+
+    monkeypatch.setattr(Orchestrator, "_run_step", failing_step)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        "sys.argv",
+        ["cli.py", "--pipeline", str(pipeline), "--save-artifacts", "--mem", 'product_idea="X"'],
+    )
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    (manifest,) = (tmp_path / "out").glob("*/manifest.json")
+    assert {e["stage"] for e in _manifest(manifest.parent)} == {"requirements"}
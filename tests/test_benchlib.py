@@ -0,0 +1,87 @@
+"""Tests for the benchmark harness and perf_baseline regression mode."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from scripts import perf_baseline
+from scripts.benchlib import (
+    Workload,
+    chain,
+    compare,
+    diamonds,
+    factories,
+    fanout,
+    layered,
+    measure,
+    percentile,
+    summarize,
+)
+
+
+def test_percentiles_and_summary() -> None:
+    """Percentiles interpolate linearly between ranks."""
+    samples = [float(v) for v in range(1, 101)]
+    assert percentile(samples, 50) == pytest.approx(50.5)
+    assert percentile(samples, 99) == pytest.approx(99.01)
+    assert percentile([], 50) == 0.0
+    summary = summarize([3.0, 1.0, 2.0])
+    assert summary["n"] == 3 and summary["p50"] == 2.0 and summary["max"] == 3.0
+
+
+def test_dag_generators_are_topological() -> None:
+    """Every generated stage depends only on stages defined before it."""
+    for dag in (chain(5), fanout(4), diamonds(3, width=3), layered(1200, width=40, seed=7)):
+        seen = set()
+        for stage, deps in dag:
+            assert set(deps) <= seen
+            seen.add(stage)
+        assert len(seen) == len(dag)
+    assert len(fanout(4)) == 6 and fanout(4)[-1][1] == [f"leaf{i}" for i in range(4)]
+    assert len(diamonds(3, width=3)) == 13
+    assert layered(1200, seed=7) == layered(1200, seed=7)
+
+
+def test_synthetic_agents_and_measure() -> None:
+    """Synthetic agents honor output size and advisors the configured score."""
+    agent_factory, advisor_factory = factories(Workload(output_bytes=100), Workload(score=0.4))
+    output = agent_factory("a").process("task", {})
+    assert len(output.content) == len("task\n") + 100
+    assert advisor_factory("r").review(output, "task", {})["approved"] is False
+
+    calls = []
+    samples = measure(lambda: lambda: calls.append(1), warmup=2, repeat=3)
+    assert len(samples) == 3 and len(calls) == 5
+    assert len(measure(lambda: lambda: None, warmup=0, repeat=10, max_time_sec=1e-9)) == 1
+
+
+def test_compare_flags_regressions() -> None:
+    """Only slowdowns beyond both the relative threshold and the noise floor regress."""
+    base = {"a": {"p50": 100.0}, "b": {"p50": 0.1}, "c": {"p50": 10.0}, "gone": {"p50": 1.0}}
+    cur = {"a": {"p50": 130.0}, "b": {"p50": 0.3}, "c": {"p50": 9.0}, "new": {"p50": 1.0}}
+    rows = {r["name"]: r for r in compare(base, cur, threshold=0.25, min_delta_ms=1.0)}
+    assert set(rows) == {"a", "b", "c"}
+    assert rows["a"]["regressed"] and rows["a"]["change"] == pytest.approx(0.3)
+    assert not rows["b"]["regressed"]  # 3x slower but below the 1 ms noise floor
+    assert not rows["c"]["regressed"]
+
+
+def test_perf_baseline_saves_and_compares(tmp_path: Path) -> None:
+    """A quick run saves a baseline; --compare exits 1 only when a benchmark got slower."""
+    args = ["--quick", "--only", "parallel.fanout,checkpoint", "--warmup", "0", "--repeat", "2"]
+    assert perf_baseline.main(args + ["--out", str(tmp_path)]) == 0
+    latest = tmp_path / "baseline_latest.json"
+    doc = json.loads(latest.read_text(encoding="utf-8"))
+    assert set(doc["benchmarks"]) == {"parallel.fanout", "checkpoint.fs", "checkpoint.sqlite"}
+    assert doc["benchmarks"]["parallel.fanout"]["n"] == 2
+    assert len(list(tmp_path.glob("baseline_*.md"))) == 1
+
+    slow = dict(doc, benchmarks={k: {"p50": 1e9} for k in doc["benchmarks"]})
+    fast = dict(doc, benchmarks={"parallel.fanout": {"p50": 0.001}})
+    (tmp_path / "slow.json").write_text(json.dumps(slow), encoding="utf-8")
+    (tmp_path / "fast.json").write_text(json.dumps(fast), encoding="utf-8")
+    assert perf_baseline.main(args + ["--compare", str(tmp_path / "slow.json")]) == 0
+    assert perf_baseline.main(args + ["--compare", str(tmp_path / "fast.json")]) == 1
+    assert len(list(tmp_path.glob("baseline_*.json"))) == 2  # compare does not save
+    assert perf_baseline.main(["--only", "nope"]) == 2
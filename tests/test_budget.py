@@ -44,3 +44,21 @@ def test_budget_within_limits():
     budget = Budget(max_stages=10, max_artifacts_bytes=5000, max_runtime_sec=100.0)
     stats = {"stages": 5, "artifacts_bytes": 2000, "runtime_sec": 50.0}
     enforce_budget(budget, stats)  # Should not raise
+
+
+def test_budget_cpu_exceeded():
+    """Test that exceeding CPU budget raises error."""
+    budget = Budget(max_cpu_sec=10.0)
+    stats = {"stages": 5, "cpu_sec": 12.5, "rss_mb": 100.0}
+
+    with pytest.raises(BudgetExceededError, match="CPU budget exceeded"):
+        enforce_budget(budget, stats)
+
+
+def test_budget_rss_exceeded():
+    """Test that exceeding peak RSS budget raises error."""
+    budget = Budget(max_rss_mb=256.0)
+    stats = {"stages": 5, "cpu_sec": 1.0, "rss_mb": 512.0}
+
+    with pytest.raises(BudgetExceededError, match="Memory budget exceeded"):
+        enforce_budget(budget, stats)
@@ -0,0 +1,93 @@
+"""Tests for content-addressed checkpoint deduplication."""
+
+from pathlib import Path
+
+import pytest
+
+from src.core.resume import Checkpoint
+from src.orchestrator import checkpoint_sqlite
+from src.orchestrator.checkpoint_blobs import BLOB_REF, BlobStore
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+
+BIG = "x" * 5000
+
+
+def _ck(step: int, **memory: object) -> Checkpoint:
+    return Checkpoint(run_id="r1", step_index=step, stage=f"s{step}", memory_snapshot=memory)
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "lzma"])
+def test_blob_store_roundtrip_and_refcount(tmp_path: Path, codec: str) -> None:
+    """Identical content is stored once; gc only removes unreferenced blobs."""
+    blobs = BlobStore(str(tmp_path / "blobs.db"), compression=codec)
+
+    d1 = blobs.put(b"payload" * 100)
+    d2 = blobs.put(b"payload" * 100)
+    assert d1 == d2
+    assert blobs.get(d1) == b"payload" * 100
+    assert blobs.stats()["blobs"] == 1
+
+    blobs.release([d1])
+    assert blobs.gc() == 0
+    blobs.release([d1])
+    assert blobs.gc() == 1
+    assert blobs.get(d1) is None
+
+
+def test_fs_store_dedups_large_values(tmp_path: Path) -> None:
+    """Large values are replaced by digest references and restored on load."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"), blob_threshold=1024)
+
+    store.save("r1:0", _ck(0, big=BIG, small="ok"))
+    store.save("r1:1", _ck(1, big=BIG, small="ok", n=1))
+
+    raw = store._path("r1:1").read_text(encoding="utf-8")
+    assert BIG not in raw
+    assert BLOB_REF in raw
+    assert store.blobs is not None
+    assert store.blobs.stats()["blobs"] == 1
+
+    loaded = store.load("r1:1")
+    assert loaded is not None
+    assert loaded.memory_snapshot == {"big": BIG, "small": "ok", "n": 1}
+
+
+def test_sqlite_store_gc_after_delete(tmp_path: Path) -> None:
+    """Blobs survive while any checkpoint references them."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"), blob_threshold=1024)
+
+    store.save("r1:0", _ck(0, big=BIG))
+    store.save("r1:1", _ck(1, big=BIG))
+    # Overwriting a key must not leak its previous reference
+    store.save("r1:1", _ck(1, big=BIG))
+
+    assert store.delete("r1:0") is True
+    assert store.gc_blobs() == 0
+    loaded = store.load("r1:1")
+    assert loaded is not None
+    assert loaded.memory_snapshot["big"] == BIG
+
+    assert store.delete("r1:1") is True
+    assert store.gc_blobs() == 1
+
+
+def test_sqlite_failed_save_rolls_back_blob_refs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Blob puts commit with the checkpoint rows, so a failed save leaves no stray references."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"), blob_threshold=1024)
+    store.save("r1:0", _ck(0, big=BIG))
+
+    def crash(*args: object) -> None:
+        raise RuntimeError("crash")
+
+    monkeypatch.setattr(checkpoint_sqlite, "encode_row", crash)
+    with pytest.raises(RuntimeError):
+        store.save_many([("r1:1", _ck(1, big=BIG, other="y" * 5000))])
+    monkeypatch.undo()
+
+    assert store.blobs.stats()["blobs"] == 1
+    assert store.delete("r1:0") is True
+    assert store.gc_blobs() == 1
+    store.close()
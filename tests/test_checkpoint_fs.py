@@ -1,9 +1,13 @@
 """Test filesystem checkpoint store."""
 
+import json
 from pathlib import Path
 
+import pytest
+
 from src.core.resume import Checkpoint
-from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_fs import INDEX_FILE, FileCheckpointStore
+from src.orchestrator.errors import CheckpointCorruptError
 
 
 def test_checkpoint_save_and_load(tmp_path: Path) -> None:
@@ -42,5 +46,79 @@ def test_checkpoint_key_sanitization(tmp_path: Path) -> None:
 
     store.save("run:id:with:colons", checkpoint)
 
-    # Should create file with __ instead of :
-    assert (tmp_path / "checkpoints" / "run__id__with__colons.json").exists()
+    # Run id "run:id:with" maps to a single directory with __ instead of :
+    path = store._path("run:id:with:colons")
+    assert path.exists()
+    assert path.name == "colons.json"
+    assert path.parent.name == "run__id__with"
+    assert store.load("run:id:with:colons") is not None
+
+
+def test_checkpoint_sharded_layout_and_index(tmp_path: Path) -> None:
+    """Checkpoints live in a per-run directory with an index of the latest key."""
+    root = tmp_path / "checkpoints"
+    store = FileCheckpointStore(root=str(root))
+    for i in (0, 2, 1):
+        store.save(f"r1:{i}", Checkpoint(run_id="r1", step_index=i, stage=f"s{i}"))
+
+    run_dir = store._path("r1:0").parent
+    assert run_dir.parent.parent == root
+    index = json.loads((run_dir / INDEX_FILE).read_text(encoding="utf-8"))
+    assert index["last"] == "2"
+    assert set(index["keys"]) == {"0", "1", "2"}
+    assert not list(root.glob("*.json"))  # nothing left in the flat root
+
+    assert store.find_last_key("r1") == "r1:2"
+    assert store.find_key("r1", 1) == "r1:1"
+    assert store.find_key("r1", 5) is None
+
+    assert store.delete("r1:2")
+    assert store.find_last_key("r1") == "r1:1"
+
+
+def test_checkpoint_index_rebuilt_when_stale(tmp_path: Path) -> None:
+    """A missing or stale index is rebuilt from the run directory."""
+    store = FileCheckpointStore(root=str(tmp_path / "checkpoints"))
+    store.save("r1:0", Checkpoint(run_id="r1", step_index=0, stage="a"))
+    store.save("r1:3", Checkpoint(run_id="r1", step_index=3, stage="b"))
+
+    store._path("r1:3").unlink()  # simulate a crash that lost the newest file
+    assert store.find_last_key("r1") == "r1:0"
+
+    (store._path("r1:0").parent / INDEX_FILE).unlink()
+    assert store.find_last_key("r1") == "r1:0"
+
+
+def test_checkpoint_legacy_flat_layout_readable(tmp_path: Path) -> None:
+    """Checkpoints written by the old flat layout can still be found and loaded."""
+    root = tmp_path / "checkpoints"
+    root.mkdir()
+    legacy = Checkpoint(run_id="old", step_index=4, stage="s", memory_snapshot={"k": 1})
+    (root / "old__4.json").write_text(legacy.to_json(), encoding="utf-8")
+
+    store = FileCheckpointStore(root=str(root))
+    assert store.find_last_key("old") == "old:4"
+    assert store.find_key("old", 4) == "old:4"
+    loaded = store.load("old:4")
+    assert loaded is not None
+    assert loaded.memory_snapshot == {"k": 1}
+
+
+def test_checkpoint_corrupt_file_raises(tmp_path: Path) -> None:
+    """A torn checkpoint is reported instead of being treated as missing."""
+    store = FileCheckpointStore(root=str(tmp_path / "checkpoints"))
+    store.save("r1:0", Checkpoint(run_id="r1", step_index=0, stage="a"))
+    store._path("r1:0").write_text('{"run_id": "r1", "step_', encoding="utf-8")
+
+    with pytest.raises(CheckpointCorruptError):
+        store.load("r1:0")
+
+
+def test_checkpoint_writes_leave_no_temp_files(tmp_path: Path) -> None:
+    """Atomic writes rename their temp files into place."""
+    store = FileCheckpointStore(root=str(tmp_path / "checkpoints"))
+    store.save_many(
+        [(f"r1:{i}", Checkpoint(run_id="r1", step_index=i, stage="s")) for i in range(5)]
+    )
+
+    assert not list((tmp_path / "checkpoints").rglob("*.tmp"))
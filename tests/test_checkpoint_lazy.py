@@ -0,0 +1,124 @@
+"""Tests for lazy, key-selective checkpoint loading."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import pytest
+
+from src.core.resume import Checkpoint, CheckpointStore
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_lazy import LazySnapshot, load_keys, load_lazy
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.errors import CheckpointCorruptError
+from src.orchestrator.resume_plan import replay_memory
+
+SNAPSHOT = {
+    "req.content": "héllo",
+    "req.review": {"score": 0.9, "approved": True, "issues": []},
+    "req.list": [1, 2.5, None],
+    "flag": False,
+    "nothing": None,
+    "count": 3,
+    "big": "x" * 100_000,
+}
+
+
+def test_fs_load_keys_reads_only_requested_values(tmp_path: Path) -> None:
+    """Values outside the requested keys are never decoded."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    store.save("r1:0", Checkpoint("r1", 0, "req", dict(SNAPSHOT)))
+    assert store.load_keys("r1:0", ["req.review", "flag", "missing"]) == {
+        "req.review": SNAPSHOT["req.review"],
+        "flag": False,
+    }
+
+    # Damage the large value in place (same size, so the offsets stay valid)
+    path = store._path("r1:0")
+    raw = path.read_bytes()
+    start = raw.index(b'"xxxx')
+    path.write_bytes(raw[:start] + b"!" * 100_002 + raw[start + 100_002 :])
+
+    assert store.load_keys("r1:0", ["req.content"]) == {"req.content": "héllo"}
+    with pytest.raises(CheckpointCorruptError):
+        store.load("r1:0")
+
+
+def test_fs_stale_sidecar_falls_back_to_full_load(tmp_path: Path) -> None:
+    """A checkpoint rewritten without its sidecar is still read correctly."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    store.save("r1:0", Checkpoint("r1", 0, "req", {"a": 1}))
+    store._path("r1:0").write_text(
+        Checkpoint("r1", 0, "req", {"a": 2, "b": 3}).to_json(), encoding="utf-8"
+    )
+    assert store.load_keys("r1:0", ["a"]) == {"a": 2}
+    assert dict(store.load_lazy("r1:0").memory_snapshot) == {"a": 2, "b": 3}
+    assert store.load_keys("r1:missing", ["a"]) is None
+
+
+def test_fs_lazy_checkpoint_decodes_on_access(tmp_path: Path) -> None:
+    """load_lazy returns header fields eagerly and values on demand."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    store.save("r1:0", Checkpoint("r1", 0, "req", dict(SNAPSHOT), extra={"approved": True}))
+
+    ck = store.load_lazy("r1:0")
+    snapshot = ck.memory_snapshot
+    assert isinstance(snapshot, LazySnapshot)
+    assert ck.stage == "req" and ck.extra == {"approved": True}
+    assert list(snapshot) == list(SNAPSHOT)
+    assert snapshot.loaded == []
+    assert snapshot["count"] == 3
+    assert snapshot.loaded == ["count"]
+    assert snapshot.to_dict() == SNAPSHOT
+    # Lazy checkpoints can be saved again as-is
+    assert Checkpoint.to_dict(ck)["memory_snapshot"] == SNAPSHOT
+
+
+def test_fs_load_keys_resolves_blobs(tmp_path: Path) -> None:
+    """Deduplicated values are resolved for the selected keys."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"), blob_threshold=1024)
+    store.save("r1:0", Checkpoint("r1", 0, "req", dict(SNAPSHOT)))
+    assert store.load_keys("r1:0", ["big"]) == {"big": SNAPSHOT["big"]}
+
+
+@pytest.mark.parametrize("serializer", ["json", "pickle"])
+def test_sqlite_load_keys(tmp_path: Path, serializer: str) -> None:
+    """SQLite returns selected keys with their JSON types intact."""
+    store = SQLiteCheckpointStore(db_path=str(tmp_path / "cp.db"), serializer=serializer)
+    store.save("r1:0", Checkpoint("r1", 0, "req", dict(SNAPSHOT), extra={"score": 1.0}))
+
+    keys = ["req.review", "req.list", "flag", "nothing", "count", "req.content", "missing"]
+    assert store.load_keys("r1:0", keys) == {k: SNAPSHOT[k] for k in keys if k in SNAPSHOT}
+    assert store.load_keys("r1:9", ["flag"]) is None
+
+    ck = store.load_lazy("r1:0")
+    assert ck.extra == {"score": 1.0}
+    assert ck.memory_snapshot["flag"] is False
+    assert dict(ck.memory_snapshot) == SNAPSHOT
+    store.close()
+
+
+def test_load_keys_falls_back_for_plain_stores() -> None:
+    """Stores without selective loading are read in full."""
+    store = CheckpointStore()
+    store.save("r1:0", Checkpoint("r1", 0, "req", {"a": 1, "b": 2}))
+    assert load_keys(store, "r1:0", ["b"]) == {"b": 2}
+    assert load_lazy(store, "r1:0").memory_snapshot == {"a": 1, "b": 2}
+
+
+def test_replay_decodes_each_key_once() -> None:
+    """Replaying cumulative snapshots fetches every key from its newest snapshot only."""
+    fetched: List[str] = []
+
+    def snapshot(values: Dict[str, Any]) -> LazySnapshot:
+        def fetch(keys: Sequence[str]) -> Dict[str, Any]:
+            fetched.extend(keys)
+            return {k: values[k] for k in keys}
+
+        return LazySnapshot(values, fetch)
+
+    cks = [
+        Checkpoint("r", 0, "a", snapshot({"a.content": "1"}), timestamp=1.0),  # type: ignore[arg-type]
+        Checkpoint("r", 1, "b", snapshot({"a.content": "1", "b.content": "2"}), timestamp=2.0),  # type: ignore[arg-type]
+    ]
+    assert replay_memory(cks) == {"a.content": "1", "b.content": "2"}
+    assert sorted(fetched) == ["a.content", "b.content"]
@@ -0,0 +1,94 @@
+"""Tests for pooled SQLite connections in the checkpoint store."""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from src.core.resume import Checkpoint
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.sqlite_pool import SQLiteConnectionPool
+
+
+def test_pool_reuses_connection_per_thread(tmp_path: Path) -> None:
+    """Each thread gets one connection, reused across calls."""
+    pool = SQLiteConnectionPool(str(tmp_path / "p.db"))
+    main = pool.connection()
+    assert pool.connection() is main
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(pool.connection()))
+    t.start()
+    t.join()
+    assert other[0] is not main
+    pool.close()
+
+
+def test_pool_applies_pragmas(tmp_path: Path) -> None:
+    """Default and overridden PRAGMAs are set on new connections."""
+    pool = SQLiteConnectionPool(str(tmp_path / "p.db"), pragmas={"synchronous": "NORMAL"})
+    cx = pool.connection()
+    assert cx.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert cx.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    pool.close()
+
+
+def test_store_concurrent_saves(tmp_path: Path) -> None:
+    """Saves from several threads all land in the database."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"))
+
+    def worker(run: str) -> None:
+        for i in range(25):
+            store.save(f"{run}:{i}", Checkpoint(run, i, "s", {"i": i}))
+
+    threads = [threading.Thread(target=worker, args=(f"r{n}",)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for n in range(4):
+        assert store.find_last_key(f"r{n}") == f"r{n}:24"
+    store.close()
+
+
+def test_save_many_restores_synchronous(tmp_path: Path) -> None:
+    """Unsynced bulk saves do not leave synchronous=OFF on the connection."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"))
+    store.save_many([(f"r:{i}", Checkpoint("r", i, "s")) for i in range(10)], sync=False)
+
+    assert store.find_last_key("r") == "r:9"
+    cx = store._pool.connection()
+    assert cx.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    store.close()
+
+
+def test_synced_saves_commit_with_full(tmp_path: Path) -> None:
+    """sync=True commits under synchronous=FULL even if the pool opted into NORMAL."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"), pragmas={"synchronous": "NORMAL"})
+    cx = store._pool.connection()
+    statements: list = []
+    cx.set_trace_callback(statements.append)
+    store.save("r:0", Checkpoint("r", 0, "s"))
+    cx.set_trace_callback(None)
+
+    pragmas = [s for s in statements if s.startswith("PRAGMA synchronous")]
+    assert pragmas == ["PRAGMA synchronous=FULL;", "PRAGMA synchronous=NORMAL;"]
+    assert cx.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    store.close()
+
+
+def test_close_releases_connections(tmp_path: Path) -> None:
+    """close() closes pooled connections; later calls reconnect."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"))
+    store.save("r:0", Checkpoint("r", 0, "s"))
+    old = store._pool.connection()
+    store.close()
+
+    try:
+        old.execute("SELECT 1")
+        raised = False
+    except sqlite3.ProgrammingError:
+        raised = True
+    assert raised
+    assert store.load("r:0") is not None
+    store.close()
@@ -0,0 +1,110 @@
+"""Tests for the background group-commit checkpoint writer."""
+
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from src.core.resume import Checkpoint, CheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.checkpoint_writer import AsyncCheckpointWriter
+from src.orchestrator.errors import CheckpointWriteError
+from src.orchestrator.factory import advisor_factory, agent_factory
+from src.orchestrator.runner import Orchestrator, PipelineStep
+
+
+class _RecordingStore(CheckpointStore):
+    """In-memory store that records the size of every bulk write."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: List[int] = []
+
+    def save_many(self, items: Sequence[Tuple[str, Checkpoint]], sync: bool = True) -> None:
+        self.batches.append(len(items))
+        for key, ck in items:
+            self.save(key, ck)
+
+
+class _FailingStore(CheckpointStore):
+    def save(self, key: str, checkpoint: Checkpoint) -> None:
+        raise OSError("disk full")
+
+
+@pytest.mark.parametrize("durability", ["none", "batched", "per-step"])
+def test_writer_persists_everything_on_flush(tmp_path: Path, durability: str) -> None:
+    """All queued checkpoints are visible to reads after flush."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"))
+    writer = AsyncCheckpointWriter(store, durability=durability)  # type: ignore[arg-type]
+
+    for i in range(20):
+        writer.save(f"r1:{i}", Checkpoint("r1", i, f"s{i}", {"i": i}))
+
+    # Reads flush first, so resume never misses a queued checkpoint
+    assert writer.find_last_key("r1") == "r1:19"
+    loaded = writer.load("r1:7")
+    assert loaded is not None
+    assert loaded.memory_snapshot == {"i": 7}
+    writer.close()
+
+
+@pytest.mark.parametrize("durability,level", [("per-step", "FULL"), ("none", "OFF")])
+def test_writer_sets_sqlite_synchronous(tmp_path: Path, durability: str, level: str) -> None:
+    """Durability picks the commit's synchronous level, overriding the pool's NORMAL."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"), pragmas={"synchronous": "NORMAL"})
+    writer = AsyncCheckpointWriter(store, durability=durability)  # type: ignore[arg-type]
+    statements: List[str] = []
+    writer.save("r:0", Checkpoint("r", 0, "s"))  # The worker thread opens its connection
+    writer.flush()
+    for _, cx in store._pool._conns.values():
+        cx.set_trace_callback(statements.append)
+
+    writer.save("r:1", Checkpoint("r", 1, "s"))
+    writer.close()
+    assert f"PRAGMA synchronous={level};" in statements
+
+
+def test_writer_groups_writes_into_batches() -> None:
+    """Checkpoints queued behind an in-flight write are committed together."""
+    store = _RecordingStore()
+    writer = AsyncCheckpointWriter(store, durability="batched", max_batch=8)
+
+    for i in range(50):
+        writer.save(f"r:{i}", Checkpoint("r", i, "s"))
+    writer.close()
+
+    assert sum(store.batches) == 50
+    assert max(store.batches) <= 8
+
+
+def test_writer_surfaces_background_errors() -> None:
+    """A failed background write is raised from flush()."""
+    writer = AsyncCheckpointWriter(_FailingStore(), durability="batched")
+    writer.save("r:0", Checkpoint("r", 0, "s"))
+
+    with pytest.raises(CheckpointWriteError):
+        writer.flush()
+    writer.close()
+
+
+def test_orchestrator_flushes_writer_at_run_end(tmp_path: Path) -> None:
+    """Run end flushes the writer so checkpoints are durable when run() returns."""
+    store = SQLiteCheckpointStore(str(tmp_path / "cp.db"))
+    writer = AsyncCheckpointWriter(store, durability="batched")
+    orch = Orchestrator(agent_factory, advisor_factory, checkpoint_store=writer)
+    orch.memory.set("product_idea", "Writer test")
+
+    orch.run(
+        [
+            PipelineStep(
+                stage="requirements",
+                agent="RequirementsDraftingAgent",
+                advisor="RequirementsAdvisor",
+                task="PRD for {product_idea}",
+                max_retries=0,
+            )
+        ]
+    )
+
+    assert store.find_last_key(orch.run_id) == f"{orch.run_id}:0"
+    writer.close()
@@ -2,7 +2,9 @@
 
 from pathlib import Path
 
-from src.orchestrator.eventlog import JsonlEventLog
+import pytest
+
+from src.orchestrator.eventlog import BufferedJsonlEventLog, JsonlEventLog
 
 
 def test_eventlog_emits_events(tmp_path: Path) -> None:
@@ -42,3 +44,92 @@ def test_eventlog_creates_parent_dirs(tmp_path: Path) -> None:
 
     assert log_path.exists()
     assert log_path.parent.exists()
+
+
+def _read(path: Path) -> list:
+    import json
+
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_buffered_eventlog_flushes_on_demand_and_on_close(tmp_path: Path) -> None:
+    """Buffered events reach the file on flush() and close(); emit after close still works."""
+    log_path = tmp_path / "events.jsonl"
+    log = BufferedJsonlEventLog(path=str(log_path), flush_interval=60.0)
+
+    log.emit("a", n=1)
+    log.flush()
+    assert [e["event"] for e in _read(log_path)] == ["a"]
+
+    log.emit("b", n=2)
+    log.close()
+    log.emit("c", n=3)
+    log.close()
+    assert [e["n"] for e in _read(log_path)] == [1, 2, 3]
+
+
+def test_buffered_eventlog_time_threshold(tmp_path: Path) -> None:
+    """Pending lines are written once flush_interval elapses."""
+    import time
+
+    log_path = tmp_path / "events.jsonl"
+    log = BufferedJsonlEventLog(path=str(log_path), flush_interval=0.05)
+    log.emit("tick")
+    deadline = time.time() + 5
+    while not (log_path.exists() and log_path.stat().st_size) and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(_read(log_path)) == 1
+    log.close()
+
+
+def test_buffered_eventlog_concurrent_emitters(tmp_path: Path) -> None:
+    """Lines from many threads are all written, whole and unmangled."""
+    import threading
+
+    log_path = tmp_path / "events.jsonl"
+    log = BufferedJsonlEventLog(path=str(log_path), max_batch=16, max_queue=8)
+
+    def emitter(t: int) -> None:
+        for i in range(200):
+            log.emit("step", thread=t, i=i, payload="x" * 100)
+
+    threads = [threading.Thread(target=emitter, args=(t,)) for t in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.close()
+
+    events = _read(log_path)
+    assert len(events) == 800
+    for t in range(4):
+        assert [e["i"] for e in events if e["thread"] == t] == list(range(200))
+
+
+def test_buffered_eventlog_reports_write_errors(tmp_path: Path) -> None:
+    """An unwritable path fails flush()/close() instead of hanging or dropping silently."""
+    log = BufferedJsonlEventLog(path=str(tmp_path))  # A directory cannot be opened
+    log.emit("a")
+    with pytest.raises(OSError):
+        log.flush()
+
+    log.emit("b")
+    with pytest.raises(OSError):
+        log.close()
+    log.close()
+
+
+def test_buffered_eventlog_drop_backpressure(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With "drop", a full queue discards events instead of blocking."""
+    log = BufferedJsonlEventLog(
+        path=str(tmp_path / "events.jsonl"), max_queue=2, backpressure="drop"
+    )
+    monkeypatch.setattr(log, "_ensure_thread", lambda: None)  # Stalled flusher
+    for i in range(5):
+        log.emit("step", i=i)
+    assert log.dropped == 3
+    assert log._queue.qsize() == 2
+    with pytest.raises(ValueError):
+        BufferedJsonlEventLog(path=str(tmp_path / "x.jsonl"), backpressure="spill")  # type: ignore[arg-type]
@@ -0,0 +1,90 @@
+"""Tests for the SQLite event store."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.orchestrator.eventlog_sqlite import (
+    EventQuery,
+    SQLiteEventLog,
+    aggregate_events,
+    import_jsonl,
+    percentile,
+    query_events,
+)
+
+
+def _fill(db: str, runs: int = 5) -> None:
+    log = SQLiteEventLog(db_path=db, max_batch=7)
+    for r in range(runs):
+        for stage, base in (("plan", 10), ("build", 100)):
+            log.emit("step_start", run_id=f"r{r}", stage=stage)
+            log.emit("step_end", run_id=f"r{r}", stage=stage, duration_ms=base + r)
+    log.close()
+
+
+def test_sink_indexes_and_queries(tmp_path: Path) -> None:
+    """Events are filtered on indexed columns and returned newest first."""
+    db = str(tmp_path / "events.db")
+    _fill(db)
+
+    events = query_events(db, EventQuery(run_id="r4", event="step_end"))
+    assert [e["stage"] for e in events] == ["build", "plan"]
+    assert events[0]["duration_ms"] == 104
+    assert len(query_events(db, EventQuery(), limit=None)) == 20
+
+    plan = sqlite3.connect(db).execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM events WHERE stage='plan' AND event='step_end'"
+    )
+    assert "idx_events_stage" in " ".join(str(row) for row in plan)
+
+
+def test_aggregates_per_stage_over_last_runs(tmp_path: Path) -> None:
+    """Percentiles of a field are computed per group over the most recent runs."""
+    db = str(tmp_path / "events.db")
+    _fill(db)
+
+    rows = aggregate_events(
+        db,
+        EventQuery(event="step_end", last_runs=3),
+        field="duration_ms",
+        aggregates=["count", "min", "max", "p50"],
+        group_by="stage",
+    )
+    assert rows == [
+        {"stage": "build", "count": 3, "min": 102.0, "max": 104.0, "p50": 103.0},
+        {"stage": "plan", "count": 3, "min": 12.0, "max": 14.0, "p50": 13.0},
+    ]
+    counts = aggregate_events(db, EventQuery(), group_by="event")
+    assert counts == [{"event": "step_end", "count": 10}, {"event": "step_start", "count": 10}]
+
+    with pytest.raises(ValueError):
+        aggregate_events(db, EventQuery(), aggregates=["p95"])
+    with pytest.raises(ValueError):
+        aggregate_events(db, EventQuery(), field="duration_ms", aggregates=["median"])
+
+
+def test_percentile_interpolates() -> None:
+    """Percentiles interpolate between ranks like numpy's default."""
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 95) == 5
+    assert percentile([10, 20, 30, 40, 50], 95) == pytest.approx(48.0)
+
+
+def test_import_jsonl_is_incremental(tmp_path: Path) -> None:
+    """Backfill skips unchanged files and replaces the rows of changed ones."""
+    log_file = tmp_path / "r1_events.jsonl"
+    lines = [{"ts": 1.0 + i, "event": "step_end", "run_id": "r1", "stage": "s"} for i in range(3)]
+    log_file.write_text("\n".join(json.dumps(e) for e in lines) + "\nnot json\n")
+    db = str(tmp_path / "events.db")
+
+    stats = import_jsonl(db, [str(log_file)], batch_size=2)
+    assert stats == {"files": 1, "events": 3, "skipped_files": 0, "bad_lines": 1}
+    assert import_jsonl(db, [str(log_file)])["skipped_files"] == 1
+
+    with log_file.open("a") as f:
+        f.write(json.dumps({"ts": 9.0, "event": "step_end", "run_id": "r1"}) + "\n")
+    assert import_jsonl(db, [str(log_file)])["events"] == 4
+    assert len(query_events(db, EventQuery(run_id="r1"), limit=None)) == 4
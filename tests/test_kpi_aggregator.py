@@ -0,0 +1,66 @@
+"""Tests for KPI aggregation and the in-process hard test runner."""
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from scripts.hard_test import run_in_process
+from scripts.kpi_aggregator import aggregate_kpis, aggregate_runs, generate_kpi_markdown, write_kpis
+
+PIPELINE = Path(__file__).resolve().parent.parent / "pipeline" / "hard_test.yaml"
+
+
+def _run(*durations: int) -> dict:
+    return {
+        "history": [
+            {"stage": f"s{i}", "approved": True, "score": 0.9, "duration_ms": d, "phases_ms": {}}
+            for i, d in enumerate(durations)
+        ]
+    }
+
+
+def test_total_duration_comes_from_step_timings() -> None:
+    """total_duration_ms sums duration_ms, falling back to phases_ms for older results."""
+    assert aggregate_kpis(_run(10, 20))["total_duration_ms"] == 30
+    legacy = {"history": [{"stage": "a", "phases_ms": {"agent_call": 4.6, "review": 1.0}}]}
+    assert aggregate_kpis(legacy)["total_duration_ms"] == 5
+
+
+def test_aggregate_runs_reports_percentiles(tmp_path: Path) -> None:
+    """Repeated runs give per-run and per-stage timing distributions."""
+    runs = [_run(10 * i, 5) for i in range(1, 11)]
+    kpis = aggregate_runs(runs, wall_ms=[float(i) for i in range(1, 11)])
+    assert kpis["iterations"] == 10 and kpis["stages"] == 2
+    assert kpis["approved_ratio"] == 1.0
+    assert kpis["total_duration_ms"] == pytest.approx(60.0)
+    assert kpis["total_duration_ms_p95"] == pytest.approx(100.5)
+    assert kpis["wall_ms_p50"] == pytest.approx(5.5)
+    assert kpis["stage_ms"]["s0"]["n"] == 10 and kpis["stage_ms"]["s1"]["p99"] == 5
+
+    write_kpis(str(tmp_path), kpis)
+    with open(tmp_path / "kpis.csv", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    assert "stage_ms" not in header and "total_duration_ms_p99" in header
+    assert json.loads((tmp_path / "kpis.json").read_text())["stage_ms"]["s0"]["p50"] == 55.0
+    generate_kpi_markdown(kpis, str(tmp_path / "KPIS.md"))
+    assert "| s0 | 10 | 55.0 |" in (tmp_path / "KPIS.md").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_run_in_process_collects_stage_timings(tmp_path: Path, parallel: bool) -> None:
+    """The in-process runner repeats the pipeline and reads the runners' own timings."""
+    kpis = run_in_process(
+        str(PIPELINE),
+        iterations=3,
+        concurrency=2,
+        parallel=parallel,
+        out_dir=str(tmp_path),
+    )
+    assert kpis["iterations"] == 3 and kpis["exit_code"] == 0
+    assert kpis["stages"] == 10
+    assert all(t["n"] == 3 for t in kpis["stage_ms"].values())
+    assert kpis["phase_ms"]["agent_call"]["n"] >= 30
+    assert kpis["wall_ms_p50"] > 0
+    assert len(list((tmp_path / "events").glob("*.jsonl"))) == 3
@@ -0,0 +1,196 @@
+"""Tests for streaming, incremental cross-run KPI aggregation."""
+
+import csv
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from scripts.benchlib import Workload, chain, factories, percentile, to_steps
+from scripts.kpi_stream import PARQUET_AVAILABLE, LatencySketch, aggregate, main
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.eventlog_sqlite import SQLiteEventLog
+from src.orchestrator.runner import Orchestrator, PipelineStep
+
+HOUR = 1_700_000_000 - 1_700_000_000 % 3600
+
+
+def _event(event: str, **data) -> str:
+    return json.dumps({"event": event, **data}) + "\n"
+
+
+def _step_end(run_id: str, stage: str, ts: float, ms: float, approved: bool = True, **kw) -> str:
+    return _event(
+        "step_end",
+        ts=ts,
+        run_id=run_id,
+        stage=stage,
+        agent=f"{stage}_agent",
+        approved=approved,
+        duration_ms=ms,
+        **kw,
+    )
+
+
+def _rows(path: Path) -> list:
+    with path.open(encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_sketch_percentiles_are_within_relative_accuracy() -> None:
+    """Sketch percentiles stay within ~1% of exact ones, and merged sketches match one sketch."""
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(3, 1) for _ in range(5000)]
+    whole, a, b = LatencySketch(), LatencySketch(), LatencySketch()
+    for i, v in enumerate(samples):
+        whole.add(v)
+        (a if i % 2 else b).add(v)
+    a.merge(b)
+    for q in (50, 95, 99):
+        exact = percentile(samples, q)
+        assert whole.quantile(q) == pytest.approx(exact, rel=0.03)
+        assert a.quantile(q) == whole.quantile(q)
+    assert len(whole.buckets) < 1000
+    restored = LatencySketch.from_dict(json.loads(json.dumps(whole.to_dict())))
+    assert restored.quantile(95) == whole.quantile(95) and restored.max == max(samples)
+
+
+def test_event_logs_aggregate_per_stage_agent_and_window(tmp_path: Path) -> None:
+    """Failure rates, cache hit rates and percentiles come out per window and stage/agent."""
+    log = tmp_path / "runs" / "r1_events.jsonl"
+    log.parent.mkdir()
+    lines = [_event("cache_hit", ts=HOUR + 1, run_id="r1", stage="plan", agent="PlanAgent")]
+    lines += [_step_end("r1", "plan", HOUR + 2, 10.0)]
+    lines += [_step_end("r1", "build", HOUR + 3 + i, 100.0 + i, approved=i != 0) for i in range(4)]
+    lines += [
+        _step_end("r2", "build", HOUR + 3600 + 5, 50.0, approved=False, error_reason="timeout")
+    ]
+    log.write_text("".join(lines), encoding="utf-8")
+
+    summary = aggregate([str(tmp_path / "runs")], out_dir=str(tmp_path / "kpi"), window="hour")
+    assert summary["sources_scanned"] == 1
+
+    rows = _rows(tmp_path / "kpi" / "stage_kpis.csv")
+    by_key = {(r["window_start"], r["stage"]): r for r in rows}
+    assert len(by_key) == 3
+    first, second = sorted({r["window_start"] for r in rows})
+    plan = by_key[(first, "plan")]
+    assert plan["cache_hit_rate"] == "1.0" and plan["cache_hits"] == "1"
+    build = by_key[(first, "build")]
+    assert build["steps"] == "4" and build["failure_rate"] == "0.25"
+    assert build["cache_hit_rate"] == "0.0"
+    assert float(build["duration_p50_ms"]) == pytest.approx(101.5, rel=0.02)
+    assert float(build["duration_max_ms"]) == 103.0
+    late = by_key[(second, "build")]
+    assert late["timeouts"] == "1" and late["failure_rate"] == "1.0"
+
+    agents = _rows(tmp_path / "kpi" / "agent_kpis.csv")
+    assert {r["agent"] for r in agents} == {"plan_agent", "build_agent"}
+
+
+def test_incremental_runs_read_only_new_events(tmp_path: Path) -> None:
+    """A second aggregation reads appended lines only and skips unchanged sources."""
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    a, b = logs / "a.jsonl", logs / "b.jsonl"
+    a.write_text(_step_end("ra", "s", HOUR, 5.0), encoding="utf-8")
+    b.write_text(_step_end("rb", "s", HOUR, 5.0), encoding="utf-8")
+    out = str(tmp_path / "kpi")
+
+    assert aggregate([str(logs)], out_dir=out, window="all")["sources_scanned"] == 2
+
+    # A run still writing: its partial last line is left for the next aggregation
+    with a.open("a", encoding="utf-8") as f:
+        f.write(_step_end("ra", "s", HOUR, 7.0))
+        f.write(_step_end("ra", "s", HOUR, 9.0)[:20])
+    summary = aggregate([str(logs)], out_dir=out, window="all")
+    assert summary["sources_scanned"] == 1 and summary["sources_skipped"] == 1
+    assert _rows(tmp_path / "kpi" / "stage_kpis.csv")[0]["steps"] == "3"
+
+    with a.open("a", encoding="utf-8") as f:
+        f.write(_step_end("ra", "s", HOUR, 9.0)[20:])
+    aggregate([str(logs)], out_dir=out, window="all")
+    (row,) = _rows(tmp_path / "kpi" / "stage_kpis.csv")
+    assert row["steps"] == "4" and row["window_start"] == ""
+    assert float(row["duration_max_ms"]) == 9.0
+
+    assert aggregate([str(logs)], out_dir=out, window="all")["sources_scanned"] == 0
+    with pytest.raises(ValueError, match="--rebuild"):
+        aggregate([str(logs)], out_dir=out, window="day")
+    aggregate([str(logs)], out_dir=out, window="day", rebuild=True)
+    assert _rows(tmp_path / "kpi" / "stage_kpis.csv")[0]["steps"] == "4"
+
+
+def test_parallel_scan_matches_serial(tmp_path: Path) -> None:
+    """Scanning files in worker processes merges to the same tables."""
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    rng = random.Random(1)
+    for f in range(4):
+        lines = [
+            _step_end(f"r{f}", f"s{i % 3}", HOUR + i * 60, rng.uniform(1, 500), i % 7 != 0)
+            for i in range(200)
+        ]
+        (logs / f"r{f}.jsonl").write_text("".join(lines), encoding="utf-8")
+
+    aggregate([str(logs)], out_dir=str(tmp_path / "serial"), window="hour")
+    aggregate([str(logs)], out_dir=str(tmp_path / "par"), window="hour", jobs=2)
+    for name in ("stage_kpis.csv", "agent_kpis.csv"):
+        serial = _rows(tmp_path / "serial" / name)
+        par = _rows(tmp_path / "par" / name)
+        assert len(serial) == len(par) > 0
+        for x, y in zip(serial, par):
+            assert {k: v for k, v in x.items() if k != "duration_mean_ms"} == {
+                k: v for k, v in y.items() if k != "duration_mean_ms"
+            }
+            assert float(x["duration_mean_ms"]) == pytest.approx(float(y["duration_mean_ms"]))
+
+
+def test_real_run_sources(tmp_path: Path) -> None:
+    """Event DBs, checkpoint DBs and result JSONs of real runs are aggregated incrementally."""
+    agent_factory, advisor_factory = factories(Workload(output_bytes=16))
+    data = tmp_path / "data"
+    data.mkdir()
+    store = SQLiteCheckpointStore(db_path=str(data / "checkpoints.db"))
+    events = SQLiteEventLog(db_path=str(data / "events.db"))
+    steps = to_steps(chain(3), PipelineStep)
+
+    def run_once() -> dict:
+        orch = Orchestrator(agent_factory, advisor_factory, store)
+        orch.eventlog = events
+        result = orch.run(steps)
+        events.flush()
+        return result
+
+    result = run_once()
+    (data / "result.json").write_text(json.dumps(result, default=str), encoding="utf-8")
+    (data / "kpis.json").write_text(json.dumps({"stages": 3}), encoding="utf-8")
+    out = str(tmp_path / "kpi")
+
+    summary = aggregate([str(data)], out_dir=out, window="all")
+    assert summary["sources_scanned"] == 3
+    # Event DB and result JSON record agents; each stage is counted from all three sources
+    (s0,) = [r for r in _rows(tmp_path / "kpi" / "stage_kpis.csv") if r["stage"] == "s0"]
+    assert s0["steps"] == "3" and s0["failures"] == "0"
+    (a0,) = [r for r in _rows(tmp_path / "kpi" / "agent_kpis.csv") if r["agent"] == "s0"]
+    assert a0["steps"] == "2"
+
+    run_once()
+    summary = aggregate([str(data)], out_dir=out, window="all")
+    assert summary["sources_scanned"] == 2  # The result JSON and kpis.json did not change
+    (s0,) = [r for r in _rows(tmp_path / "kpi" / "stage_kpis.csv") if r["stage"] == "s0"]
+    assert s0["steps"] == "5"
+    events.close()
+    store.close()
+
+
+def test_main_writes_tables_and_rejects_missing_parquet(tmp_path: Path, capsys) -> None:
+    log = tmp_path / "x.jsonl"
+    log.write_text(_step_end("r", "s", HOUR, 1.0), encoding="utf-8")
+    out = tmp_path / "kpi"
+    assert main([str(log), "--out", str(out), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["sources_scanned"] == 1
+    assert (out / "stage_kpis.csv").exists() and (out / "kpi_state.json").exists()
+    if not PARQUET_AVAILABLE:
+        assert main([str(log), "--out", str(out), "--format", "parquet"]) == 2
@@ -0,0 +1,96 @@
+"""Tests for liveness-based memory pruning between stages."""
+
+import json
+from pathlib import Path
+from typing import List
+
+from src.core.resume import CheckpointStore
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.liveness import OFFLOAD_REF, dead_stages, last_readers, memory_size
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from tests.helpers import RecordingAgents, approve
+
+# Outputs large enough to be offloaded
+_BIG = "{name}:{task}:" + "x" * 1000
+
+
+def _steps() -> List[PipelineStep]:
+    """a feeds b and d through templates; c reads nothing upstream."""
+    return [
+        PipelineStep(stage="a", agent="a", advisor="ok", task="ta", depends_on=[]),
+        PipelineStep(stage="b", agent="b", advisor="ok", task="tb {a.content}", depends_on=["a"]),
+        PipelineStep(stage="c", agent="c", advisor="ok", task="tc", depends_on=[]),
+        PipelineStep(stage="d", agent="d", advisor="ok", task="td {{ a.content }}"),
+    ]
+
+
+def test_last_readers_uses_dependencies_and_templates() -> None:
+    """A stage stays live until its last dependent or template reader."""
+    last = last_readers(_steps())
+    assert last == {"a": 3, "b": 1, "c": 2, "d": 3}
+    assert dead_stages(last, 1) == ["b"]
+    assert set(dead_stages(last, 3)) == {"a", "b", "c", "d"}
+
+
+def test_prune_offloads_dead_outputs(tmp_path: Path) -> None:
+    """Dead outputs leave memory but the run result still contains them."""
+    agents = RecordingAgents(_BIG)
+    orch = Orchestrator(agents, approve, checkpoint_store=CheckpointStore())
+    orch.use_cache = False
+    orch.prune_memory = True
+    orch.offload_dir = str(tmp_path)
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+
+    result = orch.run(_steps())
+
+    # b was dead after its own step, so c no longer carries its content
+    assert OFFLOAD_REF in agents.contexts["c"]["b.content"]
+    # a is still read by d and stays resident until then
+    assert agents.contexts["d"]["a.content"].startswith("a:ta:")
+    assert result["memory"]["b.content"].startswith("b:tb a:ta:")
+    assert (tmp_path / orch.run_id / "_memory" / "b.content.json").exists()
+
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    sizes = {e["stage"]: e for e in events if e["event"] == "memory_size"}
+    assert set(sizes) == {"a", "b", "c", "d"}
+    assert "b.content" in sizes["b"]["pruned_keys"]
+    assert sizes["b"]["offloaded_bytes"] > 1000
+    assert sizes["a"]["pruned_keys"] == []
+
+
+def test_memory_size_reported_without_pruning(tmp_path: Path) -> None:
+    """Memory sizes are logged even when pruning is off, and nothing is offloaded."""
+    orch = Orchestrator(RecordingAgents(_BIG), approve, checkpoint_store=CheckpointStore())
+    orch.use_cache = False
+    orch.offload_dir = str(tmp_path)
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+
+    result = orch.run(_steps())
+
+    assert not (tmp_path / orch.run_id).exists()
+    assert all(OFFLOAD_REF not in str(v) for v in result["memory"].values())
+    events = (tmp_path / "events.jsonl").read_text(encoding="utf-8")
+    assert events.count('"memory_size"') == 4
+
+
+def test_memory_size_tracks_deltas_exactly(tmp_path: Path) -> None:
+    """Per-key sizes add up to the JSON size of the whole memory after every step."""
+    orch = Orchestrator(RecordingAgents(_BIG), approve, checkpoint_store=CheckpointStore())
+    orch.use_cache = False
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    orch.memory.set("seed", "é" * 100)
+    sizes: List[int] = []
+    orch.post_step_hooks.append(
+        lambda step_result, shared_memory: sizes.append(memory_size(shared_memory.to_dict()))
+    )
+
+    result = orch.run(_steps())
+
+    lines = (tmp_path / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    events = [e for e in map(json.loads, lines) if e["event"] == "memory_size"]
+    assert [e["bytes"] for e in events] == sizes
+    assert events[-1]["bytes"] == memory_size(result["memory"])
+    assert events[-1]["keys"] == len(result["memory"])
@@ -0,0 +1,170 @@
+"""Tests for the Prometheus metrics subsystem."""
+
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from src.core.base import BaseAdvisor, BaseFunctionalAgent
+from src.core.resume import CheckpointStore
+from src.core.types import AgentOutput
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.council import AdvisorCouncil
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.metrics import (
+    CHECKPOINT_BYTES,
+    COUNCIL_VOTES,
+    RETRIES,
+    REVIEWS,
+    STAGE_SECONDS,
+    STAGES,
+    STEPS_IN_FLIGHT,
+    MetricsRegistry,
+    MetricsServer,
+    write_textfile,
+)
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+
+
+class _Agent(BaseFunctionalAgent):
+    def process(self, task: str, context: Dict) -> AgentOutput:
+        return AgentOutput(content=f"out:{task}")
+
+
+class _Advisor(BaseAdvisor):
+    def __init__(self, score: float) -> None:
+        super().__init__()
+        self.score = score
+
+    def review(self, output: AgentOutput, task: str, context: Dict) -> Dict:
+        return {
+            "score": self.score,
+            "approved": self.score >= 0.5,
+            "critical_issues": [],
+            "suggestions": [],
+            "summary": "",
+            "severity": "low",
+        }
+
+
+def test_counters_sum_across_threads() -> None:
+    """Per-thread shards add up, including those of threads that have exited."""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ["kind"])
+
+    def work() -> None:
+        for _ in range(1000):
+            counter.inc(kind="a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc(2, kind="b")
+
+    assert counter.value(kind="a") == 4000
+    assert counter.value(kind="b") == 2
+    assert counter.value(kind="a") == 4000  # dead shards were folded in, not lost
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="a")
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_render_text_format() -> None:
+    """Rendering follows the Prometheus text exposition format."""
+    registry = MetricsRegistry()
+    registry.counter("req_total", "Requests", ["path"]).inc(path='/a"b')
+    gauge = registry.gauge("in_flight", "In flight")
+    gauge.inc(3)
+    gauge.dec()
+    gauge.set(5)
+    hist = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 7.0):
+        hist.observe(value)
+
+    text = registry.render()
+    assert '# TYPE req_total counter\nreq_total{path="/a\\"b"} 1\n' in text
+    assert "in_flight 5\n" in text
+    assert 'latency_seconds_bucket{le="0.1"} 2\n' in text
+    assert 'latency_seconds_bucket{le="1"} 3\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4\n' in text
+    assert "latency_seconds_sum 7.65\n" in text
+    assert "latency_seconds_count 4\n" in text
+    with pytest.raises(ValueError):
+        registry.gauge("req_total", "clash")
+
+
+def test_textfile_and_http_exporters(tmp_path: Path) -> None:
+    """The same rendering is written atomically to a file and served over HTTP."""
+    registry = MetricsRegistry()
+    registry.counter("runs_total", "Runs").inc()
+
+    path = tmp_path / "collector" / "orchestrator.prom"
+    write_textfile(str(path), registry)
+    assert path.read_text(encoding="utf-8") == registry.render()
+    assert [p.name for p in path.parent.iterdir()] == ["orchestrator.prom"]
+
+    server = MetricsServer(port=0, registry=registry).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert resp.read().decode("utf-8") == registry.render()
+    finally:
+        server.stop()
+
+
+def test_runners_and_council_feed_metrics(tmp_path: Path) -> None:
+    """Both runners record stage status, reviews, retries, latency and checkpoint bytes."""
+    stage = "metrics-seq"
+    orch = Orchestrator(
+        lambda _: _Agent(), lambda _: _Advisor(0.1), FileCheckpointStore(root=str(tmp_path))
+    )
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    orch.use_cache = False
+    before_bytes = CHECKPOINT_BYTES.value(store="fs")
+    orch.run([PipelineStep(stage=stage, agent="a", advisor="x", task="t", max_retries=2)])
+
+    assert STAGES.value(stage=stage, status="rejected") == 1
+    assert REVIEWS.value(stage=stage, outcome="rejected") == 3
+    assert RETRIES.value(stage=stage) == 2
+    assert STAGE_SECONDS.value(stage=stage) == 1
+    assert CHECKPOINT_BYTES.value(store="fs") > before_bytes
+    assert STEPS_IN_FLIGHT.value() == 0
+
+    par = OrchestratorParallel(lambda _: _Agent(), lambda _: _Advisor(0.9), CheckpointStore())
+    par.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    par.run_waves(
+        [ParallelStep(stage=f"metrics-par-{i}", agent="a", advisor="x", task="t") for i in range(3)]
+    )
+    assert all(STAGES.value(stage=f"metrics-par-{i}", status="approved") == 1 for i in range(3))
+    assert STEPS_IN_FLIGHT.value() == 0
+
+    council = AdvisorCouncil(
+        advisor_factory=lambda name: _Advisor(0.9 if name == "metrics-yes" else 0.1),
+        advisors=["metrics-yes", "metrics-no"],
+        min_score=0.5,
+    )
+    council.review(AgentOutput(content="x"), "t", {})
+    assert COUNCIL_VOTES.value(advisor="metrics-yes", vote="approve") == 1
+    assert COUNCIL_VOTES.value(advisor="metrics-no", vote="reject") == 1
+
+
+def test_failed_step_counts_as_error(tmp_path: Path) -> None:
+    """An exception inside a step is recorded as status=error and leaves nothing in flight."""
+
+    class _Broken(BaseFunctionalAgent):
+        def process(self, task: str, context: Dict) -> AgentOutput:
+            raise RuntimeError("boom")
+
+    orch = Orchestrator(lambda _: _Broken(), lambda _: _Advisor(0.9), CheckpointStore())
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    with pytest.raises(RuntimeError):
+        orch.run([PipelineStep(stage="metrics-broken", agent="a", advisor="x", task="t")])
+    assert STAGES.value(stage="metrics-broken", status="error") == 1
+    assert STEPS_IN_FLIGHT.value() == 0
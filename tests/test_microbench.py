@@ -0,0 +1,69 @@
+"""Tests for the hot-path microbenchmark suite (cli.py bench)."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from scripts.microbench import MICROBENCHES, bench_names, main, run_microbenches
+
+QUICK = ["--sizes", "small", "--repeat", "2", "--min-batch-ms", "1"]
+
+
+def test_bench_names_expand_sizes_and_filter() -> None:
+    runs = bench_names(["small", "large"], only=["memory.get", "eventlog"])
+    assert [r[0] for r in runs] == ["memory.get[small]", "memory.get[large]", "eventlog.emit"]
+    assert {r[1] for r in bench_names(["small"], only=["checkpoint"])} == {
+        "checkpoint.to_json",
+        "checkpoint.fs.save",
+        "checkpoint.fs.load",
+        "checkpoint.sqlite.save",
+        "checkpoint.sqlite.load",
+    }
+
+
+def test_every_microbench_runs() -> None:
+    """Each operation builds and runs at the smallest size; results are us per call."""
+    results = run_microbenches(bench_names(["small"]), repeat=1, min_batch_ms=0.1)
+    assert len(results) == len(MICROBENCHES)
+    for s in results.values():
+        assert s["n"] == 1 and s["p50"] > 0 and s["calls"] >= 1
+
+
+def test_save_then_compare_flags_regressions(tmp_path: Path, capsys) -> None:
+    baseline = tmp_path / "micro.json"
+    args = ["--only", "render.fallback,cache.key", *QUICK]
+    assert main([*args, "--save", str(baseline), "--json"]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["unit"] == "us" and set(data["benchmarks"]) == {
+        "render.fallback[small]",
+        "cache.key[small]",
+    }
+    assert json.loads(baseline.read_text(encoding="utf-8"))["benchmarks"] == data["benchmarks"]
+
+    # Same code against a generous threshold passes; against a baseline 100x faster it fails
+    assert main([*args, "--compare", str(baseline), "--threshold", "100"]) == 0
+    for s in data["benchmarks"].values():
+        s["p50"] /= 100
+    baseline.write_text(json.dumps(data), encoding="utf-8")
+    assert main([*args, "--compare", str(baseline), "--min-delta-us", "0"]) == 1
+    assert "REGRESSION" in capsys.readouterr().err
+
+
+def test_bad_arguments(tmp_path: Path) -> None:
+    assert main(["--sizes", "huge"]) == 2
+    assert main(["--only", "nope"]) == 2
+    assert main(["--only", "memory", "--compare", str(tmp_path / "missing.json")]) == 2
+
+
+def test_cli_bench_subcommand() -> None:
+    repo = Path(__file__).resolve().parent.parent
+    proc = subprocess.run(
+        [sys.executable, "cli.py", "bench", "--list", "--only", "diff"],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.split() == ["diff.text[small]", "diff.text[medium]", "diff.text[large]"]
@@ -0,0 +1,70 @@
+"""Tests for the streaming FS → SQLite checkpoint migration."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts.migrate_checkpoints import migrate
+from src.core.resume import Checkpoint
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+
+
+def _fill(root: Path, runs: int = 3, steps: int = 4) -> None:
+    store = FileCheckpointStore(root=str(root), blob_threshold=512)
+    for r in range(runs):
+        for i in range(steps):
+            store.save(
+                f"r{r}:{i}",
+                Checkpoint(f"r{r}", i, f"s{i}", {"big": "x" * 1000, "i": i}, extra={"score": 1.0}),
+            )
+    # Close the blob DB: if it were closed by GC mid-migration, removing its WAL
+    # would race with worker processes opening it
+    store.blobs.close()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_migrate_batches_and_resolves_blobs(tmp_path: Path, workers: int) -> None:
+    """Every checkpoint lands in SQLite with blob references inlined."""
+    _fill(tmp_path / "cp")
+    db = str(tmp_path / "cp.db")
+    assert migrate(str(tmp_path / "cp"), db, fmt="pickle+zlib", workers=workers, batch_size=5) == 12
+
+    store = SQLiteCheckpointStore(db_path=db)
+    ck = store.load("r2:3")
+    assert ck.memory_snapshot == {"big": "x" * 1000, "i": 3}
+    assert ck.extra == {"score": 1.0}
+    assert len(store.keys()) == 12
+    store.close()
+
+
+def test_migrate_resumes_and_skips_bad_files(tmp_path: Path) -> None:
+    """A second run only migrates keys missing from the database."""
+    root = tmp_path / "cp"
+    _fill(root, runs=2, steps=2)
+    db = str(tmp_path / "cp.db")
+    assert migrate(str(root), db, workers=1) == 4
+
+    _fill(root, runs=3, steps=2)
+    (root / "broken__0.json").write_text("{not json", encoding="utf-8")
+    assert migrate(str(root), db, workers=1) == 2
+    assert migrate(str(root), db, workers=1, resume=False) == 6
+
+
+def test_script_runs_from_any_directory(tmp_path: Path) -> None:
+    """The script sets up its own import path, like the other scripts/ tools."""
+    _fill(tmp_path / "cp", runs=1, steps=2)
+    script = Path(__file__).resolve().parent.parent / "scripts" / "migrate_checkpoints.py"
+    proc = subprocess.run(
+        [sys.executable, str(script), "cp", "cp.db", "--workers", "2"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+    store = SQLiteCheckpointStore(db_path=str(tmp_path / "cp.db"))
+    assert store.keys() == {"r0:0", "r0:1"}
+    store.close()
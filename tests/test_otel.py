@@ -1,8 +1,16 @@
 """Tests for OpenTelemetry integration."""
 
+import pytest
+
 from src.orchestrator.otel import init_otel, span
 
 
+def _exporter():
+    """In-memory span exporter (skips the test without the OpenTelemetry SDK)."""
+    module = pytest.importorskip("opentelemetry.sdk.trace.export.in_memory_span_exporter")
+    return module.InMemorySpanExporter()
+
+
 def test_otel_init_no_error():
     """Test that OTel initialization doesn't crash when opentelemetry is not installed."""
     # Should not raise even if opentelemetry is not installed
@@ -14,3 +22,133 @@ def test_span_context_manager():
     # Should not raise even if opentelemetry is not installed
     with span("test_span", {"key": "value"}):
         pass
+
+
+def _otel_spans(tmp_path, runner: str, **otel_kwargs):
+    """Run a two-step pipeline with an in-memory exporter and return the finished spans."""
+    from typing import Dict
+
+    from src.core.base import BaseAdvisor, BaseFunctionalAgent
+    from src.core.resume import CheckpointStore
+    from src.core.types import AgentOutput
+    from src.orchestrator.eventlog import JsonlEventLog
+    from src.orchestrator.otel import shutdown_otel
+    from src.orchestrator.runner import Orchestrator, PipelineStep
+    from src.orchestrator.runner_parallel import OrchestratorParallel
+    from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+
+    class Agent(BaseFunctionalAgent):
+        def process(self, task: str, context: Dict) -> AgentOutput:
+            return AgentOutput(content="x")
+
+    class Advisor(BaseAdvisor):
+        def review(self, output: AgentOutput, task: str, context: Dict) -> Dict:
+            return {
+                "score": 1.0,
+                "approved": True,
+                "critical_issues": [],
+                "suggestions": [],
+                "summary": "",
+                "severity": "low",
+            }
+
+    exporter = _exporter()
+    init_otel("test", exporter=exporter, schedule_delay_ms=10, **otel_kwargs)
+    try:
+        if runner == "parallel":
+            orch = OrchestratorParallel(lambda _: Agent(), lambda _: Advisor(), CheckpointStore())
+            steps = [
+                ParallelStep(stage=s, agent="a", advisor="v", task="t", category=s)
+                for s in ("plan", "code")
+            ]
+            orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+            orch.run_waves(steps)
+        else:
+            orch = Orchestrator(lambda _: Agent(), lambda _: Advisor(), CheckpointStore())
+            orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+            orch.run(
+                [
+                    PipelineStep(stage=s, agent="a", advisor="v", task="t", category=s)
+                    for s in ("plan", "code")
+                ]
+            )
+    finally:
+        shutdown_otel()
+    return exporter.get_finished_spans()
+
+
+def _parent(spans, child):
+    by_id = {s.context.span_id: s for s in spans}
+    return by_id.get(child.parent.span_id) if child.parent else None
+
+
+@pytest.mark.parametrize("runner", ["sequential", "parallel"])
+def test_step_spans_nest_attempts_and_calls(tmp_path, runner):
+    """Each step is a trace root covering its attempt, agent, review and checkpoint spans."""
+    spans = _otel_spans(tmp_path, runner)
+    steps = [s for s in spans if s.name == "step"]
+    assert sorted(s.attributes["category"] for s in steps) == ["code", "plan"]
+    assert all(s.parent is None for s in steps)
+    assert not [s for s in spans if s.name in ("run", "wave")]
+
+    (process,) = [s for s in spans if s.name == "agent.process" and s.attributes["stage"] == "plan"]
+    chain = []
+    node = process
+    while node is not None:
+        chain.append(node.name)
+        node = _parent(spans, node)
+    assert chain == ["agent.process", "agent_call", "attempt", "step"]
+
+    review = next(s for s in spans if s.name == "advisor.review")
+    assert _parent(spans, review).name == "review"
+    assert {"checkpoint_save", "factory", "render"} <= {s.name for s in spans}
+
+
+def test_per_category_head_sampling(tmp_path):
+    """Category ratios override the default ratio at the step root; children follow."""
+    spans = _otel_spans(tmp_path, "sequential", sample_ratio=1.0, category_ratios={"code": 0.0})
+    stages = {s.attributes.get("stage") for s in spans if s.name == "step"}
+    assert stages == {"plan"}
+    trace_ids = {s.context.trace_id for s in spans}
+    assert len(trace_ids) == 1
+
+    with pytest.raises(ValueError):
+        init_otel("test", exporter=_exporter(), sample_ratio=1.5)
+
+
+def test_council_members_get_spans():
+    """Each council member's review is a span carrying its vote."""
+    from src.core.types import AgentOutput
+    from src.orchestrator.council import AdvisorCouncil
+    from src.orchestrator.otel import shutdown_otel
+
+    class Advisor:
+        def __init__(self, score):
+            self.score = score
+
+        def review(self, output, task, context):
+            return {
+                "score": self.score,
+                "approved": True,
+                "critical_issues": [],
+                "suggestions": [],
+                "summary": "",
+                "severity": "low",
+            }
+
+    exporter = _exporter()
+    init_otel("test", exporter=exporter, schedule_delay_ms=10)
+    try:
+        council = AdvisorCouncil(
+            advisor_factory=lambda name: Advisor(0.9 if name == "a" else 0.2),
+            advisors=["a", "b"],
+        )
+        council.review(AgentOutput(content="x"), "t", {})
+    finally:
+        shutdown_otel()
+    votes = {
+        s.attributes["advisor"]: s.attributes["vote"]
+        for s in exporter.get_finished_spans()
+        if s.name == "council.member"
+    }
+    assert votes == {"a": "approve", "b": "reject"}
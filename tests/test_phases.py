@@ -0,0 +1,81 @@
+"""Tests for per-phase step timing."""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.core.base import BaseFunctionalAgent
+from src.core.resume import CheckpointStore
+from src.core.types import AgentOutput
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.phases import PHASES, PhaseTimer
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+from tests.helpers import approve
+
+
+class _SlowAgent(BaseFunctionalAgent):
+    def process(self, task: str, context: Dict) -> AgentOutput:
+        time.sleep(0.02)
+        return AgentOutput(content=f"out:{task}")
+
+
+def _events(path: Path, name: str) -> List[Dict]:
+    events = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    return [e for e in events if e["event"] == name]
+
+
+def test_phase_timer_accumulates_in_phase_order() -> None:
+    """Repeated phases add up and results follow PHASES order."""
+    timer = PhaseTimer()
+    with timer.phase("review"):
+        time.sleep(0.002)
+    with timer.phase("factory"):
+        pass
+    with timer.phase("review"):
+        time.sleep(0.002)
+    with timer.phase("custom"):
+        pass
+
+    ms = timer.ms()
+    assert list(ms) == ["factory", "review", "custom"]
+    assert ms["review"] >= 4.0
+
+
+def test_sequential_runner_reports_phases(tmp_path: Path) -> None:
+    """History entries and step_end events carry per-phase durations."""
+    orch = Orchestrator(lambda _: _SlowAgent(), approve, CheckpointStore())
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    steps = [PipelineStep(stage="a", agent="a", advisor="ok", task="t")]
+
+    result = orch.run(steps)
+    phases = result["history"][0]["phases_ms"]
+    assert set(phases) <= set(PHASES)
+    assert {"factory", "render", "cache_key", "agent_call", "review", "checkpoint_save"} <= set(
+        phases
+    )
+    assert phases["agent_call"] >= 20.0
+    assert {"cache_lookup", "cache_store"} <= set(phases)
+    assert phases["cache_store"] < phases["agent_call"]
+
+    (end,) = _events(tmp_path / "events.jsonl", "step_end")
+    assert end["phases_ms"] == phases
+    assert end["duration_ms"] >= 20
+
+
+def test_parallel_runner_emits_events_with_phases(tmp_path: Path) -> None:
+    """The parallel runner now logs step events, including phase timings."""
+    orch = OrchestratorParallel(lambda _: _SlowAgent(), approve)
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    steps = [
+        ParallelStep(stage="a", agent="a", advisor="ok", task="t"),
+        ParallelStep(stage="b", agent="b", advisor="ok", task="t", depends_on=["a"]),
+    ]
+
+    result = orch.run_waves(steps)
+    assert all(h["phases_ms"]["agent_call"] >= 20.0 for h in result["history"])
+    ends = _events(tmp_path / "events.jsonl", "step_end")
+    assert [e["stage"] for e in ends] == ["a", "b"]
+    assert len(_events(tmp_path / "events.jsonl", "step_start")) == 2
@@ -0,0 +1,91 @@
+"""Tests for per-stage cProfile profiling."""
+
+import pstats
+from pathlib import Path
+from typing import Dict
+
+from src.core.base import BaseAdvisor, BaseFunctionalAgent
+from src.core.resume import CheckpointStore
+from src.core.types import AgentOutput
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.profiling import StageProfiler
+from src.orchestrator.report import build_markdown_report
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+
+
+def _hot_loop(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+class _Agent(BaseFunctionalAgent):
+    def process(self, task: str, context: Dict) -> AgentOutput:
+        return AgentOutput(content=str(_hot_loop(50_000)))
+
+
+class _RejectFirst(BaseAdvisor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def review(self, output: AgentOutput, task: str, context: Dict) -> Dict:
+        self.calls += 1
+        score = 1.0 if self.calls > 1 else 0.0
+        return {
+            "score": score,
+            "approved": score > 0.5,
+            "critical_issues": [],
+            "suggestions": [],
+            "summary": "",
+            "severity": "low",
+        }
+
+
+def test_wrap_merges_calls_into_one_profile(tmp_path: Path) -> None:
+    """Calls of a stage are merged into <out>/<run_id>/profiles/<stage>.prof."""
+    profiler = StageProfiler(stages={"a"}, out_dir=str(tmp_path), top_n=3)
+    assert profiler.wants("a") and not profiler.wants("b")
+    hot = profiler.wrap("a", _hot_loop)
+    assert hot(1000) == _hot_loop(1000)
+    hot(2000)
+
+    summary = profiler.dump("run1", "a")
+    assert summary is not None
+    assert summary["path"] == str(tmp_path / "run1" / "profiles" / "a.prof")
+    assert summary["calls"] == 2
+    assert len(summary["top"]) == 3
+    assert summary["top"][0]["function"].endswith("(_hot_loop)")
+    assert summary["top"][0]["ncalls"] == 2
+    stats = pstats.Stats(summary["path"])
+    assert any(name == "_hot_loop" for _, _, name in stats.stats)  # type: ignore[attr-defined]
+    assert profiler.dump("run1", "a") is None
+
+
+def test_runners_profile_selected_stages(tmp_path: Path) -> None:
+    """Only selected stages get a profile; it covers every attempt and lands in the report."""
+    orch = Orchestrator(lambda _: _Agent(), lambda _: _RejectFirst(), CheckpointStore())
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    orch.use_cache = False
+    orch.profiler = StageProfiler(stages=["b"], out_dir=str(tmp_path))
+    result = orch.run(
+        [
+            PipelineStep(stage="a", agent="a", advisor="r", task="t"),
+            PipelineStep(stage="b", agent="b", advisor="r", task="t", max_retries=1),
+        ]
+    )
+    a, b = result["history"]
+    assert "profile" not in a
+    # Two attempts: two agent calls and two reviews
+    assert b["profile"]["calls"] == 4
+    assert Path(b["profile"]["path"]).exists()
+    report = build_markdown_report(result)
+    assert f"**Profile:** `{b['profile']['path']}`" in report
+    assert "_hot_loop" in report
+
+    par = OrchestratorParallel(lambda _: _Agent(), lambda _: _RejectFirst(), CheckpointStore())
+    par.eventlog = JsonlEventLog(path=str(tmp_path / "par.jsonl"))
+    par.profiler = StageProfiler(out_dir=str(tmp_path))
+    history = par.run_waves([ParallelStep(stage="p", agent="p", advisor="r", task="t")])["history"]
+    assert history[0]["profile"]["path"].endswith(f"{par.run_id}/profiles/p.prof")
+    assert any("_hot_loop" in fn["function"] for fn in history[0]["profile"]["top"])
@@ -0,0 +1,142 @@
+"""Tests for per-step resource accounting."""
+
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from src.core.base import BaseFunctionalAgent
+from src.core.resume import CheckpointStore
+from src.core.types import AgentOutput
+from src.orchestrator.budget import Budget, BudgetExceededError
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.report import build_markdown_report
+from src.orchestrator.resources import ResourceMeter, allocation_tracing, stage_memory_bytes
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+from tests.helpers import approve
+
+_KEEP: List[bytes] = []
+
+
+class _BusyAgent(BaseFunctionalAgent):
+    def process(self, task: str, context: Dict) -> AgentOutput:
+        total = sum(i * i for i in range(200_000))
+        _KEEP.append(bytes(512 * 1024))
+        return AgentOutput(content=f"{task}:{total}")
+
+
+def _burn() -> int:
+    return sum(i * i for i in range(300_000))
+
+
+def test_meter_attributes_helper_thread_cpu() -> None:
+    """CPU spent in a wrapped callable counts even when it runs on another thread."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    meter = ResourceMeter().start()
+    with ThreadPoolExecutor(max_workers=1) as exe:
+        exe.submit(meter.attribute(_burn)).result()
+    usage = meter.stop(memory_written_bytes=42)
+
+    assert usage.cpu_sec > 0.001
+    assert usage.process_cpu_sec >= usage.cpu_sec * 0.5
+    assert usage.memory_written_bytes == 42
+    assert usage.peak_rss_delta_mb >= 0.0
+    assert usage.top_allocations == []
+
+
+def test_allocation_tracing_reports_top_sites() -> None:
+    """Top allocation sites come from tracemalloc; tracing is stopped only if we started it."""
+    assert not tracemalloc.is_tracing()
+    with allocation_tracing(True):
+        meter = ResourceMeter(tracemalloc_top=3).start()
+        held = [bytearray(1024) for _ in range(200)]
+        usage = meter.stop()
+    assert not tracemalloc.is_tracing()
+    assert held
+    assert 0 < len(usage.top_allocations) <= 3
+    top = usage.top_allocations[0]
+    assert top["where"].startswith(__file__) and top["size_kb"] >= 200
+
+    tracemalloc.start()
+    try:
+        with allocation_tracing(True):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_stage_memory_bytes_counts_own_outputs() -> None:
+    """Only the stage's keys count, not other stages or the carried-over previous content."""
+    memory = {"a.content": "x" * 100, "a.previous_content": "y" * 1000, "b.content": "z"}
+    assert 100 < stage_memory_bytes(memory, "a") < 200
+    assert stage_memory_bytes(memory, "c") == 0
+
+
+def test_runners_record_resources(tmp_path: Path) -> None:
+    """Both runners attach resources to history, step_end events and the report."""
+    events = tmp_path / "events.jsonl"
+    orch = Orchestrator(lambda _: _BusyAgent(), approve, CheckpointStore())
+    orch.eventlog = JsonlEventLog(path=str(events))
+    orch.use_cache = False
+    orch.track_resources = True
+    orch.tracemalloc_top = 2
+    result = orch.run([PipelineStep(stage="a", agent="a", advisor="r", task="t")])
+
+    res = result["history"][0]["resources"]
+    assert res["cpu_sec"] > 0
+    assert res["memory_written_bytes"] > 0
+    assert res["top_allocations"]
+    assert not tracemalloc.is_tracing()
+    ends = [json.loads(line) for line in events.read_text(encoding="utf-8").splitlines()]
+    (end,) = [e for e in ends if e["event"] == "step_end"]
+    assert end["resources"]["cpu_sec"] == res["cpu_sec"]
+    report = build_markdown_report(result)
+    assert "**Resources:** cpu=" in report and "KiB" in report
+
+    par = OrchestratorParallel(lambda _: _BusyAgent(), approve, CheckpointStore())
+    par.eventlog = JsonlEventLog(path=str(tmp_path / "par.jsonl"))
+    par.track_resources = True
+    history = par.run_waves(
+        [ParallelStep(stage=s, agent=s, advisor="r", task="t") for s in ("a", "b")]
+    )["history"]
+    assert all(h["resources"]["cpu_sec"] > 0 for h in history)
+    assert all(h["resources"]["top_allocations"] == [] for h in history)
+
+
+def test_written_bytes_counted_before_pruning(tmp_path: Path) -> None:
+    """A stage whose outputs are offloaded right away reports their size, not the stub's."""
+    events = tmp_path / "events.jsonl"
+
+    class _BigAgent(BaseFunctionalAgent):
+        def process(self, task: str, context: Dict) -> AgentOutput:
+            return AgentOutput(content="x" * 50_000)
+
+    orch = Orchestrator(lambda _: _BigAgent(), approve, CheckpointStore())
+    orch.eventlog = JsonlEventLog(path=str(events))
+    orch.use_cache = False
+    orch.track_resources = True
+    orch.prune_memory = True
+    orch.offload_dir = str(tmp_path)
+    result = orch.run([PipelineStep(stage="a", agent="a", advisor="r", task="t")])
+
+    logged = [json.loads(line) for line in events.read_text(encoding="utf-8").splitlines()]
+    (size,) = [e for e in logged if e["event"] == "memory_size"]
+    assert "a.content" in size["pruned_keys"]
+    written = result["history"][0]["resources"]["memory_written_bytes"]
+    assert written == stage_memory_bytes(result["memory"], "a") > 50_000
+
+
+def test_resource_budget_stops_run(tmp_path: Path) -> None:
+    """A CPU budget is enforced after each stage like the other budget limits."""
+    orch = Orchestrator(lambda _: _BusyAgent(), approve, CheckpointStore())
+    orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    orch.use_cache = False
+    orch.budget = Budget(max_cpu_sec=1e-6)
+    with pytest.raises(BudgetExceededError, match="CPU budget exceeded"):
+        orch.run([PipelineStep(stage=s, agent=s, advisor="r", task="t") for s in ("a", "b")])
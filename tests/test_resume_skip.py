@@ -0,0 +1,148 @@
+"""Tests for resuming runs without re-executing completed stages."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.eventlog import BufferedJsonlEventLog, JsonlEventLog
+from src.orchestrator.resume_plan import resumed_summary
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+from tests.helpers import RecordingAgents, approve
+
+
+def test_sequential_resume_skips_completed_stages(tmp_path: Path) -> None:
+    """A resumed run replays finished stages and continues at the failed one."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = [
+        PipelineStep(stage=s, agent=s, advisor="Approve", task=f"do {s}", max_retries=0)
+        for s in ("a", "b", "c")
+    ]
+
+    first = RecordingAgents(failing=["b"])
+    orch = Orchestrator(first, approve, checkpoint_store=store)
+    orch.use_cache = False
+    with pytest.raises(RuntimeError):
+        orch.run(steps)
+    assert first.calls == ["a", "b"]
+
+    second = RecordingAgents()
+    resumed = Orchestrator(second, approve, checkpoint_store=store)
+    resumed.use_cache = False
+    resumed.run_id = orch.run_id
+    result = resumed.run(steps, resume=True)
+
+    assert second.calls == ["b", "c"]
+    assert [h["stage"] for h in result["history"]] == ["a", "b", "c"]
+    assert result["history"][0]["resumed"] is True
+    assert result["history"][0]["approved"] is True
+    assert result["memory"]["a.content"] == "a: do a"
+
+
+def test_sequential_resume_reruns_rejected_stage(tmp_path: Path) -> None:
+    """Stages that finished without approval are not treated as complete."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = [PipelineStep(stage="a", agent="a", advisor="Approve", task="t", max_retries=0)]
+
+    orch = Orchestrator(RecordingAgents(), approve, checkpoint_store=store)
+    orch.use_cache = False
+    orch.run(steps)
+    ck = store.load(f"{orch.run_id}:0")
+    assert ck is not None
+    assert ck.extra["approved"] is True
+
+    ck.extra["approved"] = False
+    store.save(f"{orch.run_id}:0", ck)
+
+    agents = RecordingAgents()
+    resumed = Orchestrator(agents, approve, checkpoint_store=store)
+    resumed.use_cache = False
+    resumed.run_id = orch.run_id
+    resumed.run(steps, resume=True)
+    assert agents.calls == ["a"]
+
+
+def test_resume_keeps_memory_overrides(tmp_path: Path) -> None:
+    """Values set before run() win over replayed checkpoint memory."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = [PipelineStep(stage="a", agent="a", advisor="Approve", task="t", max_retries=0)]
+
+    orch = Orchestrator(RecordingAgents(), approve, checkpoint_store=store)
+    orch.use_cache = False
+    orch.memory.set("product_idea", "old")
+    orch.run(steps)
+
+    resumed = Orchestrator(RecordingAgents(), approve, checkpoint_store=store)
+    resumed.run_id = orch.run_id
+    resumed.memory.set("product_idea", "new")
+    result = resumed.run(steps, resume=True)
+    assert result["memory"]["product_idea"] == "new"
+    assert result["memory"]["a.content"] == "a: t"
+
+
+def test_parallel_resume_skips_completed_stages(tmp_path: Path) -> None:
+    """The DAG runner re-runs only incomplete stages and their dependents."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = [
+        ParallelStep(stage="a", agent="a", advisor="Approve", task="t"),
+        ParallelStep(stage="b", agent="b", advisor="Approve", task="t", depends_on=["a"]),
+        ParallelStep(stage="c", agent="c", advisor="Approve", task="t", depends_on=["a"]),
+        ParallelStep(stage="d", agent="d", advisor="Approve", task="t", depends_on=["c"]),
+    ]
+
+    first = RecordingAgents(failing=["c"])
+    orch = OrchestratorParallel(first, approve, checkpoint_store=store, max_workers=1)
+    with pytest.raises(RuntimeError):
+        orch.run_waves(steps)
+    assert store.find_key(orch.run_id, 1) == f"{orch.run_id}:1"
+
+    second = RecordingAgents()
+    resumed = OrchestratorParallel(second, approve, checkpoint_store=store)
+    resumed.run_id = orch.run_id
+    resumed.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+    result = resumed.run_waves(steps, resume=True)
+
+    assert sorted(second.calls) == ["c", "d"]
+    assert len(result["history"]) == 4
+    assert {h["stage"] for h in result["history"] if h.get("resumed")} == {"a", "b"}
+    assert result["memory"]["b.content"] == "b: t"
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    skipped = [e for e in events if e["event"] == "step_skipped"]
+    assert {(e["stage"], e["reason"]) for e in skipped} == {("a", "resumed"), ("b", "resumed")}
+
+
+def test_failed_resume_still_flushes_events(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Events buffered before a replay failure are written when the run aborts."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = [
+        PipelineStep(stage=s, agent=s, advisor="Approve", task="t", max_retries=0)
+        for s in ("a", "b", "c")
+    ]
+    orch = Orchestrator(RecordingAgents(failing=["c"]), approve, checkpoint_store=store)
+    orch.use_cache = False
+    with pytest.raises(RuntimeError):
+        orch.run(steps)
+
+    def summary(step: PipelineStep, checkpoint: object) -> dict:
+        if step.stage == "b":
+            raise ValueError("corrupt checkpoint")
+        return resumed_summary(step, checkpoint)
+
+    monkeypatch.setattr("src.orchestrator.runner.resumed_summary", summary)
+    resumed = Orchestrator(RecordingAgents(), approve, checkpoint_store=store)
+    resumed.run_id = orch.run_id
+    log_path = tmp_path / "events.jsonl"
+    resumed.eventlog = BufferedJsonlEventLog(path=str(log_path), flush_interval=60.0)
+    with pytest.raises(ValueError):
+        resumed.run(steps, resume=True)
+
+    events = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [e["stage"] for e in events if e["event"] == "step_skipped"] == ["a"]
@@ -0,0 +1,195 @@
+"""Tests for checkpoint retention policies and background GC."""
+
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from scripts.clean_artifacts import clean_checkpoints
+from src.core.resume import Checkpoint
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.retention import (
+    CheckpointInfo,
+    RetentionPolicy,
+    RetentionWorker,
+    enforce_retention,
+    plan_retention,
+)
+
+DAY = 86400.0
+NOW = 100 * DAY
+
+
+def _fill(store, runs: int = 4, steps: int = 3, failed_run: str = "") -> None:
+    """Save runs r0..rN (r0 oldest, one day apart) with `steps` checkpoints each."""
+    for r in range(runs):
+        run_id = f"r{r}"
+        for i in range(steps):
+            extra = {"approved": True}
+            if run_id == failed_run and i == steps - 1:
+                extra = {"approved": False, "error_reason": "low_score"}
+            store.save(
+                f"{run_id}:{i}",
+                Checkpoint(
+                    run_id,
+                    i,
+                    f"s{i}",
+                    {f"s{i}.content": "x" * 2000},
+                    timestamp=NOW - (runs - r) * DAY + i,
+                    extra=extra,
+                ),
+            )
+
+
+def _runs(store) -> set:
+    return {ck.run_id for ck in store.list_checkpoints()}
+
+
+def test_policy_parse() -> None:
+    """Specs combine count, age and final-only settings."""
+    policy = RetentionPolicy.parse("keep=5, age=2d, final-only")
+    assert policy == RetentionPolicy(keep_last=5, max_age_sec=2 * DAY, final_only_successful=True)
+    assert RetentionPolicy.parse("").is_empty()
+    with pytest.raises(ValueError):
+        RetentionPolicy.parse("keep=3,forever")
+
+
+def test_plan_keeps_union_of_count_and_age() -> None:
+    """A run survives if either the count or the age rule keeps it."""
+    cks = [CheckpointInfo(f"r{i}", f"r{i}:0", 0, NOW - (5 - i) * DAY) for i in range(5)]
+    plan = plan_retention(cks, RetentionPolicy(keep_last=1, max_age_sec=2.5 * DAY), now=NOW)
+    assert sorted(plan.delete_runs) == ["r0", "r1", "r2"]
+    plan = plan_retention(cks, RetentionPolicy(keep_last=1), now=NOW, protect={"r0"})
+    assert sorted(plan.delete_runs) == ["r1", "r2", "r3"]
+    assert plan_retention(cks, RetentionPolicy(), now=NOW).delete_runs == []
+
+
+@pytest.mark.parametrize("kind", ["fs", "sqlite"])
+def test_enforce_deletes_old_runs_and_intermediates(tmp_path: Path, kind: str) -> None:
+    """Old runs go entirely; successful kept runs keep only their final checkpoint."""
+    if kind == "fs":
+        store = FileCheckpointStore(root=str(tmp_path / "cp"), blob_threshold=1024)
+    else:
+        store = SQLiteCheckpointStore(db_path=str(tmp_path / "cp.db"), blob_threshold=1024)
+    _fill(store, failed_run="r3")
+
+    policy = RetentionPolicy(keep_last=2, final_only_successful=True)
+    stats = enforce_retention(store, policy, now=NOW)
+    assert stats["runs_deleted"] == 2
+    assert stats["checkpoints_deleted"] == 6 + 2
+    assert _runs(store) == {"r2", "r3"}
+    assert store.find_last_key("r2") == "r2:2"
+    assert store.load("r2:1") is None
+    # The failed run stays resumable
+    assert store.load("r3:0") is not None
+    assert store.find_last_key("r0") is None
+
+    # Nothing left to do on the next pass
+    assert enforce_retention(store, policy, now=NOW)["checkpoints_deleted"] == 0
+
+
+def test_fs_lists_legacy_flat_checkpoints(tmp_path: Path) -> None:
+    """Checkpoints in the pre-sharding flat layout are listed and deleted too."""
+    root = tmp_path / "cp"
+    root.mkdir()
+    (root / "old__0.json").write_text(
+        Checkpoint("old", 0, "a", {}, timestamp=1.0).to_json(), encoding="utf-8"
+    )
+    store = FileCheckpointStore(root=str(root))
+    assert [ck.key for ck in store.list_checkpoints()] == ["old:0"]
+    assert store.delete_run("old") == 1
+    assert list(root.iterdir()) == []
+
+
+def test_sqlite_vacuum_returns_pages(tmp_path: Path) -> None:
+    """Deleting runs and vacuuming shrinks the database file."""
+    db = tmp_path / "cp.db"
+    store = SQLiteCheckpointStore(db_path=str(db))
+    _fill(store, runs=6, steps=10)
+    store._pool.connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    before = os.path.getsize(db)
+
+    stats = enforce_retention(store, RetentionPolicy(keep_last=1), now=NOW, vacuum_pages=5)
+    assert stats["pages_freed"] == 5
+    assert store.vacuum() > 0
+    assert os.path.getsize(db) < before
+    store.close()
+
+
+def test_vacuum_converts_existing_database_only_on_request(tmp_path: Path) -> None:
+    """Databases created without auto_vacuum are only switched over by an explicit convert."""
+    db = tmp_path / "checkpoints.db"
+    with sqlite3.connect(db) as cx:
+        cx.execute("PRAGMA auto_vacuum=NONE")
+        cx.execute("CREATE TABLE t (x)")
+    store = SQLiteCheckpointStore(db_path=str(db))
+    _fill(store, runs=3, steps=10)
+    cx = store._pool.connection()
+
+    # Background retention must never rewrite the database
+    stats = enforce_retention(store, RetentionPolicy(keep_last=1), now=NOW)
+    assert stats["pages_freed"] == 0
+    assert cx.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    store.close()
+
+    result = clean_checkpoints(str(tmp_path), keep_latest=1, convert_vacuum=True)
+    assert result["sqlite"]["pages_freed"] > 0
+    store = SQLiteCheckpointStore(db_path=str(db))
+    assert store._pool.connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    store.close()
+
+
+def test_worker_tick_is_bounded(tmp_path: Path) -> None:
+    """Each background tick deletes at most `batch` checkpoints and spares protected runs."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    _fill(store, runs=4, steps=3)
+    worker = RetentionWorker(store, RetentionPolicy(keep_last=1), batch=3, protect={"r0"})
+
+    assert worker.tick()["checkpoints_deleted"] == 3
+    assert worker.tick()["checkpoints_deleted"] == 3
+    assert worker.tick()["checkpoints_deleted"] == 0
+    assert _runs(store) == {"r0", "r3"}
+    assert worker.totals["runs_deleted"] == 2
+
+
+def test_clean_checkpoints_dry_run(tmp_path: Path) -> None:
+    """The clean utility plans checkpoint retention without deleting in dry-run mode."""
+    store = FileCheckpointStore(root=str(tmp_path / "checkpoints"))
+    _fill(store, runs=3, steps=1)
+
+    result = clean_checkpoints(str(tmp_path), keep_latest=1, dry_run=True)
+    assert sorted(result["fs"]["delete_runs"]) == ["r0", "r1"]
+    assert _runs(store) == {"r0", "r1", "r2"}
+
+    clean_checkpoints(str(tmp_path), keep_latest=1)
+    assert _runs(store) == {"r2"}
+
+
+def test_clean_checkpoints_frees_deduplicated_blobs(tmp_path: Path) -> None:
+    """Retention on stores written with deduplication releases the deleted runs' blobs."""
+    stores = [
+        FileCheckpointStore(root=str(tmp_path / "checkpoints"), blob_threshold=100),
+        SQLiteCheckpointStore(db_path=str(tmp_path / "checkpoints.db"), blob_threshold=100),
+    ]
+    for store in stores:
+        for r in range(3):
+            store.save(
+                f"r{r}:0",
+                Checkpoint(f"r{r}", 0, "s0", {"s0.content": f"r{r}" * 500}, timestamp=NOW + r),
+            )
+        assert store.blobs.stats()["blobs"] == 3
+    stores[0].blobs.close()
+    stores[1].close()
+
+    result = clean_checkpoints(str(tmp_path), keep_latest=1)
+    assert result["fs"]["blobs_removed"] == result["sqlite"]["blobs_removed"] == 2
+
+    fs = FileCheckpointStore(root=str(tmp_path / "checkpoints"))
+    db = SQLiteCheckpointStore(db_path=str(tmp_path / "checkpoints.db"))
+    for store in (fs, db):
+        assert store.blobs.stats()["blobs"] == 1
+        assert store.load("r2:0").memory_snapshot == {"s0.content": "r2" * 500}
+    fs.blobs.close()
+    db.close()
@@ -0,0 +1,140 @@
+"""Tests for pluggable checkpoint serializers."""
+
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.core.resume import Checkpoint
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.checkpoint_sqlite import SQLiteCheckpointStore
+from src.orchestrator.serializers import (
+    MAGIC,
+    OUT_OF_BAND_MIN_BYTES,
+    decode,
+    encode,
+    parse_format,
+)
+
+SNAPSHOT = {
+    "req.content": "héllo",
+    "req.review": {"score": 0.9, "approved": True, "issues": [1, 2.5, None]},
+    "req.artifact": b"\x00\x01" * 10,
+    "big": b"\xff" * (OUT_OF_BAND_MIN_BYTES + 1),
+}
+
+BINARY_FORMATS = ["pickle", "pickle+zlib", "pickle+lzma"]
+
+
+@pytest.mark.parametrize("spec", BINARY_FORMATS)
+def test_binary_roundtrip_keeps_bytes(spec: str) -> None:
+    """Binary formats round-trip bytes values without base64."""
+    raw = encode(SNAPSHOT, spec)
+    assert raw.startswith(MAGIC)
+    assert decode(raw) == SNAPSHOT
+
+
+def test_msgpack_roundtrip() -> None:
+    """msgpack is used when installed."""
+    pytest.importorskip("msgpack")
+    assert decode(encode(SNAPSHOT, "msgpack+zlib")) == SNAPSHOT
+
+
+def test_plain_json_is_unchanged() -> None:
+    """The default format stays headerless JSON readable by json.loads."""
+    data = {"a": 1, "b": "x"}
+    raw = encode(data, "json")
+    assert json.loads(raw) == data
+    assert decode(raw) == data
+    assert decode(encode(data, "json+zlib")) == data
+
+
+def test_parse_format_rejects_unknown() -> None:
+    """Unknown codecs and compressions are rejected up front."""
+    assert parse_format("pickle+lzma") == ("pickle", "lzma")
+    with pytest.raises(ValueError):
+        parse_format("yaml")
+    with pytest.raises(ValueError):
+        parse_format("pickle+brotli")
+
+
+def test_unknown_version_rejected() -> None:
+    """Containers from a newer format version fail loudly."""
+    raw = bytearray(encode({"a": 1}, "pickle"))
+    raw[len(MAGIC)] = 99
+    with pytest.raises(ValueError):
+        decode(bytes(raw))
+
+
+def test_fs_store_binary_and_mixed_formats(tmp_path: Path) -> None:
+    """FS stores write .ckpt files and read checkpoints in any format."""
+    root = str(tmp_path / "cp")
+    FileCheckpointStore(root=root).save("r1:0", Checkpoint("r1", 0, "a", {"a": "json"}))
+
+    store = FileCheckpointStore(root=root, serializer="pickle+zlib")
+    store.save("r1:1", Checkpoint("r1", 1, "b", dict(SNAPSHOT)))
+    assert store._path("r1:1").suffix == ".ckpt"
+    assert store.load("r1:1").memory_snapshot == SNAPSHOT
+    assert store.load("r1:0").memory_snapshot == {"a": "json"}
+    assert store.find_last_key("r1") == "r1:1"
+
+    # Rewriting in another format leaves a single file per key
+    store.save("r1:0", store.load("r1:0"))
+    run_dir = store._run_dir("r1")
+    assert sorted(p.name for p in run_dir.iterdir()) == ["0.ckpt", "1.ckpt", "index.json"]
+
+
+def test_sqlite_store_binary_column(tmp_path: Path) -> None:
+    """SQLite stores put binary snapshots in memory_blob, keeping extra as JSON."""
+    db = str(tmp_path / "cp.db")
+    store = SQLiteCheckpointStore(db_path=db, serializer="pickle")
+    store.save("r1:0", Checkpoint("r1", 0, "a", dict(SNAPSHOT), extra={"score": 1.0}))
+    ck = store.load("r1:0")
+    assert ck.memory_snapshot == SNAPSHOT
+    assert ck.extra == {"score": 1.0}
+
+    # A JSON store on the same database reads binary rows too
+    assert SQLiteCheckpointStore(db_path=db).load("r1:0").memory_snapshot == SNAPSHOT
+    store.close()
+
+
+def test_sqlite_adds_blob_column_to_old_schema(tmp_path: Path) -> None:
+    """Databases created before memory_blob existed are upgraded in place."""
+    db = tmp_path / "old.db"
+    with sqlite3.connect(db) as cx:
+        cx.execute(
+            "CREATE TABLE checkpoints (run_id TEXT NOT NULL, step_index INTEGER NOT NULL, "
+            "stage TEXT NOT NULL, created_at INTEGER NOT NULL, memory_json TEXT NOT NULL, "
+            "extra_json TEXT NOT NULL, PRIMARY KEY (run_id, step_index))"
+        )
+        cx.execute("INSERT INTO checkpoints VALUES ('r', 0, 's', 0, '{\"k\": 1}', '{}')")
+    store = SQLiteCheckpointStore(db_path=str(db))
+    assert store.load("r:0").memory_snapshot == {"k": 1}
+    store.close()
+
+
+def test_migrate_converts_formats(tmp_path: Path) -> None:
+    """migrate_checkpoints converts FS checkpoints in place and into SQLite."""
+    root = tmp_path / "cp"
+    FileCheckpointStore(root=str(root)).save("r1:0", Checkpoint("r1", 0, "a", {"a": "x"}))
+    repo = str(Path(__file__).parent.parent)
+
+    def run(*args: str) -> None:
+        subprocess.run(
+            [sys.executable, "-m", "scripts.migrate_checkpoints", *args],
+            cwd=repo,
+            check=True,
+            capture_output=True,
+        )
+
+    run(str(root), "--fs-only", "--format", "pickle+zlib")
+    store = FileCheckpointStore(root=str(root))
+    assert store._existing_path("r1:0").suffix == ".ckpt"
+    assert store.load("r1:0").memory_snapshot == {"a": "x"}
+
+    db = tmp_path / "cp.db"
+    run(str(root), str(db), "--format", "pickle")
+    assert SQLiteCheckpointStore(db_path=str(db)).load("r1:0").memory_snapshot == {"a": "x"}
@@ -0,0 +1,112 @@
+"""Tests for partial pipeline runs (--only / --from / --until)."""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.orchestrator.checkpoint_fs import FileCheckpointStore
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+from src.orchestrator.subgraph import dependency_map, select_stages
+from src.orchestrator.yaml_loader import YAMLPipelineLoader
+from tests.helpers import RecordingAgents, approve
+
+
+def _dag() -> List[ParallelStep]:
+    """a -> b -> d, a -> c."""
+    return [
+        ParallelStep(stage="a", agent="a", advisor="ok", task="t"),
+        ParallelStep(stage="b", agent="b", advisor="ok", task="t {a.content}", depends_on=["a"]),
+        ParallelStep(stage="c", agent="c", advisor="ok", task="t", depends_on=["a"]),
+        ParallelStep(stage="d", agent="d", advisor="ok", task="t", depends_on=["b"]),
+    ]
+
+
+def test_select_stages_filters() -> None:
+    """--only/--from/--until select stages from the dependency graph."""
+    steps = _dag()
+    assert select_stages(steps, only=["b"]) == {"b"}
+    assert select_stages(steps, only=["b"], include_upstream=True) == {"a", "b"}
+    assert select_stages(steps, from_stage="b") == {"b", "d"}
+    assert select_stages(steps, until="d") == {"a", "b", "d"}
+    assert select_stages(steps, from_stage="b", until="b") == {"b"}
+
+    with pytest.raises(ValueError):
+        select_stages(steps, only=["missing"])
+    with pytest.raises(ValueError):
+        select_stages(steps, from_stage="c", until="d")
+
+
+def test_pipeline_without_dependencies_is_a_chain() -> None:
+    """Pipelines that declare no depends_on are treated as linear."""
+    steps = [PipelineStep(stage=s, agent=s, advisor="ok", task="t") for s in ("x", "y", "z")]
+    assert dependency_map(steps) == {"x": [], "y": ["x"], "z": ["y"]}
+    assert select_stages(steps, from_stage="y") == {"y", "z"}
+
+
+def test_loader_populates_depends_on() -> None:
+    """The YAML loader keeps depends_on on sequential steps."""
+    yaml_content = """
+stages:
+  - name: requirements
+    agent: RequirementsDraftingAgent
+    advisor: RequirementsAdvisor
+    task: "PRD"
+  - name: refine
+    depends_on: [requirements]
+    agent: PromptRefinerAgent
+    advisor: PromptRefinerAdvisor
+    task: "Refine"
+"""
+    steps, _ = YAMLPipelineLoader().load(yaml_content)
+    assert steps[1].depends_on == ["requirements"]
+
+
+def test_parallel_only_hydrates_inputs_from_prior_run(tmp_path: Path) -> None:
+    """--only b with --inputs-from-run reuses a's output and runs nothing else."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = _dag()
+
+    first = OrchestratorParallel(RecordingAgents(), approve, checkpoint_store=store)
+    first.run_waves(steps)
+
+    agents = RecordingAgents()
+    partial = OrchestratorParallel(agents, approve, checkpoint_store=store)
+    result = partial.run_waves(steps, stages={"b"}, inputs_from_run=first.run_id)
+
+    assert agents.calls == ["b"]
+    assert [h["stage"] for h in result["history"]] == ["b"]
+    assert result["memory"]["b.content"] == "b: t a: t"
+
+
+def test_sequential_from_stage(tmp_path: Path) -> None:
+    """The sequential runner executes only the selected stages, in order."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    steps = [
+        PipelineStep(stage=s, agent=s, advisor="ok", task=f"t{s}", max_retries=0)
+        for s in ("x", "y", "z")
+    ]
+    first = Orchestrator(RecordingAgents(), approve, checkpoint_store=store)
+    first.use_cache = False
+    first.run(steps)
+
+    agents = RecordingAgents()
+    partial = Orchestrator(agents, approve, checkpoint_store=store)
+    partial.use_cache = False
+    stages = select_stages(steps, from_stage="y")
+    result = partial.run(steps, stages=stages, inputs_from_run=first.run_id)
+
+    assert agents.calls == ["y", "z"]
+    assert result["memory"]["x.content"] == "x: tx"
+    # Checkpoints keep full-pipeline indexes so partial runs can be resumed
+    assert store.find_key(partial.run_id, 2) == f"{partial.run_id}:2"
+
+
+def test_missing_upstream_checkpoint_raises(tmp_path: Path) -> None:
+    """Hydrating from a run that never produced an upstream stage fails loudly."""
+    store = FileCheckpointStore(root=str(tmp_path / "cp"))
+    orch = OrchestratorParallel(RecordingAgents(), approve, checkpoint_store=store)
+    with pytest.raises(ValueError):
+        orch.run_waves(_dag(), stages={"d"}, inputs_from_run="no-such-run")
@@ -0,0 +1,139 @@
+"""Tests for the Chrome trace-event tracer."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.core.base import BaseAdvisor, BaseFunctionalAgent
+from src.core.resume import CheckpointStore
+from src.core.types import AgentOutput
+from src.orchestrator.eventlog import JsonlEventLog
+from src.orchestrator.runner import Orchestrator, PipelineStep
+from src.orchestrator.runner_parallel import OrchestratorParallel
+from src.orchestrator.runner_parallel import PipelineStep as ParallelStep
+from src.orchestrator.tracing import ChromeTracer, set_tracer, span
+
+
+class _SlowAgent(BaseFunctionalAgent):
+    def process(self, task: str, context: Dict) -> AgentOutput:
+        time.sleep(0.01)
+        return AgentOutput(content=f"out:{task}")
+
+
+class _RejectFirst(BaseAdvisor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def review(self, output: AgentOutput, task: str, context: Dict) -> Dict:
+        self.calls += 1
+        score = 1.0 if self.calls > 1 else 0.0
+        return {
+            "score": score,
+            "approved": score > 0.5,
+            "critical_issues": [],
+            "suggestions": [],
+            "summary": "",
+            "severity": "low",
+        }
+
+
+def _spans(doc: Dict, name: str) -> List[Dict]:
+    return [e for e in doc["traceEvents"] if e["ph"] == "X" and e["name"] == name]
+
+
+def _inside(inner: Dict, outer: Dict) -> bool:
+    return outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def _record_inner(tracer: ChromeTracer) -> None:
+    with tracer.span("inner"):
+        pass
+
+
+def test_spans_record_threads_and_errors(tmp_path: Path) -> None:
+    """Spans land on their thread's track, with thread names and error args."""
+    tracer = ChromeTracer(process_name="test")
+    with tracer.span("outer", cat="t", k=1) as s:
+        s.set(extra="x")
+        worker = threading.Thread(target=_record_inner, args=(tracer,), name="w1")
+        worker.start()
+        worker.join()
+    try:
+        with tracer.span("failing"):
+            raise KeyError("x")
+    except KeyError:
+        pass
+
+    doc = json.loads(tracer.write(tmp_path / "t.json").read_text(encoding="utf-8"))
+    (outer,) = _spans(doc, "outer")
+    (inner,) = _spans(doc, "inner")
+    assert outer["args"] == {"k": 1, "extra": "x"} and outer["cat"] == "t"
+    assert inner["tid"] != outer["tid"]
+    names = {e["tid"]: e["args"]["name"] for e in doc["traceEvents"] if e["name"] == "thread_name"}
+    assert names[inner["tid"]] == "w1"
+    assert _spans(doc, "failing")[0]["args"] == {"error": "KeyError"}
+
+
+def test_span_is_noop_without_tracer() -> None:
+    """Module-level span() records nothing while no tracer is installed."""
+    with span("x") as s:
+        s.set(a=1)
+
+
+def test_sequential_run_nests_attempts_and_phases(tmp_path: Path) -> None:
+    """Retries show up as separate attempt spans, each nesting its phases."""
+    tracer = ChromeTracer()
+    set_tracer(tracer)
+    try:
+        orch = Orchestrator(lambda _: _SlowAgent(), lambda _: _RejectFirst(), CheckpointStore())
+        orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+        orch.use_cache = False
+        orch.run([PipelineStep(stage="a", agent="a", advisor="r", task="t", max_retries=1)])
+    finally:
+        set_tracer(None)
+
+    doc = tracer.to_dict()
+    (step,) = _spans(doc, "step")
+    assert step["args"]["status"] == "approved"
+    attempts = _spans(doc, "attempt")
+    assert [a["args"]["attempt"] for a in attempts] == [1, 2]
+    assert all(_inside(a, step) for a in attempts)
+    for attempt in attempts:
+        assert sum(_inside(r, attempt) for r in _spans(doc, "review")) == 1
+    # The agent runs on the timeout helper's thread, inside the agent_call phase
+    calls = _spans(doc, "agent_call")
+    processes = _spans(doc, "agent.process")
+    assert len(processes) == 2
+    assert all(p["tid"] != step["tid"] for p in processes)
+    assert all(any(_inside(p, c) for c in calls) for p in processes)
+
+
+def test_parallel_run_shows_waves_and_workers(tmp_path: Path) -> None:
+    """Steps of one wave run on worker tracks inside the wave span."""
+    tracer = ChromeTracer()
+    set_tracer(tracer)
+    try:
+        orch = OrchestratorParallel(
+            lambda _: _SlowAgent(), lambda _: _RejectFirst(), CheckpointStore(), max_workers=2
+        )
+        orch.eventlog = JsonlEventLog(path=str(tmp_path / "events.jsonl"))
+        steps = [
+            ParallelStep(stage="a", agent="a", advisor="r", task="t"),
+            ParallelStep(stage="b", agent="b", advisor="r", task="t"),
+            ParallelStep(stage="c", agent="c", advisor="r", task="t", depends_on=["a", "b"]),
+        ]
+        orch.run_waves(steps)
+    finally:
+        set_tracer(None)
+
+    doc = tracer.to_dict()
+    waves = _spans(doc, "wave")
+    assert [w["args"]["stages"] for w in waves] == [["a", "b"], ["c"]]
+    by_stage = {s["args"]["stage"]: s for s in _spans(doc, "step")}
+    assert by_stage["a"]["tid"] != by_stage["b"]["tid"]
+    assert _inside(by_stage["a"], waves[0]) and _inside(by_stage["c"], waves[1])
+    assert by_stage["a"]["tid"] != waves[0]["tid"]
+    assert len(_spans(doc, "agent_call")) == 3
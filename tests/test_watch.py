@@ -0,0 +1,134 @@
+"""Tests for incremental watch mode."""
+
+from pathlib import Path
+from typing import Dict, List
+
+from src.core.types import AgentOutput
+from src.orchestrator.task_render import referenced_keys
+from src.orchestrator.watch import IncrementalRunner
+from tests.helpers import Approve, RecordingAgents, approve
+
+PIPELINE = """
+stages:
+  - name: a
+    agent: RequirementsDraftingAgent
+    advisor: RequirementsAdvisor
+    task: "{a_task}"
+    max_retries: 0
+  - name: b
+    depends_on: [a]
+    agent: PromptRefinerAgent
+    advisor: PromptRefinerAdvisor
+    task: "{b_task} from {a.content}"
+    max_retries: 0
+  - name: c
+    depends_on: [a]
+    agent: CodeSkeletonAgent
+    advisor: CodeReviewAdvisor
+    task: "{c_task}"
+    max_retries: 0
+"""
+
+
+class _Reject(Approve):
+    def review(self, output: AgentOutput, task: str, context: Dict) -> Dict:
+        return {**super().review(output, task, context), "score": 0.0, "approved": False}
+
+
+def _write(path: Path, a: str = "A", b: str = "B", c: str = "C") -> None:
+    text = PIPELINE.replace("{a_task}", a).replace("{b_task}", b).replace("{c_task}", c)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_referenced_keys() -> None:
+    """Placeholders and Jinja2 names are extracted from task templates."""
+    keys = referenced_keys("Do {product_idea} with {{ req.content }} {% if tone %}x{% endif %}")
+    assert keys == {"product_idea", "req.content", "tone"}
+
+
+def test_only_changed_stages_rerun(tmp_path: Path) -> None:
+    """Editing a stage re-runs it and its dependents only."""
+    pipeline = tmp_path / "pipeline.yaml"
+    _write(pipeline)
+    agents = RecordingAgents()
+    runner = IncrementalRunner(str(pipeline), agent_factory=agents, advisor_factory=approve)
+
+    first = runner.run_once()
+    assert first["executed"] == ["a", "b", "c"]
+
+    assert runner.run_once()["executed"] == []
+
+    _write(pipeline, b="B2")
+    result = runner.run_once()
+    assert result["executed"] == ["b"]
+    assert (
+        result["memory"]["b.content"] == "PromptRefinerAgent: B2 from RequirementsDraftingAgent: A"
+    )
+    assert result["memory"]["c.content"] == "CodeSkeletonAgent: C"
+
+    _write(pipeline, a="A2", b="B2")
+    assert runner.run_once()["executed"] == ["a", "b", "c"]
+    assert agents.calls.count("RequirementsDraftingAgent") == 2
+
+
+def test_seed_change_invalidates(tmp_path: Path) -> None:
+    """Seed file edits invalidate stages; identical inputs hit the warm cache."""
+    pipeline = tmp_path / "pipeline.yaml"
+    _write(pipeline)
+    seed = tmp_path / "brand.txt"
+    seed.write_text("Acme", encoding="utf-8")
+    agents = RecordingAgents()
+    runner = IncrementalRunner(
+        str(pipeline),
+        seeds=[f"brand={seed}"],
+        agent_factory=agents,
+        advisor_factory=approve,
+    )
+
+    assert runner.run_once()["memory"]["brand"] == "Acme"
+    assert seed in runner.watched_files()
+
+    seed.write_text("Globex", encoding="utf-8")
+    result = runner.run_once()
+    assert result["executed"] == ["a", "b", "c"]
+    assert result["memory"]["brand"] == "Globex"
+    calls = len(agents.calls)
+
+    # Reverting re-validates the stages, but their rendered inputs are unchanged,
+    # so the warm agent cache serves them without calling the agents
+    seed.write_text("Acme", encoding="utf-8")
+    assert runner.run_once()["executed"] == ["a", "b", "c"]
+    assert len(agents.calls) == calls
+
+
+def test_rejected_stages_rerun(tmp_path: Path) -> None:
+    """A stage its advisor rejects is not reused; it reruns every cycle until approved."""
+    pipeline = tmp_path / "pipeline.yaml"
+    _write(pipeline)
+    runner = IncrementalRunner(
+        str(pipeline),
+        agent_factory=RecordingAgents(),
+        advisor_factory=lambda name: _Reject() if name == "CodeReviewAdvisor" else Approve(),
+    )
+
+    first = runner.run_once()
+    assert first["executed"] == ["a", "b", "c"]
+    assert [h["approved"] for h in first["history"]] == [True, True, False]
+
+    second = runner.run_once()
+    assert second["executed"] == ["c"] and second["reused"] == ["a", "b"]
+    assert runner.run_once()["executed"] == ["c"]
+
+
+def test_watch_runs_bounded_cycles(tmp_path: Path) -> None:
+    """watch() reports each cycle through the callback."""
+    pipeline = tmp_path / "pipeline.yaml"
+    _write(pipeline)
+    runner = IncrementalRunner(
+        str(pipeline), agent_factory=RecordingAgents(), advisor_factory=approve
+    )
+    results: List[Dict] = []
+    runner.watch(max_cycles=1, on_result=results.append)
+
+    assert len(results) == 1
+    assert pipeline in runner.watched_files()